@@ -0,0 +1,96 @@
+"""
+Funding Response Cache
+Gecachte Antworten für GET /funding/ und /funding/{id}
+
+Der Katalog ändert sich nur durch Scraper-Läufe (andere Prozesse). Statt
+expliziter Invalidierung enthält jeder Cache-Key die Datenversion
+(Anzahl + MAX(updated_at) der FUNDING_OPPORTUNITIES, plus Tagesdatum wegen
+des Deadline-Filters). Die Version wird höchstens alle
+FUNDING_CACHE_CHECK_INTERVAL Sekunden gelesen (Index-Lookup); speichert ein
+Scraper, entstehen danach automatisch neue Einträge.
+"""
+
+import os
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+
+from api.http_cache import ResponseCache, ResponseBuilder, http_date
+from utils.db_adapter import get_db_cursor, run_db
+from utils.ttl_cache import TTLCache
+
+# Lebensdauer gecachter Antworten (Sekunden, 0 = nur ETag/304)
+FUNDING_CACHE_TTL = float(os.getenv('FUNDING_CACHE_TTL', 300))
+
+# Sekunden zwischen zwei Prüfungen der Datenversion
+FUNDING_CACHE_CHECK_INTERVAL = float(os.getenv('FUNDING_CACHE_CHECK_INTERVAL', 5))
+
+# max-age für Browser/CDN (Cache-Control)
+FUNDING_CACHE_MAX_AGE = int(os.getenv('FUNDING_CACHE_MAX_AGE', 60))
+
+funding_response_cache = ResponseCache(ttl=FUNDING_CACHE_TTL)
+
+_version_cache = TTLCache(ttl=FUNDING_CACHE_CHECK_INTERVAL, max_entries=1)
+
+
+def _read_version() -> Tuple[int, Optional[datetime]]:
+    with get_db_cursor() as cursor:
+        cursor.execute('SELECT COUNT(*), MAX(updated_at) FROM FUNDING_OPPORTUNITIES')
+        count, updated_at = cursor.fetchone()
+
+    # SQLite liefert CURRENT_TIMESTAMP als Text (UTC)
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+    return count, updated_at
+
+
+def funding_data_version() -> Tuple[tuple, Optional[str]]:
+    """
+    Aktuelle Datenversion des Förderkatalogs
+
+    Blockierend; aus async Handlern über run_db aufrufen.
+
+    Returns:
+        (Versions-Tupel für Cache-Keys, Last-Modified als HTTP-Datum)
+    """
+    count, updated_at = _version_cache.get_or_set('version', _read_version)
+    last_modified = http_date(updated_at) if updated_at else None
+    return (count, updated_at, date.today()), last_modified
+
+
+async def cached_funding_response(
+    request: Request,
+    build: ResponseBuilder,
+    public: bool = True
+) -> Response:
+    """
+    Antwort eines Funding-Endpoints aus dem Response-Cache
+
+    Key: Pfad + sortierte Query-Parameter + Datenversion.
+
+    Args:
+        request: Eingehender Request
+        build: Erzeugt (Inhalt, Header) bei Cache-Miss
+        public: Cache-Control public (CDN darf cachen) statt private
+
+    Returns:
+        JSON-Antwort mit ETag/Last-Modified oder 304
+    """
+    version, last_modified = await run_db(funding_data_version)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), version)
+    scope = 'public' if public else 'private'
+
+    return await funding_response_cache.respond(
+        request,
+        key,
+        build,
+        cache_control=f'{scope}, max-age={FUNDING_CACHE_MAX_AGE}',
+        last_modified=last_modified
+    )
+
+
+def invalidate_funding_cache() -> None:
+    """Verwirft gecachte Antworten und die Datenversion (gleicher Prozess)"""
+    _version_cache.invalidate()
+    funding_response_cache.invalidate()
@@ -0,0 +1,162 @@
+"""
+HTTP Caching
+ETag / If-None-Match und Response-Cache für gecachte GET-Endpoints
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.ttl_cache import TTLCache
+
+
+def quote_etag(etag: str) -> str:
+    """Starkes ETag im Header-Format ("...")"""
+    return f'"{etag}"'
+
+
+def http_date(value: datetime) -> str:
+    """HTTP-Datum (RFC 7231) für Last-Modified; naive Zeitstempel gelten als UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Prüft If-None-Match gegen das aktuelle ETag
+
+    Args:
+        request: Eingehender Request
+        etag: Aktuelles ETag (ohne Anführungszeichen)
+
+    Returns:
+        True, wenn der Client den aktuellen Stand bereits hat
+    """
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = {value.strip().removeprefix('W/') for value in header.split(',')}
+    return quote_etag(etag) in candidates
+
+
+def _validator_headers(etag: str, cache_control: str, last_modified: Optional[str]) -> Dict[str, str]:
+    headers = {
+        'ETag': quote_etag(etag),
+        'Cache-Control': cache_control
+    }
+    if last_modified:
+        headers['Last-Modified'] = last_modified
+    return headers
+
+
+def cached_json_response(
+    request: Request,
+    content: Any,
+    etag: str,
+    max_age: int = 0,
+    last_modified: Optional[str] = None
+) -> Response:
+    """
+    JSON-Antwort mit ETag, 304 bei passendem If-None-Match
+
+    Args:
+        request: Eingehender Request
+        content: JSON-serialisierbarer Inhalt
+        etag: ETag des Inhalts (ohne Anführungszeichen)
+        max_age: Cache-Control max-age in Sekunden (0 = immer revalidieren)
+        last_modified: Last-Modified Header (HTTP-Datum)
+
+    Returns:
+        JSONResponse oder leere 304-Antwort
+    """
+    headers = _validator_headers(etag, f'private, max-age={max_age}, must-revalidate', last_modified)
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=content, headers=headers)
+
+
+@dataclass
+class CachedResponse:
+    """Fertig serialisierte JSON-Antwort"""
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+# build() liefert (Inhalt, zusätzliche Header, z.B. X-Next-Cursor)
+ResponseBuilder = Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+
+
+class ResponseCache:
+    """
+    Anwendungsseitiger Cache für JSON-Antworten
+
+    Speichert den serialisierten Body (kein erneutes Pydantic-Validieren
+    und JSON-Encoding bei Treffern). Das starke ETag ist der SHA1 des Bodys;
+    der Key sollte eine Datenversion enthalten, damit Änderungen ohne
+    explizites invalidate() zu neuen Einträgen führen.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 512):
+        """
+        Args:
+            ttl: Lebensdauer eines Eintrags in Sekunden (0 = nur ETag/304)
+            max_entries: Maximale Anzahl Einträge
+        """
+        self.entries = TTLCache(ttl=ttl, max_entries=max_entries)
+
+    async def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        build: ResponseBuilder,
+        cache_control: str = 'private, max-age=0, must-revalidate',
+        last_modified: Optional[str] = None
+    ) -> Response:
+        """
+        Antwort aus dem Cache oder per build() erzeugen
+
+        Args:
+            request: Eingehender Request (If-None-Match)
+            key: Cache-Key (Route, Query-Parameter, Datenversion)
+            build: Erzeugt (Inhalt, Header) bei Cache-Miss
+            cache_control: Cache-Control Header
+            last_modified: Last-Modified Header (HTTP-Datum)
+
+        Returns:
+            JSON-Antwort oder leere 304-Antwort
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            content, headers = await build()
+            body = json.dumps(
+                jsonable_encoder(content),
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(',', ':')
+            ).encode('utf-8')
+            entry = CachedResponse(body, hashlib.sha1(body).hexdigest(), dict(headers))
+            self.entries.set(key, entry)
+
+        headers = {**entry.headers, **_validator_headers(entry.etag, cache_control, last_modified)}
+
+        if etag_matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type='application/json', headers=headers)
+
+    def invalidate(self) -> None:
+        """Verwirft alle Einträge"""
+        self.entries.invalidate()
@@ -29,6 +29,9 @@ else:
     print('[STARTUP] Using Oracle routers (Production Mode)')
     from api.routers import auth, funding, applications, drafts
 
+from utils.db_adapter import init_db_pool, close_db_pool, shutdown_db_executor
+from utils.token_counter import load_tokenizer
+
 # Advanced RAG Router (v2)
 if USE_ADVANCED_RAG:
     print('[STARTUP] Loading Advanced RAG Router (v2)...')
@@ -54,10 +57,20 @@ async def lifespan(app: FastAPI):
         # seed_demo_data()  # Disabled - using real data from ChromaDB import
         print('[STARTUP] Using production data (ChromaDB import)')
 
+    # Oracle: session pool, SQLite: persistent WAL connections
+    print('[STARTUP] Creating database connection pool...')
+    init_db_pool()
+
+    # Tokenizer for prompt budgets: load now, not in the first draft request
+    load_tokenizer()
+
     yield
     # Shutdown
     print('[SHUTDOWN] API wird heruntergefahren...')
 
+    shutdown_db_executor()
+    close_db_pool()
+
 
 # FastAPI App
 app = FastAPI(
@@ -79,6 +92,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['X-Next-Cursor', 'X-Total-Count', 'ETag'],
 )
 
 # Custom Middleware
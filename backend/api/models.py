@@ -52,7 +52,7 @@ class User(BaseModel):
 # ============================================================================
 
 class FundingOpportunity(BaseModel):
-    """Fördermittel-Ausschreibung"""
+    """Fördermittel-Ausschreibung (Listenansicht, ohne Volltext)"""
     funding_id: str
     title: str
     source_url: str
@@ -64,7 +64,13 @@ class FundingOpportunity(BaseModel):
     max_funding_amount: Optional[float]
     tags: Optional[List[str]]
     scraped_at: datetime
-    cleaned_text: Optional[str] = None
+
+    # Kurze Klartext-Vorschau (utils.summary), Volltext nur in FundingDetail
+    summary: Optional[str] = None
+
+    # Nur bei Volltextsuche (q=): Relevanz + Textausschnitt mit <mark>-Treffern
+    score: Optional[float] = None
+    snippet: Optional[str] = None
 
 
 class FundingDetail(FundingOpportunity):
@@ -0,0 +1,118 @@
+"""
+Keyset Pagination
+Opake Cursor-Tokens und Gesamtanzahl-Cache für Listen-Endpoints
+
+Statt LIMIT/OFFSET (tiefe Seiten scannen alle vorherigen Zeilen) wird ab dem
+letzten Sortierschlüssel der vorherigen Seite weitergelesen. Der Cursor
+kodiert diesen Schlüssel base64url-JSON; Clients behandeln ihn als opak.
+
+Antworten bleiben Listen; Cursor und Anzahl stehen in Response-Headern:
+    X-Next-Cursor: Token für die nächste Seite (fehlt auf der letzten Seite)
+    X-Total-Count: Gesamtanzahl (nur mit include_total=true)
+"""
+
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Optional
+
+from fastapi import HTTPException, Response, status
+
+from utils.ttl_cache import TTLCache
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+TOTAL_COUNT_HEADER = 'X-Total-Count'
+
+# Gesamtanzahl pro Filterkombination (Sekunden, 0 = kein Cache)
+LIST_COUNT_CACHE_TTL = float(os.getenv('LIST_COUNT_CACHE_TTL', 60))
+
+total_count_cache = TTLCache(ttl=LIST_COUNT_CACHE_TTL)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Not serializable: {type(value).__name__}')
+
+
+def encode_cursor(scope: str, values: Dict[str, Any]) -> str:
+    """
+    Erzeugt ein Cursor-Token
+
+    Args:
+        scope: Endpoint-Kennung (Cursor eines Endpoints gilt nicht für andere)
+        values: Sortierschlüssel der letzten Zeile
+
+    Returns:
+        base64url-Token
+    """
+    payload = json.dumps({'s': scope, 'v': values}, default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(scope: str, token: str) -> Dict[str, Any]:
+    """
+    Liest ein Cursor-Token
+
+    Args:
+        scope: Erwartete Endpoint-Kennung
+        token: Token aus X-Next-Cursor
+
+    Returns:
+        Sortierschlüssel der letzten Zeile der vorherigen Seite
+
+    Raises:
+        400: Ungültiger Cursor
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if payload.get('s') != scope or not isinstance(payload.get('v'), dict):
+            raise ValueError('scope mismatch')
+        return payload['v']
+    except (ValueError, TypeError, UnicodeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor'
+        )
+
+
+def pagination_headers(
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None
+) -> Dict[str, str]:
+    """X-Next-Cursor / X-Total-Count als Header-Dict"""
+    headers = {}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(total)
+    return headers
+
+
+def set_pagination_headers(
+    response: Response,
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None
+) -> None:
+    """Setzt X-Next-Cursor / X-Total-Count"""
+    response.headers.update(pagination_headers(next_cursor, total))
+
+
+def invalidate_total_counts(scope: Optional[str] = None) -> None:
+    """
+    Verwirft gecachte Gesamtanzahlen (nach Schreibzugriffen)
+
+    Args:
+        scope: Nur Einträge dieses Endpoints (default: alle)
+    """
+    if scope is None:
+        total_count_cache.invalidate()
+    else:
+        total_count_cache.invalidate(lambda key: key[0] == scope)
+
+
+def count_cache_key(scope: str, *filters: Hashable) -> tuple:
+    """Cache-Key für die Gesamtanzahl einer Filterkombination"""
+    return (scope,) + filters
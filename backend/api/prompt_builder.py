@@ -0,0 +1,167 @@
+"""
+Prompt Builder
+Token-Budget-basierter Prompt-Aufbau für alle Draft-Generatoren
+
+Jeder variable Prompt-Abschnitt (Kontext, Förderkriterien, Schulprofil,
+Few-Shot-Beispiel) bekommt eine Priorität. Das Budget wird in Prioritäts-
+reihenfolge verteilt; was nicht passt, wird an Wortgrenzen gekürzt oder
+(bei niedriger Priorität) ganz weggelassen.
+"""
+
+import os
+import sys
+from typing import Dict, Any, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+from utils.token_counter import count_tokens, truncate_to_tokens
+from utils.prometheus_metrics import draft_generation_tokens
+
+# Section priorities (lower = more important)
+PRIORITY_REQUIRED = 0  # never truncated (e.g. user query)
+PRIORITY_CONTEXT = 1
+PRIORITY_ELIGIBILITY = 2
+PRIORITY_SCHOOL_PROFILE = 3
+PRIORITY_FEW_SHOT = 4
+
+# Default budget for the complete prompt (system + user message)
+DRAFT_PROMPT_MAX_TOKENS = int(os.getenv('DRAFT_PROMPT_MAX_TOKENS', 6000))
+
+
+class PromptBuilder:
+    """
+    Baut einen Prompt aus einem Template und priorisierten Abschnitten
+    """
+
+    def __init__(
+        self,
+        template: str,
+        max_tokens: int = DRAFT_PROMPT_MAX_TOKENS,
+        reserved_tokens: int = 0
+    ):
+        """
+        Initialisiert den Builder
+
+        Args:
+            template: Template mit {platzhaltern} (str.format)
+            max_tokens: Token-Budget für den gesamten Prompt
+            reserved_tokens: Bereits verbrauchte Tokens (z.B. System-Prompt)
+        """
+        self.template = template
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.sections: List[Dict[str, Any]] = []
+
+    def add_section(
+        self,
+        name: str,
+        text: str,
+        priority: int,
+        min_tokens: int = 0,
+        max_tokens: int = None,
+        fallback: str = ''
+    ) -> 'PromptBuilder':
+        """
+        Fügt einen variablen Abschnitt hinzu
+
+        Args:
+            name: Platzhalter-Name im Template
+            text: Inhalt des Abschnitts
+            priority: Priorität (PRIORITY_*)
+            min_tokens: Mindestbudget, das für diesen Abschnitt reserviert wird
+            max_tokens: Obergrenze für diesen Abschnitt (unabhängig vom Budget)
+            fallback: Ersatztext, wenn der Abschnitt leer ist oder wegfällt
+
+        Returns:
+            self (für Chaining)
+        """
+        text = (text or '').strip()
+        self.sections.append({
+            'name': name,
+            'text': text,
+            'tokens': count_tokens(text),
+            'priority': priority,
+            'min_tokens': min_tokens,
+            'max_tokens': max_tokens,
+            'fallback': fallback
+        })
+        return self
+
+    def _allocate(self, available: int) -> Dict[str, int]:
+        """Verteilt das verfügbare Budget nach Priorität"""
+        ordered = sorted(self.sections, key=lambda s: s['priority'])
+
+        wanted = {}
+        for section in ordered:
+            need = section['tokens']
+            if section['max_tokens'] is not None and section['priority'] != PRIORITY_REQUIRED:
+                need = min(need, section['max_tokens'])
+            wanted[section['name']] = need
+
+        # Minimum reservations for everything that is not required
+        reserved = {
+            s['name']: min(s['min_tokens'], wanted[s['name']])
+            for s in ordered if s['priority'] != PRIORITY_REQUIRED
+        }
+
+        allocation = {}
+        remaining = available
+        for section in ordered:
+            name = section['name']
+
+            if section['priority'] == PRIORITY_REQUIRED:
+                allocation[name] = wanted[name]
+                remaining -= wanted[name]
+                continue
+
+            reserved.pop(name)
+            grant = max(0, min(wanted[name], remaining - sum(reserved.values())))
+            allocation[name] = grant
+            remaining -= grant
+
+        return allocation
+
+    def build(self, **fixed_values) -> Dict[str, Any]:
+        """
+        Baut den Prompt und meldet die Prompt-Tokens an Prometheus
+
+        Args:
+            **fixed_values: Kurze Werte, die unverändert eingesetzt werden
+
+        Returns:
+            Dict mit 'prompt', 'prompt_tokens' und 'sections' (Token-Report)
+        """
+        empty = {section['name']: '' for section in self.sections}
+        fixed_tokens = count_tokens(self.template.format(**fixed_values, **empty))
+        available = self.max_tokens - self.reserved_tokens - fixed_tokens
+
+        allocation = self._allocate(available)
+
+        values = {}
+        report = {}
+        for section in self.sections:
+            name = section['name']
+            budget = allocation[name]
+
+            if section['priority'] == PRIORITY_REQUIRED or section['tokens'] <= budget:
+                text = section['text']
+            else:
+                text = truncate_to_tokens(section['text'], budget)
+
+            values[name] = text or section['fallback']
+            report[name] = {
+                'tokens': count_tokens(text),
+                'original_tokens': section['tokens'],
+                'truncated': text != section['text']
+            }
+
+        prompt = self.template.format(**fixed_values, **values)
+        prompt_tokens = self.reserved_tokens + count_tokens(prompt)
+
+        draft_generation_tokens.labels(type='prompt').observe(prompt_tokens)
+
+        return {
+            'prompt': prompt,
+            'prompt_tokens': prompt_tokens,
+            'sections': report
+        }
@@ -13,7 +13,7 @@ from pydantic import BaseModel
 from typing import Optional
 
 from api.auth_utils import hash_password
-from utils.db_adapter import get_db_cursor, USE_SQLITE
+from utils.db_adapter import get_db_cursor, run_db, USE_SQLITE
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -92,75 +92,44 @@ async def seed_school(school: SchoolCreate, x_admin_token: str = Header(...)):
     admin_password_hash = hash_password(school.admin_password)
 
     try:
-        with get_db_cursor() as cursor:
-            # 1. Create school
-            if USE_SQLITE:
-                cursor.execute("""
-                    INSERT INTO SCHOOLS (school_id, name, address, city, postal_code, contact_email, contact_phone)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    school_id,
-                    school.name,
-                    school.address,
-                    school.city,
-                    school.postal_code,
-                    school.contact_email,
-                    school.contact_phone
-                ))
-            else:
-                # Oracle version
-                cursor.execute("""
-                    INSERT INTO SCHOOLS (school_id, name, address, city, state, postal_code, contact_email, contact_phone, logo_url)
-                    VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
-                """, (
-                    school_id,
-                    school.name,
-                    school.address,
-                    school.city,
-                    school.state,
-                    school.postal_code,
-                    school.contact_email,
-                    school.contact_phone,
-                    school.logo_url
-                ))
-
-            # 2. Create admin user
-            if USE_SQLITE:
-                cursor.execute("""
-                    INSERT INTO USERS (user_id, school_id, email, password_hash, first_name, last_name, role, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    admin_id,
-                    school_id,
-                    school.admin_email,
-                    admin_password_hash,
-                    school.admin_first_name,
-                    school.admin_last_name,
-                    'admin',
-                    1
-                ))
-            else:
-                # Oracle version - check if FULL_NAME or FIRST_NAME/LAST_NAME
-                cursor.execute("SELECT column_name FROM user_tab_columns WHERE table_name = 'USERS' AND column_name IN ('FULL_NAME', 'FIRST_NAME')")
-                columns = [row[0] for row in cursor.fetchall()]
-
-                if 'FULL_NAME' in columns:
+        def _create_school():
+            with get_db_cursor() as cursor:
+                # 1. Create school
+                if USE_SQLITE:
                     cursor.execute("""
-                        INSERT INTO USERS (user_id, school_id, email, password_hash, full_name, role, is_active)
-                        VALUES (:1, :2, :3, :4, :5, :6, :7)
+                        INSERT INTO SCHOOLS (school_id, name, address, city, postal_code, contact_email, contact_phone)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
                     """, (
-                        admin_id,
                         school_id,
-                        school.admin_email,
-                        admin_password_hash,
-                        f"{school.admin_first_name} {school.admin_last_name}",
-                        'admin',
-                        1
+                        school.name,
+                        school.address,
+                        school.city,
+                        school.postal_code,
+                        school.contact_email,
+                        school.contact_phone
                     ))
                 else:
+                    # Oracle version
+                    cursor.execute("""
+                        INSERT INTO SCHOOLS (school_id, name, address, city, state, postal_code, contact_email, contact_phone, logo_url)
+                        VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
+                    """, (
+                        school_id,
+                        school.name,
+                        school.address,
+                        school.city,
+                        school.state,
+                        school.postal_code,
+                        school.contact_email,
+                        school.contact_phone,
+                        school.logo_url
+                    ))
+
+                # 2. Create admin user
+                if USE_SQLITE:
                     cursor.execute("""
                         INSERT INTO USERS (user_id, school_id, email, password_hash, first_name, last_name, role, is_active)
-                        VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     """, (
                         admin_id,
                         school_id,
@@ -171,10 +140,44 @@ async def seed_school(school: SchoolCreate, x_admin_token: str = Header(...)):
                         'admin',
                         1
                     ))
-
-            # Commit transaction
-            if not USE_SQLITE:
-                cursor.connection.commit()
+                else:
+                    # Oracle version - check if FULL_NAME or FIRST_NAME/LAST_NAME
+                    cursor.execute("SELECT column_name FROM user_tab_columns WHERE table_name = 'USERS' AND column_name IN ('FULL_NAME', 'FIRST_NAME')")
+                    columns = [row[0] for row in cursor.fetchall()]
+
+                    if 'FULL_NAME' in columns:
+                        cursor.execute("""
+                            INSERT INTO USERS (user_id, school_id, email, password_hash, full_name, role, is_active)
+                            VALUES (:1, :2, :3, :4, :5, :6, :7)
+                        """, (
+                            admin_id,
+                            school_id,
+                            school.admin_email,
+                            admin_password_hash,
+                            f"{school.admin_first_name} {school.admin_last_name}",
+                            'admin',
+                            1
+                        ))
+                    else:
+                        cursor.execute("""
+                            INSERT INTO USERS (user_id, school_id, email, password_hash, first_name, last_name, role, is_active)
+                            VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+                        """, (
+                            admin_id,
+                            school_id,
+                            school.admin_email,
+                            admin_password_hash,
+                            school.admin_first_name,
+                            school.admin_last_name,
+                            'admin',
+                            1
+                        ))
+
+                # Commit transaction
+                if not USE_SQLITE:
+                    cursor.connection.commit()
+
+        await run_db(_create_school)
 
         return SchoolResponse(
             school_id=school_id,
@@ -7,24 +7,53 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from typing import List
+from datetime import datetime
 
 from api.models import Application, ApplicationCreate, ApplicationUpdate
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor
+from api.pagination import (
+    encode_cursor,
+    decode_cursor,
+    set_pagination_headers,
+    total_count_cache,
+    count_cache_key
+)
+from utils.db_adapter import get_db_cursor, db_fetch_all, db_fetch_one, db_execute, run_db
 
 router = APIRouter()
 
+APPLICATIONS_CURSOR_SCOPE = 'applications'
+
+
+def invalidate_school_count(school_id: str) -> None:
+    """Verwirft die gecachte Anzahl Anträge einer Schule"""
+    total_count_cache.invalidate(lambda key: key == count_cache_key(APPLICATIONS_CURSOR_SCOPE, school_id))
+
 
 @router.get('/', response_model=List[Application])
-async def list_applications(current_user: dict = Depends(get_current_user)):
+async def list_applications(
+    response: Response,
+    limit: int = Query(None, ge=1, le=200),
+    cursor: str = Query(None, max_length=500),
+    include_total: bool = Query(False),
+    current_user: dict = Depends(get_current_user)
+):
     """
     Liste aller Anträge der Schule des aktuellen Users
 
+    Args:
+        limit: Seitengröße (ohne limit: alle Anträge)
+        cursor: X-Next-Cursor der vorherigen Seite (Keyset-Pagination auf
+            created_at, application_id)
+        include_total: Gesamtanzahl als X-Total-Count
+
     Returns:
         Liste von Anträgen (nur der eigenen Schule!)
     """
+    school_id = current_user['school_id']
+
     query = """
     SELECT
         RAWTOHEX(application_id) as application_id,
@@ -41,20 +70,51 @@ async def list_applications(current_user: dict = Depends(get_current_user)):
         updated_at
     FROM APPLICATIONS
     WHERE RAWTOHEX(school_id) = :school_id
-    ORDER BY created_at DESC
     """
+    params = {'school_id': school_id}
+
+    # Keyset: continue after (created_at, application_id) of the last row
+    if cursor:
+        last = decode_cursor(APPLICATIONS_CURSOR_SCOPE, cursor)
+        try:
+            last_created_at = datetime.fromisoformat(last.get('created_at'))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        query += """ AND (created_at < :last_created_at
+            OR (created_at = :last_created_at AND RAWTOHEX(application_id) < :last_id))"""
+        params['last_created_at'] = last_created_at
+        params['last_id'] = last.get('id')
+
+    query += ' ORDER BY created_at DESC, RAWTOHEX(application_id) DESC'
+
+    if limit:
+        query += ' FETCH FIRST :limit ROWS ONLY'
+        params['limit'] = limit
+
+    rows = await db_fetch_all(query, params, as_dicts=True)
+
+    next_cursor = None
+    if limit and len(rows) == limit:
+        next_cursor = encode_cursor(APPLICATIONS_CURSOR_SCOPE, {
+            'created_at': rows[-1]['created_at'],
+            'id': rows[-1]['application_id']
+        })
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'school_id': current_user['school_id']})
-
-        columns = [col[0].lower() for col in cursor.description]
-        results = []
+    total = None
+    if include_total:
+        key = count_cache_key(APPLICATIONS_CURSOR_SCOPE, school_id)
+        total = total_count_cache.get(key)
+        if total is None:
+            count_row = await db_fetch_one(
+                'SELECT COUNT(*) FROM APPLICATIONS WHERE RAWTOHEX(school_id) = :school_id',
+                {'school_id': school_id}
+            )
+            total = count_row[0]
+            total_count_cache.set(key, total)
 
-        for row in cursor:
-            data = dict(zip(columns, row))
-            results.append(Application(**data))
+    set_pagination_headers(response, next_cursor, total)
 
-    return results
+    return [Application(**data) for data in rows]
 
 
 @router.get('/{application_id}', response_model=Application)
@@ -94,17 +154,11 @@ async def get_application(
     WHERE RAWTOHEX(application_id) = :application_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'application_id': application_id})
-        row = cursor.fetchone()
+    data = await db_fetch_one(query, {'application_id': application_id}, as_dict=True)
 
-    if not row:
+    if not data:
         raise HTTPException(status_code=404, detail='Application not found')
 
-    # Parse Result
-    columns = [col[0].lower() for col in cursor.description]
-    data = dict(zip(columns, row))
-
     # Verify School Access
     if data['school_id'] != current_user['school_id']:
         raise HTTPException(
@@ -135,10 +189,8 @@ async def create_application(
     WHERE RAWTOHEX(funding_id) = :funding_id AND is_active = 1
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(funding_check, {'funding_id': app_data.funding_id})
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail='Funding not found')
+    if not await db_fetch_one(funding_check, {'funding_id': app_data.funding_id}):
+        raise HTTPException(status_code=404, detail='Funding not found')
 
     # Insert Application
     insert_query = """
@@ -159,20 +211,22 @@ async def create_application(
     ) RETURNING RAWTOHEX(application_id) INTO :application_id
     """
 
-    application_id_var = cursor.var(str)
-
-    with get_db_cursor() as cursor:
-        cursor.execute(insert_query, {
-            'school_id': current_user['school_id'],
-            'user_id': current_user['user_id'],
-            'funding_id': app_data.funding_id,
-            'title': app_data.title,
-            'projektbeschreibung': app_data.projektbeschreibung,
-            'application_id': application_id_var
-        })
+    def _insert_application():
+        with get_db_cursor() as cursor:
+            application_id_var = cursor.var(str)
+            cursor.execute(insert_query, {
+                'school_id': current_user['school_id'],
+                'user_id': current_user['user_id'],
+                'funding_id': app_data.funding_id,
+                'title': app_data.title,
+                'projektbeschreibung': app_data.projektbeschreibung,
+                'application_id': application_id_var
+            })
+            return application_id_var.getvalue()[0]
 
     # Return created application
-    application_id = application_id_var.getvalue()[0]
+    application_id = await run_db(_insert_application)
+    invalidate_school_count(current_user['school_id'])
     return await get_application(application_id, current_user)
 
 
@@ -230,8 +284,7 @@ async def update_application(
     WHERE RAWTOHEX(application_id) = :application_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(update_query, params)
+    await db_execute(update_query, params)
 
     # Return updated
     return await get_application(application_id, current_user)
@@ -267,7 +320,7 @@ async def delete_application(
     WHERE RAWTOHEX(application_id) = :application_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(delete_query, {'application_id': application_id})
+    await db_execute(delete_query, {'application_id': application_id})
+    invalidate_school_count(current_user['school_id'])
 
     return None
@@ -7,30 +7,58 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from typing import List
 import uuid
 
 from api.models import Application, ApplicationCreate, ApplicationUpdate
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor
+from api.pagination import (
+    encode_cursor,
+    decode_cursor,
+    set_pagination_headers,
+    total_count_cache,
+    count_cache_key
+)
+from utils.db_adapter import db_fetch_all, db_fetch_one, db_execute
 
 router = APIRouter()
 
+APPLICATIONS_CURSOR_SCOPE = 'applications'
+
 
 def generate_id():
     """Generate UUID without dashes for SQLite"""
     return str(uuid.uuid4()).replace('-', '').upper()
 
 
+def invalidate_school_count(school_id: str) -> None:
+    """Verwirft die gecachte Anzahl Anträge einer Schule"""
+    total_count_cache.invalidate(lambda key: key == count_cache_key(APPLICATIONS_CURSOR_SCOPE, school_id))
+
+
 @router.get('/', response_model=List[Application])
-async def list_applications(current_user: dict = Depends(get_current_user)):
+async def list_applications(
+    response: Response,
+    limit: int = Query(None, ge=1, le=200),
+    cursor: str = Query(None, max_length=500),
+    include_total: bool = Query(False),
+    current_user: dict = Depends(get_current_user)
+):
     """
     Liste aller Anträge der Schule des aktuellen Users
 
+    Args:
+        limit: Seitengröße (ohne limit: alle Anträge)
+        cursor: X-Next-Cursor der vorherigen Seite (Keyset-Pagination auf
+            created_at, application_id)
+        include_total: Gesamtanzahl als X-Total-Count
+
     Returns:
         Liste von Anträgen (nur der eigenen Schule!)
     """
+    school_id = current_user['school_id']
+
     query = """
     SELECT
         application_id,
@@ -45,30 +73,59 @@ async def list_applications(current_user: dict = Depends(get_current_user)):
         created_at
     FROM APPLICATIONS
     WHERE school_id = ?
-    ORDER BY created_at DESC
     """
-
-    with get_db_cursor() as cursor:
-        cursor.execute(query, (current_user['school_id'],))
-
-        results = []
-        for row in cursor:
-            data = {
-                'application_id': row['application_id'],
-                'school_id': row['school_id'],
-                'user_id': row['user_id'],
-                'funding_id': row['funding_id'],
-                'title': row['title'],
-                'status': row['status'],
-                'projektbeschreibung': row['draft_text'] or row['final_text'],
-                'budget_total': None,
-                'submission_date': row['submitted_at'],
-                'decision_status': None,
-                'notes': None,
-                'created_at': row['created_at'],
-                'updated_at': row['created_at']  # SQLite doesn't have updated_at
-            }
-            results.append(Application(**data))
+    params = [school_id]
+
+    # Keyset: continue after (created_at, application_id) of the last row
+    if cursor:
+        last = decode_cursor(APPLICATIONS_CURSOR_SCOPE, cursor)
+        query += ' AND (created_at, application_id) < (?, ?)'
+        params.extend([last.get('created_at'), last.get('id')])
+
+    query += ' ORDER BY created_at DESC, application_id DESC'
+
+    if limit:
+        query += ' LIMIT ?'
+        params.append(limit)
+
+    rows = await db_fetch_all(query, tuple(params))
+
+    next_cursor = None
+    if limit and len(rows) == limit:
+        next_cursor = encode_cursor(APPLICATIONS_CURSOR_SCOPE, {
+            'created_at': rows[-1]['created_at'],
+            'id': rows[-1]['application_id']
+        })
+
+    total = None
+    if include_total:
+        key = count_cache_key(APPLICATIONS_CURSOR_SCOPE, school_id)
+        total = total_count_cache.get(key)
+        if total is None:
+            count_row = await db_fetch_one('SELECT COUNT(*) FROM APPLICATIONS WHERE school_id = ?', (school_id,))
+            total = count_row[0]
+            total_count_cache.set(key, total)
+
+    set_pagination_headers(response, next_cursor, total)
+
+    results = []
+    for row in rows:
+        data = {
+            'application_id': row['application_id'],
+            'school_id': row['school_id'],
+            'user_id': row['user_id'],
+            'funding_id': row['funding_id'],
+            'title': row['title'],
+            'status': row['status'],
+            'projektbeschreibung': row['draft_text'] or row['final_text'],
+            'budget_total': None,
+            'submission_date': row['submitted_at'],
+            'decision_status': None,
+            'notes': None,
+            'created_at': row['created_at'],
+            'updated_at': row['created_at']  # SQLite doesn't have updated_at
+        }
+        results.append(Application(**data))
 
     return results
 
@@ -107,9 +164,7 @@ async def get_application(
     WHERE application_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, (application_id,))
-        row = cursor.fetchone()
+    row = await db_fetch_one(query, (application_id,))
 
     if not row:
         raise HTTPException(status_code=404, detail='Application not found')
@@ -161,10 +216,8 @@ async def create_application(
     WHERE funding_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(funding_check, (app_data.funding_id,))
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail='Funding not found')
+    if not await db_fetch_one(funding_check, (app_data.funding_id,)):
+        raise HTTPException(status_code=404, detail='Funding not found')
 
     # Generate new application ID
     application_id = generate_id()
@@ -182,16 +235,16 @@ async def create_application(
     ) VALUES (?, ?, ?, ?, ?, ?, ?)
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(insert_query, (
-            application_id,
-            current_user['school_id'],
-            current_user['user_id'],
-            app_data.funding_id,
-            app_data.title,
-            app_data.projektbeschreibung,
-            'draft'
-        ))
+    await db_execute(insert_query, (
+        application_id,
+        current_user['school_id'],
+        current_user['user_id'],
+        app_data.funding_id,
+        app_data.title,
+        app_data.projektbeschreibung,
+        'draft'
+    ))
+    invalidate_school_count(current_user['school_id'])
 
     # Return created application
     return await get_application(application_id, current_user)
@@ -246,8 +299,7 @@ async def update_application(
     WHERE application_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(update_query, tuple(params))
+    await db_execute(update_query, tuple(params))
 
     # Return updated
     return await get_application(application_id, current_user)
@@ -283,7 +335,7 @@ async def delete_application(
     WHERE application_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(delete_query, (application_id,))
+    await db_execute(delete_query, (application_id,))
+    invalidate_school_count(current_user['school_id'])
 
     return None
@@ -12,7 +12,7 @@ from datetime import datetime
 
 from api.models import UserLogin, Token, UserCreate, User
 from api.auth_utils import hash_password, verify_password, create_access_token
-from utils.database import get_db_cursor
+from utils.db_adapter import get_db_cursor, db_fetch_one, db_execute, run_db
 
 router = APIRouter()
 
@@ -44,9 +44,7 @@ async def login(credentials: UserLogin):
     WHERE email = :email
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'email': credentials.email})
-        row = cursor.fetchone()
+    row = await db_fetch_one(query, {'email': credentials.email})
 
     if not row:
         raise HTTPException(
@@ -78,8 +76,7 @@ async def login(credentials: UserLogin):
     SET last_login = SYSTIMESTAMP
     WHERE email = :email
     """
-    with get_db_cursor() as cursor:
-        cursor.execute(update_query, {'email': credentials.email})
+    await db_execute(update_query, {'email': credentials.email})
 
     # Create JWT Token
     token_data = {
@@ -119,26 +116,22 @@ async def register(user_data: UserCreate):
     WHERE RAWTOHEX(school_id) = :school_id AND is_active = 1
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(school_check_query, {'school_id': user_data.school_id})
-        if not cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='School not found'
-            )
+    if not await db_fetch_one(school_check_query, {'school_id': user_data.school_id}):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='School not found'
+        )
 
     # Check if user already exists
     email_check_query = """
     SELECT email FROM USERS WHERE email = :email
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(email_check_query, {'email': user_data.email})
-        if cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Email already registered'
-            )
+    if await db_fetch_one(email_check_query, {'email': user_data.email}):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Email already registered'
+        )
 
     # Hash Password
     password_hash = hash_password(user_data.password)
@@ -152,21 +145,24 @@ async def register(user_data: UserCreate):
     ) RETURNING RAWTOHEX(user_id) INTO :user_id
     """
 
-    user_id_var = cursor.var(str)
-
-    with get_db_cursor() as cursor:
-        cursor.execute(insert_query, {
-            'school_id': user_data.school_id,
-            'email': user_data.email,
-            'password_hash': password_hash,
-            'first_name': user_data.first_name,
-            'last_name': user_data.last_name,
-            'user_id': user_id_var
-        })
+    def _insert_user():
+        with get_db_cursor() as cursor:
+            user_id_var = cursor.var(str)
+            cursor.execute(insert_query, {
+                'school_id': user_data.school_id,
+                'email': user_data.email,
+                'password_hash': password_hash,
+                'first_name': user_data.first_name,
+                'last_name': user_data.last_name,
+                'user_id': user_id_var
+            })
+            return user_id_var.getvalue()[0]
+
+    user_id = await run_db(_insert_user)
 
     # Return created user (ohne password_hash!)
     return User(
-        user_id=user_id_var.getvalue()[0],
+        user_id=user_id,
         school_id=user_data.school_id,
         email=user_data.email,
         first_name=user_data.first_name,
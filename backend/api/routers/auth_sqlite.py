@@ -13,7 +13,7 @@ from datetime import datetime
 
 from api.models import UserLogin, Token, UserCreate, User
 from api.auth_utils import hash_password, verify_password, create_access_token
-from utils.db_adapter import get_db_cursor, USE_SQLITE
+from utils.db_adapter import get_db_cursor, db_fetch_one, db_execute, run_db, USE_SQLITE
 
 router = APIRouter()
 
@@ -63,13 +63,10 @@ async def login(credentials: UserLogin):
         WHERE email = :email
         """
 
-    with get_db_cursor() as cursor:
-        if USE_SQLITE:
-            cursor.execute(query, (credentials.email,))
-            row = cursor.fetchone()
-        else:
-            cursor.execute(query, {'email': credentials.email})
-            row = cursor.fetchone()
+    if USE_SQLITE:
+        row = await db_fetch_one(query, (credentials.email,))
+    else:
+        row = await db_fetch_one(query, {'email': credentials.email})
 
     if not row:
         raise HTTPException(
@@ -113,16 +110,14 @@ async def login(credentials: UserLogin):
         SET last_login = CURRENT_TIMESTAMP
         WHERE email = ?
         """
-        with get_db_cursor() as cursor:
-            cursor.execute(update_query, (credentials.email,))
+        await db_execute(update_query, (credentials.email,))
     else:
         update_query = """
         UPDATE USERS
         SET last_login = SYSTIMESTAMP
         WHERE email = :email
         """
-        with get_db_cursor() as cursor:
-            cursor.execute(update_query, {'email': credentials.email})
+        await db_execute(update_query, {'email': credentials.email})
 
     # Create JWT Token
     token_data = {
@@ -168,17 +163,16 @@ async def register(user_data: UserCreate):
         WHERE RAWTOHEX(school_id) = :school_id AND is_active = 1
         """
 
-    with get_db_cursor() as cursor:
-        if USE_SQLITE:
-            cursor.execute(school_check_query, (user_data.school_id,))
-        else:
-            cursor.execute(school_check_query, {'school_id': user_data.school_id})
+    if USE_SQLITE:
+        school = await db_fetch_one(school_check_query, (user_data.school_id,))
+    else:
+        school = await db_fetch_one(school_check_query, {'school_id': user_data.school_id})
 
-        if not cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='School not found'
-            )
+    if not school:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='School not found'
+        )
 
     # Check if user already exists
     if USE_SQLITE:
@@ -190,17 +184,16 @@ async def register(user_data: UserCreate):
         SELECT email FROM USERS WHERE email = :email
         """
 
-    with get_db_cursor() as cursor:
-        if USE_SQLITE:
-            cursor.execute(email_check_query, (user_data.email,))
-        else:
-            cursor.execute(email_check_query, {'email': user_data.email})
+    if USE_SQLITE:
+        existing = await db_fetch_one(email_check_query, (user_data.email,))
+    else:
+        existing = await db_fetch_one(email_check_query, {'email': user_data.email})
 
-        if cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Email already registered'
-            )
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Email already registered'
+        )
 
     # Hash Password
     password_hash = hash_password(user_data.password)
@@ -215,15 +208,14 @@ async def register(user_data: UserCreate):
             user_id, school_id, email, password_hash, first_name, last_name, role
         ) VALUES (?, ?, ?, ?, ?, ?, 'lehrkraft')
         """
-        with get_db_cursor() as cursor:
-            cursor.execute(insert_query, (
-                user_id,
-                user_data.school_id,
-                user_data.email,
-                password_hash,
-                user_data.first_name,
-                user_data.last_name
-            ))
+        await db_execute(insert_query, (
+            user_id,
+            user_data.school_id,
+            user_data.email,
+            password_hash,
+            user_data.first_name,
+            user_data.last_name
+        ))
     else:
         insert_query = """
         INSERT INTO USERS (
@@ -232,17 +224,21 @@ async def register(user_data: UserCreate):
             HEXTORAW(:school_id), :email, :password_hash, :first_name, :last_name, 'lehrkraft'
         ) RETURNING RAWTOHEX(user_id) INTO :user_id
         """
-        user_id_var = cursor.var(str)
-        with get_db_cursor() as cursor:
-            cursor.execute(insert_query, {
-                'school_id': user_data.school_id,
-                'email': user_data.email,
-                'password_hash': password_hash,
-                'first_name': user_data.first_name,
-                'last_name': user_data.last_name,
-                'user_id': user_id_var
-            })
-            user_id = user_id_var.getvalue()[0]
+
+        def _insert_user():
+            with get_db_cursor() as cursor:
+                user_id_var = cursor.var(str)
+                cursor.execute(insert_query, {
+                    'school_id': user_data.school_id,
+                    'email': user_data.email,
+                    'password_hash': password_hash,
+                    'first_name': user_data.first_name,
+                    'last_name': user_data.last_name,
+                    'user_id': user_id_var
+                })
+                return user_id_var.getvalue()[0]
+
+        user_id = await run_db(_insert_user)
 
     # Return created user (ohne password_hash!)
     return User(
@@ -19,6 +19,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 import httpx
 from datetime import datetime
@@ -29,8 +30,14 @@ from dotenv import load_dotenv
 
 from api.models import DraftGenerateRequest, DraftGenerateResponse, DraftFeedback
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor
+from utils.db_adapter import get_db_cursor, db_fetch_all, db_fetch_one, db_execute, run_db
 from utils.oci_secrets import get_deepseek_api_key
+from api.prompt_builder import (
+    PromptBuilder,
+    PRIORITY_REQUIRED,
+    PRIORITY_CONTEXT,
+    PRIORITY_SCHOOL_PROFILE
+)
 
 load_dotenv()
 
@@ -107,9 +114,7 @@ async def get_school_profile(school_id: str) -> dict:
     WHERE RAWTOHEX(school_id) = :school_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'school_id': school_id})
-        row = cursor.fetchone()
+    row = await db_fetch_one(query, {'school_id': school_id})
 
     if not row:
         return {}
@@ -244,9 +249,7 @@ async def generate_draft(
     WHERE RAWTOHEX(application_id) = :application_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(app_query, {'application_id': request.application_id})
-        app_row = cursor.fetchone()
+    app_row = await db_fetch_one(app_query, {'application_id': request.application_id})
 
     if not app_row:
         raise HTTPException(status_code=404, detail='Application not found')
@@ -263,17 +266,15 @@ async def generate_draft(
     WHERE RAWTOHEX(funding_id) = :funding_id AND is_active = 1
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(funding_query, {'funding_id': request.funding_id})
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail='Funding not found')
+    if not await db_fetch_one(funding_query, {'funding_id': request.funding_id}):
+        raise HTTPException(status_code=404, detail='Funding not found')
 
     # 3. Get School Profile
     school_profile = await get_school_profile(current_user['school_id'])
     school_profile_str = '\n'.join([f'{k}: {v}' for k, v in school_profile.items()])
 
-    # 4. RAG Retrieval
-    context_chunks = retrieve_context(request.funding_id, request.user_query)
+    # 4. RAG Retrieval (embedding + ChromaDB are blocking)
+    context_chunks = await run_in_threadpool(retrieve_context, request.funding_id, request.user_query)
 
     if not context_chunks:
         raise HTTPException(
@@ -281,12 +282,15 @@ async def generate_draft(
             detail='No context found for this funding (index may not be built yet)'
         )
 
-    # 5. Build Prompt
-    prompt = DEEPSEEK_PROMPT_TEMPLATE.format(
-        context_chunks='\n---\n'.join(context_chunks),
-        school_profile=school_profile_str,
-        user_query=request.user_query
+    # 5. Build Prompt (token budget by priority)
+    prompt_result = (
+        PromptBuilder(DEEPSEEK_PROMPT_TEMPLATE)
+        .add_section('user_query', request.user_query, PRIORITY_REQUIRED)
+        .add_section('context_chunks', '\n---\n'.join(context_chunks), PRIORITY_CONTEXT, min_tokens=500)
+        .add_section('school_profile', school_profile_str, PRIORITY_SCHOOL_PROFILE, min_tokens=100)
+        .build()
     )
+    prompt = prompt_result['prompt']
 
     # 6. Call DeepSeek API
     generated_content = await call_deepseek_api(prompt)
@@ -313,22 +317,24 @@ async def generate_draft(
         'model': DEEPSEEK_MODEL,
         'temperature': DEEPSEEK_TEMPERATURE,
         'max_tokens': DEEPSEEK_MAX_TOKENS,
-        'chunks_used': len(context_chunks)
+        'chunks_used': len(context_chunks),
+        'prompt_tokens': prompt_result['prompt_tokens']
     })
 
-    draft_id_var = cursor.var(str)
-
-    with get_db_cursor() as cursor:
-        cursor.execute(insert_query, {
-            'application_id': request.application_id,
-            'generated_content': generated_content,
-            'model_used': DEEPSEEK_MODEL,
-            'prompt_used': prompt,
-            'metadata': metadata,
-            'draft_id': draft_id_var
-        })
-
-    draft_id = draft_id_var.getvalue()[0]
+    def _insert_draft():
+        with get_db_cursor() as cursor:
+            draft_id_var = cursor.var(str)
+            cursor.execute(insert_query, {
+                'application_id': request.application_id,
+                'generated_content': generated_content,
+                'model_used': DEEPSEEK_MODEL,
+                'prompt_used': prompt,
+                'metadata': metadata,
+                'draft_id': draft_id_var
+            })
+            return draft_id_var.getvalue()[0]
+
+    draft_id = await run_db(_insert_draft)
 
     return DraftGenerateResponse(
         draft_id=draft_id,
@@ -370,17 +376,9 @@ async def get_drafts_for_application(
     ORDER BY created_at DESC
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'application_id': application_id})
+    rows = await db_fetch_all(query, {'application_id': application_id}, as_dicts=True)
 
-        columns = [col[0].lower() for col in cursor.description]
-        results = []
-
-        for row in cursor:
-            data = dict(zip(columns, row))
-            results.append(DraftGenerateResponse(**data))
-
-    return results
+    return [DraftGenerateResponse(**data) for data in rows]
 
 
 @router.post('/feedback')
@@ -403,13 +401,12 @@ async def submit_feedback(
     WHERE RAWTOHEX(draft_id) = :draft_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(update_query, {
-            'draft_id': feedback.draft_id,
-            'feedback': feedback.feedback
-        })
+    updated = await db_execute(update_query, {
+        'draft_id': feedback.draft_id,
+        'feedback': feedback.feedback
+    })
 
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail='Draft not found')
+    if updated == 0:
+        raise HTTPException(status_code=404, detail='Draft not found')
 
     return {'message': 'Feedback submitted successfully'}
@@ -22,8 +22,16 @@ import json
 
 from api.models import DraftGenerateRequest, DraftGenerateResponse, DraftFeedback
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor
+from utils.db_adapter import get_db_cursor, db_fetch_all, db_fetch_one, db_execute, run_db
 from utils.oci_secrets import get_deepseek_api_key
+from utils.token_counter import count_tokens
+from api.prompt_builder import (
+    PromptBuilder,
+    PRIORITY_REQUIRED,
+    PRIORITY_CONTEXT,
+    PRIORITY_SCHOOL_PROFILE,
+    PRIORITY_FEW_SHOT
+)
 
 # Advanced RAG imports
 from rag_indexer.advanced_rag_pipeline import AdvancedRAGPipeline
@@ -55,28 +63,16 @@ DEEPSEEK_MODEL = os.getenv('DEEPSEEK_MODEL', 'deepseek-chat')
 DEEPSEEK_MAX_TOKENS = int(os.getenv('DEEPSEEK_MAX_TOKENS', 3000))  # Increased for better drafts
 DEEPSEEK_TEMPERATURE = float(os.getenv('DEEPSEEK_TEMPERATURE', 0.5))
 
+# Token budget for the compressed RAG context in the prompt
+RAG_CONTEXT_MAX_TOKENS = int(os.getenv('RAG_CONTEXT_MAX_TOKENS', 1500))
+
+SYSTEM_PROMPT = 'Du bist ein professioneller Experte für Fördermittelanträge im deutschen Grundschulsystem.'
+
 # ============================================================================
 # Enhanced Prompt Template (Few-Shot + Chain-of-Thought)
 # ============================================================================
 
-ENHANCED_PROMPT_TEMPLATE = """
-Du bist ein professioneller Experte für Fördermittelanträge im deutschen Grundschulsystem mit 10+ Jahren Erfahrung bei erfolgreichen Bewerbungen.
-
----
-KONTEXT (Relevante Auszüge aus der offiziellen Ausschreibung):
-{context_chunks}
-
----
-ANTRAGSTELLER (Stammdaten der Schule):
-{school_profile}
-
----
-PROJEKTBESCHREIBUNG (Nutzereingabe):
-{user_query}
-
----
-BEISPIEL-ANTRAG (Few-Shot Learning):
-
+FEW_SHOT_EXAMPLE = """
 **Beispiel 1: Tablet-Förderung**
 
 Anfrage: "Wir brauchen 20 Tablets für unsere 3. Klasse für digitalen Unterricht"
@@ -105,6 +101,27 @@ Ziel ist die Anschaffung von 20 Tablets (iPad 10. Generation oder vergleichbar)
 - Zubehör (Hüllen, Ladewagen): 1.500€
 - Fortbildung: 500€
 - **Gesamtsumme: 10.000€**
+""".strip()
+
+ENHANCED_PROMPT_TEMPLATE = """
+Du bist ein professioneller Experte für Fördermittelanträge im deutschen Grundschulsystem mit 10+ Jahren Erfahrung bei erfolgreichen Bewerbungen.
+
+---
+KONTEXT (Relevante Auszüge aus der offiziellen Ausschreibung):
+{context_chunks}
+
+---
+ANTRAGSTELLER (Stammdaten der Schule):
+{school_profile}
+
+---
+PROJEKTBESCHREIBUNG (Nutzereingabe):
+{user_query}
+
+---
+BEISPIEL-ANTRAG (Few-Shot Learning):
+
+{few_shot_example}
 
 ---
 SCHRITT-FÜR-SCHRITT ANLEITUNG (Chain-of-Thought):
@@ -151,9 +168,7 @@ async def get_school_profile(school_id: str) -> dict:
     WHERE RAWTOHEX(school_id) = :school_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'school_id': school_id})
-        row = cursor.fetchone()
+    row = await db_fetch_one(query, {'school_id': school_id})
 
     if not row:
         return {}
@@ -189,7 +204,7 @@ async def call_deepseek_api(prompt: str, temperature: float = DEEPSEEK_TEMPERATU
         'messages': [
             {
                 'role': 'system',
-                'content': 'Du bist ein professioneller Experte für Fördermittelanträge im deutschen Grundschulsystem.'
+                'content': SYSTEM_PROMPT
             },
             {
                 'role': 'user',
@@ -259,9 +274,7 @@ async def generate_draft(
     WHERE RAWTOHEX(application_id) = :application_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(app_query, {'application_id': request.application_id})
-        app_row = cursor.fetchone()
+    app_row = await db_fetch_one(app_query, {'application_id': request.application_id})
 
     if not app_row:
         raise HTTPException(status_code=404, detail='Application not found')
@@ -278,10 +291,8 @@ async def generate_draft(
     WHERE RAWTOHEX(funding_id) = :funding_id AND is_active = 1
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(funding_query, {'funding_id': request.funding_id})
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail='Funding not found')
+    if not await db_fetch_one(funding_query, {'funding_id': request.funding_id}):
+        raise HTTPException(status_code=404, detail='Funding not found')
 
     # 3. Get School Profile
     school_profile = await get_school_profile(current_user['school_id'])
@@ -294,7 +305,8 @@ async def generate_draft(
             query=request.user_query,
             funding_id=request.funding_id,
             school_profile={'data': school_profile},
-            top_k=5
+            top_k=5,
+            context_max_tokens=RAG_CONTEXT_MAX_TOKENS
         )
     except Exception as e:
         print(f'[ERROR] Advanced RAG failed: {e}')
@@ -312,12 +324,16 @@ async def generate_draft(
     compressed_context = rag_result['compressed_context']
     retrieval_metadata = rag_result.get('retrieval_metadata', {})
 
-    # 5. Build Enhanced Prompt
-    prompt = ENHANCED_PROMPT_TEMPLATE.format(
-        context_chunks=compressed_context,
-        school_profile=school_profile,
-        user_query=request.user_query
+    # 5. Build Enhanced Prompt (token budget by priority)
+    prompt_result = (
+        PromptBuilder(ENHANCED_PROMPT_TEMPLATE, reserved_tokens=count_tokens(SYSTEM_PROMPT))
+        .add_section('user_query', request.user_query, PRIORITY_REQUIRED)
+        .add_section('context_chunks', compressed_context, PRIORITY_CONTEXT, min_tokens=500)
+        .add_section('school_profile', school_profile, PRIORITY_SCHOOL_PROFILE, min_tokens=100)
+        .add_section('few_shot_example', FEW_SHOT_EXAMPLE, PRIORITY_FEW_SHOT, fallback='(entfällt)')
+        .build()
     )
+    prompt = prompt_result['prompt']
 
     # 6. Call DeepSeek API
     print('[INFO] Calling DeepSeek API for generation...')
@@ -345,6 +361,8 @@ async def generate_draft(
         'temperature': DEEPSEEK_TEMPERATURE,
         'max_tokens': DEEPSEEK_MAX_TOKENS,
         'rag_version': 'advanced_v2',
+        'prompt_tokens': prompt_result['prompt_tokens'],
+        'prompt_sections': prompt_result['sections'],
         'retrieval_metadata': retrieval_metadata,
         'features_used': {
             'hybrid_search': True,
@@ -354,19 +372,20 @@ async def generate_draft(
         }
     })
 
-    draft_id_var = cursor.var(str)
-
-    with get_db_cursor() as cursor:
-        cursor.execute(insert_query, {
-            'application_id': request.application_id,
-            'generated_content': generated_content,
-            'model_used': f'{DEEPSEEK_MODEL}_advanced_rag_v2',
-            'prompt_used': prompt,
-            'metadata': metadata,
-            'draft_id': draft_id_var
-        })
-
-    draft_id = draft_id_var.getvalue()[0]
+    def _insert_draft():
+        with get_db_cursor() as cursor:
+            draft_id_var = cursor.var(str)
+            cursor.execute(insert_query, {
+                'application_id': request.application_id,
+                'generated_content': generated_content,
+                'model_used': f'{DEEPSEEK_MODEL}_advanced_rag_v2',
+                'prompt_used': prompt,
+                'metadata': metadata,
+                'draft_id': draft_id_var
+            })
+            return draft_id_var.getvalue()[0]
+
+    draft_id = await run_db(_insert_draft)
 
     print(f'[SUCCESS] Draft generated: {draft_id}')
 
@@ -410,17 +429,9 @@ async def get_drafts_for_application(
     ORDER BY created_at DESC
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'application_id': application_id})
-
-        columns = [col[0].lower() for col in cursor.description]
-        results = []
+    rows = await db_fetch_all(query, {'application_id': application_id}, as_dicts=True)
 
-        for row in cursor:
-            data = dict(zip(columns, row))
-            results.append(DraftGenerateResponse(**data))
-
-    return results
+    return [DraftGenerateResponse(**data) for data in rows]
 
 
 @router.post('/feedback')
@@ -443,14 +454,13 @@ async def submit_feedback(
     WHERE RAWTOHEX(draft_id) = :draft_id
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(update_query, {
-            'draft_id': feedback.draft_id,
-            'feedback': feedback.feedback
-        })
+    updated = await db_execute(update_query, {
+        'draft_id': feedback.draft_id,
+        'feedback': feedback.feedback
+    })
 
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail='Draft not found')
+    if updated == 0:
+        raise HTTPException(status_code=404, detail='Draft not found')
 
     return {'message': 'Feedback submitted successfully'}
 
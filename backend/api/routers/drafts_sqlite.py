@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from datetime import datetime
 import uuid
@@ -15,7 +16,15 @@ import logging
 
 from api.models import DraftGenerateRequest, DraftGenerateResponse, DraftFeedback
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor
+from utils.db_adapter import db_fetch_all, db_fetch_one, db_execute
+from utils.token_counter import count_tokens
+from utils.prometheus_metrics import draft_generation_tokens
+from api.prompt_builder import (
+    PromptBuilder,
+    PRIORITY_REQUIRED,
+    PRIORITY_CONTEXT,
+    PRIORITY_ELIGIBILITY
+)
 
 # DeepSeek Integration via OpenAI SDK
 from openai import OpenAI
@@ -463,92 +472,21 @@ Die {school_name} verfügt über alle notwendigen Voraussetzungen für eine erfo
     return mock_draft.strip()
 
 
-def generate_deepseek_draft(
-    funding_data: dict,
-    user_query: str,
-    school_profile: dict
-) -> str:
-    """
-    Generate real AI draft using DeepSeek API with enhanced prompts
-
-    Uses multi-stage approach:
-    1. Build comprehensive prompt from funding + school context
-    2. Call DeepSeek with structured system/user prompts
-    3. Fallback to mock if API fails
-
-    Args:
-        funding_data: Complete funding opportunity details
-        user_query: User's project description
-        school_profile: School information
-
-    Returns:
-        Generated markdown draft or mock fallback
-    """
-    # Check if API key is configured
-    api_key = os.getenv("DEEPSEEK_API_KEY", "")
-    if not api_key or api_key == "sk-placeholder":
-        logger.warning("DeepSeek API key not configured, falling back to mock")
-        return generate_mock_draft(funding_data, user_query, school_profile)
-
-    # Build enhanced system prompt
-    system_prompt = """Du bist ein erfahrener Förderantrag-Experte für deutsche Grundschulen mit 15+ Jahren Erfahrung.
-Du hast über 200 erfolgreiche Anträge begleitet und kennst die Erfolgsfaktoren genau.
-
-Deine Aufgabe: Erstelle einen professionellen, überzeugenden Förderantrag in deutscher Sprache.
-
-QUALITÄTSKRITERIEN:
-✅ Konkrete Zahlen, Fakten und messbare Ziele (SMART-Formulierung)
-✅ Klare Struktur mit 8 Hauptabschnitten
-✅ Positive, selbstbewusste Sprache (KEIN Konjunktiv)
-✅ Budget detailliert aufgeschlüsselt und begründet
-✅ Evaluation mit messbaren Indikatoren
-✅ Nachhaltigkeit über Projektlaufzeit hinaus
-
-VERMEIDE:
-❌ Floskeln und Allgemeinplätze
-❌ Passive Formulierungen
-❌ Vage Angaben ohne Zahlen
-❌ Generische Phrasen
-
-Erstelle den Antrag als strukturiertes Markdown-Dokument."""
-
-    # Build comprehensive user prompt with all context
-    funding_title = funding_data.get('title', 'Unbekanntes Förderprogramm')
-    provider = funding_data.get('provider', 'Unbekannter Anbieter')
-    description = funding_data.get('description', '')
-    eligibility = funding_data.get('eligibility', '')
-    categories = funding_data.get('categories', '')
-    target_groups = funding_data.get('target_groups', '')
-    max_amount = funding_data.get('funding_amount_max', 50000)
-    min_amount = funding_data.get('funding_amount_min', 0)
-    deadline = funding_data.get('application_deadline', '')
-
-    school_name = school_profile.get('school_name', 'Grundschule Musterberg')
-    school_address = school_profile.get('address', 'Adresse wird nachgetragen')
-
-    # Format amounts
-    if min_amount and max_amount:
-        funding_range = f"{min_amount:,.0f}€ - {max_amount:,.0f}€".replace(',', '.')
-    elif max_amount:
-        funding_range = f"bis {max_amount:,.0f}€".replace(',', '.')
-    else:
-        funding_range = "Nicht spezifiziert"
-
-    user_prompt = f"""Erstelle einen vollständigen Förderantrag für folgende Situation:
+DEEPSEEK_USER_PROMPT_TEMPLATE = """Erstelle einen vollständigen Förderantrag für folgende Situation:
 
 **FÖRDERPROGRAMM:**
 - Titel: {funding_title}
 - Anbieter: {provider}
-- Förderkategorien: {categories or 'Allgemeine Bildungsförderung'}
-- Zielgruppen: {target_groups or 'Grundschulen'}
+- Förderkategorien: {categories}
+- Zielgruppen: {target_groups}
 - Fördersumme: {funding_range}
-- Bewerbungsfrist: {deadline or 'Siehe Ausschreibung'}
+- Bewerbungsfrist: {deadline}
 
 **PROGRAMMBESCHREIBUNG:**
-{description[:1000] if description else 'Siehe Ausschreibung'}
+{description}
 
 **FÖRDERKRITERIEN:**
-{eligibility[:800] if eligibility else 'Siehe Ausschreibung'}
+{eligibility}
 
 **ANTRAGSTELLENDE SCHULE:**
 - Name: {school_name}
@@ -613,6 +551,98 @@ WICHTIG:
 
 Erstelle jetzt den vollständigen Antrag:"""
 
+
+def generate_deepseek_draft(
+    funding_data: dict,
+    user_query: str,
+    school_profile: dict
+) -> str:
+    """
+    Generate real AI draft using DeepSeek API with enhanced prompts
+
+    Uses multi-stage approach:
+    1. Build comprehensive prompt from funding + school context
+    2. Call DeepSeek with structured system/user prompts
+    3. Fallback to mock if API fails
+
+    Args:
+        funding_data: Complete funding opportunity details
+        user_query: User's project description
+        school_profile: School information
+
+    Returns:
+        Generated markdown draft or mock fallback
+    """
+    # Check if API key is configured
+    api_key = os.getenv("DEEPSEEK_API_KEY", "")
+    if not api_key or api_key == "sk-placeholder":
+        logger.warning("DeepSeek API key not configured, falling back to mock")
+        return generate_mock_draft(funding_data, user_query, school_profile)
+
+    # Build enhanced system prompt
+    system_prompt = """Du bist ein erfahrener Förderantrag-Experte für deutsche Grundschulen mit 15+ Jahren Erfahrung.
+Du hast über 200 erfolgreiche Anträge begleitet und kennst die Erfolgsfaktoren genau.
+
+Deine Aufgabe: Erstelle einen professionellen, überzeugenden Förderantrag in deutscher Sprache.
+
+QUALITÄTSKRITERIEN:
+✅ Konkrete Zahlen, Fakten und messbare Ziele (SMART-Formulierung)
+✅ Klare Struktur mit 8 Hauptabschnitten
+✅ Positive, selbstbewusste Sprache (KEIN Konjunktiv)
+✅ Budget detailliert aufgeschlüsselt und begründet
+✅ Evaluation mit messbaren Indikatoren
+✅ Nachhaltigkeit über Projektlaufzeit hinaus
+
+VERMEIDE:
+❌ Floskeln und Allgemeinplätze
+❌ Passive Formulierungen
+❌ Vage Angaben ohne Zahlen
+❌ Generische Phrasen
+
+Erstelle den Antrag als strukturiertes Markdown-Dokument."""
+
+    # Build comprehensive user prompt with all context
+    funding_title = funding_data.get('title', 'Unbekanntes Förderprogramm')
+    provider = funding_data.get('provider', 'Unbekannter Anbieter')
+    description = funding_data.get('description', '')
+    eligibility = funding_data.get('eligibility', '')
+    categories = funding_data.get('categories', '')
+    target_groups = funding_data.get('target_groups', '')
+    max_amount = funding_data.get('funding_amount_max', 50000)
+    min_amount = funding_data.get('funding_amount_min', 0)
+    deadline = funding_data.get('application_deadline', '')
+
+    school_name = school_profile.get('school_name', 'Grundschule Musterberg')
+    school_address = school_profile.get('address', 'Adresse wird nachgetragen')
+
+    # Format amounts
+    if min_amount and max_amount:
+        funding_range = f"{min_amount:,.0f}€ - {max_amount:,.0f}€".replace(',', '.')
+    elif max_amount:
+        funding_range = f"bis {max_amount:,.0f}€".replace(',', '.')
+    else:
+        funding_range = "Nicht spezifiziert"
+
+    prompt_result = (
+        PromptBuilder(DEEPSEEK_USER_PROMPT_TEMPLATE, reserved_tokens=count_tokens(system_prompt))
+        .add_section('user_query', user_query, PRIORITY_REQUIRED)
+        .add_section('description', description, PRIORITY_CONTEXT, min_tokens=200,
+                     fallback='Siehe Ausschreibung')
+        .add_section('eligibility', eligibility, PRIORITY_ELIGIBILITY, min_tokens=200,
+                     fallback='Siehe Ausschreibung')
+        .build(
+            funding_title=funding_title,
+            provider=provider,
+            categories=categories or 'Allgemeine Bildungsförderung',
+            target_groups=target_groups or 'Grundschulen',
+            funding_range=funding_range,
+            deadline=deadline or 'Siehe Ausschreibung',
+            school_name=school_name,
+            school_address=school_address
+        )
+    )
+    user_prompt = prompt_result['prompt']
+
     try:
         logger.info(f"Calling DeepSeek API for funding '{funding_title}' (school: {school_name})")
 
@@ -629,7 +659,13 @@ Erstelle jetzt den vollständigen Antrag:"""
 
         generated_content = response.choices[0].message.content
 
-        logger.info(f"DeepSeek API success. Generated {len(generated_content)} characters")
+        if response.usage:
+            draft_generation_tokens.labels(type='completion').observe(response.usage.completion_tokens)
+
+        logger.info(
+            f"DeepSeek API success. Generated {len(generated_content)} characters "
+            f"(prompt: {prompt_result['prompt_tokens']} tokens)"
+        )
 
         return generated_content.strip()
 
@@ -656,9 +692,7 @@ async def generate_draft(
     WHERE application_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(app_query, (request.application_id,))
-        app_row = cursor.fetchone()
+    app_row = await db_fetch_one(app_query, (request.application_id,))
 
     if not app_row:
         raise HTTPException(status_code=404, detail='Application not found')
@@ -686,25 +720,23 @@ async def generate_draft(
     WHERE funding_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(funding_query, (request.funding_id,))
-        funding_row = cursor.fetchone()
-
-        if not funding_row:
-            raise HTTPException(status_code=404, detail='Funding not found')
-
-        funding_data = {
-            'title': funding_row['title'],
-            'provider': funding_row['provider'],
-            'description': funding_row['description'] or '',
-            'eligibility': funding_row['eligibility'] or '',
-            'funding_amount_min': funding_row['funding_amount_min'],
-            'funding_amount_max': funding_row['funding_amount_max'],
-            'application_deadline': funding_row['application_deadline'],
-            'categories': funding_row['categories'] or '',
-            'target_groups': funding_row['target_groups'] or '',
-            'cleaned_text': funding_row['cleaned_text'] or ''
-        }
+    funding_row = await db_fetch_one(funding_query, (request.funding_id,))
+
+    if not funding_row:
+        raise HTTPException(status_code=404, detail='Funding not found')
+
+    funding_data = {
+        'title': funding_row['title'],
+        'provider': funding_row['provider'],
+        'description': funding_row['description'] or '',
+        'eligibility': funding_row['eligibility'] or '',
+        'funding_amount_min': funding_row['funding_amount_min'],
+        'funding_amount_max': funding_row['funding_amount_max'],
+        'application_deadline': funding_row['application_deadline'],
+        'categories': funding_row['categories'] or '',
+        'target_groups': funding_row['target_groups'] or '',
+        'cleaned_text': funding_row['cleaned_text'] or ''
+    }
 
     # 3. Get School Profile from Database
     school_query = """
@@ -713,28 +745,27 @@ async def generate_draft(
     WHERE school_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(school_query, (current_user['school_id'],))
-        school_row = cursor.fetchone()
-
-        if not school_row:
-            raise HTTPException(status_code=404, detail='School not found')
-
-        # Build school profile with real data
-        school_profile = {
-            'school_name': school_row['name'],
-            'school_number': 'wird nachgetragen',  # Optional field, not in DB yet
-            'address': f"{school_row['address']}, {school_row['postal_code']} {school_row['city']}" if school_row['address'] else 'Adresse wird nachgetragen',
-            'schultyp': 'Grundschule',  # Default for this project
-            'schuelerzahl': 'wird nachgetragen',  # Optional field, not in DB yet
-            'traeger': 'Öffentlicher Träger'  # Default for this project
-        }
+    school_row = await db_fetch_one(school_query, (current_user['school_id'],))
+
+    if not school_row:
+        raise HTTPException(status_code=404, detail='School not found')
+
+    # Build school profile with real data
+    school_profile = {
+        'school_name': school_row['name'],
+        'school_number': 'wird nachgetragen',  # Optional field, not in DB yet
+        'address': f"{school_row['address']}, {school_row['postal_code']} {school_row['city']}" if school_row['address'] else 'Adresse wird nachgetragen',
+        'schultyp': 'Grundschule',  # Default for this project
+        'schuelerzahl': 'wird nachgetragen',  # Optional field, not in DB yet
+        'traeger': 'Öffentlicher Träger'  # Default for this project
+    }
 
     # 4. Generate Draft - Priority: DeepSeek > Advanced > Mock
-    # Try DeepSeek first (real AI generation)
+    # Try DeepSeek first (real AI generation) - blocking SDK call runs in threadpool
     try:
         logger.info(f'[DRAFT] Using DeepSeek API for app {request.application_id}')
-        generated_content = generate_deepseek_draft(
+        generated_content = await run_in_threadpool(
+            generate_deepseek_draft,
             funding_data=funding_data,
             user_query=request.user_query,
             school_profile=school_profile
@@ -750,7 +781,8 @@ async def generate_draft(
         if USE_ADVANCED_GENERATOR:
             try:
                 logger.info('[DRAFT] Falling back to Advanced Context-Aware Generator')
-                generated_content = generate_advanced_draft(
+                generated_content = await run_in_threadpool(
+                    generate_advanced_draft,
                     funding_id=request.funding_id,
                     user_query=request.user_query,
                     application_id=request.application_id,
@@ -780,14 +812,13 @@ async def generate_draft(
     ) VALUES (?, ?, ?, ?, ?)
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(insert_query, (
-            draft_id,
-            request.application_id,
-            generated_content,
-            ai_model,  # Use the determined model name
-            f'User query: {request.user_query}'
-        ))
+    await db_execute(insert_query, (
+        draft_id,
+        request.application_id,
+        generated_content,
+        ai_model,  # Use the determined model name
+        f'User query: {request.user_query}'
+    ))
 
     return DraftGenerateResponse(
         draft_id=draft_id,
@@ -823,20 +854,19 @@ async def get_drafts_for_application(
     ORDER BY created_at DESC
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, (application_id,))
-
-        results = []
-        for row in cursor:
-            # Map SQLite column names to API model field names
-            data = {
-                'draft_id': row['draft_id'],
-                'application_id': row['application_id'],
-                'generated_content': row['draft_text'],  # Map draft_text → generated_content
-                'model_used': row['ai_model'],  # Map ai_model → model_used
-                'created_at': row['created_at']
-            }
-            results.append(DraftGenerateResponse(**data))
+    rows = await db_fetch_all(query, (application_id,))
+
+    results = []
+    for row in rows:
+        # Map SQLite column names to API model field names
+        data = {
+            'draft_id': row['draft_id'],
+            'application_id': row['application_id'],
+            'generated_content': row['draft_text'],  # Map draft_text → generated_content
+            'model_used': row['ai_model'],  # Map ai_model → model_used
+            'created_at': row['created_at']
+        }
+        results.append(DraftGenerateResponse(**data))
 
     return results
 
@@ -855,13 +885,12 @@ async def submit_feedback(
     WHERE draft_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(update_query, (
-            feedback.feedback,
-            feedback.draft_id
-        ))
+    updated = await db_execute(update_query, (
+        feedback.feedback,
+        feedback.draft_id
+    ))
 
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail='Draft not found')
+    if updated == 0:
+        raise HTTPException(status_code=404, detail='Draft not found')
 
     return {'message': 'Feedback submitted successfully'}
@@ -8,38 +8,102 @@ import os
 import json
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 
 from api.models import FundingOpportunity, FundingDetail, FundingFilter
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor
+from api.http_cache import cached_json_response
+from api.funding_cache import cached_funding_response
+from api.pagination import (
+    encode_cursor,
+    decode_cursor,
+    pagination_headers,
+    total_count_cache,
+    count_cache_key
+)
+from utils.db_adapter import get_db_cursor, db_fetch_all, db_fetch_one, run_db
+from utils.facets import get_facets, facet_options
+from utils.fulltext import oracle_contains_query, HIGHLIGHT_START, HIGHLIGHT_END
+from utils.summary import SUMMARY_MAX_CHARS
 
 router = APIRouter()
 
+FUNDING_CURSOR_SCOPE = 'funding'
+
+
+def _search_funding(query: str, params: dict) -> list:
+    """Volltextsuche ausführen (CTX_DOC.SNIPPET adressiert Dokumente per ROWID)"""
+    with get_db_cursor() as cursor:
+        cursor.execute("BEGIN CTX_DOC.SET_KEY_TYPE('ROWID'); END;")
+        cursor.execute(query, params)
+        columns = [col[0].lower() for col in cursor.description]
+        rows = []
+        for row in cursor:
+            data = dict(zip(columns, row))
+            if data.get('snippet') is not None and hasattr(data['snippet'], 'read'):
+                data['snippet'] = data['snippet'].read()
+            rows.append(data)
+        return rows
+
 
 @router.get('/', response_model=List[FundingOpportunity])
 async def list_funding(
+    request: Request,
+    q: str = Query(None, max_length=200),
     region: str = Query(None),
     funding_area: str = Query(None),
     provider: str = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str = Query(None, max_length=500),
+    include_total: bool = Query(False),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Liste aller aktiven Fördermittel mit optionalen Filtern
 
+    Antworten werden pro Query-Parameter und Datenversion gecacht
+    (api.funding_cache): ETag, Last-Modified, 304 bei If-None-Match.
+
     Args:
+        q: Volltextsuche (Oracle Text CONTAINS, Score-Ranking, Snippets)
         region: Filter nach Region
         funding_area: Filter nach Förderbereich
         provider: Filter nach Fördergeber
         limit: Anzahl Ergebnisse
-        offset: Offset für Pagination
+        offset: Offset für Pagination (veraltet, stattdessen cursor)
+        cursor: X-Next-Cursor der vorherigen Seite (Keyset-Pagination auf
+            deadline, funding_id; nicht mit q kombinierbar)
+        include_total: Gesamtanzahl als X-Total-Count (gecacht pro Filter)
 
     Returns:
-        Liste von Fördermitteln
+        Liste von Fördermitteln (nächste Seite: X-Next-Cursor Header)
     """
+    return await cached_funding_response(
+        request,
+        lambda: _query_funding_list(q, region, funding_area, provider, limit, offset, cursor, include_total),
+        public=False
+    )
+
+
+async def _query_funding_list(
+    q: Optional[str],
+    region: Optional[str],
+    funding_area: Optional[str],
+    provider: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    include_total: bool
+) -> Tuple[List[FundingOpportunity], Dict[str, str]]:
+    """Liest eine Seite aus der DB (Cache-Miss von list_funding)"""
+    contains_query = oracle_contains_query(q) if q else ''
+
+    if cursor and contains_query:
+        raise HTTPException(status_code=400, detail='cursor cannot be combined with q')
+
     # Build Query
     query = """
     SELECT
@@ -53,66 +117,122 @@ async def list_funding(
         min_funding_amount,
         max_funding_amount,
         tags,
-        scraped_at
+        scraped_at,
+        COALESCE(summary, DBMS_LOB.SUBSTR(cleaned_text, :summary_chars, 1)) as summary
+    """
+
+    params = {}
+    filter_sql = """
     FROM FUNDING_OPPORTUNITIES
     WHERE is_active = 1
     """
 
-    params = {}
+    if contains_query:
+        # Full-text search via CONTEXT index idx_funding_fulltext (multi-column
+        # datastore: title, provider, region, funding_area, cleaned_text)
+        query += """,
+        SCORE(1) as score,
+        CTX_DOC.SNIPPET('idx_funding_fulltext', ROWID, :q, :hl_start, :hl_end) as snippet
+    """
+        filter_sql += ' AND CONTAINS(cleaned_text, :q, 1) > 0'
+        params['q'] = contains_query
 
     # Filters
     if region:
-        query += ' AND region = :region'
+        filter_sql += ' AND region = :region'
         params['region'] = region
 
     if funding_area:
-        query += ' AND funding_area = :funding_area'
+        filter_sql += ' AND funding_area = :funding_area'
         params['funding_area'] = funding_area
 
     if provider:
-        query += ' AND provider = :provider'
+        filter_sql += ' AND provider = :provider'
         params['provider'] = provider
 
     # Nur zukünftige Deadlines
-    query += ' AND (deadline IS NULL OR deadline > SYSTIMESTAMP)'
+    filter_sql += ' AND (deadline IS NULL OR deadline > SYSTIMESTAMP)'
+    filter_params = dict(params)
+
+    # Vorschau statt Volltext (Fallback: Textanfang, falls summary fehlt)
+    params['summary_chars'] = SUMMARY_MAX_CHARS
+
+    query += filter_sql
 
-    # Order & Limit
-    query += ' ORDER BY deadline ASC NULLS LAST'
+    # Keyset: continue after (deadline, funding_id) of the last row (NULLS LAST)
+    if cursor:
+        last = decode_cursor(FUNDING_CURSOR_SCOPE, cursor)
+        params['last_id'] = last.get('id')
+        if last.get('deadline') is None:
+            query += ' AND deadline IS NULL AND funding_id > HEXTORAW(:last_id)'
+        else:
+            try:
+                params['last_deadline'] = datetime.fromisoformat(last['deadline'])
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail='Invalid cursor')
+            query += """ AND (deadline > :last_deadline
+            OR (deadline = :last_deadline AND funding_id > HEXTORAW(:last_id))
+            OR deadline IS NULL)"""
+        offset = 0
+
+    # Order & Limit (search results by relevance)
+    if contains_query:
+        query += ' ORDER BY score DESC'
+        params.update({'hl_start': HIGHLIGHT_START, 'hl_end': HIGHLIGHT_END})
+    else:
+        query += ' ORDER BY deadline ASC NULLS LAST, funding_id ASC'
     query += ' OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY'
 
     params['offset'] = offset
     params['limit'] = limit
 
-    # Execute
-    with get_db_cursor() as cursor:
-        cursor.execute(query, params)
-
-        columns = [col[0].lower() for col in cursor.description]
-        results = []
-
-        for row in cursor:
-            data = dict(zip(columns, row))
-
-            # Parse tags (JSON Array -> List)
-            if data.get('tags'):
-                try:
-                    data['tags'] = json.loads(data['tags'])
-                except json.JSONDecodeError:
-                    data['tags'] = []
+    # Execute (DB thread pool)
+    if contains_query:
+        rows = await run_db(_search_funding, query, params)
+    else:
+        rows = await db_fetch_all(query, params, as_dicts=True)
+
+    next_cursor = None
+    if rows and len(rows) == limit and not contains_query:
+        next_cursor = encode_cursor(FUNDING_CURSOR_SCOPE, {
+            'deadline': rows[-1]['deadline'],
+            'id': rows[-1]['funding_id']
+        })
+
+    total = None
+    if include_total:
+        key = count_cache_key(FUNDING_CURSOR_SCOPE, contains_query, region, funding_area, provider)
+        total = total_count_cache.get(key)
+        if total is None:
+            count_row = await db_fetch_one('SELECT COUNT(*)' + filter_sql, filter_params)
+            total = count_row[0]
+            total_count_cache.set(key, total)
+
+    results = []
+    for data in rows:
+        # Parse tags (JSON Array -> List)
+        if data.get('tags'):
+            try:
+                data['tags'] = json.loads(data['tags'])
+            except json.JSONDecodeError:
+                data['tags'] = []
 
-            results.append(FundingOpportunity(**data))
+        results.append(FundingOpportunity(**data))
 
-    return results
+    return results, pagination_headers(next_cursor, total)
 
 
 @router.get('/{funding_id}', response_model=FundingDetail)
 async def get_funding_detail(
+    request: Request,
     funding_id: str,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Detaillierte Informationen zu einer Förderausschreibung (inkl. Text)
 
+    Gecacht wie list_funding (ETag, Last-Modified, 304).
+
     Args:
         funding_id: ID der Förderausschreibung
 
@@ -122,6 +242,15 @@ async def get_funding_detail(
     Raises:
         404: Förderung nicht gefunden
     """
+    return await cached_funding_response(
+        request,
+        lambda: _query_funding_detail(funding_id),
+        public=False
+    )
+
+
+async def _query_funding_detail(funding_id: str) -> Tuple[FundingDetail, Dict[str, str]]:
+    """Liest ein Förderprogramm aus der DB (Cache-Miss von get_funding_detail)"""
     query = """
     SELECT
         RAWTOHEX(funding_id) as funding_id,
@@ -135,6 +264,7 @@ async def get_funding_detail(
         max_funding_amount,
         tags,
         cleaned_text,
+        summary,
         metadata_json,
         scraped_at,
         eligibility,
@@ -153,17 +283,11 @@ async def get_funding_detail(
       AND is_active = 1
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, {'funding_id': funding_id})
-        row = cursor.fetchone()
+    data = await db_fetch_one(query, {'funding_id': funding_id}, as_dict=True)
 
-    if not row:
+    if not data:
         raise HTTPException(status_code=404, detail='Funding not found')
 
-    # Parse Result
-    columns = [col[0].lower() for col in cursor.description]
-    data = dict(zip(columns, row))
-
     # Parse JSON fields
     if data.get('tags'):
         try:
@@ -192,56 +316,21 @@ async def get_funding_detail(
         else:
             data[field] = []
 
-    return FundingDetail(**data)
+    return FundingDetail(**data), {}
 
 
 @router.get('/filters/options')
-async def get_filter_options(current_user: dict = Depends(get_current_user)):
+async def get_filter_options(request: Request, current_user: dict = Depends(get_current_user)):
     """
     Gibt verfügbare Filter-Optionen zurück (für Dropdown-Menüs)
 
-    Returns:
-        Dict mit Listen von verfügbaren Regionen, Areas, Providern
-    """
-    # Regionen
-    regions_query = """
-    SELECT DISTINCT region
-    FROM FUNDING_OPPORTUNITIES
-    WHERE is_active = 1 AND region IS NOT NULL
-    ORDER BY region
-    """
+    Liest den vorberechneten Facetten-Snapshot (utils.facets) statt bei
+    jedem Aufruf DISTINCT-Scans auszuführen. ETag + If-None-Match: 304,
+    wenn sich die Facetten seit dem letzten Abruf nicht geändert haben.
 
-    # Funding Areas
-    areas_query = """
-    SELECT DISTINCT funding_area
-    FROM FUNDING_OPPORTUNITIES
-    WHERE is_active = 1 AND funding_area IS NOT NULL
-    ORDER BY funding_area
-    """
-
-    # Providers
-    providers_query = """
-    SELECT DISTINCT provider
-    FROM FUNDING_OPPORTUNITIES
-    WHERE is_active = 1 AND provider IS NOT NULL
-    ORDER BY provider
+    Returns:
+        Dict mit Listen von Providern, Regionen, Areas und Kategorien
+        sowie 'facets' mit Anzahl pro Wert
     """
-
-    with get_db_cursor() as cursor:
-        # Regions
-        cursor.execute(regions_query)
-        regions = [row[0] for row in cursor.fetchall()]
-
-        # Areas
-        cursor.execute(areas_query)
-        areas = [row[0] for row in cursor.fetchall()]
-
-        # Providers
-        cursor.execute(providers_query)
-        providers = [row[0] for row in cursor.fetchall()]
-
-    return {
-        'regions': regions,
-        'funding_areas': areas,
-        'providers': providers
-    }
+    etag, facets = await run_db(get_facets)
+    return cached_json_response(request, facet_options(facets), etag)
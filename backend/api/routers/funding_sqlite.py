@@ -7,122 +7,227 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from api.models import FundingOpportunity, FundingDetail, FundingFilter
 from api.auth_utils import get_current_user
-from utils.db_adapter import get_db_cursor, USE_SQLITE
+from api.http_cache import cached_json_response
+from api.funding_cache import cached_funding_response
+from api.pagination import (
+    encode_cursor,
+    decode_cursor,
+    pagination_headers,
+    total_count_cache,
+    count_cache_key
+)
+from utils.db_adapter import db_fetch_all, db_fetch_one, run_db, USE_SQLITE
+from utils.facets import get_facets, facet_options
+from utils.fulltext import fts5_match_query, HIGHLIGHT_START, HIGHLIGHT_END, SNIPPET_TOKENS
+from utils.summary import SUMMARY_MAX_CHARS
 
 router = APIRouter()
 
+# BM25-Gewichte pro FUNDING_FTS-Spalte:
+# funding_id (unindexed), title, provider, region, funding_area, description,
+# categories, cleaned_text
+FTS_COLUMN_WEIGHTS = '0.0, 10.0, 5.0, 3.0, 3.0, 2.0, 3.0, 1.0'
+
+FUNDING_CURSOR_SCOPE = 'funding'
+
 
 @router.get('/', response_model=List[FundingOpportunity])
 async def list_funding(
+    request: Request,
+    q: str = Query(None, max_length=200),
     provider: str = Query(None),
     categories: str = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: str = Query(None, max_length=500),
+    include_total: bool = Query(False)
 ):
     """
     Liste aller aktiven Fördermittel mit optionalen Filtern
 
     PUBLIC ENDPOINT - Keine Authentifizierung erforderlich (Development Mode)
 
+    Antworten werden pro Query-Parameter und Datenversion gecacht
+    (api.funding_cache): ETag, Last-Modified, 304 bei If-None-Match.
+
     Args:
+        q: Volltextsuche (FTS5, BM25-Ranking, Snippets mit Treffer-Markierung)
         provider: Filter nach Fördergeber
         categories: Filter nach Kategorien
         limit: Anzahl Ergebnisse
-        offset: Offset für Pagination
+        offset: Offset für Pagination (veraltet, stattdessen cursor)
+        cursor: X-Next-Cursor der vorherigen Seite (Keyset-Pagination auf
+            application_deadline, funding_id; nicht mit q kombinierbar)
+        include_total: Gesamtanzahl als X-Total-Count (gecacht pro Filter)
 
     Returns:
-        Liste von Fördermitteln
+        Liste von Fördermitteln (nächste Seite: X-Next-Cursor Header)
     """
+    return await cached_funding_response(
+        request,
+        lambda: _query_funding_list(q, provider, categories, limit, offset, cursor, include_total)
+    )
+
+
+async def _query_funding_list(
+    q: Optional[str],
+    provider: Optional[str],
+    categories: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    include_total: bool
+) -> Tuple[List[FundingOpportunity], Dict[str, str]]:
+    """Liest eine Seite aus der DB (Cache-Miss von list_funding)"""
+    match_query = fts5_match_query(q) if q else ''
+
+    if cursor and match_query:
+        raise HTTPException(status_code=400, detail='cursor cannot be combined with q')
+
     # Build Query (SQLite-compatible)
     query = """
     SELECT
-        funding_id,
-        title,
-        provider,
-        url as source_url,
-        application_deadline as deadline,
-        funding_amount_min as min_funding_amount,
-        funding_amount_max as max_funding_amount,
-        categories,
-        created_at as scraped_at,
-        cleaned_text
-    FROM FUNDING_OPPORTUNITIES
+        f.funding_id,
+        f.title,
+        f.provider,
+        f.url as source_url,
+        f.application_deadline as deadline,
+        f.funding_amount_min as min_funding_amount,
+        f.funding_amount_max as max_funding_amount,
+        f.categories,
+        f.created_at as scraped_at,
+        COALESCE(f.summary, substr(f.cleaned_text, 1, ?)) as summary
     """
 
+    # Vorschau statt Volltext (Fallback: Textanfang, falls summary fehlt)
+    select_params = [SUMMARY_MAX_CHARS]
     params = []
     where_clauses = []
 
+    if match_query:
+        # Full-text search: BM25 (negated, higher = better) + snippet
+        query += f""",
+        -bm25(FUNDING_FTS, {FTS_COLUMN_WEIGHTS}) as score,
+        snippet(FUNDING_FTS, -1, ?, ?, '…', ?) as snippet
+    """
+        select_params.extend([HIGHLIGHT_START, HIGHLIGHT_END, SNIPPET_TOKENS])
+        from_clause = ' FROM FUNDING_FTS JOIN FUNDING_OPPORTUNITIES f ON f.funding_id = FUNDING_FTS.funding_id'
+        where_clauses.append('FUNDING_FTS MATCH ?')
+        params.append(match_query)
+    else:
+        from_clause = ' FROM FUNDING_OPPORTUNITIES f'
+
     # Filters
     if provider:
-        where_clauses.append('provider = ?')
+        where_clauses.append('f.provider = ?')
         params.append(provider)
 
     if categories:
-        where_clauses.append('categories LIKE ?')
+        where_clauses.append('f.categories LIKE ?')
         params.append(f'%{categories}%')
 
     # Only future deadlines
-    where_clauses.append("(application_deadline IS NULL OR application_deadline > date('now'))")
-
-    if where_clauses:
-        query += ' WHERE ' + ' AND '.join(where_clauses)
-
-    # Order & Limit
-    query += ' ORDER BY application_deadline ASC'
+    where_clauses.append("(f.application_deadline IS NULL OR f.application_deadline > date('now'))")
+
+    filter_sql = from_clause + ' WHERE ' + ' AND '.join(where_clauses)
+    filter_params = list(params)
+
+    # Keyset: continue after (application_deadline, funding_id) of the last row.
+    # NULL deadlines sort first in SQLite.
+    if cursor:
+        last = decode_cursor(FUNDING_CURSOR_SCOPE, cursor)
+        if last.get('deadline') is None:
+            where_clauses.append(
+                '((f.application_deadline IS NULL AND f.funding_id > ?) OR f.application_deadline IS NOT NULL)'
+            )
+            params.append(last.get('id'))
+        else:
+            where_clauses.append('(f.application_deadline, f.funding_id) > (?, ?)')
+            params.extend([last['deadline'], last.get('id')])
+        offset = 0
+
+    query += from_clause + ' WHERE ' + ' AND '.join(where_clauses)
+
+    # Order & Limit (search results by relevance)
+    if match_query:
+        query += ' ORDER BY score DESC'
+    else:
+        query += ' ORDER BY f.application_deadline ASC, f.funding_id ASC'
     query += ' LIMIT ? OFFSET ?'
 
     params.extend([limit, offset])
 
-    # Execute
-    with get_db_cursor() as cursor:
-        cursor.execute(query, tuple(params))
-
-        results = []
-        for row in cursor:
-            # Convert SQLite Row to dict with proper field names for Pydantic
-            # Parse datetime if needed
-            scraped_at = row['scraped_at']
-            if isinstance(scraped_at, str):
-                scraped_at = datetime.fromisoformat(scraped_at.replace('Z', '+00:00'))
-
-            deadline = row['deadline']
-            if deadline and isinstance(deadline, str):
-                deadline = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-
-            data = {
-                'funding_id': row['funding_id'],
-                'title': row['title'],
-                'source_url': row['source_url'] or '',  # Required field, provide default
-                'deadline': deadline,
-                'provider': row['provider'],
-                'region': None,  # Optional field
-                'funding_area': None,  # Optional field
-                'min_funding_amount': row['min_funding_amount'],
-                'max_funding_amount': row['max_funding_amount'],
-                'tags': row['categories'].split(',') if row['categories'] else [],
-                'scraped_at': scraped_at,
-                'cleaned_text': row['cleaned_text'] if 'cleaned_text' in row.keys() else None
-            }
-
-            results.append(FundingOpportunity(**data))
-
-    return results
+    # Execute (DB thread pool)
+    rows = await db_fetch_all(query, tuple(select_params + params))
+
+    next_cursor = None
+    if rows and len(rows) == limit and not match_query:
+        next_cursor = encode_cursor(FUNDING_CURSOR_SCOPE, {
+            'deadline': rows[-1]['deadline'],
+            'id': rows[-1]['funding_id']
+        })
+
+    total = None
+    if include_total:
+        key = count_cache_key(FUNDING_CURSOR_SCOPE, match_query, provider, categories)
+        total = total_count_cache.get(key)
+        if total is None:
+            count_row = await db_fetch_one('SELECT COUNT(*)' + filter_sql, tuple(filter_params))
+            total = count_row[0]
+            total_count_cache.set(key, total)
+
+    results = []
+    for row in rows:
+        # Convert SQLite Row to dict with proper field names for Pydantic
+        # Parse datetime if needed
+        scraped_at = row['scraped_at']
+        if isinstance(scraped_at, str):
+            scraped_at = datetime.fromisoformat(scraped_at.replace('Z', '+00:00'))
+
+        deadline = row['deadline']
+        if deadline and isinstance(deadline, str):
+            deadline = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+
+        data = {
+            'funding_id': row['funding_id'],
+            'title': row['title'],
+            'source_url': row['source_url'] or '',  # Required field, provide default
+            'deadline': deadline,
+            'provider': row['provider'],
+            'region': None,  # Optional field
+            'funding_area': None,  # Optional field
+            'min_funding_amount': row['min_funding_amount'],
+            'max_funding_amount': row['max_funding_amount'],
+            'tags': row['categories'].split(',') if row['categories'] else [],
+            'scraped_at': scraped_at,
+            'summary': row['summary']
+        }
+
+        if match_query:
+            data['score'] = row['score']
+            data['snippet'] = row['snippet']
+
+        results.append(FundingOpportunity(**data))
+
+    return results, pagination_headers(next_cursor, total)
 
 
 @router.get('/{funding_id}', response_model=FundingDetail)
 async def get_funding_detail(
+    request: Request,
     funding_id: str
 ):
     """
     Detaillierte Informationen zu einer Förderausschreibung (inkl. Text)
 
     PUBLIC ENDPOINT - Keine Authentifizierung erforderlich (Development Mode)
+    Gecacht wie list_funding (ETag, Last-Modified, 304).
 
     Args:
         funding_id: ID der Förderausschreibung
@@ -133,6 +238,11 @@ async def get_funding_detail(
     Raises:
         404: Förderung nicht gefunden
     """
+    return await cached_funding_response(request, lambda: _query_funding_detail(funding_id))
+
+
+async def _query_funding_detail(funding_id: str) -> Tuple[FundingDetail, Dict[str, str]]:
+    """Liest ein Förderprogramm aus der DB (Cache-Miss von get_funding_detail)"""
     query = """
     SELECT
         funding_id,
@@ -148,14 +258,13 @@ async def get_funding_detail(
         url as source_url,
         source_url,
         cleaned_text,
+        summary,
         created_at as scraped_at
     FROM FUNDING_OPPORTUNITIES
     WHERE funding_id = ?
     """
 
-    with get_db_cursor() as cursor:
-        cursor.execute(query, (funding_id,))
-        row = cursor.fetchone()
+    row = await db_fetch_one(query, (funding_id,))
 
     if not row:
         raise HTTPException(status_code=404, detail='Funding not found')
@@ -174,50 +283,25 @@ async def get_funding_detail(
         'tags': row['categories'].split(',') if row['categories'] else [],
         'scraped_at': row['scraped_at'],
         'cleaned_text': row['cleaned_text'] or '',
+        'summary': row['summary'],
         'metadata': {}
     }
 
-    return FundingDetail(**data)
+    return FundingDetail(**data), {}
 
 
 @router.get('/filters/options')
-async def get_filter_options(current_user: dict = Depends(get_current_user)):
+async def get_filter_options(request: Request, current_user: dict = Depends(get_current_user)):
     """
     Gibt verfügbare Filter-Optionen zurück (für Dropdown-Menüs)
 
-    Returns:
-        Dict mit Listen von verfügbaren Providern und Kategorien
-    """
-    # Providers
-    providers_query = """
-    SELECT DISTINCT provider
-    FROM FUNDING_OPPORTUNITIES
-    WHERE provider IS NOT NULL
-    ORDER BY provider
-    """
+    Liest den vorberechneten Facetten-Snapshot (utils.facets) statt bei
+    jedem Aufruf DISTINCT-Scans auszuführen. ETag + If-None-Match: 304,
+    wenn sich die Facetten seit dem letzten Abruf nicht geändert haben.
 
-    # Categories (need to split comma-separated values)
-    categories_query = """
-    SELECT DISTINCT categories
-    FROM FUNDING_OPPORTUNITIES
-    WHERE categories IS NOT NULL
+    Returns:
+        Dict mit Listen von Providern, Regionen, Areas und Kategorien
+        sowie 'facets' mit Anzahl pro Wert
     """
-
-    with get_db_cursor() as cursor:
-        # Providers
-        cursor.execute(providers_query)
-        providers = [row[0] for row in cursor.fetchall()]
-
-        # Categories (split and unique)
-        cursor.execute(categories_query)
-        categories_set = set()
-        for row in cursor.fetchall():
-            if row[0]:
-                categories_set.update([cat.strip() for cat in row[0].split(',')])
-
-        categories = sorted(list(categories_set))
-
-    return {
-        'providers': providers,
-        'categories': categories
-    }
+    etag, facets = await run_db(get_facets)
+    return cached_json_response(request, facet_options(facets), etag)
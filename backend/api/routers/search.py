@@ -73,6 +73,25 @@ class RAGHealthResponse(BaseModel):
     crag_enabled: bool = Field(..., description="CRAG Evaluation aktiviert")
 
 
+def _format_results(results: List[Dict[str, Any]]) -> List[SearchResultChunk]:
+    """
+    Wandelt Pipeline-Ergebnisse in SearchResultChunks um
+
+    Geteilte Boilerplate-Chunks (funding_id='shared') schließt bereits
+    der HybridSearcher bei der Suche aus.
+    """
+    return [
+        SearchResultChunk(
+            chunk_id=result.get('id', 'unknown'),
+            funding_id=result.get('metadata', {}).get('funding_id', 'unknown'),
+            text=result.get('text', ''),
+            score=result.get('score', 0.0),
+            metadata=result.get('metadata', {})
+        )
+        for result in results
+    ]
+
+
 # ========== Endpoints ==========
 
 @router.post('/', response_model=SearchResponse)
@@ -140,16 +159,7 @@ async def search_funding_opportunities(
         retrieval_time_ms = (time.time() - start_time) * 1000
 
         # Format results
-        search_results = [
-            SearchResultChunk(
-                chunk_id=result.get('id', 'unknown'),
-                funding_id=result.get('metadata', {}).get('funding_id', 'unknown'),
-                text=result.get('text', ''),
-                score=result.get('score', 0.0),
-                metadata=result.get('metadata', {})
-            )
-            for result in results
-        ]
+        search_results = _format_results(results)
 
         # Extract expanded queries if available
         expanded_queries = None
@@ -281,16 +291,7 @@ async def quick_search(
         retrieval_time_ms = (time.time() - start_time) * 1000
 
         # Format results
-        search_results = [
-            SearchResultChunk(
-                chunk_id=result.get('id', 'unknown'),
-                funding_id=result.get('metadata', {}).get('funding_id', 'unknown'),
-                text=result.get('text', ''),
-                score=result.get('score', 0.0),
-                metadata=result.get('metadata', {})
-            )
-            for result in results
-        ]
+        search_results = _format_results(results)
 
         return SearchResponse(
             query=q,
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Hot Queries mit und ohne Indizes (SQLite)
+
+Erzeugt einen synthetischen Datensatz (default 100.000 Förderprogramme,
+Anträge und Entwürfe) in einer temporären DB und misst die Queries von
+list_funding, Scraper-Lookup per source_url, list_applications und
+Entwürfen pro Antrag - einmal ohne, einmal mit den Indizes aus
+create_indexes(). Tiefe Seiten: OFFSET vs. Keyset-Cursor.
+
+Usage:
+    python benchmark_db_indexes.py
+    python benchmark_db_indexes.py --programs 100000 --repeat 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from utils import database_sqlite
+from utils.database_sqlite import (
+    SQLiteDatabaseManager, init_sqlite_schema, create_indexes, SQLITE_INDEXES, SQLITE_UNIQUE_INDEXES
+)
+
+PROVIDERS = [f'Stiftung {i}' for i in range(200)] + ['BMBF', 'Land Bayern', 'Land NRW', 'EU']
+
+# (Name, Query, Parameter-Factory) - Queries wie in den SQLite-Routern
+HOT_QUERIES = [
+    (
+        'list_funding',
+        """SELECT funding_id, title, provider, application_deadline FROM FUNDING_OPPORTUNITIES
+        WHERE (application_deadline IS NULL OR application_deadline > date('now'))
+        ORDER BY application_deadline ASC, funding_id ASC LIMIT 50 OFFSET 0""",
+        lambda rng, n: ()
+    ),
+    (
+        'list_funding page 1000 (OFFSET)',
+        """SELECT funding_id, title, provider, application_deadline FROM FUNDING_OPPORTUNITIES
+        WHERE (application_deadline IS NULL OR application_deadline > date('now'))
+        ORDER BY application_deadline ASC, funding_id ASC LIMIT 50 OFFSET 50000""",
+        lambda rng, n: ()
+    ),
+    (
+        'list_funding page 1000 (cursor)',
+        """SELECT funding_id, title, provider, application_deadline FROM FUNDING_OPPORTUNITIES
+        WHERE (application_deadline IS NULL OR application_deadline > date('now'))
+        AND (application_deadline, funding_id) > (?, ?)
+        ORDER BY application_deadline ASC, funding_id ASC LIMIT 50""",
+        lambda rng, n: ((date.today() + timedelta(days=500)).isoformat(), 'fund-0')
+    ),
+    (
+        'list_funding?provider',
+        """SELECT funding_id, title, provider, application_deadline FROM FUNDING_OPPORTUNITIES
+        WHERE provider = ? AND (application_deadline IS NULL OR application_deadline > date('now'))
+        ORDER BY application_deadline ASC, funding_id ASC LIMIT 50 OFFSET 0""",
+        lambda rng, n: (rng.choice(PROVIDERS),)
+    ),
+    (
+        'scraper source_url lookup',
+        'SELECT funding_id FROM FUNDING_OPPORTUNITIES WHERE source_url = ?',
+        lambda rng, n: (f'https://example.org/programm/{rng.randrange(n)}',)
+    ),
+    (
+        'list_applications',
+        'SELECT application_id, title, status, created_at FROM APPLICATIONS WHERE school_id = ? ORDER BY created_at DESC, application_id DESC',
+        lambda rng, n: (f'school-{rng.randrange(1000)}',)
+    ),
+    (
+        'drafts by application',
+        'SELECT draft_id, created_at FROM APPLICATION_DRAFTS WHERE application_id = ? ORDER BY created_at DESC',
+        lambda rng, n: (f'app-{rng.randrange(n)}',)
+    ),
+]
+
+
+def generate_data(cursor, programs: int, seed: int = 42) -> None:
+    """Schreibt synthetische Programme, Anträge und Entwürfe"""
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.now()
+
+    cursor.executemany(
+        """INSERT INTO FUNDING_OPPORTUNITIES
+        (funding_id, title, provider, application_deadline, source_url, categories)
+        VALUES (?, ?, ?, ?, ?, ?)""",
+        (
+            (
+                f'fund-{i}',
+                f'Förderprogramm {i}',
+                rng.choice(PROVIDERS),
+                None if rng.random() < 0.1 else (today + timedelta(days=rng.randint(-365, 730))).isoformat(),
+                f'https://example.org/programm/{i}',
+                'Digitalisierung,Bildung'
+            )
+            for i in range(programs)
+        )
+    )
+
+    cursor.executemany(
+        """INSERT INTO APPLICATIONS
+        (application_id, school_id, user_id, funding_id, title, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)""",
+        (
+            (
+                f'app-{i}',
+                f'school-{rng.randrange(1000)}',
+                f'user-{rng.randrange(5000)}',
+                f'fund-{rng.randrange(programs)}',
+                f'Antrag {i}',
+                (now - timedelta(minutes=rng.randrange(500000))).isoformat()
+            )
+            for i in range(programs)
+        )
+    )
+
+    cursor.executemany(
+        """INSERT INTO APPLICATION_DRAFTS
+        (draft_id, application_id, draft_text, created_at)
+        VALUES (?, ?, ?, ?)""",
+        (
+            (
+                f'draft-{i}',
+                f'app-{rng.randrange(programs)}',
+                'Entwurf',
+                (now - timedelta(minutes=rng.randrange(500000))).isoformat()
+            )
+            for i in range(programs)
+        )
+    )
+
+
+def measure(cursor, programs: int, repeat: int, seed: int = 7) -> dict:
+    """Median-Laufzeit (ms) pro Query"""
+    rng = random.Random(seed)
+    timings = {}
+    for name, query, make_params in HOT_QUERIES:
+        samples = []
+        for _ in range(repeat):
+            params = make_params(rng, programs)
+            start = time.perf_counter()
+            cursor.execute(query, params).fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        timings[name] = samples[len(samples) // 2]
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQLite indexes on synthetic data')
+    parser.add_argument('--programs', type=int, default=100000, help='Anzahl synthetischer Programme')
+    parser.add_argument('--repeat', type=int, default=25, help='Wiederholungen pro Query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = SQLiteDatabaseManager(os.path.join(tmp_dir, 'benchmark.db'))
+        database_sqlite._db_manager = manager
+
+        init_sqlite_schema()
+
+        print(f'[BENCHMARK] Generating {args.programs:,} programs, applications and drafts...')
+        start = time.perf_counter()
+        with manager.get_cursor() as cursor:
+            for name, _ in SQLITE_INDEXES + SQLITE_UNIQUE_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+            generate_data(cursor, args.programs)
+        print(f'[BENCHMARK] Data generated in {time.perf_counter() - start:.1f}s')
+
+        with manager.get_cursor() as cursor:
+            before = measure(cursor, args.programs, args.repeat)
+
+        start = time.perf_counter()
+        create_indexes()
+        print(f'[BENCHMARK] Indexes created in {time.perf_counter() - start:.1f}s')
+
+        with manager.get_cursor() as cursor:
+            after = measure(cursor, args.programs, args.repeat)
+
+        manager.close_all()
+
+    print()
+    print(f'{"Query":<34} {"no index (ms)":>14} {"indexed (ms)":>13} {"speedup":>8}')
+    print('-' * 72)
+    for name, _, _ in HOT_QUERIES:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f'{name:<34} {before[name]:>14.2f} {after[name]:>13.3f} {speedup:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
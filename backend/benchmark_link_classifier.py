@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Link-Klassifizierung - Keyword-Schleifen vs. kompiliertes Muster
+
+Misst extract_links_from_markdown von program_finder und multi_page_scraper
+auf großen Seiten: die frühere Implementierung (urlparse pro Link, eine
+Schleife pro Keyword-Liste, Dedupe nach dem Sortieren) gegen den
+LinkClassifier (ein Regex-Durchlauf pro Link, Dedupe beim Scannen).
+
+Ohne --pages wird eine synthetische Ministeriumsseite erzeugt (Mega-Menü,
+Footer, Teaser - default 3.000 Links). Mit --pages werden gespeicherte
+Markdown-Dateien echter Seiten gemessen.
+
+Usage:
+    python benchmark_link_classifier.py
+    python benchmark_link_classifier.py --links 10000 --repeat 20
+    python benchmark_link_classifier.py --pages seite1.md seite2.md --base-url https://www.bmbf.de/
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from scraper_firecrawl import multi_page_scraper, program_finder
+from scraper_firecrawl.link_classifier import MARKDOWN_LINK
+
+BASE_URL = 'https://www.ministerium.example/'
+
+SECTIONS = [
+    'Bildung', 'Forschung', 'Digitalisierung', 'Ministerium', 'Service', 'Presse',
+    'Themen', 'Aktuelles', 'Karriere', 'Kontakt', 'Förderung', 'Projekte'
+]
+TOPICS = [
+    'Grundschulen', 'MINT', 'Ganztag', 'Inklusion', 'Lehrkräfte', 'Berufsorientierung',
+    'KI', 'Nachhaltigkeit', 'Sprachförderung', 'Schulbau', 'Medienbildung', 'Demokratie'
+]
+LINK_KINDS = [
+    ('{topic}', '/{section}/{topic}'),
+    ('Förderprogramm {topic}', '/foerderung/{topic}'),
+    ('Ausschreibung {topic} {n}', '/ausschreibungen/{topic}-{n}'),
+    ('Pressemitteilung {n}', '/presse/{n}'),
+    ('Richtlinie {topic} (PDF)', '/downloads/richtlinie-{topic}.pdf'),
+    ('Projekte {topic}', '/projekte/{topic}#uebersicht'),
+    ('Stellenangebot {n}', '/karriere/stelle-{n}'),
+    ('{section}', 'https://www.bund.example/{section}'),
+    ('Antrag stellen', '/antrag/{topic}'),
+    ('Kontakt', 'mailto:info@ministerium.example'),
+]
+
+
+def generate_page(links: int, seed: int = 42) -> str:
+    """Synthetische Seite: Mega-Menü-Markdown mit Fließtext dazwischen"""
+    rng = random.Random(seed)
+    parts = []
+    for n in range(links):
+        text, url = rng.choice(LINK_KINDS)
+        values = {'topic': rng.choice(TOPICS), 'section': rng.choice(SECTIONS), 'n': rng.randint(1, 400)}
+        slug = {key: str(value).lower().replace(' ', '-') for key, value in values.items()}
+        parts.append(f'- [{text.format(**values)}]({url.format(**slug)})')
+        if n % 25 == 0:
+            parts.append('\nDas Ministerium fördert Vorhaben in Schulen und Hochschulen.\n')
+    return '\n'.join(parts)
+
+
+def legacy_extract_links(markdown_text: str, base_url: str, priorities: Dict[int, List[str]],
+                         blacklist: List[str] = ()) -> List[Dict[str, any]]:
+    """Frühere extract_links_from_markdown (Keyword-Schleifen) als Referenz"""
+    links = []
+    for text, url in re.findall(r'\[([^\]]+)\]\(([^\)]+)\)', markdown_text):
+        if url.startswith('#') or url.startswith('mailto:') or url.startswith('tel:'):
+            continue
+        absolute_url = urljoin(base_url, url)
+        if urlparse(base_url).netloc not in urlparse(absolute_url).netloc:
+            continue
+        if absolute_url.lower().endswith(('.pdf', '.jpg', '.png', '.zip', '.doc', '.docx')):
+            continue
+        combined = text.lower() + ' ' + url.lower()
+        if any(keyword in combined for keyword in blacklist):
+            continue
+        priority = 0
+        for level in sorted(priorities, reverse=True):
+            if any(keyword in combined for keyword in priorities[level]):
+                priority = level
+                break
+        if priority > 0:
+            links.append({'url': absolute_url, 'text': text, 'priority': priority})
+
+    links.sort(key=lambda x: x['priority'], reverse=True)
+    seen = set()
+    unique_links = []
+    for link in links:
+        if link['url'] not in seen:
+            seen.add(link['url'])
+            unique_links.append(link)
+    return unique_links
+
+
+def measure(function, pages: List[str], base_url: str, repeat: int) -> tuple:
+    """Median-Laufzeit (ms) über alle Seiten und Anzahl gefundener Links"""
+    timings = []
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(len(function(page, base_url)) for page in pages)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark link classification on large pages')
+    parser.add_argument('--links', type=int, default=3000, help='Links der synthetischen Seite')
+    parser.add_argument('--repeat', type=int, default=10, help='Wiederholungen pro Variante')
+    parser.add_argument('--pages', nargs='*', help='Markdown-Dateien echter Seiten statt synthetischer Seite')
+    parser.add_argument('--base-url', default=BASE_URL, help='Base URL der Seiten')
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, encoding='utf-8') as f:
+                pages.append(f.read())
+    else:
+        pages = [generate_page(args.links)]
+    total_links = sum(len(MARKDOWN_LINK.findall(page)) for page in pages)
+    print(f'[BENCHMARK] {len(pages)} page(s), {total_links:,} markdown links')
+
+    finder_priorities = {
+        3: program_finder.PROGRAM_KEYWORDS['high_priority'],
+        2: program_finder.PROGRAM_KEYWORDS['medium_priority'],
+    }
+    multi_priorities = {
+        3: multi_page_scraper.LINK_KEYWORDS['high_priority'],
+        2: multi_page_scraper.LINK_KEYWORDS['medium_priority'],
+        1: multi_page_scraper.LINK_KEYWORDS['low_priority'],
+    }
+    variants = [
+        (
+            'program_finder',
+            lambda page, base: legacy_extract_links(page, base, finder_priorities, program_finder.BLACKLIST_KEYWORDS),
+            program_finder.extract_links_from_markdown,
+        ),
+        (
+            'multi_page_scraper',
+            lambda page, base: legacy_extract_links(page, base, multi_priorities),
+            multi_page_scraper.extract_links_from_markdown,
+        ),
+    ]
+
+    print()
+    print(f'{"Scraper":<20} {"loops (ms)":>11} {"compiled (ms)":>14} {"speedup":>8} {"links old/new":>14}')
+    print('-' * 72)
+    for name, legacy, compiled in variants:
+        before, found_before = measure(legacy, pages, args.base_url, args.repeat)
+        after, found_after = measure(compiled, pages, args.base_url, args.repeat)
+        speedup = before / after if after else float('inf')
+        print(f'{name:<20} {before:>11.2f} {after:>14.2f} {speedup:>7.1f}x {found_before:>7}/{found_after:<6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -64,6 +64,7 @@ CREATE TABLE FUNDING_OPPORTUNITIES (
     funding_area VARCHAR2(255), -- "Digitalisierung", "Sport", "MINT"
     tags CLOB, -- JSON-Array: ["Digital", "Inklusion", "MINT"]
     cleaned_text CLOB NOT NULL, -- Haupttext für RAG (sehr wichtig!)
+    summary VARCHAR2(1000 CHAR), -- Klartext-Vorschau für die Listenansicht
     metadata_json CLOB, -- JSON mit allen weiteren Feldern
     min_funding_amount NUMBER(12,2),
     max_funding_amount NUMBER(12,2),
@@ -13,6 +13,8 @@ import uuid
 from datetime import datetime
 from collections import defaultdict
 
+from rag_indexer.deduplicator import ChunkDeduplicator
+
 def generate_id():
     """Generate UUID without dashes"""
     return str(uuid.uuid4()).replace('-', '').upper()
@@ -48,10 +50,16 @@ def extract_funding_from_chromadb(chroma_path='./chroma_db_dev'):
         funding_map[key]['metadata'] = meta
 
     unique_funding = []
+    deduplicator = ChunkDeduplicator()
+    removed_chunks = 0
 
     for key, data in funding_map.items():
         meta = data['metadata']
-        texts = data['texts']
+
+        # Skip near-identical chunks (overlap, repeated footers)
+        clusters = deduplicator.find_clusters(data['texts'])
+        texts = [data['texts'][members[0]] for members in clusters]
+        removed_chunks += len(data['texts']) - len(texts)
 
         # Combine all text chunks for this funding
         combined_text = '\n\n---\n\n'.join(texts)
@@ -77,6 +85,7 @@ def extract_funding_from_chromadb(chroma_path='./chroma_db_dev'):
         unique_funding.append(funding)
 
     print(f"✅ Extracted {len(unique_funding)} unique funding opportunities")
+    print(f"🧹 Skipped {removed_chunks} near-duplicate chunks")
     return unique_funding
 
 
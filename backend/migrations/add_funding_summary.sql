@@ -0,0 +1,27 @@
+/*
+ * Migration: Add Funding Summary Column
+ * Purpose: GET /funding/ returns a short plain-text preview instead of cleaned_text
+ * Date: 2026-10-19
+ * Version: 1.0
+ *
+ * Preferred (both backends, adds the column and backfills existing rows):
+ *   python run_summary_migration.py
+ *
+ * SQLite adds the column automatically in init_sqlite_schema() (API startup).
+ */
+
+-- ============================================================================
+-- SQLite
+-- ============================================================================
+
+ALTER TABLE FUNDING_OPPORTUNITIES ADD COLUMN summary TEXT;
+
+-- ============================================================================
+-- Oracle (ORA-01430 means the column already exists)
+-- ============================================================================
+
+-- ALTER TABLE FUNDING_OPPORTUNITIES ADD (summary VARCHAR2(1000 CHAR));
+--
+-- The preview strips markdown (utils.summary.make_summary), so existing rows
+-- are backfilled by run_summary_migration.py rather than in SQL. Until then
+-- list_funding falls back to the first characters of cleaned_text.
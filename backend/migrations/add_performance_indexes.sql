@@ -0,0 +1,78 @@
+/*
+ * Migration: Add Performance Indexes
+ * Purpose: Avoid full table scans on the hot API and scraper queries
+ * Date: 2026-10-19
+ * Version: 1.0
+ *
+ * Preferred (both backends, idempotent):
+ *   python run_index_migration.py
+ *
+ * Usage (SQLite):
+ *   sqlite3 dev_database.db < migrations/add_performance_indexes.sql
+ *
+ * Usage (Oracle): see Oracle section below
+ *
+ * SQLite applies these automatically in init_sqlite_schema() (API startup).
+ */
+
+-- ============================================================================
+-- SQLite
+-- ============================================================================
+
+-- list_funding: ORDER BY application_deadline, funding_id (keyset pagination)
+CREATE INDEX IF NOT EXISTS idx_funding_deadline_keyset
+ON FUNDING_OPPORTUNITIES(application_deadline, funding_id);
+
+-- list_funding?provider=...: equality + ordered keyset scan
+CREATE INDEX IF NOT EXISTS idx_funding_provider_keyset
+ON FUNDING_OPPORTUNITIES(provider, application_deadline, funding_id);
+
+-- Scraper upsert: INSERT ... ON CONFLICT(source_url) needs a unique index.
+-- Duplicate source_url rows must be merged first (create_indexes() does this).
+CREATE UNIQUE INDEX IF NOT EXISTS idx_funding_source_url_unique
+ON FUNDING_OPPORTUNITIES(source_url);
+
+-- Response cache data version: MAX(updated_at)
+CREATE INDEX IF NOT EXISTS idx_funding_updated_at
+ON FUNDING_OPPORTUNITIES(updated_at);
+
+-- list_applications: WHERE school_id = ? ORDER BY created_at DESC, application_id DESC
+CREATE INDEX IF NOT EXISTS idx_applications_school_keyset
+ON APPLICATIONS(school_id, created_at, application_id);
+
+-- Drafts per application: WHERE application_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_drafts_application_created
+ON APPLICATION_DRAFTS(application_id, created_at);
+
+-- Superseded by the keyset indexes above
+DROP INDEX IF EXISTS idx_funding_deadline;
+DROP INDEX IF EXISTS idx_funding_provider_deadline;
+DROP INDEX IF EXISTS idx_applications_school_created;
+DROP INDEX IF EXISTS idx_funding_source_url;
+
+PRAGMA optimize;
+
+-- ============================================================================
+-- Oracle (run manually or via run_index_migration.py;
+-- ORA-00955 / ORA-01408 mean the index already exists)
+-- ============================================================================
+
+-- CREATE INDEX idx_funding_active_keyset ON FUNDING_OPPORTUNITIES(is_active, deadline, funding_id);
+-- CREATE INDEX idx_funding_provider_keyset ON FUNDING_OPPORTUNITIES(provider, deadline, funding_id);
+-- CREATE INDEX idx_funding_app_deadline ON FUNDING_OPPORTUNITIES(application_deadline);
+-- DROP INDEX idx_funding_source_url;
+-- CREATE UNIQUE INDEX idx_funding_source_url_unique ON FUNDING_OPPORTUNITIES(source_url);
+--     (database/schema.sql already declares source_url UNIQUE: ORA-01408)
+-- CREATE INDEX idx_funding_updated_at ON FUNDING_OPPORTUNITIES(updated_at);
+--
+-- Routers filter with RAWTOHEX(<id>) = :id, so the id indexes are function-based:
+-- CREATE INDEX idx_applications_school_keyset
+--     ON APPLICATIONS(RAWTOHEX(school_id), created_at, RAWTOHEX(application_id));
+-- CREATE INDEX idx_drafts_application_created ON APPLICATION_DRAFTS(RAWTOHEX(application_id), created_at);
+--
+-- Full-text search (GET /funding/?q=), requires CTXAPP role:
+-- CREATE INDEX idx_funding_fulltext ON FUNDING_OPPORTUNITIES(cleaned_text)
+--     INDEXTYPE IS CTXSYS.CONTEXT PARAMETERS ('SYNC (ON COMMIT)');
+--
+-- SQLite: the FTS5 table FUNDING_FTS and its sync triggers are created by
+-- create_fulltext_index() in init_sqlite_schema().
@@ -17,15 +17,18 @@ import os
 import sys
 import json
 import asyncio
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
 from rag_indexer.advanced_embedder import AdvancedEmbedder
 from rag_indexer.hybrid_searcher import HybridSearcher
+from rag_indexer.rank_fusion import fuse_results, ranking_agreement
 from rag_indexer.reranker import Reranker
 from rag_indexer.query_expansion import QueryExpander
+from rag_indexer.context_compressor import ContextCompressor
+from utils.prometheus_metrics import rag_retrieval_path_total
 
 
 class AdvancedRAGPipeline:
@@ -39,7 +42,9 @@ class AdvancedRAGPipeline:
         enable_reranking: bool = True,
         enable_compression: bool = True,
         enable_crag: bool = True,
-        verbose: bool = True
+        verbose: bool = True,
+        dense_weight: float = 0.6,
+        sparse_weight: float = 0.4
     ):
         """
         Initialize advanced RAG pipeline
@@ -50,8 +55,19 @@ class AdvancedRAGPipeline:
             enable_compression: Use contextual compression
             enable_crag: Use CRAG quality evaluation
             verbose: Print debug information
+            dense_weight: RRF weight of every dense result list
+            sparse_weight: RRF weight of every sparse (BM25) result list
         """
         self.verbose = verbose
+        self.dense_weight = dense_weight
+        self.sparse_weight = sparse_weight
+
+        # Adaptive depth / early exit
+        self.adaptive = os.getenv('RAG_ADAPTIVE_RETRIEVAL', 'true').lower() == 'true'
+        self.early_exit_overlap = float(os.getenv('RAG_EARLY_EXIT_OVERLAP', 0.6))
+        self.early_exit_margin = float(os.getenv('RAG_EARLY_EXIT_MARGIN', 0.15))
+        self.probe_depth_factor = int(os.getenv('RAG_PROBE_DEPTH_FACTOR', 2))
+        self.wide_depth_factor = int(os.getenv('RAG_WIDE_DEPTH_FACTOR', 6))
         self.enable_query_expansion = enable_query_expansion
         self.enable_reranking = enable_reranking
         self.enable_compression = enable_compression
@@ -63,12 +79,14 @@ class AdvancedRAGPipeline:
             print(f'[CONFIG] Reranking: {enable_reranking}')
             print(f'[CONFIG] Compression: {enable_compression}')
             print(f'[CONFIG] CRAG: {enable_crag}')
+            print(f'[CONFIG] Adaptive retrieval: {self.adaptive}')
 
         # Initialize components
         self.embedder = AdvancedEmbedder()
         self.searcher = HybridSearcher()
         self.reranker = Reranker() if enable_reranking else None
         self.query_expander = QueryExpander() if enable_query_expansion else None
+        self.compressor = ContextCompressor(self.embedder) if enable_compression else None
 
         if verbose:
             print('[SUCCESS] Advanced RAG Pipeline initialized')
@@ -121,7 +139,107 @@ class AdvancedRAGPipeline:
         if funding_id:
             metadata_filters['funding_id'] = funding_id
 
-        # Step 2: Query Expansion (RAG Fusion)
+        where_filter = metadata_filters if metadata_filters else None
+
+        # Step 2: Adaptive probe - if dense and sparse already agree,
+        # expansion and reranking would not change the answer
+        decision = {'path': 'fixed', 'depth': top_k * 4}
+        final_results = None
+        probe = None
+
+        if self.adaptive:
+            # Shallow probe; reused for the original query if the path is widened
+            probe_depth = top_k * self.probe_depth_factor
+            dense_results, sparse_results = self.searcher.search_candidates(
+                query=cleaned_query,
+                candidate_k=probe_depth,
+                where_filter=where_filter
+            )
+            probe = (dense_results, sparse_results)
+            agreement = ranking_agreement(dense_results, sparse_results, top_k)
+            decision.update(agreement)
+
+            agrees = (
+                agreement['overlap'] >= self.early_exit_overlap
+                or (agreement['top1_shared'] and agreement['margin'] >= self.early_exit_margin)
+            )
+
+            if agrees:
+                decision.update(path='early_exit', depth=probe_depth)
+                final_results = fuse_results(
+                    [dense_results, sparse_results],
+                    weights=[self.dense_weight, self.sparse_weight],
+                    top_k=top_k
+                )
+            else:
+                decision.update(path='widened', depth=top_k * self.wide_depth_factor)
+
+        # Step 3-6: Expansion, fusion, reranking (expensive path)
+        if final_results is None:
+            final_results = await self._retrieve_expanded(
+                cleaned_query=cleaned_query,
+                where_filter=where_filter,
+                top_k=top_k,
+                candidate_k=decision['depth'],
+                expand_queries=expand_queries,
+                rerank_results=rerank_results,
+                probe=probe
+            )
+
+        self._log_decision(query, decision)
+
+        # Step 7: CRAG Evaluation (optional)
+        if self.enable_crag:
+            try:
+                quality = await self._evaluate_retrieval_quality(
+                    query=cleaned_query,
+                    results=final_results
+                )
+
+                if self.verbose:
+                    print(f'[CRAG] Retrieval quality: {quality["quality"]}')
+
+                # If quality is low, could re-retrieve here
+                # For now, just log the quality
+            except Exception as e:
+                print(f'[WARNING] CRAG evaluation failed: {e}')
+
+        # Calculate metrics
+        duration = (datetime.now() - start_time).total_seconds()
+
+        if self.verbose:
+            print(f'[RETRIEVE] Completed in {duration:.2f}s')
+            print(f'[RETRIEVE] Returning {len(final_results)} results')
+
+        return final_results
+
+    async def _retrieve_expanded(
+        self,
+        cleaned_query: str,
+        where_filter: Dict,
+        top_k: int,
+        candidate_k: int,
+        expand_queries: bool,
+        rerank_results: bool,
+        probe: Optional[Tuple[List[Dict], List[Dict]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Full retrieval path: query expansion, fusion of all variants, reranking
+
+        Args:
+            cleaned_query: Query after self-querying
+            where_filter: ChromaDB metadata filter (or None)
+            top_k: Number of final results
+            candidate_k: Candidates per retriever and query variant
+            expand_queries: Use query expansion (if enabled)
+            rerank_results: Use reranking (if enabled)
+            probe: (dense, sparse) lists of the shallow probe for cleaned_query;
+                reused when query variants add the wide depth
+
+        Returns:
+            Top-k results
+        """
+        # Step 3: Query Expansion (RAG Fusion)
         queries = [cleaned_query]
 
         if expand_queries and self.enable_query_expansion and self.query_expander:
@@ -136,36 +254,37 @@ class AdvancedRAGPipeline:
             except Exception as e:
                 print(f'[WARNING] Query expansion failed: {e}')
 
-        # Step 3: Hybrid Search for each query
-        all_results = []
-        candidate_k = top_k * 4  # Get more candidates for reranking
+        # Step 4: Dense + sparse candidates for each query variant
+        ranked_lists = []
+        weights = []
 
         for i, q in enumerate(queries):
             if self.verbose and len(queries) > 1:
                 print(f'[HYBRID-SEARCH] Query {i+1}/{len(queries)}: "{q}"')
 
-            results = self.searcher.hybrid_search(
-                query=q,
-                top_k=candidate_k,
-                where_filter=metadata_filters if metadata_filters else None
-            )
-
-            all_results.extend(results)
+            # The variants widen the candidate pool; without variants the
+            # original query itself is searched at the wide depth
+            if probe is not None and q == cleaned_query and len(queries) > 1:
+                dense_results, sparse_results = probe
+            else:
+                dense_results, sparse_results = self.searcher.search_candidates(
+                    query=q,
+                    candidate_k=candidate_k,
+                    where_filter=where_filter
+                )
 
-        # Step 4: Deduplicate and merge results
-        seen_ids = set()
-        unique_results = []
+            ranked_lists.extend([dense_results, sparse_results])
+            weights.extend([self.dense_weight, self.sparse_weight])
 
-        for result in all_results:
-            if result['id'] not in seen_ids:
-                seen_ids.add(result['id'])
-                unique_results.append(result)
+        # Step 5: One RRF over all 2N lists (ids that several variants agree on rise)
+        unique_results = fuse_results(ranked_lists, weights=weights, top_k=top_k * 2)
 
         if self.verbose:
-            print(f'[HYBRID-SEARCH] Found {len(unique_results)} unique results')
+            print(f'[HYBRID-SEARCH] Fused {len(ranked_lists)} ranked lists '
+                  f'-> {len(unique_results)} candidates')
 
-        # Step 5: Reranking
-        final_results = unique_results[:top_k * 2]  # Pre-filter to top-2k for reranking
+        # Step 6: Reranking
+        final_results = unique_results  # Top-2k from fusion for reranking
 
         if rerank_results and self.enable_reranking and self.reranker and self.reranker.available:
             try:
@@ -190,30 +309,20 @@ class AdvancedRAGPipeline:
         else:
             final_results = final_results[:top_k]
 
-        # Step 6: CRAG Evaluation (optional)
-        if self.enable_crag:
-            try:
-                quality = await self._evaluate_retrieval_quality(
-                    query=cleaned_query,
-                    results=final_results
-                )
-
-                if self.verbose:
-                    print(f'[CRAG] Retrieval quality: {quality["quality"]}')
-
-                # If quality is low, could re-retrieve here
-                # For now, just log the quality
-            except Exception as e:
-                print(f'[WARNING] CRAG evaluation failed: {e}')
+        return final_results
 
-        # Calculate metrics
-        duration = (datetime.now() - start_time).total_seconds()
+    def _log_decision(self, query: str, decision: Dict[str, Any]) -> None:
+        """Log the adaptive retrieval decision of one request"""
+        rag_retrieval_path_total.labels(path=decision['path']).inc()
 
-        if self.verbose:
-            print(f'[RETRIEVE] Completed in {duration:.2f}s')
-            print(f'[RETRIEVE] Returning {len(final_results)} results')
+        if decision['path'] == 'fixed':
+            return
 
-        return final_results
+        print(
+            f'[ADAPTIVE] path={decision["path"]} depth={decision["depth"]} '
+            f'overlap={decision["overlap"]:.2f} margin={decision["margin"]:.3f} '
+            f'top1_shared={decision["top1_shared"]} query="{query[:60]}"'
+        )
 
     async def _evaluate_retrieval_quality(
         self,
@@ -256,44 +365,59 @@ class AdvancedRAGPipeline:
         self,
         query: str,
         chunks: List[str],
-        target_ratio: float = 0.5
+        target_ratio: float = 0.5,
+        max_tokens: int = None
     ) -> str:
         """
         Contextual compression: extract only relevant sentences
 
+        Sentences of all chunks are scored against the query embedding and
+        the best ones are kept (in original order) up to the token budget.
+
         Args:
             query: User query
             chunks: Retrieved text chunks
-            target_ratio: Target compression ratio (0.5 = keep 50%)
+            target_ratio: Budget as fraction of the original context (if max_tokens not set)
+            max_tokens: Absolute token budget for the compressed context
 
         Returns:
             Compressed context string
         """
-        if not self.enable_compression:
-            return '\n\n---\n\n'.join(chunks)
+        result = self._compress(query, chunks, target_ratio, max_tokens)
+        return result['text']
 
-        # For now, simple implementation: concatenate chunks
-        # TODO: Implement LLM-based sentence extraction using DeepSeek
-        full_context = '\n\n---\n\n'.join(chunks)
+    def _compress(
+        self,
+        query: str,
+        chunks: List[str],
+        target_ratio: float = 0.5,
+        max_tokens: int = None
+    ) -> Dict[str, Any]:
+        """Run extractive compression and return text plus stats"""
+        if not self.enable_compression or not self.compressor:
+            return {'text': '\n\n---\n\n'.join(chunks)}
 
-        if self.verbose:
-            print(f'[COMPRESSION] Original length: {len(full_context)} chars')
+        if max_tokens is None:
+            original_tokens = self.compressor.count_tokens('\n\n---\n\n'.join(chunks))
+            max_tokens = max(1, int(original_tokens * target_ratio))
 
-        # Simple compression: take first N characters (can be improved)
-        target_length = int(len(full_context) * target_ratio)
-        compressed = full_context[:target_length]
+        result = self.compressor.compress(query, chunks, max_tokens=max_tokens)
 
         if self.verbose:
-            print(f'[COMPRESSION] Compressed length: {len(compressed)} chars ({target_ratio*100}%)')
+            print(f'[COMPRESSION] Original: {result["original_tokens"]} tokens, '
+                  f'{result["sentences_total"]} sentences')
+            print(f'[COMPRESSION] Compressed: {result["compressed_tokens"]} tokens, '
+                  f'{result["sentences_kept"]} sentences (budget {max_tokens})')
 
-        return compressed
+        return result
 
     async def generate_draft(
         self,
         query: str,
         funding_id: str,
         school_profile: Dict[str, Any],
-        top_k: int = 5
+        top_k: int = 5,
+        context_max_tokens: int = None
     ) -> Dict[str, Any]:
         """
         Complete RAG pipeline: Retrieve + Generate
@@ -303,6 +427,7 @@ class AdvancedRAGPipeline:
             funding_id: Funding opportunity ID
             school_profile: School metadata
             top_k: Number of chunks to retrieve
+            context_max_tokens: Token budget for the compressed context
 
         Returns:
             Dict with retrieved_chunks, compressed_context, and metadata
@@ -330,7 +455,8 @@ class AdvancedRAGPipeline:
         chunks = [r['text'] for r in results]
 
         # Step 3: Compress context
-        compressed_context = await self.compress_context(query, chunks)
+        compression = self._compress(query, chunks, max_tokens=context_max_tokens)
+        compressed_context = compression.pop('text')
 
         # Return for use in generation
         return {
@@ -342,7 +468,8 @@ class AdvancedRAGPipeline:
                     r.get('rerank_score', r.get('rrf_score', r.get('score', 0)))
                     for r in results
                 ) / len(results),
-                'chunk_ids': [r['id'] for r in results]
+                'chunk_ids': [r['id'] for r in results],
+                'compression': compression
             }
         }
 
@@ -353,7 +480,8 @@ class AdvancedRAGPipeline:
                 'embedder': self.embedder.get_model_info(),
                 'hybrid_search': self.searcher.get_stats(),
                 'reranker_available': self.reranker.available if self.reranker else False,
-                'query_expander_available': self.query_expander is not None
+                'query_expander_available': self.query_expander is not None,
+                'compressor': self.compressor.get_stats() if self.compressor else None
             },
             'features': {
                 'query_expansion': self.enable_query_expansion,
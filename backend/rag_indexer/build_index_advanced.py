@@ -34,6 +34,7 @@ from dotenv import load_dotenv
 from utils.db_adapter import get_db_cursor
 from rag_indexer.advanced_embedder import AdvancedEmbedder
 from rag_indexer.hybrid_searcher import HybridSearcher
+from rag_indexer.deduplicator import ChunkDeduplicator
 
 load_dotenv()
 
@@ -41,8 +42,14 @@ load_dotenv()
 class AdvancedIndexBuilder:
     """Build advanced RAG indices (Dense + Sparse)"""
 
-    def __init__(self):
-        """Initialize builder"""
+    def __init__(self, dedup: bool = True, drop_boilerplate: bool = False):
+        """
+        Initialize builder
+
+        Args:
+            dedup: Collapse near-duplicate chunks (MinHash + LSH) before indexing
+            drop_boilerplate: Drop boilerplate shared by many programs entirely
+        """
         # ChromaDB Setup
         self.chroma_path = os.getenv('CHROMA_DB_PATH', '/opt/chroma_db')
         self.collection_name = os.getenv('CHROMA_COLLECTION_NAME', 'funding_docs')
@@ -66,6 +73,13 @@ class AdvancedIndexBuilder:
         print('[INFO] Loading embedding model...')
         self.embedder = AdvancedEmbedder()
 
+        # Near-duplicate detection (cookie notices, footers, contact blocks)
+        self.deduplicator = ChunkDeduplicator(
+            threshold=float(os.getenv('RAG_DEDUP_THRESHOLD', 0.8)),
+            boilerplate_min_docs=int(os.getenv('RAG_DEDUP_BOILERPLATE_MIN_DOCS', 3)),
+            drop_boilerplate=drop_boilerplate
+        ) if dedup else None
+
         print('[SUCCESS] Index builder initialized')
 
     def fetch_funding_documents(self) -> List[Dict]:
@@ -199,7 +213,8 @@ class AdvancedIndexBuilder:
                 'chunk_index': chunk['chunk_index'],
                 'provider': chunk['provider'],
                 'region': chunk['region'],
-                'funding_area': chunk['funding_area']
+                'funding_area': chunk['funding_area'],
+                'duplicate_count': chunk.get('duplicate_count', 1)
             }
             for chunk in chunks
         ]
@@ -259,17 +274,27 @@ class AdvancedIndexBuilder:
 
         print(f'[INFO] Total chunks: {len(all_chunks)}')
 
-        # 3. Index in ChromaDB (batches)
+        # 3. Collapse near-duplicate chunks (boilerplate)
+        dedup_stats = None
+        if self.deduplicator:
+            all_chunks, dedup_stats = self.deduplicator.deduplicate(all_chunks)
+            print(
+                f'[DEDUP] {dedup_stats["input_chunks"]} -> {dedup_stats["output_chunks"]} chunks '
+                f'({dedup_stats["duplicate_clusters"]} duplicate clusters, '
+                f'{dedup_stats["boilerplate_clusters"]} boilerplate)'
+            )
+
+        # 4. Index in ChromaDB (batches)
         batch_size = 500
         for i in range(0, len(all_chunks), batch_size):
             batch = all_chunks[i:i + batch_size]
             print(f'[INFO] Indexing batch {i // batch_size + 1}/{(len(all_chunks) // batch_size) + 1}')
             self.index_chunks_dense(batch)
 
-        # 4. Build BM25 Index
+        # 5. Build BM25 Index
         self.build_bm25_index(all_chunks)
 
-        # 5. Stats
+        # 6. Stats
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
 
@@ -277,6 +302,8 @@ class AdvancedIndexBuilder:
         print(f'\n[SUCCESS] Advanced RAG Index rebuild complete!')
         print(f'[STATS] Total documents: {len(documents)}')
         print(f'[STATS] Total chunks: {len(all_chunks)}')
+        if dedup_stats:
+            print(f'[STATS] Duplicate chunks removed: {dedup_stats["removed_chunks"]}')
         print(f'[STATS] ChromaDB collection count: {collection_count}')
         print(f'[STATS] Duration: {duration:.2f} seconds')
         print(f'[STATS] Embedder: {self.embedder.get_model_info()["model_name"]}')
@@ -295,10 +322,23 @@ def main():
         action='store_true',
         help='Incremental update (TODO: not implemented yet)'
     )
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help='Disable near-duplicate chunk detection'
+    )
+    parser.add_argument(
+        '--drop-boilerplate',
+        action='store_true',
+        help='Drop boilerplate chunks instead of keeping one shared chunk'
+    )
 
     args = parser.parse_args()
 
-    builder = AdvancedIndexBuilder()
+    builder = AdvancedIndexBuilder(
+        dedup=not args.no_dedup,
+        drop_boilerplate=args.drop_boilerplate
+    )
 
     if args.rebuild or not args.incremental:
         builder.rebuild_index()
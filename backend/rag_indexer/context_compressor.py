@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Extractive Context Compressor
+Selects the most query-relevant sentences from retrieved chunks
+
+Instead of truncating the concatenated context, every chunk is split into
+sentences, all sentences are embedded in ONE batched encode and scored
+against the query embedding. The best sentences are kept greedily up to a
+token budget and emitted in their original order.
+
+Sentence embeddings are cached in-process (keyed by sentence hash), so chunks
+that are retrieved repeatedly (same funding program) are only encoded once.
+"""
+
+import os
+import re
+import sys
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+from utils import token_counter
+
+
+# Sentence boundary: end punctuation followed by whitespace and an uppercase
+# letter / digit / quote / list marker. Line breaks always split (markdown).
+SENTENCE_BOUNDARY = re.compile(
+    r'(?<=[.!?])\s+(?=[A-ZÄÖÜ0-9"„(\-*•])|\n+'
+)
+
+# Common German abbreviations that end with a dot but do not end a sentence
+ABBREVIATIONS = re.compile(
+    r'\b(?:z\.\s?B|d\.\s?h|u\.\s?a|bzw|ca|ggf|inkl|max|min|Nr|Abs|Art|vgl|usw|evtl|sog)\.'
+)
+
+CHUNK_SEPARATOR = '\n\n---\n\n'
+
+
+def split_sentences(text: str, min_length: int = 20) -> List[str]:
+    """
+    Split text into sentences (German-aware, markdown-friendly)
+
+    Very short fragments (headings, bullet stubs) are merged into the
+    following sentence so they are not scored in isolation.
+
+    Args:
+        text: Text to split
+        min_length: Minimum sentence length in characters
+
+    Returns:
+        List of sentences
+    """
+    if not text:
+        return []
+
+    # Protect abbreviation dots from being treated as sentence ends
+    protected = ABBREVIATIONS.sub(lambda m: m.group(0).replace('.', '\x00'), text)
+    raw = [s.strip() for s in SENTENCE_BOUNDARY.split(protected)]
+
+    sentences = []
+    carry = ''
+    for part in raw:
+        if not part:
+            continue
+        part = part.replace('\x00', '.')
+
+        part = f'{carry} {part}'.strip() if carry else part
+        if len(part) < min_length:
+            carry = part
+            continue
+
+        sentences.append(part)
+        carry = ''
+
+    if carry:
+        if sentences:
+            sentences[-1] = f'{sentences[-1]} {carry}'
+        else:
+            sentences.append(carry)
+
+    return sentences
+
+
+class ContextCompressor:
+    """
+    Extractive compressor: keeps the top-scoring sentences within a token budget
+    """
+
+    def __init__(
+        self,
+        embedder,
+        count_tokens: Callable[[str], int] = None,
+        cache_size: int = 20000,
+        min_sentence_length: int = 20
+    ):
+        """
+        Initialize compressor
+
+        Args:
+            embedder: AdvancedEmbedder instance (shared with the pipeline)
+            count_tokens: Token counter (default: shared DeepSeek token counter)
+            cache_size: Max number of cached sentence embeddings
+            min_sentence_length: Shorter fragments are merged with neighbours
+        """
+        self.embedder = embedder
+        self.count_tokens = count_tokens or token_counter.count_tokens
+        self.cache_size = cache_size
+        self.min_sentence_length = min_sentence_length
+
+        self._cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _key(sentence: str) -> str:
+        return hashlib.sha1(sentence.encode('utf-8')).hexdigest()
+
+    def embed_sentences(self, sentences: List[str]) -> np.ndarray:
+        """
+        Embed sentences, encoding only cache misses in one batch
+
+        Args:
+            sentences: Sentences to embed
+
+        Returns:
+            L2-normalized embedding matrix (shape: [len(sentences), dim])
+        """
+        keys = [self._key(s) for s in sentences]
+        missing = {}
+        for key, sentence in zip(keys, sentences):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            elif key not in missing:
+                missing[key] = sentence
+
+        self.cache_hits += len(keys) - len(missing)
+        self.cache_misses += len(missing)
+
+        if missing:
+            encoded = np.asarray(
+                self.embedder.embed_documents(list(missing.values()), batch_size=64),
+                dtype=np.float32
+            )
+            norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+            encoded = encoded / np.maximum(norms, 1e-12)
+
+            for key, vector in zip(missing.keys(), encoded):
+                self._cache[key] = vector
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return np.stack([self._cache[key] for key in keys])
+
+    def compress(
+        self,
+        query: str,
+        chunks: List[str],
+        max_tokens: int,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Select the most relevant sentences up to max_tokens
+
+        Args:
+            query: User query
+            chunks: Retrieved text chunks (in retrieval order)
+            max_tokens: Token budget for the compressed context
+            query_embedding: Precomputed query embedding (optional)
+
+        Returns:
+            Dict with 'text', 'original_tokens', 'compressed_tokens',
+            'sentences_total' and 'sentences_kept'
+        """
+        # (chunk_index, sentence) in original order
+        units = [
+            (chunk_idx, sentence)
+            for chunk_idx, chunk in enumerate(chunks)
+            for sentence in split_sentences(chunk, self.min_sentence_length)
+        ]
+        original_tokens = self.count_tokens(CHUNK_SEPARATOR.join(chunks))
+
+        if not units:
+            return {
+                'text': '',
+                'original_tokens': original_tokens,
+                'compressed_tokens': 0,
+                'sentences_total': 0,
+                'sentences_kept': 0
+            }
+
+        sentences = [sentence for _, sentence in units]
+
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_query(query)
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        query_vec = query_vec / max(float(np.linalg.norm(query_vec)), 1e-12)
+
+        scores = self.embed_sentences(sentences) @ query_vec
+
+        # Greedy selection by score, skipping sentences that do not fit
+        selected = []
+        used_tokens = 0
+        for idx in np.argsort(-scores, kind='stable'):
+            cost = self.count_tokens(sentences[idx])
+            if used_tokens + cost > max_tokens:
+                continue
+            selected.append(int(idx))
+            used_tokens += cost
+
+        # Restore original order, keep chunk boundaries
+        grouped: 'OrderedDict[int, List[str]]' = OrderedDict()
+        for idx in sorted(selected):
+            chunk_idx, sentence = units[idx]
+            grouped.setdefault(chunk_idx, []).append(sentence)
+
+        text = CHUNK_SEPARATOR.join(' '.join(group) for group in grouped.values())
+
+        return {
+            'text': text,
+            'original_tokens': original_tokens,
+            'compressed_tokens': self.count_tokens(text),
+            'sentences_total': len(units),
+            'sentences_kept': len(selected)
+        }
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        return {
+            'cached_sentences': len(self._cache),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses
+        }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Chunk Detection (MinHash + LSH Banding)
+Removes repeated boilerplate (cookie notices, footers, "Kontakt" blocks)
+before chunks are embedded and indexed
+
+- MinHash signatures over word shingles (vectorized with NumPy)
+- LSH banding: only chunks sharing a band bucket are compared
+- Each bucket member is compared with the bucket representative only,
+  so the whole pass stays linear in the number of chunks
+"""
+
+import re
+import zlib
+import hashlib
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+# Mersenne-like prime > 2^32 for universal hashing
+_PRIME = np.uint64(4294967311)
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+SHARED_FUNDING_ID = 'shared'
+
+# Per-program metadata blanked on shared chunks (would name a random program)
+SHARED_NEUTRAL_FIELDS = ('title', 'provider', 'region', 'funding_area')
+
+
+class ChunkDeduplicator:
+    """
+    Finds near-identical chunks and collapses them
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 3,
+        boilerplate_min_docs: int = 3,
+        drop_boilerplate: bool = False,
+        seed: int = 42
+    ):
+        """
+        Initialize deduplicator
+
+        Args:
+            threshold: Min. estimated Jaccard similarity to count as duplicate
+            num_perm: Number of MinHash permutations
+            bands: Number of LSH bands (num_perm must be divisible by bands)
+            shingle_size: Words per shingle
+            boilerplate_min_docs: Clusters spanning this many funding programs are boilerplate
+            drop_boilerplate: Drop boilerplate entirely instead of keeping one shared chunk
+            seed: Random seed for the hash permutations (stable signatures)
+        """
+        if num_perm % bands != 0:
+            raise ValueError('num_perm must be divisible by bands')
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.boilerplate_min_docs = boilerplate_min_docs
+        self.drop_boilerplate = drop_boilerplate
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**31 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 2**31 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """Hash word shingles of normalized text to uint64"""
+        words = _WORD.findall(text.lower())
+        if not words:
+            return np.array([0], dtype=np.uint64)
+
+        k = self.shingle_size
+        if len(words) <= k:
+            grams = [' '.join(words)]
+        else:
+            grams = [' '.join(words[i:i + k]) for i in range(len(words) - k + 1)]
+
+        return np.fromiter(
+            (zlib.crc32(g.encode('utf-8')) for g in set(grams)),
+            dtype=np.uint64
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature of a text
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Array of shape [num_perm] (uint64)
+        """
+        shingles = self._shingles(text)
+        hashed = (np.outer(self._a, shingles) + self._b[:, None]) % _PRIME
+        return hashed.min(axis=1)
+
+    def similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(sig_a == sig_b))
+
+    def find_clusters(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group near-duplicate texts
+
+        Args:
+            texts: Texts to compare
+
+        Returns:
+            Clusters of indices (original order, first index = canonical),
+            singletons included
+        """
+        signatures = [self.signature(text) for text in texts]
+
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int) -> None:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                # Keep the smaller index as root (first occurrence wins)
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        for band in range(self.bands):
+            buckets: Dict[bytes, int] = {}
+            start = band * self.rows
+            for idx, sig in enumerate(signatures):
+                key = sig[start:start + self.rows].tobytes()
+                representative = buckets.setdefault(key, idx)
+                if representative == idx or find(representative) == find(idx):
+                    continue
+                if self.similarity(signatures[representative], sig) >= self.threshold:
+                    union(representative, idx)
+
+        clusters = defaultdict(list)
+        for idx in range(len(texts)):
+            clusters[find(idx)].append(idx)
+
+        return sorted(clusters.values(), key=lambda members: members[0])
+
+    def deduplicate(
+        self,
+        chunks: List[Dict[str, Any]],
+        text_key: str = 'chunk_text',
+        doc_key: str = 'funding_id',
+        id_key: str = 'chunk_id'
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Collapse near-duplicate chunks
+
+        - Duplicates within one funding program: keep the first chunk
+        - Duplicates across a few programs: keep one chunk per program
+        - Boilerplate (>= boilerplate_min_docs programs): one shared chunk
+          (funding_id='shared', neutral title/provider/region/area) or
+          dropped entirely
+
+        Args:
+            chunks: Chunk dicts (as produced by the index builder)
+            text_key: Key of the chunk text
+            doc_key: Key of the owning document
+            id_key: Key of the chunk id
+
+        Returns:
+            (kept chunks in original order, stats dict)
+        """
+        clusters = self.find_clusters([chunk[text_key] for chunk in chunks])
+
+        keep: Dict[int, Dict[str, Any]] = {}
+        stats = {
+            'input_chunks': len(chunks),
+            'duplicate_clusters': 0,
+            'boilerplate_clusters': 0,
+            'removed_chunks': 0
+        }
+
+        for members in clusters:
+            if len(members) == 1:
+                keep[members[0]] = chunks[members[0]]
+                continue
+
+            stats['duplicate_clusters'] += 1
+            docs = {chunks[idx][doc_key] for idx in members}
+
+            if len(docs) >= self.boilerplate_min_docs:
+                stats['boilerplate_clusters'] += 1
+                if self.drop_boilerplate:
+                    continue
+
+                canonical = dict(chunks[members[0]])
+                digest = hashlib.sha1(canonical[text_key].encode('utf-8')).hexdigest()[:16]
+                canonical[id_key] = f'{SHARED_FUNDING_ID}_{digest}'
+                canonical[doc_key] = SHARED_FUNDING_ID
+                for key in SHARED_NEUTRAL_FIELDS:
+                    if key in canonical:
+                        canonical[key] = ''
+                canonical['duplicate_count'] = len(members)
+                keep[members[0]] = canonical
+                continue
+
+            # Keep first occurrence per program
+            seen_docs = set()
+            for idx in members:
+                doc = chunks[idx][doc_key]
+                if doc in seen_docs:
+                    continue
+                seen_docs.add(doc)
+                chunk = dict(chunks[idx])
+                chunk['duplicate_count'] = sum(1 for m in members if chunks[m][doc_key] == doc)
+                keep[idx] = chunk
+
+        kept = [keep[idx] for idx in sorted(keep)]
+        stats['output_chunks'] = len(kept)
+        stats['removed_chunks'] = len(chunks) - len(kept)
+
+        return kept, stats
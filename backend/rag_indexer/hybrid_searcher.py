@@ -24,7 +24,6 @@ import numpy as np
 import json
 import pickle
 from pathlib import Path
-from collections import defaultdict
 
 # BM25 for sparse retrieval
 try:
@@ -40,6 +39,8 @@ from dotenv import load_dotenv
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 from rag_indexer.advanced_embedder import AdvancedEmbedder
+from rag_indexer.rank_fusion import fuse_results
+from rag_indexer.deduplicator import SHARED_FUNDING_ID
 
 load_dotenv()
 
@@ -91,6 +92,7 @@ class HybridSearcher:
             self.bm25_index = None
             self.bm25_corpus = []
             self.bm25_ids = []
+            self.bm25_shared = np.zeros(0, dtype=bool)
             self.load_bm25_index()
         else:
             print('[WARNING] BM25 not available, using dense-only search')
@@ -121,6 +123,7 @@ class HybridSearcher:
         # Build BM25 index
         self.bm25_index = BM25Okapi(tokenized_corpus)
         self.bm25_corpus = [doc['text'] for doc in documents]
+        self.bm25_shared = self._shared_mask(self.bm25_ids)
 
         # Save index
         self.save_bm25_index()
@@ -163,6 +166,7 @@ class HybridSearcher:
             self.bm25_index = index_data['bm25_index']
             self.bm25_corpus = index_data['bm25_corpus']
             self.bm25_ids = index_data['bm25_ids']
+            self.bm25_shared = self._shared_mask(self.bm25_ids)
 
             print(f'[SUCCESS] BM25 index loaded ({len(self.bm25_ids)} documents)')
             return True
@@ -171,6 +175,27 @@ class HybridSearcher:
             print(f'[ERROR] Failed to load BM25 index: {e}')
             return False
 
+    @staticmethod
+    def _shared_mask(ids: List[str]) -> np.ndarray:
+        """True for shared boilerplate chunks (ids 'shared_<digest>', see deduplicator)"""
+        prefix = f'{SHARED_FUNDING_ID}_'
+        return np.array([doc_id.startswith(prefix) for doc_id in ids], dtype=bool)
+
+    @staticmethod
+    def _exclude_shared(where_filter: Dict = None) -> Dict:
+        """
+        Add funding_id != 'shared' to a ChromaDB where filter
+
+        Shared boilerplate chunks belong to no program and must not take
+        retrieval slots. A filter on one funding_id excludes them already.
+        """
+        if where_filter and 'funding_id' in where_filter:
+            return where_filter
+
+        conditions = [{key: value} for key, value in (where_filter or {}).items()]
+        conditions.append({'funding_id': {'$ne': SHARED_FUNDING_ID}})
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
     def dense_search(
         self,
         query: str,
@@ -191,11 +216,11 @@ class HybridSearcher:
         # Embed query
         query_embedding = self.embedder.embed_query(query)
 
-        # Search in ChromaDB
+        # Search in ChromaDB (without shared boilerplate chunks)
         results = self.collection.query(
             query_embeddings=[query_embedding.tolist()],
             n_results=top_k,
-            where=where_filter
+            where=self._exclude_shared(where_filter)
         )
 
         # Format results
@@ -233,11 +258,17 @@ class HybridSearcher:
         # Tokenize query
         tokenized_query = query.lower().split()
 
-        # Get BM25 scores
+        # Get BM25 scores (shared boilerplate chunks never become candidates)
         scores = self.bm25_index.get_scores(tokenized_query)
+        if self.bm25_shared.any():
+            scores = np.where(self.bm25_shared, 0.0, scores)
 
-        # Get top-k indices
-        top_indices = np.argsort(scores)[::-1][:top_k]
+        # Get top-k indices (partial selection, then sort only the top-k)
+        if top_k < len(scores):
+            top_indices = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top_indices = np.arange(len(scores))
+        top_indices = top_indices[np.argsort(-scores[top_indices], kind='stable')]
 
         # Format results
         results = []
@@ -272,38 +303,63 @@ class HybridSearcher:
         Returns:
             Fused and re-ranked results
         """
-        if weights is None:
-            weights = [1.0] * len(results_list)
-
-        # RRF scores
-        rrf_scores = defaultdict(float)
-        doc_data = {}  # Store document data
-
-        # Process each result list
-        for weight, results in zip(weights, results_list):
-            for rank, result in enumerate(results):
-                doc_id = result['id']
-                rrf_scores[doc_id] += weight / (k + rank)
-
-                # Store document data (from first occurrence)
-                if doc_id not in doc_data:
-                    doc_data[doc_id] = result
-
-        # Sort by RRF score
-        ranked_docs = sorted(
-            rrf_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        return fuse_results(results_list, weights=weights, k=k)
 
-        # Format results
-        fused_results = []
-        for doc_id, rrf_score in ranked_docs:
-            result = doc_data[doc_id].copy()
-            result['rrf_score'] = rrf_score
-            fused_results.append(result)
+    def search_candidates(
+        self,
+        query: str,
+        candidate_k: int = 20,
+        where_filter: Dict = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Dense and sparse candidate lists for one query (not fused)
 
-        return fused_results
+        Args:
+            query: Search query
+            candidate_k: Candidates per retriever
+            where_filter: ChromaDB metadata filter
+
+        Returns:
+            (dense_results, sparse_results)
+        """
+        # 1. Dense retrieval
+        dense_results = self.dense_search(query, top_k=candidate_k, where_filter=where_filter)
+
+        # 2. Sparse retrieval
+        sparse_results = self.sparse_search(query, top_k=candidate_k)
+
+        # Apply metadata filter to sparse results (if provided)
+        if where_filter and sparse_results:
+            sparse_results = self._filter_sparse(sparse_results, where_filter)
+
+        return dense_results, sparse_results
+
+    def _filter_sparse(self, sparse_results: List[Dict], where_filter: Dict) -> List[Dict]:
+        """
+        Filter sparse results by metadata (one batched ChromaDB lookup)
+
+        Note: This is simplified - production should handle complex where filters
+        """
+        chroma_result = self.collection.get(ids=[result['id'] for result in sparse_results])
+        if not chroma_result or not chroma_result['metadatas']:
+            return []
+
+        metadata_by_id = dict(zip(chroma_result['ids'], chroma_result['metadatas']))
+
+        filtered_sparse = []
+        for result in sparse_results:
+            metadata = metadata_by_id.get(result['id'])
+            if metadata is None:
+                continue
+            matches = all(
+                metadata.get(key) == value
+                for key, value in where_filter.items()
+            )
+            if matches:
+                result['metadata'] = metadata
+                filtered_sparse.append(result)
+
+        return filtered_sparse
 
     def hybrid_search(
         self,
@@ -329,41 +385,19 @@ class HybridSearcher:
         # Retrieve from both systems (get more candidates)
         candidate_k = top_k * 4
 
-        # 1. Dense retrieval
-        dense_results = self.dense_search(query, top_k=candidate_k, where_filter=where_filter)
-
-        # 2. Sparse retrieval
-        sparse_results = self.sparse_search(query, top_k=candidate_k)
+        dense_results, sparse_results = self.search_candidates(
+            query,
+            candidate_k=candidate_k,
+            where_filter=where_filter
+        )
 
-        # Apply metadata filter to sparse results (if provided)
-        if where_filter and sparse_results:
-            # Filter sparse results by metadata
-            # Note: This is simplified - production should handle complex where filters
-            filtered_sparse = []
-            for result in sparse_results:
-                # Get metadata from ChromaDB
-                chroma_result = self.collection.get(ids=[result['id']])
-                if chroma_result and chroma_result['metadatas']:
-                    metadata = chroma_result['metadatas'][0]
-                    # Check if matches filter (simplified)
-                    matches = all(
-                        metadata.get(key) == value
-                        for key, value in where_filter.items()
-                    )
-                    if matches:
-                        result['metadata'] = metadata
-                        filtered_sparse.append(result)
-            sparse_results = filtered_sparse
-
-        # 3. Reciprocal Rank Fusion
-        fused_results = self.reciprocal_rank_fusion(
+        # 3. Reciprocal Rank Fusion (top-k selected inside the fusion)
+        return fuse_results(
             [dense_results, sparse_results],
-            weights=[dense_weight, sparse_weight]
+            weights=[dense_weight, sparse_weight],
+            top_k=top_k
         )
 
-        # 4. Return top-k
-        return fused_results[:top_k]
-
     def get_stats(self) -> Dict:
         """Get searcher statistics"""
         stats = {
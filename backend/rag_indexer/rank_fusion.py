@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Vectorized Reciprocal Rank Fusion
+Fuses any number of ranked lists in one pass
+
+Document ids are mapped to integer slots once, all contributions
+weight / (k + rank) are accumulated with a single np.bincount and the
+top-k is selected with np.argpartition (no full sort of all candidates).
+"""
+
+from typing import List, Dict, Tuple, Any, Sequence
+
+import numpy as np
+
+RRF_K = 60
+
+
+def rrf_fuse(
+    ranked_ids: Sequence[Sequence[str]],
+    weights: Sequence[float] = None,
+    k: int = RRF_K,
+    top_k: int = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Fuse ranked id lists with RRF
+
+    Formula: RRF_score(doc) = Σ(weight / (k + rank))
+
+    Args:
+        ranked_ids: Ranked id lists (best first)
+        weights: Weight per list (default: equal weights)
+        k: RRF constant (default 60, standard value)
+        top_k: Number of fused ids to return (default: all)
+
+    Returns:
+        (fused ids best first, matching RRF scores)
+        Ties keep first-seen order.
+    """
+    if weights is None:
+        weights = [1.0] * len(ranked_ids)
+
+    slots: Dict[str, int] = {}
+    slot_arrays = []
+    contributions = []
+
+    for weight, ids in zip(weights, ranked_ids):
+        if not ids:
+            continue
+        slot_arrays.append(np.fromiter(
+            (slots.setdefault(doc_id, len(slots)) for doc_id in ids),
+            dtype=np.int64,
+            count=len(ids)
+        ))
+        contributions.append(weight / (k + np.arange(len(ids), dtype=np.float64)))
+
+    if not slots:
+        return [], np.zeros(0)
+
+    scores = np.bincount(
+        np.concatenate(slot_arrays),
+        weights=np.concatenate(contributions),
+        minlength=len(slots)
+    )
+
+    if top_k is not None and top_k < len(slots):
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        top = np.arange(len(slots))
+
+    # Sort selected slots by score, first-seen slot breaks ties
+    top = top[np.lexsort((top, -scores[top]))]
+
+    id_list = list(slots)
+    return [id_list[slot] for slot in top], scores[top]
+
+
+def fuse_results(
+    results_list: Sequence[Sequence[Dict[str, Any]]],
+    weights: Sequence[float] = None,
+    k: int = RRF_K,
+    top_k: int = None
+) -> List[Dict[str, Any]]:
+    """
+    Fuse result dict lists with RRF
+
+    Args:
+        results_list: Result lists (each a list of dicts with 'id')
+        weights: Weight per list (default: equal weights)
+        k: RRF constant
+        top_k: Number of fused results to return (default: all)
+
+    Returns:
+        Fused results (copies) with 'rrf_score'. Document data comes from
+        the first occurrence, preferring one that carries 'metadata'.
+    """
+    doc_data: Dict[str, Dict[str, Any]] = {}
+    for results in results_list:
+        for result in results:
+            known = doc_data.get(result['id'])
+            if known is None or ('metadata' not in known and 'metadata' in result):
+                doc_data[result['id']] = result
+
+    ids, scores = rrf_fuse(
+        [[result['id'] for result in results] for results in results_list],
+        weights=weights,
+        k=k,
+        top_k=top_k
+    )
+
+    fused = []
+    for doc_id, score in zip(ids, scores):
+        result = doc_data[doc_id].copy()
+        result['rrf_score'] = float(score)
+        fused.append(result)
+
+    return fused
+
+
+def ranking_agreement(
+    dense_results: Sequence[Dict[str, Any]],
+    sparse_results: Sequence[Dict[str, Any]],
+    top_k: int
+) -> Dict[str, Any]:
+    """
+    Measure how strongly dense and sparse retrieval agree
+
+    Args:
+        dense_results: Dense results (best first, 'score' = similarity)
+        sparse_results: Sparse results (best first)
+        top_k: Depth at which the overlap is measured
+
+    Returns:
+        Dict with 'overlap' (shared ids / top_k, so short result lists
+        count as low agreement), 'margin' (dense top-1 minus top-2 score)
+        and 'top1_shared' (dense top-1 is also in the sparse top-k)
+    """
+    dense_top = [result['id'] for result in dense_results[:top_k]]
+    sparse_top = {result['id'] for result in sparse_results[:top_k]}
+
+    overlap = len(sparse_top.intersection(dense_top)) / top_k if top_k > 0 else 0.0
+
+    margin = 0.0
+    if len(dense_results) >= 2:
+        margin = float(dense_results[0].get('score') or 0) - float(dense_results[1].get('score') or 0)
+    elif dense_results:
+        margin = float(dense_results[0].get('score') or 0)
+
+    return {
+        'overlap': overlap,
+        'margin': margin,
+        'top1_shared': bool(dense_top) and dense_top[0] in sparse_top
+    }
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Führt die Index-Migration aus (Oracle oder SQLite, je nach USE_SQLITE)
+
+Legt Indizes für list_funding, Scraper-Lookups per source_url,
+list_applications und Entwürfe pro Antrag an. Idempotent.
+
+--merge-duplicates (nur SQLite): führt Programme mit gleicher source_url
+zusammen, damit der Unique-Index angelegt werden kann. Vorher wird die DB
+gesichert; welche IDs entfernt wurden, steht in <backup>.merged.json.
+"""
+
+import argparse
+import json
+import sys
+from utils.db_adapter import create_indexes, get_db_cursor, USE_SQLITE
+
+
+def merge_duplicates():
+    """Sichert die DB und führt doppelte source_url-Programme zusammen"""
+    from utils.database_sqlite import backup_database, merge_duplicate_source_urls
+
+    backup = backup_database()
+    print(f"💾 Backup: {backup}")
+
+    with get_db_cursor() as cursor:
+        merged = merge_duplicate_source_urls(cursor)
+
+    record = f'{backup}.merged.json'
+    with open(record, 'w', encoding='utf-8') as f:
+        json.dump(
+            [{'source_url': url, 'kept_funding_id': keep, 'removed_funding_id': removed}
+             for url, keep, removed in merged],
+            f, ensure_ascii=False, indent=2
+        )
+    print(f"🔀 {len(merged)} Duplikate zusammengeführt (Protokoll: {record})")
+
+
+def run_migration(merge: bool = False):
+    """Führe Migration aus"""
+    backend = 'SQLite' if USE_SQLITE else 'Oracle'
+    print(f"🔧 Starte Migration: Add Performance Indexes ({backend})...")
+
+    try:
+        if merge:
+            if USE_SQLITE:
+                merge_duplicates()
+            else:
+                print("⚠️ --merge-duplicates wird nur für SQLite unterstützt")
+        create_indexes()
+        print("\n✅ Migration erfolgreich abgeschlossen!")
+    except Exception as e:
+        print(f"\n❌ Migration fehlgeschlagen: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Index-Migration')
+    parser.add_argument(
+        '--merge-duplicates',
+        action='store_true',
+        help='Programme mit gleicher source_url zusammenführen (SQLite, mit Backup)'
+    )
+    args = parser.parse_args()
+    run_migration(merge=args.merge_duplicates)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Führt die Summary-Migration aus (Oracle oder SQLite, je nach USE_SQLITE)
+
+Ergänzt FUNDING_OPPORTUNITIES.summary (Listen-Vorschau statt Volltext)
+und befüllt sie für bestehende Programme. Idempotent.
+"""
+
+import sys
+from utils.db_adapter import get_db_cursor, USE_SQLITE
+from utils.summary import backfill_summaries
+
+
+def add_summary_column(cursor):
+    """Spalte anlegen, falls sie fehlt"""
+    if USE_SQLITE:
+        from utils.database_sqlite import add_missing_columns
+        add_missing_columns(cursor)
+        return
+
+    import cx_Oracle
+    try:
+        cursor.execute('ALTER TABLE FUNDING_OPPORTUNITIES ADD (summary VARCHAR2(1000 CHAR))')
+        print("   ✅ Column summary added")
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code != 1430:  # ORA-01430: Spalte existiert bereits
+            raise
+        print("   ⏭️ Column summary already exists, skipping")
+
+
+def run_migration():
+    """Führe Migration aus"""
+    backend = 'SQLite' if USE_SQLITE else 'Oracle'
+    print(f"🔧 Starte Migration: Add Funding Summary ({backend})...")
+
+    try:
+        with get_db_cursor() as cursor:
+            add_summary_column(cursor)
+            count = backfill_summaries(cursor)
+        print(f"\n✅ Migration erfolgreich abgeschlossen! ({count} Vorschauen erzeugt)")
+    except Exception as e:
+        print(f"\n❌ Migration fehlgeschlagen: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_migration()
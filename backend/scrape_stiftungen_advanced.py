@@ -27,6 +27,7 @@ from scraper_firecrawl.llm_extractor import (
     validate_extracted_data,
     calculate_quality_score
 )
+from utils.llm_cache import cache_key, get_llm_cache, prompt_version
 
 load_dotenv()
 
@@ -117,6 +118,10 @@ Gib die Daten als valides JSON zurück (NUR JSON, keine Markdown-Blöcke):
 Falls keine Stiftung erkennbar oder keine relevanten Daten: {"error": "no_data"}
 """
 
+LLM_MODEL = "deepseek-chat"
+LLM_TEMPERATURE = 0.2
+LLM_PROMPT_VERSION = prompt_version(LLM_PROMPT)
+
 def get_quelle_from_url(url):
     """Extrahiere Kurzbezeichnung aus URL"""
     domain = urlparse(url).netloc.replace('www.', '')
@@ -159,14 +164,22 @@ def extract_with_llm(markdown, url):
     """Extrahiere Stiftungsdaten mit DeepSeek LLM"""
     logger.info(f"   🤖 LLM-Extraktion...")
 
+    # Kürze Text wenn nötig (max 8000 chars für Token-Limit)
+    text_sample = markdown[:8000] if len(markdown) > 8000 else markdown
+
+    # Gleicher Text + gleicher Prompt -> Ergebnis aus dem LLM-Cache
+    cache = get_llm_cache()
+    key = cache_key(LLM_PROMPT_VERSION, LLM_MODEL, LLM_TEMPERATURE, text_sample)
+    data = cache.get(key)
+    if data is not None:
+        logger.info(f"   ♻️ LLM-Ergebnis aus Cache")
+        return _stiftung_or_none(data)
+
     if not DEEPSEEK_API_KEY or DEEPSEEK_API_KEY == 'your_key_here_optional':
         logger.error("   ❌ DeepSeek API-Key fehlt!")
         return None
 
     try:
-        # Kürze Text wenn nötig (max 8000 chars für Token-Limit)
-        text_sample = markdown[:8000] if len(markdown) > 8000 else markdown
-
         response = requests.post(
             "https://api.deepseek.com/v1/chat/completions",
             headers={
@@ -174,12 +187,12 @@ def extract_with_llm(markdown, url):
                 "Content-Type": "application/json"
             },
             json={
-                "model": "deepseek-chat",
+                "model": LLM_MODEL,
                 "messages": [
                     {"role": "system", "content": LLM_PROMPT},
                     {"role": "user", "content": text_sample}
                 ],
-                "temperature": 0.2,
+                "temperature": LLM_TEMPERATURE,
                 "max_tokens": 1500
             },
             timeout=60
@@ -202,13 +215,8 @@ def extract_with_llm(markdown, url):
                     extracted_text = extracted_text[start:end].strip()
 
                 data = json.loads(extracted_text)
-
-                if "error" in data:
-                    logger.warning(f"   ⚠️ LLM: {data['error']}")
-                    return None
-
-                logger.info(f"   ✅ LLM-Extraktion erfolgreich!")
-                return data
+                cache.put(key, data, LLM_PROMPT_VERSION, LLM_MODEL)
+                return _stiftung_or_none(data)
 
             except json.JSONDecodeError as e:
                 logger.error(f"   ❌ JSON-Parse-Fehler: {e}")
@@ -222,6 +230,15 @@ def extract_with_llm(markdown, url):
         logger.error(f"   ❌ LLM Exception: {e}")
         return None
 
+def _stiftung_or_none(data):
+    """LLM-Ergebnis oder None, wenn das LLM keine Stiftung erkannt hat"""
+    if "error" in data:
+        logger.warning(f"   ⚠️ LLM: {data['error']}")
+        return None
+
+    logger.info(f"   ✅ LLM-Extraktion erfolgreich!")
+    return data
+
 def save_to_database(conn, stiftung_data, raw_markdown, source_url, structured_data=None):
     """
     Speichere Stiftung in DB (STIFTUNGEN + FUNDING_OPPORTUNITIES)
@@ -15,10 +15,11 @@ Version: 2.0 (Migration from Firecrawl)
 Date: 2025-10-31
 """
 
+import argparse
 import os
 import sys
-import uuid
 import asyncio
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
@@ -27,12 +28,21 @@ from dotenv import load_dotenv
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from scraper_firecrawl.crawl_scheduler import DomainScheduler
+from scraper_firecrawl.crawler_pool import CrawlerPool, is_browser_failure
 from scraper_firecrawl.funding_sources import ALL_SOURCES, FundingSource
 from scraper_firecrawl.llm_extractor import extract_with_deepseek, validate_extracted_data
-from utils.db_adapter import get_db_cursor
+from utils.facets import refresh_facets
+from utils.fetch_state import FetchStateStore
+from utils.funding_upsert import UpsertResult, upsert_funding_opportunities
+from utils.llm_cache import get_llm_cache
+from utils.scrape_ledger import ScrapeLedger
 
 load_dotenv()
 
+# Scraper name in the job ledger
+LEDGER_NAME = 'crawl4ai'
+
 
 class Crawl4AIScraper:
     """Crawl4AI-based scraper for funding opportunities"""
@@ -42,11 +52,33 @@ class Crawl4AIScraper:
         self.headless = True
         self.max_retries = 2
         self.retry_delay = 3  # seconds
+        # Upper bound per URL (fetch incl. retries + LLM extraction)
+        self.task_timeout = float(os.getenv('SCRAPER_TASK_TIMEOUT', 180))
+
+        # Long-lived browsers shared by all URLs (started on first use)
+        self.crawler_pool = CrawlerPool.from_env(self._start_crawler, self._stop_crawler)
+
+        # ETag / Last-Modified / content hash per URL (skip unchanged pages)
+        self.fetch_state = FetchStateStore()
 
         print(f'[INFO] Crawl4AI Scraper initialized')
         print(f'[INFO] Headless: {self.headless}')
         print(f'[INFO] Max retries: {self.max_retries}')
 
+    async def _start_crawler(self) -> AsyncWebCrawler:
+        """Launch one headless browser for the pool"""
+        crawler = AsyncWebCrawler(headless=self.headless, verbose=False)
+        await crawler.start()
+        return crawler
+
+    @staticmethod
+    async def _stop_crawler(crawler: AsyncWebCrawler) -> None:
+        await crawler.close()
+
+    async def close(self) -> None:
+        """Close all pooled browsers"""
+        await self.crawler_pool.close()
+
     async def scrape_url(
         self,
         url: str,
@@ -86,9 +118,11 @@ class Crawl4AIScraper:
                     override_navigator=True
                 )
 
-                # Scrape with Crawl4AI
-                async with AsyncWebCrawler(headless=self.headless, verbose=False) as crawler:
+                # Scrape with a pooled browser (no launch per URL)
+                async with self.crawler_pool.crawler() as crawler:
                     result = await crawler.arun(url=url, config=config)
+                    if not result.success and is_browser_failure(result.error_message):
+                        self.crawler_pool.mark_unhealthy(crawler)
 
                 if not result.success:
                     print(f'[ERROR] Attempt {attempt + 1}/{self.max_retries} failed for {url}: {result.error_message}')
@@ -135,27 +169,125 @@ class Crawl4AIScraper:
             'url': url
         }
 
-    async def process_source(self, source: FundingSource) -> List[Dict[str, Any]]:
+    async def _fetch_and_parse(
+        self,
+        url: str,
+        source: FundingSource,
+        scheduler: DomainScheduler
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch within the scheduler's limits and parse; raises if the fetch failed
+
+        The task_timeout budget starts once the slot is held: waiting behind
+        the global/per-domain limits and politeness delays does not count.
+        """
+        loop = asyncio.get_running_loop()
+        async with scheduler.slot(url):
+            deadline = loop.time() + self.task_timeout
+            async with asyncio.timeout_at(deadline):
+                # Conditional GET at the origin: 304 means no browser fetch needed
+                if await asyncio.to_thread(self.fetch_state.probe, url):
+                    print(f'[SKIP] Not modified: {url}')
+                    return None
+                page_data = await self.scrape_url(url, extract_schema=source.schema)
+        if not page_data.get('success'):
+            raise RuntimeError(page_data.get('error_message', 'fetch failed'))
+        # LLM extraction is blocking (HTTP): keep it off the event loop
+        async with asyncio.timeout_at(deadline):
+            return await asyncio.to_thread(self._parse_page_data, page_data, source)
+
+    async def process_url(
+        self,
+        url: str,
+        source: FundingSource,
+        scheduler: DomainScheduler,
+        ledger: Optional[ScrapeLedger] = None
+    ) -> Optional[Dict[str, Any]]:
         """
-        Process a funding source (scrape all URLs)
+        Scrape and parse one URL within the scheduler's limits
+
+        Errors and timeouts are reported and return None, so one failing
+        URL never cancels the other tasks of the run.
+
+        Args:
+            url: URL to scrape
+            source: Source definition
+            scheduler: Shared global/per-domain limits
+            ledger: Job ledger; if given, the result is saved right away and
+                URLs already done in the run are skipped
+
+        Returns:
+            Parsed funding opportunity dict or None
+        """
+        if ledger is not None:
+            if not ledger.should_process(source.name, url):
+                print(f'[SKIP] Done in run {ledger.run_id}: {url}')
+                return None
+            await asyncio.to_thread(ledger.start_job, source.name, url)
+
+        try:
+            result = await self._fetch_and_parse(url, source, scheduler)
+            if ledger is not None:
+                await asyncio.to_thread(self._save_job, ledger, source, url, result)
+            return result
+        except TimeoutError:
+            print(f'[TIMEOUT] {url} exceeded {self.task_timeout:.0f}s - skipping')
+            error = f'timeout after {self.task_timeout:.0f}s'
+        except Exception as e:
+            print(f'[ERROR] Failed to process {url}: {e}')
+            error = str(e)
+
+        if ledger is not None:
+            self.fetch_state.forget(url)
+            await asyncio.to_thread(ledger.fail_job, source.name, url, error)
+        return None
+
+    def _save_job(
+        self,
+        ledger: ScrapeLedger,
+        source: FundingSource,
+        url: str,
+        result: Optional[Dict[str, Any]]
+    ) -> None:
+        """Write one URL's result, then mark its job done (runs in a worker thread)"""
+        # Only this URL's fetch state: other URLs may still be in extraction
+        if result:
+            if self._write_opportunities([result], flush_urls=[url]).errors:
+                raise RuntimeError('opportunity not saved')
+        else:
+            self.fetch_state.flush(urls=[url])
+        ledger.finish_job(source.name, url, 1 if result else 0)
+
+    async def process_source(
+        self,
+        source: FundingSource,
+        scheduler: Optional[DomainScheduler] = None,
+        ledger: Optional[ScrapeLedger] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process a funding source (scrape all URLs concurrently)
 
         Args:
             source: FundingSource definition
+            scheduler: Shared limits (default: new scheduler from env)
+            ledger: Job ledger (results are then saved per URL)
 
         Returns:
             List of extracted funding opportunities
         """
         print(f'\n[START] Processing source: {source.name}')
+        scheduler = scheduler or DomainScheduler.from_env()
+        start_time = time.monotonic()
+        if ledger is not None:
+            await asyncio.to_thread(ledger.register, source.name, source.urls)
 
-        all_results = []
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(self.process_url(url, source, scheduler, ledger)) for url in source.urls]
 
-        # Scrape all URLs for this source
-        for url in source.urls:
-            page_data = await self.scrape_url(url, extract_schema=source.schema)
-            result = self._parse_page_data(page_data, source)
-            if result:
-                all_results.append(result)
+        all_results = [task.result() for task in tasks if task.result()]
 
+        if ledger is not None:
+            ledger.source_finished(source.name, time.monotonic() - start_time)
         print(f'[INFO] Extracted {len(all_results)} opportunities from {source.name}')
         return all_results
 
@@ -188,6 +320,14 @@ class Crawl4AIScraper:
         # Get metadata
         metadata = data.get('metadata', {})
 
+        # Same content as last run: skip LLM extraction and DB write
+        # (fetch state is keyed by the requested URL, before redirects)
+        source_url = metadata.get('url', metadata.get('sourceURL', ''))
+        requested_url = metadata.get('sourceURL', source_url)
+        if self.fetch_state.is_unchanged(requested_url, markdown):
+            print(f'[SKIP] Unchanged content: {requested_url}')
+            return None
+
         # Use LLM to extract structured data from markdown
         print(f'[LLM] Extracting from {source.name}...')
         llm_extracted = extract_with_deepseek(markdown, source.name)
@@ -210,7 +350,7 @@ class Crawl4AIScraper:
         # Build funding opportunity
         funding = {
             'title': extracted.get('title', 'Unbekannt'),
-            'source_url': metadata.get('url', metadata.get('sourceURL', '')),
+            'source_url': source_url,
             'cleaned_text': markdown,  # LLM-ready markdown
             'provider': source.provider,
             'region': source.region,
@@ -222,11 +362,15 @@ class Crawl4AIScraper:
             'metadata_json': {
                 'extracted_data': extracted,
                 'source_name': source.name,
+                'requested_url': requested_url,
                 'scraped_with': 'Crawl4AI',
                 'scrape_timestamp': datetime.now().isoformat()
             }
         }
 
+        # Staged only now: a page whose extraction fails or times out is
+        # not recorded as processed (saved with the next flush)
+        self.fetch_state.remember(requested_url, markdown)
         return funding
 
     def _parse_amount(self, amount: Optional[Any]) -> Optional[float]:
@@ -271,102 +415,85 @@ class Crawl4AIScraper:
         """
         if not funding_opportunities:
             print('[INFO] No opportunities to save')
+            self.fetch_state.flush()
             return 0
 
-        print(f'[INFO] Saving {len(funding_opportunities)} opportunities to database...')
+        result = self._write_opportunities(funding_opportunities)
+
+        insert_count = result.inserted
+        print(f'[SUCCESS] Saved {insert_count} new, updated {result.updated} opportunities')
+
+        self.update_facets()
 
-        insert_count = 0
-        with get_db_cursor() as cursor:
-            for funding in funding_opportunities:
-                try:
-                    # Check if already exists (by source_url)
-                    cursor.execute(
-                        "SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES WHERE source_url = :url",
-                        {'url': funding['source_url']}
-                    )
-                    exists = cursor.fetchone()[0] > 0
-
-                    if exists:
-                        # Update existing
-                        cursor.execute("""
-                            UPDATE FUNDING_OPPORTUNITIES
-                            SET title = :title,
-                                cleaned_text = :cleaned_text,
-                                provider = :provider,
-                                region = :region,
-                                funding_area = :funding_area,
-                                deadline = :deadline,
-                                min_funding_amount = :min_amount,
-                                max_funding_amount = :max_amount,
-                                metadata_json = :metadata,
-                                updated_at = CURRENT_TIMESTAMP
-                            WHERE source_url = :url
-                        """, {
-                            'title': funding['title'],
-                            'cleaned_text': funding['cleaned_text'],
-                            'provider': funding['provider'],
-                            'region': funding['region'],
-                            'funding_area': funding['funding_area'],
-                            'deadline': funding.get('deadline'),
-                            'min_amount': funding.get('min_funding_amount'),
-                            'max_amount': funding.get('max_funding_amount'),
-                            'metadata': str(funding.get('metadata_json', {})),
-                            'url': funding['source_url']
-                        })
-                        print(f'[UPDATE] {funding["title"][:50]}...')
-                    else:
-                        # Insert new
-                        funding_id = str(uuid.uuid4()).replace('-', '').upper()
-                        cursor.execute("""
-                            INSERT INTO FUNDING_OPPORTUNITIES (
-                                funding_id, title, source_url, cleaned_text,
-                                provider, region, funding_area,
-                                deadline, min_funding_amount, max_funding_amount,
-                                metadata_json, last_scraped
-                            ) VALUES (
-                                :funding_id, :title, :url, :cleaned_text,
-                                :provider, :region, :funding_area,
-                                :deadline, :min_amount, :max_amount,
-                                :metadata, CURRENT_TIMESTAMP
-                            )
-                        """, {
-                            'funding_id': funding_id,
-                            'title': funding['title'],
-                            'url': funding['source_url'],
-                            'cleaned_text': funding['cleaned_text'],
-                            'provider': funding['provider'],
-                            'region': funding['region'],
-                            'funding_area': funding['funding_area'],
-                            'deadline': funding.get('deadline'),
-                            'min_amount': funding.get('min_funding_amount'),
-                            'max_amount': funding.get('max_funding_amount'),
-                            'metadata': str(funding.get('metadata_json', {}))
-                        })
-                        print(f'[INSERT] {funding["title"][:50]}...')
-                        insert_count += 1
-
-                except Exception as e:
-                    print(f'[ERROR] Failed to save {funding.get("title", "Unknown")}: {e}')
-                    import traceback
-                    traceback.print_exc()
-
-        print(f'[SUCCESS] Saved {insert_count} new opportunities')
         return insert_count
 
-    async def run_all(self) -> None:
-        """Run scraper for all configured sources"""
+    def _write_opportunities(
+        self,
+        funding_opportunities: List[Dict[str, Any]],
+        flush_urls: Optional[List[str]] = None
+    ) -> UpsertResult:
+        """
+        Bulk upsert; pages whose rows failed are processed again next run
+
+        Args:
+            funding_opportunities: List of funding dicts
+            flush_urls: Persist only the fetch state of these URLs (default: all)
+        """
+        print(f'[INFO] Saving {len(funding_opportunities)} opportunities to database...')
+
+        # One bulk upsert keyed by source_url (MERGE / ON CONFLICT)
+        result = upsert_funding_opportunities(funding_opportunities)
+
+        for index, message in result.errors:
+            title = funding_opportunities[index].get('title', 'Unknown')
+            print(f'[ERROR] Failed to save {title}: {message}')
+            # Not saved: process the page again next run
+            self.fetch_state.forget(funding_opportunities[index].get('metadata_json', {}).get('requested_url'))
+
+        # Pages are only marked as processed once their rows are written
+        self.fetch_state.flush(urls=flush_urls)
+        return result
+
+    def update_facets(self) -> None:
+        """Recompute the filter facet snapshot served by /funding/filters/options"""
+        try:
+            refresh_facets()
+        except Exception as e:
+            print(f'[WARN] Facet refresh failed: {e}')
+
+    async def run_all(self, resume: bool = False) -> None:
+        """
+        Run scraper for all configured sources
+
+        Args:
+            resume: Continue the last unfinished run instead of starting over
+        """
         print('[START] Crawl4AI Scraper - Förder-Finder')
         print(f'[INFO] Processing {len(ALL_SOURCES)} sources')
 
         start_time = datetime.now()
-        all_opportunities = []
 
+        # All sources at once; politeness is enforced per domain
+        scheduler = DomainScheduler.from_env()
+        print(
+            f'[INFO] Concurrency: {scheduler.max_concurrency} total, '
+            f'{scheduler.per_domain_concurrency} per domain, {scheduler.min_delay}s delay'
+        )
+
+        # All jobs up front, so a resumed run also knows the sources not started yet
+        ledger = ScrapeLedger.open(LEDGER_NAME, resume=resume)
         for source in ALL_SOURCES:
-            opportunities = await self.process_source(source)
-            all_opportunities.extend(opportunities)
+            ledger.register(source.name, source.urls)
+
+        # Each URL's result is saved as soon as it is extracted
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self.process_source(source, scheduler, ledger)) for source in ALL_SOURCES]
+        finally:
+            await self.close()
 
-        # Save to database
-        self.save_to_database(all_opportunities)
+        all_opportunities = [opportunity for task in tasks for opportunity in task.result()]
+        self.update_facets()
 
         # Stats
         end_time = datetime.now()
@@ -376,13 +503,22 @@ class Crawl4AIScraper:
         print(f'[STATS] Total opportunities: {len(all_opportunities)}')
         print(f'[STATS] Duration: {duration:.2f} seconds ({duration/60:.1f} minutes)')
         print(f'[STATS] Average per source: {duration/len(ALL_SOURCES):.2f}s')
+        print(f'[STATS] Domains: {len(scheduler.stats())}, requests: {sum(scheduler.stats().values())}')
+        print(f'[STATS] Jobs ({ledger.run_id}): {ledger.summary()}')
+        if not ledger.is_complete():
+            print('[WARN] Failed jobs left - continue with --resume')
+        print(f'[STATS] Skipped pages: {self.fetch_state.stats()}')
+        print(f'[STATS] LLM extraction: {get_llm_cache().stats()}')
+        print(f'[STATS] Browsers started: {self.crawler_pool.started} ({self.crawler_pool.restarted} after failures)')
 
 
-async def main():
+async def main(resume: bool = False):
     """Main entry point"""
     scraper = Crawl4AIScraper()
-    await scraper.run_all()
+    await scraper.run_all(resume=resume)
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description='Scrape all funding sources with Crawl4AI')
+    parser.add_argument('--resume', action='store_true', help='Continue the last unfinished run')
+    asyncio.run(main(resume=parser.parse_args().resume))
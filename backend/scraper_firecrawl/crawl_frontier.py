@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Sitemap Crawl Frontier
+Streaming sitemap discovery, keyword scoring and a bounded priority queue
+
+Ministry sitemaps list tens of thousands of URLs, of which a few dozen are
+funding programs. The frontier streams sitemap XML (and sitemap indexes,
+plain or .gz) while it downloads, scores every <loc> with one compiled
+keyword pattern and keeps only the best SCRAPER_FRONTIER_CAPACITY
+candidates in a priority queue, so memory stays bounded by the candidate
+list instead of the sitemap size. Async fetchers then drain the queue
+best-first.
+
+URLs are deduplicated within a run and against a persisted seen-set
+(SCRAPER_FRONTIER_DIR): pages fetched in earlier runs are queued behind
+new ones, so a limited budget per run reaches new pages first.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import re
+import zlib
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Set, Tuple, TypeVar
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from dotenv import load_dotenv
+
+from scraper_firecrawl.link_classifier import KeywordMatcher, normalize_url
+
+load_dotenv()
+
+T = TypeVar('T')
+
+# Directory for persisted seen-sets (one file per domain)
+SCRAPER_FRONTIER_DIR = os.getenv('SCRAPER_FRONTIER_DIR', 'crawl_frontier')
+
+# Sitemap locations tried besides the ones announced in robots.txt
+DEFAULT_SITEMAPS = ['/sitemap.xml', '/sitemap_index.xml', '/sitemap-index.xml']
+
+# PDFs from the sitemap go first (calls and guidelines are often PDF-only)
+PDF_SCORE = 999
+
+_DIGEST_SIZE = 16
+
+
+class UrlScorer:
+    """Keyword relevance of URLs in a single regex pass"""
+
+    def __init__(self, keywords: Iterable[str], blacklist: Iterable[str] = ()):
+        self.keywords = {keyword.lower() for keyword in keywords}
+        self.blacklist = {keyword.lower() for keyword in blacklist}
+        self.matcher = KeywordMatcher(self.keywords | self.blacklist)
+
+    def score(self, url: str) -> Optional[int]:
+        """
+        Number of distinct keywords in the URL
+
+        Returns:
+            None if a blacklist keyword occurs, otherwise the score (0 = irrelevant)
+        """
+        found = self.matcher.find(url)
+        if found & self.blacklist:
+            return None
+        return len(found & self.keywords)
+
+
+def _digest(url: str) -> bytes:
+    return hashlib.blake2b(normalize_url(url).encode('utf-8'), digest_size=_DIGEST_SIZE).digest()
+
+
+def seen_set_path(domain: str) -> str:
+    """Seen-set file of a domain (e.g. 'www.bmbf.de')"""
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', domain).strip('_')
+    return os.path.join(SCRAPER_FRONTIER_DIR, f'{slug}.seen')
+
+
+@dataclass(order=True)
+class FrontierEntry:
+    """Queued URL; ordering = priority (lower sorts first)"""
+    seen_before: bool
+    neg_score: int
+    seq: int
+    url: str = field(compare=False)
+
+    @property
+    def score(self) -> int:
+        return -self.neg_score
+
+
+@dataclass
+class FrontierStats:
+    """Counters of one frontier"""
+    sitemaps: int = 0
+    sitemap_urls: int = 0
+    duplicates: int = 0
+    candidates: int = 0
+    pdfs: int = 0
+    seen_before: int = 0
+    dropped: int = 0
+
+    def summary(self) -> str:
+        return (
+            f'{self.sitemaps} sitemaps, {self.sitemap_urls} URLs, {self.duplicates} duplicates, '
+            f'{self.candidates} candidates ({self.pdfs} PDFs, {self.seen_before} fetched before), '
+            f'{self.dropped} dropped over capacity'
+        )
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+async def iter_sitemap(http: httpx.AsyncClient, url: str) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Stream one sitemap and yield its entries while downloading
+
+    Finished <url>/<sitemap> elements are removed from the tree right away,
+    so memory does not grow with the sitemap size.
+
+    Yields:
+        ('url', loc) for pages, ('sitemap', loc) for sitemap index entries
+
+    Raises:
+        httpx.HTTPError, ET.ParseError: Download failed / not a sitemap
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS) if urlparse(url).path.endswith('.gz') else None
+    root = None
+
+    async with http.stream('GET', url) as response:
+        if response.status_code != 200:
+            return
+        async for chunk in response.aiter_bytes():
+            parser.feed(gunzip.decompress(chunk) if gunzip else chunk)
+            for event, elem in parser.read_events():
+                if root is None:
+                    root = elem
+                if event != 'end':
+                    continue
+                tag = _local_name(elem.tag)
+                if tag not in ('url', 'sitemap'):
+                    continue
+                # Direct <loc> only (image/video extensions have their own)
+                loc = next((child.text for child in elem if _local_name(child.tag) == 'loc'), None)
+                if loc and loc.strip():
+                    yield tag, loc.strip()
+                root.clear()
+
+
+async def sitemaps_from_robots(http: httpx.AsyncClient, base_url: str) -> List[str]:
+    """Sitemap: directives of robots.txt"""
+    try:
+        response = await http.get(urljoin(base_url, '/robots.txt'))
+    except httpx.HTTPError:
+        return []
+    if response.status_code != 200:
+        return []
+    return [
+        line.split(':', 1)[1].strip()
+        for line in response.text.splitlines()
+        if line.lower().startswith('sitemap:')
+    ]
+
+
+class CrawlFrontier:
+    """Deduplicated, bounded priority queue of candidate URLs of one site"""
+
+    def __init__(
+        self,
+        base_url: str,
+        scorer: UrlScorer,
+        capacity: int = 5000,
+        seen_path: Optional[str] = None
+    ):
+        """
+        Args:
+            base_url: Site root; only URLs of this host are queued
+            scorer: Keyword scorer (score 0 / blacklisted = not queued)
+            capacity: Max. candidates kept (lowest priority dropped)
+            seen_path: Persisted seen-set file (None = no persistence)
+        """
+        self.base_url = base_url
+        self.domain = urlparse(base_url).netloc
+        self.scorer = scorer
+        self.capacity = capacity
+        self.seen_path = seen_path
+        self.stats = FrontierStats()
+        self._heap: List[FrontierEntry] = []
+        self._seq = itertools.count()
+        self._queued: Set[bytes] = set()
+        self._fetched: Set[bytes] = self._load_seen()
+        self._new_fetched: List[bytes] = []
+
+    @classmethod
+    def from_env(cls, base_url: str, scorer: UrlScorer) -> 'CrawlFrontier':
+        """Frontier with SCRAPER_FRONTIER_CAPACITY and a seen-set per domain"""
+        return cls(
+            base_url,
+            scorer,
+            capacity=int(os.getenv('SCRAPER_FRONTIER_CAPACITY', 5000)),
+            seen_path=seen_set_path(urlparse(base_url).netloc)
+        )
+
+    def _load_seen(self) -> Set[bytes]:
+        if not self.seen_path or not os.path.exists(self.seen_path):
+            return set()
+        with open(self.seen_path, 'rb') as f:
+            data = f.read()
+        # A torn last record after a crash is ignored
+        usable = len(data) - len(data) % _DIGEST_SIZE
+        return {data[i:i + _DIGEST_SIZE] for i in range(0, usable, _DIGEST_SIZE)}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, url: str) -> bool:
+        """
+        Score and queue a URL
+
+        Returns:
+            True if queued (new, same host, relevant or PDF)
+        """
+        self.stats.sitemap_urls += 1
+        digest = _digest(url)
+        if digest in self._queued:
+            self.stats.duplicates += 1
+            return False
+        self._queued.add(digest)
+
+        parsed = urlparse(url)
+        if parsed.netloc != self.domain:
+            return False
+        if parsed.path.lower().endswith('.pdf'):
+            score = PDF_SCORE
+            self.stats.pdfs += 1
+        else:
+            score = self.scorer.score(url)
+            if not score:
+                return False
+
+        seen_before = digest in self._fetched
+        self.stats.seen_before += seen_before
+        self.stats.candidates += 1
+        heapq.heappush(self._heap, FrontierEntry(seen_before, -score, next(self._seq), url))
+
+        # Amortized top-k: trim to capacity once the heap doubled
+        if len(self._heap) > 2 * self.capacity:
+            self.stats.dropped += len(self._heap) - self.capacity
+            self._heap = heapq.nsmallest(self.capacity, self._heap)
+        return True
+
+    def pop(self) -> FrontierEntry:
+        """Highest-priority entry"""
+        return heapq.heappop(self._heap)
+
+    def peek(self, count: int) -> List[FrontierEntry]:
+        """Top entries without removing them"""
+        return heapq.nsmallest(count, self._heap)
+
+    def mark_fetched(self, url: str) -> None:
+        """Remember a fetched page for later runs (written by save())"""
+        digest = _digest(url)
+        if digest not in self._fetched:
+            self._fetched.add(digest)
+            self._new_fetched.append(digest)
+
+    def save(self) -> int:
+        """
+        Append newly fetched pages to the seen-set file
+
+        Returns:
+            Number of URLs written
+        """
+        if not self.seen_path or not self._new_fetched:
+            return 0
+        os.makedirs(os.path.dirname(self.seen_path) or '.', exist_ok=True)
+        with open(self.seen_path, 'ab') as f:
+            f.write(b''.join(self._new_fetched))
+        written, self._new_fetched = len(self._new_fetched), []
+        return written
+
+    async def discover(
+        self,
+        http: Optional[httpx.AsyncClient] = None,
+        concurrency: int = 2,
+        max_sitemaps: int = 200
+    ) -> None:
+        """
+        Stream all sitemaps of the site into the frontier
+
+        Sitemaps from robots.txt and the default locations are fetched by
+        `concurrency` workers; sitemap index entries are followed.
+
+        Args:
+            http: HTTP client (default: new client, redirects followed)
+            concurrency: Parallel sitemap downloads
+            max_sitemaps: Upper bound of sitemaps per site (index loops)
+        """
+        if http is None:
+            async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+                return await self.discover(client, concurrency, max_sitemaps)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        visited: Set[str] = set()
+
+        def enqueue(sitemap_url: str) -> None:
+            key = normalize_url(sitemap_url)
+            if key not in visited and len(visited) < max_sitemaps:
+                visited.add(key)
+                queue.put_nowait(sitemap_url)
+
+        for sitemap_url in await sitemaps_from_robots(http, self.base_url):
+            enqueue(sitemap_url)
+        for path in DEFAULT_SITEMAPS:
+            enqueue(urljoin(self.base_url, path))
+
+        async def worker() -> None:
+            while True:
+                sitemap_url = await queue.get()
+                try:
+                    count = 0
+                    async for kind, loc in iter_sitemap(http, sitemap_url):
+                        if kind == 'sitemap':
+                            enqueue(loc)
+                        else:
+                            self.add(loc)
+                        count += 1
+                    if count:
+                        self.stats.sitemaps += 1
+                        print(f'[INFO] Sitemap {sitemap_url}: {count} entries')
+                except (httpx.HTTPError, ET.ParseError, zlib.error) as e:
+                    print(f'[WARN] Sitemap {sitemap_url} skipped: {type(e).__name__}: {e}')
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def drain(
+        self,
+        fetch: Callable[[str], Awaitable[Optional[T]]],
+        limit: int,
+        workers: int = 4
+    ) -> List[Tuple[FrontierEntry, Optional[T]]]:
+        """
+        Fetch up to `limit` entries best-first with `workers` fetchers
+
+        Successful fetches (result not None) are marked as fetched.
+
+        Returns:
+            (entry, result) pairs in priority order
+        """
+        results: List[Tuple[FrontierEntry, Optional[T]]] = []
+        remaining = limit
+
+        async def fetcher() -> None:
+            nonlocal remaining
+            while remaining > 0 and self._heap:
+                remaining -= 1
+                entry = self.pop()
+                result = await fetch(entry.url)
+                if result is not None:
+                    self.mark_fetched(entry.url)
+                results.append((entry, result))
+
+        async with asyncio.TaskGroup() as tasks:
+            for _ in range(max(1, workers)):
+                tasks.create_task(fetcher())
+
+        results.sort(key=lambda item: item[0])
+        return results
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Polite Crawl Scheduler
+Global concurrency limit plus per-domain semaphores and minimum delay
+
+Lets the async scrapers fetch many URLs in parallel while each domain
+(e.g. a ministry site) still sees at most SCRAPER_DOMAIN_CONCURRENCY
+requests at a time, started at least SCRAPER_DELAY seconds apart.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass
+class _DomainState:
+    """Per-domain slot + start time of the next allowed request"""
+    semaphore: asyncio.Semaphore
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    next_start: float = 0.0
+    requests: int = 0
+
+
+class DomainScheduler:
+    """Schedules fetches under a global and a per-domain concurrency limit"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_domain_concurrency: int = 2,
+        min_delay: float = 2.0
+    ):
+        """
+        Args:
+            max_concurrency: Max. parallel fetches overall
+            per_domain_concurrency: Max. parallel fetches per domain
+            min_delay: Min. seconds between two request starts on one domain
+        """
+        self.max_concurrency = max_concurrency
+        self.per_domain_concurrency = per_domain_concurrency
+        self.min_delay = min_delay
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._domains: Dict[str, _DomainState] = {}
+
+    @classmethod
+    def from_env(cls) -> 'DomainScheduler':
+        """Scheduler configured via SCRAPER_* environment variables"""
+        return cls(
+            max_concurrency=int(os.getenv('SCRAPER_CONCURRENT_REQUESTS', 8)),
+            per_domain_concurrency=int(os.getenv('SCRAPER_DOMAIN_CONCURRENCY', 2)),
+            min_delay=float(os.getenv('SCRAPER_DELAY', 2.0))
+        )
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """Domain key of a URL (host without port, lowercase)"""
+        return (urlparse(url).hostname or url).lower()
+
+    def _state(self, domain: str) -> _DomainState:
+        if domain not in self._domains:
+            self._domains[domain] = _DomainState(asyncio.Semaphore(self.per_domain_concurrency))
+        return self._domains[domain]
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Wait for a free slot for url and hold it while fetching
+
+        The domain slot (and politeness delay) is taken before the global
+        one, so a throttled domain does not block fetches to other domains.
+        """
+        state = self._state(self.domain_of(url))
+        loop = asyncio.get_running_loop()
+
+        async with state.semaphore:
+            async with state.lock:
+                now = loop.time()
+                start_at = max(now, state.next_start)
+                state.next_start = start_at + self.min_delay
+                state.requests += 1
+
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+            async with self._global:
+                yield
+
+    def stats(self) -> Dict[str, int]:
+        """Requests started per domain"""
+        return {domain: state.requests for domain, state in self._domains.items()}
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Browser Crawler Pool
+Small pool of long-lived AsyncWebCrawler instances shared across URLs
+
+Launching headless Chromium costs more than loading a page, so crawlers
+are started once and reused. Each crawler serves at most
+SCRAPER_PAGES_PER_BROWSER pages (bounds memory growth), then it is retired
+and closed once its in-flight pages finish; a crawler that raised or
+reported a browser crash is retired immediately. Retired crawlers are
+replaced lazily on the next request.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Error fragments that mean the browser/context itself is gone
+BROWSER_FAILURE_MARKERS = (
+    'target closed',
+    'browser has been closed',
+    'browser closed',
+    'context has been closed',
+    'connection closed',
+    'page crashed',
+)
+
+
+def is_browser_failure(message: Optional[str]) -> bool:
+    """True if an error message points to a dead browser (restart needed)"""
+    if not message:
+        return False
+    message = message.lower()
+    return any(marker in message for marker in BROWSER_FAILURE_MARKERS)
+
+
+@dataclass
+class _PooledCrawler:
+    crawler: Any
+    pages: int = 0
+    active: int = 0
+    retired: bool = False
+
+
+class CrawlerPool:
+    """Reuses a few crawlers; recycles them after max_pages or on failure"""
+
+    def __init__(
+        self,
+        start: Callable[[], Awaitable[Any]],
+        stop: Callable[[Any], Awaitable[None]],
+        size: int = 2,
+        max_pages: int = 50
+    ):
+        """
+        Args:
+            start: Coroutine factory returning a started crawler
+            stop: Coroutine closing a crawler
+            size: Number of crawlers (browsers) kept alive
+            max_pages: Pages per crawler before it is recycled
+        """
+        self._start = start
+        self._stop = stop
+        self.size = size
+        self.max_pages = max_pages
+        self._live: List[_PooledCrawler] = []
+        self._retiring: List[_PooledCrawler] = []
+        self._lock = asyncio.Lock()
+        self.started = 0
+        self.restarted = 0
+
+    @classmethod
+    def from_env(cls, start, stop) -> 'CrawlerPool':
+        """Pool configured via SCRAPER_* environment variables"""
+        return cls(
+            start,
+            stop,
+            size=int(os.getenv('SCRAPER_BROWSER_POOL_SIZE', 2)),
+            max_pages=int(os.getenv('SCRAPER_PAGES_PER_BROWSER', 50))
+        )
+
+    async def _acquire(self) -> _PooledCrawler:
+        async with self._lock:
+            if len(self._live) < self.size:
+                pooled = _PooledCrawler(await self._start())
+                self._live.append(pooled)
+                self.started += 1
+            else:
+                pooled = min(self._live, key=lambda item: item.active)
+
+            pooled.active += 1
+            pooled.pages += 1
+            if pooled.pages >= self.max_pages:
+                self._retire(pooled)
+            return pooled
+
+    def _retire(self, pooled: _PooledCrawler) -> None:
+        if pooled.retired:
+            return
+        pooled.retired = True
+        self._live.remove(pooled)
+        self._retiring.append(pooled)
+
+    async def _release(self, pooled: _PooledCrawler) -> None:
+        pooled.active -= 1
+        if pooled.retired and pooled.active == 0 and pooled in self._retiring:
+            self._retiring.remove(pooled)
+            await self._close(pooled)
+
+    async def _close(self, pooled: _PooledCrawler) -> None:
+        try:
+            await self._stop(pooled.crawler)
+        except Exception as e:
+            print(f'[WARN] Closing crawler failed: {e}')
+
+    @asynccontextmanager
+    async def crawler(self) -> AsyncIterator[Any]:
+        """
+        Borrow a crawler for one page
+
+        An exception inside the block retires the crawler (restarted on
+        the next request).
+        """
+        pooled = await self._acquire()
+        try:
+            yield pooled.crawler
+        except Exception:
+            self.mark_unhealthy(pooled.crawler)
+            raise
+        finally:
+            await self._release(pooled)
+
+    def mark_unhealthy(self, crawler: Any) -> None:
+        """Retire a crawler whose browser crashed (health check failed)"""
+        for pooled in self._live:
+            if pooled.crawler is crawler:
+                print('[WARN] Browser unhealthy - restarting crawler')
+                self._retire(pooled)
+                self.restarted += 1
+                return
+
+    async def close(self) -> None:
+        """Close all crawlers"""
+        async with self._lock:
+            pooled_all = self._live + self._retiring
+            self._live, self._retiring = [], []
+        for pooled in pooled_all:
+            await self._close(pooled)
+
+    async def __aenter__(self) -> 'CrawlerPool':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+LLM Extraction Queue
+Concurrent DeepSeek extraction with retries, checkpointing and throughput stats
+
+A run extracting hundreds of pages spends most of its time waiting on
+DeepSeek. The queue keeps DEEPSEEK_CONCURRENCY requests in flight over one
+keep-alive connection pool, retries transient failures (429, 5xx, network,
+timeouts) with backoff, and appends every finished item to a JSONL
+checkpoint. A crashed run restarted with the same checkpoint only extracts
+what is missing; the checkpoint is removed once a run finishes cleanly.
+Pages already in the LLM cache (same prompt and text) are not sent at all,
+and identical texts within a run are sent once.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from scraper_firecrawl.firecrawl_client import RETRY_STATUS, retry_after_seconds
+from scraper_firecrawl.llm_extractor import (
+    DEEPSEEK_API_URL,
+    DEEPSEEK_MODEL,
+    EXTRACTION_PROMPT_VERSION,
+    build_extraction_request,
+    deepseek_headers,
+    extraction_cache_key,
+    has_deepseek_api_key,
+    parse_extraction_response,
+    record_deepseek_call
+)
+from utils.llm_cache import LLMCache, get_llm_cache
+from utils.token_counter import get_tokenizer
+
+load_dotenv()
+
+# Directory for resumable checkpoints (one JSONL file per run name)
+EXTRACTION_CHECKPOINT_DIR = os.getenv('EXTRACTION_CHECKPOINT_DIR', 'extraction_checkpoints')
+
+
+@dataclass
+class ExtractionJob:
+    """One page to extract; key identifies it across restarts (e.g. URL)"""
+    key: str
+    text: str
+    source_name: str
+
+
+@dataclass
+class ExtractionStats:
+    """Throughput of one queue run"""
+    completed: int = 0
+    failed: int = 0
+    resumed: int = 0
+    cached: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def items_per_minute(self) -> float:
+        return self.completed / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def tokens_per_minute(self) -> float:
+        tokens = self.prompt_tokens + self.completion_tokens
+        return tokens / self.elapsed * 60 if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f'{self.completed} extracted in {self.elapsed / 60:.1f} min '
+            f'({self.items_per_minute:.1f} items/min, {self.tokens_per_minute:,.0f} tokens/min), '
+            f'{self.cached} cached, {self.resumed} resumed, {self.retries} retries, {self.failed} failed'
+        )
+
+
+def checkpoint_path(run_name: str) -> str:
+    """Checkpoint file for a run name (e.g. 'program_finder_telekom-stiftung.de')"""
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', run_name).strip('_')
+    return os.path.join(EXTRACTION_CHECKPOINT_DIR, f'{slug}.jsonl')
+
+
+class ExtractionQueue:
+    """Bounded-concurrency DeepSeek extraction over a list of jobs"""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        backoff: float = 2.0,
+        timeout: float = 90,
+        checkpoint: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[LLMCache] = None
+    ):
+        """
+        Args:
+            concurrency: Max. DeepSeek requests in flight
+            max_retries: Retries per item on transient failures
+            backoff: Base of the exponential backoff (seconds)
+            timeout: HTTP timeout per request
+            checkpoint: JSONL file for finished items (None = no resume)
+            transport: Custom httpx transport (tests)
+            cache: LLM result cache (default: process-wide cache)
+        """
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.checkpoint = checkpoint
+        self.transport = transport
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.stats = ExtractionStats()
+
+    @classmethod
+    def from_env(cls, checkpoint: Optional[str] = None) -> 'ExtractionQueue':
+        """Queue configured via DEEPSEEK_* environment variables"""
+        return cls(
+            concurrency=int(os.getenv('DEEPSEEK_CONCURRENCY', 4)),
+            max_retries=int(os.getenv('DEEPSEEK_MAX_RETRIES', 3)),
+            checkpoint=checkpoint
+        )
+
+    def _load_checkpoint(self) -> Dict[str, Optional[Dict]]:
+        """Finished items of an interrupted run (failed ones are retried)"""
+        done = {}
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return done
+        with open(self.checkpoint, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                if entry.get('error') is None:
+                    done[entry['key']] = entry.get('data')
+        return done
+
+    def _persist(self, key: str, data: Optional[Dict], error: Optional[str]) -> None:
+        if not self.checkpoint:
+            return
+        with open(self.checkpoint, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'key': key, 'data': data, 'error': error}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after
+        return min(60.0, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _extract(self, http: httpx.AsyncClient, payload: Dict) -> Optional[Dict]:
+        """
+        Send one extraction request; retries transient failures
+
+        Raises:
+            RuntimeError: Retries exhausted or non-retryable error
+        """
+        error = 'not attempted'
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats.retries += 1
+            start_time = time.monotonic()
+            response = None
+            try:
+                response = await http.post(DEEPSEEK_API_URL, json=payload)
+            except httpx.TransportError as e:
+                record_deepseek_call('error', time.monotonic() - start_time)
+                error = f'{type(e).__name__}: {e}'
+            else:
+                if response.status_code == 200:
+                    # Non-JSON body (JSONDecodeError is a ValueError): item fails
+                    try:
+                        result = response.json()
+                        record_deepseek_call('success', time.monotonic() - start_time, result)
+                        usage = result.get('usage') or {}
+                        self.stats.prompt_tokens += usage.get('prompt_tokens', 0)
+                        self.stats.completion_tokens += usage.get('completion_tokens', 0)
+                        return parse_extraction_response(result)
+                    except (ValueError, KeyError, IndexError) as e:
+                        raise RuntimeError(f'Invalid LLM response: {e}') from e
+
+                record_deepseek_call('error', time.monotonic() - start_time)
+                error = f'DeepSeek API returned {response.status_code}: {response.text[:200]}'
+                if response.status_code not in RETRY_STATUS:
+                    raise RuntimeError(error)
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._delay(attempt, response))
+
+        raise RuntimeError(error)
+
+    async def run(self, jobs: Iterable[ExtractionJob]) -> Dict[str, Optional[Dict]]:
+        """
+        Extract all jobs concurrently
+
+        Args:
+            jobs: Pages to extract (unique keys)
+
+        Returns:
+            {key: extracted data or None on failure}
+        """
+        # Same key twice (e.g. a URL listed twice) is extracted once
+        jobs = list({job.key: job for job in jobs}.values())
+        results: Dict[str, Optional[Dict]] = {job.key: None for job in jobs}
+        if not jobs:
+            return results
+
+        done = self._load_checkpoint()
+        for job in jobs:
+            if job.key in done:
+                results[job.key] = done[job.key]
+        self.stats.resumed = sum(job.key in done for job in jobs)
+
+        # First tokenizer load (truncation) off the event loop
+        await asyncio.to_thread(get_tokenizer)
+
+        # Cache hits are free; identical texts (same cache key) share one request
+        groups: Dict[str, List[ExtractionJob]] = {}
+        payloads: Dict[str, Dict] = {}
+        for job in jobs:
+            if job.key in done:
+                continue
+            payload = build_extraction_request(job.text)
+            cache_key = extraction_cache_key(payload)
+            cached = self.cache.get(cache_key) if cache_key not in groups else None
+            if cached is not None:
+                results[job.key] = cached
+                self.stats.cached += 1
+                continue
+            groups.setdefault(cache_key, []).append(job)
+            payloads[cache_key] = payload
+
+        if groups and not has_deepseek_api_key():
+            print('[ERROR] DEEPSEEK_API_KEY not set in .env')
+            return results
+        if self.checkpoint:
+            os.makedirs(os.path.dirname(self.checkpoint) or '.', exist_ok=True)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for cache_key in groups:
+            queue.put_nowait(cache_key)
+
+        async def worker(http: httpx.AsyncClient) -> None:
+            while not queue.empty():
+                cache_key = queue.get_nowait()
+                group = groups[cache_key]
+                try:
+                    data = await self._extract(http, payloads[cache_key])
+                except RuntimeError as e:
+                    for job in group:
+                        print(f'[ERROR] Extraction failed for {job.source_name}: {e}')
+                        self.stats.failed += 1
+                        self.stats.errors[job.key] = str(e)
+                        self._persist(job.key, None, str(e))
+                    continue
+                self.cache.put(cache_key, data, EXTRACTION_PROMPT_VERSION, DEEPSEEK_MODEL)
+                for job in group:
+                    print(f'[SUCCESS] Extracted {len(data)} fields for {job.source_name}')
+                    self.stats.completed += 1
+                    results[job.key] = copy.deepcopy(data)
+                    self._persist(job.key, data, None)
+
+        start_time = time.monotonic()
+        if groups:
+            async with httpx.AsyncClient(
+                headers=deepseek_headers(),
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency),
+                transport=self.transport
+            ) as http:
+                async with asyncio.TaskGroup() as tasks:
+                    for _ in range(min(self.concurrency, len(groups))):
+                        tasks.create_task(worker(http))
+        self.stats.elapsed = time.monotonic() - start_time
+
+        # Clean finish: next run starts fresh (page content may have changed)
+        if self.checkpoint and not self.stats.failed and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+        print(f'[STATS] LLM extraction: {self.stats.summary()}')
+        return results
+
+
+def extract_many(
+    jobs: List[ExtractionJob],
+    checkpoint: Optional[str] = None
+) -> Dict[str, Optional[Dict]]:
+    """
+    Blocking wrapper: extract jobs concurrently (DEEPSEEK_CONCURRENCY)
+
+    Args:
+        jobs: Pages to extract
+        checkpoint: JSONL checkpoint for resume (see checkpoint_path)
+
+    Returns:
+        {key: extracted data or None on failure}
+    """
+    return asyncio.run(ExtractionQueue.from_env(checkpoint).run(jobs))
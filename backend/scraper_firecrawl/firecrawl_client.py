@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Shared Async Firecrawl Client
+One keep-alive HTTP connection pool, token-bucket rate limit and 429 backoff
+
+All Firecrawl calls of a process go through one client so the plan's
+quota (FIRECRAWL_RATE_LIMIT requests per minute) is shared instead of each
+module sleeping on its own. The synchronous scrapers use the client via
+run_sync(): it lives on a background event loop, so connections and the
+rate budget persist across calls. Async code awaits run_async(...).
+"""
+
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+import httpx
+from dotenv import load_dotenv
+
+from scraper_firecrawl.crawl_scheduler import DomainScheduler
+
+load_dotenv()
+
+T = TypeVar('T')
+
+# Responses worth retrying (rate limit, overloaded/restarting server)
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class FirecrawlError(Exception):
+    """Firecrawl request failed (after retries)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` (server sent 429)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._blocked_until
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta or HTTP date)"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class FirecrawlClient:
+    """Async Firecrawl API client with connection reuse, rate limit and retries"""
+
+    def __init__(
+        self,
+        base_url: str = 'http://130.61.137.77:3002',
+        api_key: str = 'self-hosted',
+        requests_per_minute: float = 60,
+        burst: int = 10,
+        max_connections: int = 10,
+        max_retries: int = 4,
+        backoff: float = 2.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            base_url: Firecrawl API URL
+            api_key: API key ('self-hosted' = no Authorization header)
+            requests_per_minute: Sustained request budget (plan quota)
+            burst: Requests allowed back-to-back before throttling
+            max_connections: Size of the keep-alive connection pool
+            max_retries: Retries on 429/5xx and network errors
+            backoff: Base of the exponential backoff (seconds)
+            transport: Custom httpx transport (tests)
+        """
+        headers = {'Content-Type': 'application/json'}
+        if api_key != 'self-hosted':
+            headers['Authorization'] = f'Bearer {api_key}'
+
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+        self.requests = 0
+        self.retries = 0
+
+    @classmethod
+    def from_env(cls) -> 'FirecrawlClient':
+        """Client configured via FIRECRAWL_* environment variables"""
+        return cls(
+            base_url=os.getenv('FIRECRAWL_API_URL', 'http://130.61.137.77:3002'),
+            api_key=os.getenv('FIRECRAWL_API_KEY', 'self-hosted'),
+            requests_per_minute=float(os.getenv('FIRECRAWL_RATE_LIMIT', 60)),
+            burst=int(os.getenv('FIRECRAWL_BURST', 10)),
+            max_connections=int(os.getenv('FIRECRAWL_MAX_CONNECTIONS', 10)),
+            max_retries=int(os.getenv('FIRECRAWL_MAX_RETRIES', 4))
+        )
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after
+        return min(60.0, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        timeout: float = 60
+    ) -> Dict[str, Any]:
+        """
+        Send one API request within the rate budget
+
+        429 pauses the whole client for Retry-After (or the backoff), so
+        concurrent callers stop too instead of hammering the quota.
+
+        Raises:
+            FirecrawlError: Non-retryable status or retries exhausted
+        """
+        # No pool timeout: waiting for a free connection is expected under load
+        request_timeout = httpx.Timeout(timeout, pool=None)
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.requests += 1
+            try:
+                response = await self._http.request(method, path, json=payload, timeout=request_timeout)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise FirecrawlError(f'{method} {path} failed: {e}') from e
+                self.retries += 1
+                await asyncio.sleep(self._delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                delay = self._delay(attempt, response)
+                if response.status_code == 429:
+                    self.bucket.pause(delay)
+                    print(f'[WARN] Firecrawl rate limit hit - pausing {delay:.1f}s')
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code >= 400:
+                raise FirecrawlError(
+                    f'{method} {path} returned {response.status_code}: {response.text[:200]}',
+                    response.status_code
+                )
+            return response.json()
+
+        raise FirecrawlError(f'{method} {path} failed after {self.max_retries} retries')
+
+    async def post(self, path: str, payload: Dict[str, Any], timeout: float = 60) -> Dict[str, Any]:
+        return await self.request('POST', path, payload, timeout)
+
+    async def get(self, path: str, timeout: float = 30) -> Dict[str, Any]:
+        return await self.request('GET', path, timeout=timeout)
+
+    async def scrape_markdown(self, url: str, timeout: float = 60, **options) -> Optional[str]:
+        """
+        Scrape one page as markdown
+
+        Args:
+            url: Page (or PDF) URL
+            timeout: HTTP timeout in seconds
+            **options: Extra /v1/scrape options (e.g. onlyMainContent)
+
+        Returns:
+            Markdown or None on error
+        """
+        try:
+            data = await self.post('/v1/scrape', {'url': url, 'formats': ['markdown'], **options}, timeout)
+        except FirecrawlError as e:
+            print(f'[ERROR] Firecrawl scrape failed for {url}: {e}')
+            return None
+        return (data.get('data') or {}).get('markdown')
+
+    async def scrape_many(
+        self,
+        urls: List[str],
+        min_delay: float = 0.0,
+        timeout: float = 60,
+        **options
+    ) -> List[Optional[str]]:
+        """
+        Scrape pages concurrently (rate budget + per-domain politeness)
+
+        Args:
+            urls: Page URLs
+            min_delay: Min. seconds between request starts per domain
+            timeout: HTTP timeout per request
+            **options: Extra /v1/scrape options
+
+        Returns:
+            Markdown (or None) per URL, in input order
+        """
+        scheduler = DomainScheduler(
+            max_concurrency=self.max_connections,
+            per_domain_concurrency=int(os.getenv('SCRAPER_DOMAIN_CONCURRENCY', 2)),
+            min_delay=min_delay
+        )
+
+        async def scrape(url: str) -> Optional[str]:
+            async with scheduler.slot(url):
+                return await self.scrape_markdown(url, timeout, **options)
+
+        return list(await asyncio.gather(*(scrape(url) for url in urls)))
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> 'FirecrawlClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# Process-wide client on a background event loop (shared by sync callers)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[FirecrawlClient] = None
+_init_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _init_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='firecrawl-client', daemon=True).start()
+    return _loop
+
+
+def get_client() -> FirecrawlClient:
+    """Shared client (created on first use); use only via run_sync / *_async"""
+    global _client
+    with _init_lock:
+        if _client is None:
+            _client = FirecrawlClient.from_env()
+    return _client
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine using the shared client and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+async def run_async(coro: Awaitable[T]) -> T:
+    """Await a coroutine on the shared client's loop from any event loop"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _background_loop()))
+
+
+def scrape_markdown(url: str, timeout: float = 60, **options) -> Optional[str]:
+    """Blocking single-page scrape via the shared client"""
+    return run_sync(get_client().scrape_markdown(url, timeout, **options))
+
+
+def scrape_many(urls: List[str], min_delay: float = 0.0, timeout: float = 60, **options) -> List[Optional[str]]:
+    """Blocking concurrent scrape of several pages via the shared client"""
+    return run_sync(get_client().scrape_many(urls, min_delay, timeout, **options))
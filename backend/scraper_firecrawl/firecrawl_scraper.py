@@ -10,24 +10,31 @@ Features:
 - Automatic retry and error handling
 """
 
+import argparse
 import os
 import sys
 import time
-import uuid
-import requests
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
+from scraper_firecrawl.firecrawl_client import FirecrawlError, get_client, run_sync
 from scraper_firecrawl.funding_sources import ALL_SOURCES, FundingSource
 from scraper_firecrawl.llm_extractor import extract_with_deepseek, validate_extracted_data
-from utils.db_adapter import get_db_cursor
+from utils.facets import refresh_facets
+from utils.fetch_state import FetchStateStore
+from utils.funding_upsert import UpsertResult, upsert_funding_opportunities
+from utils.llm_cache import get_llm_cache
+from utils.scrape_ledger import ScrapeLedger
 
 load_dotenv()
 
+# Scraper name in the job ledger (shared with scrape_all_sources)
+LEDGER_NAME = 'firecrawl'
+
 
 class FirecrawlScraper:
     """Firecrawl-based scraper for funding opportunities"""
@@ -40,19 +47,15 @@ class FirecrawlScraper:
         )
         self.firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY', 'self-hosted')
 
-        # Request headers
-        self.headers = {
-            'Content-Type': 'application/json'
-        }
-        if self.firecrawl_api_key != 'self-hosted':
-            self.headers['Authorization'] = f'Bearer {self.firecrawl_api_key}'
+        # Shared keep-alive client (rate limit + 429 backoff, see firecrawl_client)
+        self.client = get_client()
 
         print(f'[INFO] Firecrawl URL: {self.firecrawl_url}')
         print(f'[INFO] API Key: {"self-hosted" if self.firecrawl_api_key == "self-hosted" else "***"}')
+        print(f'[INFO] Max retries: {self.client.max_retries}')
 
-        # Retry configuration
-        self.max_retries = 3
-        self.retry_delay = 5  # seconds
+        # ETag / Last-Modified / content hash per URL (skip unchanged pages)
+        self.fetch_state = FetchStateStore()
 
     def scrape_url(
         self,
@@ -73,62 +76,46 @@ class FirecrawlScraper:
         """
         print(f'[INFO] Scraping URL: {url}')
 
-        for attempt in range(self.max_retries):
+        # Retries (429 / 5xx / network) and rate limiting happen in the client
+        if extract_schema:
+            # Try /extract endpoint for structured data
+            # Note: This might not be available in self-hosted versions
             try:
-                if extract_schema:
-                    # Try /extract endpoint for structured data
-                    # Note: This might not be available in self-hosted versions
-                    try:
-                        response = requests.post(
-                            f'{self.firecrawl_url}/v1/extract',
-                            headers=self.headers,
-                            json={
-                                'url': url,
-                                'schema': extract_schema,
-                                'onlyMainContent': only_main_content
-                            },
-                            timeout=60
-                        )
-                        response.raise_for_status()
-                        data = response.json()
-                        print(f'[SUCCESS] Extracted structured data from {url}')
-                        return data
-                    except (requests.exceptions.RequestException, KeyError):
-                        # Fall back to markdown-only scraping
-                        print(f'[INFO] Extract endpoint failed, falling back to markdown scraping for {url}')
-                        extract_schema = None
-                        # Continue to markdown scraping below
-
-                # Use /scrape endpoint for markdown
-                response = requests.post(
-                    f'{self.firecrawl_url}/v1/scrape',
-                    headers=self.headers,
-                    json={
+                data = run_sync(self.client.post(
+                    '/v1/extract',
+                    {
                         'url': url,
-                        'formats': ['markdown'],
-                        'onlyMainContent': only_main_content,
-                        'removeTags': ['*cookie*', '*gdpr*', '*cmplz*', '*banner*', '*consent*', '*popup*'],
-                        'waitFor': 2000,
-                        'timeout': 30000
+                        'schema': extract_schema,
+                        'onlyMainContent': only_main_content
                     },
-                    timeout=90
-                )
-
-                response.raise_for_status()
-                data = response.json()
-
-                print(f'[SUCCESS] Scraped {url}')
+                    timeout=60
+                ))
+                print(f'[SUCCESS] Extracted structured data from {url}')
                 return data
+            except FirecrawlError:
+                # Fall back to markdown-only scraping
+                print(f'[INFO] Extract endpoint failed, falling back to markdown scraping for {url}')
 
-            except requests.exceptions.RequestException as e:
-                print(f'[ERROR] Attempt {attempt + 1}/{self.max_retries} failed for {url}: {e}')
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    print(f'[FAILED] Max retries reached for {url}')
-                    return {}
-
-        return {}
+        # Use /scrape endpoint for markdown
+        try:
+            data = run_sync(self.client.post(
+                '/v1/scrape',
+                {
+                    'url': url,
+                    'formats': ['markdown'],
+                    'onlyMainContent': only_main_content,
+                    'removeTags': ['*cookie*', '*gdpr*', '*cmplz*', '*banner*', '*consent*', '*popup*'],
+                    'waitFor': 2000,
+                    'timeout': 30000
+                },
+                timeout=90
+            ))
+        except FirecrawlError as e:
+            print(f'[FAILED] Scraping {url} failed: {e}')
+            return {}
+
+        print(f'[SUCCESS] Scraped {url}')
+        return data
 
     def crawl_url(
         self,
@@ -166,14 +153,7 @@ class FirecrawlScraper:
 
         try:
             # Start crawl job
-            response = requests.post(
-                f'{self.firecrawl_url}/v1/crawl',
-                headers=self.headers,
-                json=payload,
-                timeout=120
-            )
-            response.raise_for_status()
-            crawl_data = response.json()
+            crawl_data = run_sync(self.client.post('/v1/crawl', payload, timeout=120))
 
             job_id = crawl_data.get('id')
             if not job_id:
@@ -187,13 +167,7 @@ class FirecrawlScraper:
             start_time = time.time()
 
             while time.time() - start_time < max_wait:
-                status_response = requests.get(
-                    f'{self.firecrawl_url}/v1/crawl/{job_id}',
-                    headers=self.headers,
-                    timeout=30
-                )
-                status_response.raise_for_status()
-                status_data = status_response.json()
+                status_data = run_sync(self.client.get(f'/v1/crawl/{job_id}', timeout=30))
 
                 status = status_data.get('status')
                 print(f'[INFO] Crawl status: {status}')
@@ -213,10 +187,40 @@ class FirecrawlScraper:
             print(f'[TIMEOUT] Crawl did not complete within {max_wait}s')
             return []
 
-        except requests.exceptions.RequestException as e:
+        except FirecrawlError as e:
             print(f'[ERROR] Crawl failed for {url}: {e}')
             return []
 
+    def process_url(self, url: str, source: FundingSource) -> Optional[List[Dict[str, Any]]]:
+        """
+        Scrape (or crawl) one URL of a source and parse the pages
+
+        Args:
+            url: URL to scrape or crawl start URL
+            source: Source definition
+
+        Returns:
+            List of extracted funding opportunities, None if the fetch failed
+        """
+        if source.crawl:
+            # Crawl entire site
+            pages = self.crawl_url(url, max_pages=50, extract_schema=source.schema)
+            if not pages:
+                return None
+            return [result for result in (self._parse_page_data(page, source) for page in pages) if result]
+
+        # Conditional GET at the origin: 304 means no paid scrape needed
+        if self.fetch_state.probe(url):
+            print(f'[SKIP] Not modified: {url}')
+            return []
+
+        # Single page scrape
+        page_data = self.scrape_url(url, extract_schema=source.schema)
+        if not page_data:
+            return None
+        result = self._parse_page_data(page_data, source)
+        return [result] if result else []
+
     def process_source(self, source: FundingSource) -> List[Dict[str, Any]]:
         """
         Process a funding source (scrape or crawl)
@@ -230,25 +234,63 @@ class FirecrawlScraper:
         print(f'\n[START] Processing source: {source.name}')
 
         all_results = []
-
         for url in source.urls:
-            if source.crawl:
-                # Crawl entire site
-                pages = self.crawl_url(url, max_pages=50, extract_schema=source.schema)
-                for page in pages:
-                    result = self._parse_page_data(page, source)
-                    if result:
-                        all_results.append(result)
-            else:
-                # Single page scrape
-                page_data = self.scrape_url(url, extract_schema=source.schema)
-                result = self._parse_page_data(page_data, source)
-                if result:
-                    all_results.append(result)
+            all_results.extend(self.process_url(url, source) or [])
 
         print(f'[INFO] Extracted {len(all_results)} opportunities from {source.name}')
         return all_results
 
+    def run_source(self, source: FundingSource, ledger: ScrapeLedger) -> Tuple[int, int]:
+        """
+        Process the open jobs of a source, saving each URL's results right away
+
+        A URL counts as done only after its opportunities are written, so an
+        aborted run loses at most the page in flight (see utils.scrape_ledger).
+
+        Args:
+            source: FundingSource definition
+            ledger: Job ledger of the run
+
+        Returns:
+            (opportunities extracted, new opportunities saved)
+        """
+        print(f'\n[START] Processing source: {source.name}')
+        start_time = time.monotonic()
+        ledger.register(source.name, source.urls)
+
+        scraped = saved = 0
+        for url in source.urls:
+            if not ledger.should_process(source.name, url):
+                print(f'[SKIP] Done in run {ledger.run_id}: {url}')
+                continue
+
+            ledger.start_job(source.name, url)
+            try:
+                results = self.process_url(url, source)
+                if results is None:
+                    self.fetch_state.forget(url)
+                    ledger.fail_job(source.name, url, 'fetch failed')
+                    continue
+                if results:
+                    result = self._write_opportunities(results)
+                    saved += result.inserted
+                    if result.errors:
+                        ledger.fail_job(source.name, url, f'{len(result.errors)} opportunities not saved')
+                        continue
+                else:
+                    self.fetch_state.flush()
+            except Exception as e:
+                print(f'[ERROR] Failed to process {url}: {e}')
+                self.fetch_state.forget(url)
+                ledger.fail_job(source.name, url, str(e))
+                continue
+            ledger.finish_job(source.name, url, len(results))
+            scraped += len(results)
+
+        ledger.source_finished(source.name, time.monotonic() - start_time)
+        print(f'[INFO] Extracted {scraped} opportunities from {source.name}')
+        return scraped, saved
+
     def _parse_page_data(
         self,
         page_data: Dict[str, Any],
@@ -279,6 +321,14 @@ class FirecrawlScraper:
         extracted = data.get('extract', {})
         metadata = data.get('metadata', {})
 
+        # Same content as last run: skip LLM extraction and DB write
+        # (fetch state is keyed by the requested URL, before redirects)
+        source_url = metadata.get('url', metadata.get('sourceURL', ''))
+        requested_url = metadata.get('sourceURL', source_url)
+        if self.fetch_state.is_unchanged(requested_url, markdown):
+            print(f'[SKIP] Unchanged content: {requested_url}')
+            return None
+
         # Use LLM to extract structured data from markdown
         print(f'[LLM] Extracting from {source.name}...')
         llm_extracted = extract_with_deepseek(markdown, source.name)
@@ -301,7 +351,7 @@ class FirecrawlScraper:
         # Build funding opportunity
         funding = {
             'title': extracted.get('title', 'Unbekannt'),
-            'source_url': metadata.get('url', metadata.get('sourceURL', '')),
+            'source_url': source_url,
             'cleaned_text': markdown,  # LLM-ready markdown!
             'provider': source.provider,
             'region': source.region,
@@ -313,11 +363,15 @@ class FirecrawlScraper:
             'metadata_json': {
                 'extracted_data': extracted,
                 'source_name': source.name,
+                'requested_url': requested_url,
                 'scraped_with': 'Firecrawl',
                 'scrape_timestamp': datetime.now().isoformat()
             }
         }
 
+        # Staged only now: a page whose extraction fails or times out is
+        # not recorded as processed (saved with the next flush)
+        self.fetch_state.remember(requested_url, markdown)
         return funding
 
     def _parse_amount(self, amount_str: Optional[str]) -> Optional[float]:
@@ -362,116 +416,88 @@ class FirecrawlScraper:
         """
         if not funding_opportunities:
             print('[INFO] No opportunities to save')
+            self.fetch_state.flush()
             return 0
 
-        print(f'[INFO] Saving {len(funding_opportunities)} opportunities to database...')
+        result = self._write_opportunities(funding_opportunities)
+
+        insert_count = result.inserted
+        print(f'[SUCCESS] Saved {insert_count} new, updated {result.updated} opportunities')
+
+        self.update_facets()
 
-        insert_count = 0
-        with get_db_cursor() as cursor:
-            for funding in funding_opportunities:
-                try:
-                    # Check if already exists (by source_url)
-                    cursor.execute(
-                        "SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES WHERE source_url = :url",
-                        {'url': funding['source_url']}
-                    )
-                    exists = cursor.fetchone()[0] > 0
-
-                    if exists:
-                        # Update existing
-                        cursor.execute("""
-                            UPDATE FUNDING_OPPORTUNITIES
-                            SET title = :title,
-                                cleaned_text = :cleaned_text,
-                                provider = :provider,
-                                region = :region,
-                                funding_area = :funding_area,
-                                deadline = :deadline,
-                                min_funding_amount = :min_amount,
-                                max_funding_amount = :max_amount,
-                                metadata_json = :metadata,
-                                updated_at = CURRENT_TIMESTAMP
-                            WHERE source_url = :url
-                        """, {
-                            'title': funding['title'],
-                            'cleaned_text': funding['cleaned_text'],
-                            'provider': funding['provider'],
-                            'region': funding['region'],
-                            'funding_area': funding['funding_area'],
-                            'deadline': funding.get('deadline'),
-                            'min_amount': funding.get('min_funding_amount'),
-                            'max_amount': funding.get('max_funding_amount'),
-                            'metadata': str(funding.get('metadata_json', {})),
-                            'url': funding['source_url']
-                        })
-                        print(f'[UPDATE] {funding["title"][:50]}...')
-                    else:
-                        # Insert new
-                        funding_id = str(uuid.uuid4()).replace('-', '').upper()
-                        cursor.execute("""
-                            INSERT INTO FUNDING_OPPORTUNITIES (
-                                funding_id, title, source_url, cleaned_text,
-                                provider, region, funding_area,
-                                deadline, min_funding_amount, max_funding_amount,
-                                metadata_json, last_scraped
-                            ) VALUES (
-                                :funding_id, :title, :url, :cleaned_text,
-                                :provider, :region, :funding_area,
-                                :deadline, :min_amount, :max_amount,
-                                :metadata, CURRENT_TIMESTAMP
-                            )
-                        """, {
-                            'funding_id': funding_id,
-                            'title': funding['title'],
-                            'url': funding['source_url'],
-                            'cleaned_text': funding['cleaned_text'],
-                            'provider': funding['provider'],
-                            'region': funding['region'],
-                            'funding_area': funding['funding_area'],
-                            'deadline': funding.get('deadline'),
-                            'min_amount': funding.get('min_funding_amount'),
-                            'max_amount': funding.get('max_funding_amount'),
-                            'metadata': str(funding.get('metadata_json', {}))
-                        })
-                        print(f'[INSERT] {funding["title"][:50]}...')
-                        insert_count += 1
-
-                except Exception as e:
-                    print(f'[ERROR] Failed to save {funding.get("title", "Unknown")}: {e}')
-                    import traceback
-                    traceback.print_exc()
-
-        print(f'[SUCCESS] Saved {insert_count} new opportunities')
         return insert_count
 
-    def run_all(self) -> None:
-        """Run scraper for all configured sources"""
+    def _write_opportunities(self, funding_opportunities: List[Dict[str, Any]]) -> UpsertResult:
+        """Bulk upsert; pages whose rows failed are processed again next run"""
+        print(f'[INFO] Saving {len(funding_opportunities)} opportunities to database...')
+
+        # One bulk upsert keyed by source_url (MERGE / ON CONFLICT)
+        result = upsert_funding_opportunities(funding_opportunities)
+
+        for index, message in result.errors:
+            title = funding_opportunities[index].get('title', 'Unknown')
+            print(f'[ERROR] Failed to save {title}: {message}')
+            # Not saved: process the page again next run
+            self.fetch_state.forget(funding_opportunities[index].get('metadata_json', {}).get('requested_url'))
+
+        # Pages are only marked as processed once their rows are written
+        self.fetch_state.flush()
+        return result
+
+    def update_facets(self) -> None:
+        """Recompute the filter facet snapshot served by /funding/filters/options"""
+        try:
+            refresh_facets()
+        except Exception as e:
+            print(f'[WARN] Facet refresh failed: {e}')
+
+    def run_all(self, resume: bool = False) -> None:
+        """
+        Run scraper for all configured sources
+
+        Args:
+            resume: Continue the last unfinished run instead of starting over
+        """
         print('[START] Firecrawl Scraper - Förder-Finder')
         print(f'[INFO] Processing {len(ALL_SOURCES)} sources')
 
         start_time = datetime.now()
-        all_opportunities = []
 
+        # All jobs up front, so a resumed run also knows the sources not started yet
+        ledger = ScrapeLedger.open(LEDGER_NAME, resume=resume)
         for source in ALL_SOURCES:
-            opportunities = self.process_source(source)
-            all_opportunities.extend(opportunities)
+            ledger.register(source.name, source.urls)
 
-        # Save to database
-        self.save_to_database(all_opportunities)
+        total_scraped = 0
+        for source in ALL_SOURCES:
+            scraped, _ = self.run_source(source, ledger)
+            total_scraped += scraped
+
+        self.update_facets()
 
         # Stats
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
 
         print(f'\n[COMPLETE] Scraping finished!')
-        print(f'[STATS] Total opportunities: {len(all_opportunities)}')
+        print(f'[STATS] Total opportunities: {total_scraped}')
         print(f'[STATS] Duration: {duration:.2f} seconds')
+        print(f'[STATS] Jobs ({ledger.run_id}): {ledger.summary()}')
+        if not ledger.is_complete():
+            print('[WARN] Failed jobs left - continue with --resume')
+        print(f'[STATS] Skipped pages: {self.fetch_state.stats()}')
+        print(f'[STATS] LLM extraction: {get_llm_cache().stats()}')
 
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description='Scrape all funding sources with Firecrawl')
+    parser.add_argument('--resume', action='store_true', help='Continue the last unfinished run')
+    args = parser.parse_args()
+
     scraper = FirecrawlScraper()
-    scraper.run_all()
+    scraper.run_all(resume=args.resume)
 
 
 if __name__ == '__main__':
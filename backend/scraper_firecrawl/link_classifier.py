@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Link Classifier
+Keyword-priority classification of markdown links in a single pass
+
+Scraped pages of ministries and foundations carry hundreds of navigation
+links. Instead of looping over every keyword list per link, all keyword
+sets (priorities and blacklist) are compiled into one pattern; each link
+is matched once, resolved, normalized (fragment stripped) and deduped
+while the page is scanned.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urljoin, urlparse
+
+# Markdown link: [text](url "optional title")
+MARKDOWN_LINK = re.compile(r'\[([^\]]+)\]\(([^\)]+)\)')
+
+# Linked files that are not scraped as pages
+FILE_EXTENSIONS = ('.pdf', '.jpg', '.png', '.zip', '.doc', '.docx')
+
+_SKIP_SCHEMES = ('#', 'mailto:', 'tel:', 'javascript:')
+
+
+class KeywordMatcher:
+    """
+    Finds all keywords of a set in a text with one regex scan
+
+    The alternation sits in a lookahead, so matches may overlap and every
+    keyword occurring anywhere is found (like an Aho-Corasick automaton).
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = {keyword.lower() for keyword in keywords}
+        # Longest first: at one position the longer keyword wins ...
+        alternatives = sorted(self.keywords, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, alternatives)) + '))') if alternatives else None
+        # ... and stands for all keywords that are its prefixes
+        self._prefixes = {
+            keyword: frozenset(other for other in self.keywords if keyword.startswith(other))
+            for keyword in self.keywords
+        }
+
+    def find(self, text: str) -> Set[str]:
+        """Distinct keywords contained in text (case-insensitive)"""
+        if self._pattern is None:
+            return set()
+        return set().union(*map(self._prefixes.__getitem__, self._pattern.findall(text.lower())))
+
+
+def normalize_url(url: str) -> str:
+    """Dedupe form of a URL (no fragment, lowercase scheme and host)"""
+    # String ops instead of urlparse: called for every link and sitemap entry
+    url = url.strip().split('#', 1)[0]
+    scheme, sep, rest = url.partition('://')
+    if not sep:
+        return url
+    host, slash, path = rest.partition('/')
+    return f'{scheme.lower()}://{host.lower()}{slash}{path}'
+
+
+class LinkClassifier:
+    """Scores markdown links by keyword priority; blacklisted links are dropped"""
+
+    def __init__(
+        self,
+        priorities: Dict[int, Iterable[str]],
+        blacklist: Iterable[str] = (),
+        skip_extensions: Iterable[str] = FILE_EXTENSIONS
+    ):
+        """
+        Args:
+            priorities: {priority: keywords}, e.g. {3: high, 2: medium, 1: low}
+            blacklist: Keywords that exclude a link
+            skip_extensions: Linked files to skip
+        """
+        self.priority_of: Dict[str, int] = {}
+        for priority, keywords in priorities.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                self.priority_of[keyword] = max(priority, self.priority_of.get(keyword, 0))
+        self.blacklist = {keyword.lower() for keyword in blacklist}
+        self.skip_extensions = tuple(extension.lower() for extension in skip_extensions)
+        self.matcher = KeywordMatcher(set(self.priority_of) | self.blacklist)
+
+    def priority(self, text: str, url: str = '') -> int:
+        """
+        Priority of a link by its text and (as written) URL
+
+        Returns:
+            Highest priority of the contained keywords, 0 if none or blacklisted
+        """
+        found = self.matcher.find(f'{text} {url}')
+        if found & self.blacklist:
+            return 0
+        return max((self.priority_of[keyword] for keyword in found if keyword in self.priority_of), default=0)
+
+    def extract_links(self, markdown_text: str, base_url: str) -> List[Dict[str, any]]:
+        """
+        Relevant same-site links of a page, deduped, highest priority first
+
+        Args:
+            markdown_text: Scraped markdown
+            base_url: Page URL (resolves relative links, defines the site)
+
+        Returns:
+            List of dicts with 'url', 'text', 'priority' (ties in page order)
+        """
+        base_domain = urlparse(base_url).netloc.lower()
+        origin = base_url.split('://', 1)[0] + '://' + base_domain
+        best: Dict[str, Dict[str, any]] = {}
+
+        for position, match in enumerate(MARKDOWN_LINK.finditer(markdown_text)):
+            text = match.group(1)
+            parts = match.group(2).split()
+            if not parts:
+                continue
+            url = parts[0].strip('<>')
+            if url.startswith(_SKIP_SCHEMES):
+                continue
+
+            # Keyword check first: most navigation links are irrelevant
+            priority = self.priority(text, url)
+            if not priority:
+                continue
+
+            # String ops for the common absolute and root-relative forms
+            if url.startswith(('http://', 'https://')):
+                absolute_url = url
+            elif url.startswith('/') and not url.startswith('//'):
+                absolute_url = origin + url
+            else:
+                absolute_url = urljoin(base_url, url)
+            absolute_url = normalize_url(absolute_url)
+            host, _, path = absolute_url.partition('://')[2].partition('/')
+            # Same site (incl. subdomains)
+            if base_domain not in host:
+                continue
+            if path.split('?', 1)[0].lower().endswith(self.skip_extensions):
+                continue
+
+            current: Optional[Dict[str, any]] = best.get(absolute_url)
+            if current is None or priority > current['priority']:
+                best[absolute_url] = {'url': absolute_url, 'text': text, 'priority': priority, '_position': position}
+
+        links = sorted(best.values(), key=lambda link: (-link['priority'], link['_position']))
+        for link in links:
+            del link['_position']
+        return links
@@ -9,17 +9,31 @@ Date: 2025-10-29
 """
 
 import os
+import sys
 import json
 import re
+import time
 import requests
 from typing import Dict, Optional, List
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+from utils.llm_cache import cache_key, get_llm_cache, prompt_version
+from utils.prometheus_metrics import deepseek_api_calls_total, deepseek_api_duration, deepseek_tokens_total
+from utils.token_counter import truncate_to_tokens
+
 load_dotenv()
 
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
 DEEPSEEK_API_URL = 'https://api.deepseek.com/v1/chat/completions'
+DEEPSEEK_MODEL = 'deepseek-chat'
+
+EXTRACTION_SYSTEM_PROMPT = 'Du bist ein präziser Datenextraktor für Förderprogramme.'
+
+# Input budget for the page text (fits the context window with room for the answer)
+EXTRACTION_MAX_INPUT_TOKENS = int(os.getenv('EXTRACTION_MAX_INPUT_TOKENS', 3500))
 
 EXTRACTION_PROMPT_TEMPLATE = """
 Du bist ein Experte für deutsche Förderprogramme im Bildungsbereich.
@@ -71,6 +85,9 @@ TEXT ZUR ANALYSE:
 Gib NUR valides JSON zurück, keine Markdown-Blöcke, keine Erklärungen.
 """.strip()
 
+# Changes whenever one of the prompts changes (invalidates cached results)
+EXTRACTION_PROMPT_VERSION = prompt_version(EXTRACTION_SYSTEM_PROMPT, EXTRACTION_PROMPT_TEMPLATE)
+
 
 def clean_json_response(text: str) -> str:
     """Remove markdown code blocks from LLM response"""
@@ -91,6 +108,94 @@ def clean_json_response(text: str) -> str:
     return text.strip()
 
 
+def has_deepseek_api_key() -> bool:
+    """True if a real DeepSeek API key is configured"""
+    return bool(DEEPSEEK_API_KEY) and DEEPSEEK_API_KEY != 'your_key_here_optional'
+
+
+def deepseek_headers() -> Dict[str, str]:
+    """HTTP headers for the DeepSeek API"""
+    return {
+        'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
+        'Content-Type': 'application/json'
+    }
+
+
+def build_extraction_request(
+    markdown_text: str,
+    max_tokens: int = 2000,
+    temperature: float = 0.1
+) -> Dict:
+    """
+    Build the DeepSeek chat completion payload for one page
+
+    Args:
+        markdown_text: Scraped markdown content
+        max_tokens: Max tokens for response
+        temperature: LLM temperature (lower = more deterministic)
+
+    Returns:
+        JSON payload for DEEPSEEK_API_URL
+    """
+    # Truncate text if too long (to fit in context window)
+    text_sample = truncate_to_tokens(markdown_text, EXTRACTION_MAX_INPUT_TOKENS)
+
+    prompt = EXTRACTION_PROMPT_TEMPLATE.format(text=text_sample)
+
+    return {
+        'model': DEEPSEEK_MODEL,
+        'messages': [
+            {
+                'role': 'system',
+                'content': EXTRACTION_SYSTEM_PROMPT
+            },
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ],
+        'temperature': temperature,
+        'max_tokens': max_tokens
+    }
+
+
+def extraction_cache_key(payload: Dict) -> str:
+    """LLM cache key of a request built by build_extraction_request"""
+    # The user message is the template rendered with the truncated page text
+    return cache_key(
+        EXTRACTION_PROMPT_VERSION,
+        payload['model'],
+        payload['temperature'],
+        payload['messages'][1]['content']
+    )
+
+
+def parse_extraction_response(result: Dict) -> Dict:
+    """
+    Parse the JSON object from a DeepSeek chat completion
+
+    Raises:
+        ValueError: Response is not valid JSON (json.JSONDecodeError)
+        KeyError, IndexError: Unexpected response structure
+    """
+    extracted_text = result['choices'][0]['message']['content']
+    try:
+        return json.loads(clean_json_response(extracted_text))
+    except json.JSONDecodeError:
+        print(f'[DEBUG] Raw response: {extracted_text[:300]}')
+        raise
+
+
+def record_deepseek_call(status: str, duration: float, result: Optional[Dict] = None) -> None:
+    """Export call count, latency and token usage to Prometheus"""
+    deepseek_api_calls_total.labels(endpoint='extract', status=status).inc()
+    deepseek_api_duration.observe(duration)
+
+    usage = (result or {}).get('usage') or {}
+    deepseek_tokens_total.labels(type='prompt').inc(usage.get('prompt_tokens', 0))
+    deepseek_tokens_total.labels(type='completion').inc(usage.get('completion_tokens', 0))
+
+
 def extract_with_deepseek(
     markdown_text: str,
     source_name: str,
@@ -100,6 +205,11 @@ def extract_with_deepseek(
     """
     Extract structured data using DeepSeek API
 
+    Results are cached by prompt version, model, temperature and the
+    truncated text (utils.llm_cache); a cache hit needs no API call.
+    For many pages use scraper_firecrawl.extraction_queue.extract_many
+    (concurrent, with retries and resume).
+
     Args:
         markdown_text: Scraped markdown content
         source_name: Name of funding source (for logging)
@@ -110,57 +220,46 @@ def extract_with_deepseek(
         Extracted data as dict or None on error
     """
 
-    if not DEEPSEEK_API_KEY or DEEPSEEK_API_KEY == 'your_key_here_optional':
+    payload = build_extraction_request(markdown_text, max_tokens, temperature)
+    key = extraction_cache_key(payload)
+    cache = get_llm_cache()
+
+    cached = cache.get(key)
+    if cached is not None:
+        print(f'[CACHE] Reusing extraction for {source_name}')
+        return cached
+
+    if not has_deepseek_api_key():
         print('[ERROR] DEEPSEEK_API_KEY not set in .env')
         return None
 
-    # Truncate text if too long (to fit in context window)
-    text_sample = markdown_text[:12000] if len(markdown_text) > 12000 else markdown_text
-
-    prompt = EXTRACTION_PROMPT_TEMPLATE.format(text=text_sample)
+    start_time = time.monotonic()
 
     try:
         response = requests.post(
             DEEPSEEK_API_URL,
-            headers={
-                'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'model': 'deepseek-chat',
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'Du bist ein präziser Datenextraktor für Förderprogramme.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': temperature,
-                'max_tokens': max_tokens
-            },
+            headers=deepseek_headers(),
+            json=payload,
             timeout=90
         )
 
         if response.status_code != 200:
+            record_deepseek_call('error', time.monotonic() - start_time)
             print(f'[ERROR] DeepSeek API returned {response.status_code}: {response.text[:200]}')
             return None
 
         result = response.json()
-        extracted_text = result['choices'][0]['message']['content']
+        record_deepseek_call('success', time.monotonic() - start_time, result)
 
         # Clean and parse JSON
-        cleaned = clean_json_response(extracted_text)
-        data = json.loads(cleaned)
+        data = parse_extraction_response(result)
+        cache.put(key, data, EXTRACTION_PROMPT_VERSION, DEEPSEEK_MODEL)
 
         print(f'[SUCCESS] Extracted {len(data)} fields for {source_name}')
         return data
 
     except json.JSONDecodeError as e:
         print(f'[ERROR] JSON parse error for {source_name}: {e}')
-        print(f'[DEBUG] Raw response: {extracted_text[:300] if "extracted_text" in locals() else "N/A"}')
         return None
 
     except Exception as e:
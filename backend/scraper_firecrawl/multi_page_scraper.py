@@ -10,15 +10,18 @@ Version: 1.0
 Date: 2025-10-29
 """
 
-import re
-import requests
-from urllib.parse import urljoin, urlparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
 from typing import List, Optional, Dict
 import logging
 
-logger = logging.getLogger(__name__)
+from scraper_firecrawl import firecrawl_client
+from scraper_firecrawl.link_classifier import LinkClassifier
 
-FIRECRAWL_URL = "http://130.61.137.77:3002"
+logger = logging.getLogger(__name__)
 
 # Keywords für relevante Links (prioritisiert)
 LINK_KEYWORDS = {
@@ -48,6 +51,14 @@ LINK_KEYWORDS = {
 }
 
 
+# Alle Keyword-Listen in einem kompilierten Muster
+LINK_CLASSIFIER = LinkClassifier({
+    3: LINK_KEYWORDS['high_priority'],
+    2: LINK_KEYWORDS['medium_priority'],
+    1: LINK_KEYWORDS['low_priority'],
+})
+
+
 def extract_links_from_markdown(markdown_text: str, base_url: str) -> List[Dict[str, str]]:
     """
     Extrahiert Links aus Markdown-Text
@@ -57,79 +68,14 @@ def extract_links_from_markdown(markdown_text: str, base_url: str) -> List[Dict[
         base_url: Base URL für relative Links
 
     Returns:
-        List of dicts with 'url', 'text', 'priority'
+        List of dicts with 'url', 'text', 'priority' (dedupliziert, hohe Priorität zuerst)
     """
-
-    links = []
-
-    # Regex für Markdown-Links: [text](url)
-    pattern = r'\[([^\]]+)\]\(([^\)]+)\)'
-    matches = re.findall(pattern, markdown_text)
-
-    for text, url in matches:
-        # Skip anchors, mailto, tel
-        if url.startswith('#') or url.startswith('mailto:') or url.startswith('tel:'):
-            continue
-
-        # Convert to absolute URL
-        absolute_url = urljoin(base_url, url)
-
-        # Skip external domains
-        base_domain = urlparse(base_url).netloc
-        link_domain = urlparse(absolute_url).netloc
-        if base_domain not in link_domain:
-            continue
-
-        # Skip PDFs, images, etc.
-        if absolute_url.lower().endswith(('.pdf', '.jpg', '.png', '.zip', '.doc', '.docx')):
-            continue
-
-        # Calculate priority
-        text_lower = text.lower()
-        url_lower = url.lower()
-        combined = text_lower + ' ' + url_lower
-
-        priority = 0
-        for keyword in LINK_KEYWORDS['high_priority']:
-            if keyword in combined:
-                priority = 3
-                break
-
-        if priority == 0:
-            for keyword in LINK_KEYWORDS['medium_priority']:
-                if keyword in combined:
-                    priority = 2
-                    break
-
-        if priority == 0:
-            for keyword in LINK_KEYWORDS['low_priority']:
-                if keyword in combined:
-                    priority = 1
-
-        if priority > 0:  # Only include relevant links
-            links.append({
-                'url': absolute_url,
-                'text': text,
-                'priority': priority
-            })
-
-    # Sort by priority (high first)
-    links.sort(key=lambda x: x['priority'], reverse=True)
-
-    # Deduplicate by URL
-    seen = set()
-    unique_links = []
-    for link in links:
-        if link['url'] not in seen:
-            seen.add(link['url'])
-            unique_links.append(link)
-
-    return unique_links
+    return LINK_CLASSIFIER.extract_links(markdown_text, base_url)
 
 
 def scrape_page_firecrawl(url: str) -> Optional[str]:
     """
-    Scraped eine einzelne Seite mit Firecrawl
+    Scraped eine einzelne Seite mit Firecrawl (geteilter Client)
 
     Args:
         url: URL to scrape
@@ -137,25 +83,7 @@ def scrape_page_firecrawl(url: str) -> Optional[str]:
     Returns:
         Markdown text or None on error
     """
-
-    try:
-        response = requests.post(
-            f"{FIRECRAWL_URL}/v1/scrape",
-            json={"url": url, "formats": ["markdown"]},
-            timeout=60
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'markdown' in data['data']:
-                return data['data']['markdown']
-
-        logger.warning(f"Firecrawl Error {response.status_code} for {url}")
-        return None
-
-    except Exception as e:
-        logger.error(f"Exception scraping {url}: {e}")
-        return None
+    return firecrawl_client.scrape_markdown(url, timeout=60)
 
 
 def scrape_multi_page(
@@ -169,7 +97,8 @@ def scrape_multi_page(
     Args:
         base_url: Homepage URL
         max_pages: Maximale Anzahl zu scrapender Seiten (inkl. Homepage)
-        delay: Delay zwischen Requests in Sekunden
+        delay: Mindestabstand zwischen Request-Starts auf derselben Domain
+            (Unterseiten werden parallel im Rate-Budget geladen)
 
     Returns:
         Dict with:
@@ -178,8 +107,6 @@ def scrape_multi_page(
             - urls: List der gescrapten URLs
     """
 
-    import time
-
     scraped_pages = []
     urls_scraped = []
 
@@ -216,14 +143,17 @@ def scrape_multi_page(
     for i, link in enumerate(links[:5], 1):
         logger.info(f"      {i}. [{link['priority']}] {link['text'][:50]}... → {link['url'][:60]}...")
 
-    # 3. Scrape detail pages (max_pages - 1, da Homepage schon gescrapet)
-    remaining_pages = max_pages - 1
-
-    for i, link in enumerate(links[:remaining_pages]):
-        time.sleep(delay)  # Rate limiting
-
-        logger.info(f"   📄 Scrape [{i+1}/{remaining_pages}]: {link['text'][:40]}...")
-        detail_text = scrape_page_firecrawl(link['url'])
+    # 3. Scrape detail pages concurrently (max_pages - 1, da Homepage schon gescrapet)
+    detail_links = links[:max_pages - 1]
+    logger.info(f"   📄 Scrape {len(detail_links)} Unterseiten parallel...")
+    detail_texts = firecrawl_client.scrape_many(
+        [link['url'] for link in detail_links],
+        min_delay=delay,
+        timeout=60
+    )
+
+    for i, (link, detail_text) in enumerate(zip(detail_links, detail_texts), 1):
+        logger.info(f"   📄 [{i}/{len(detail_links)}] {link['text'][:40]}...")
 
         if detail_text:
             scraped_pages.append(detail_text)
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Local PDF Pipeline
+Streamed download, content-addressed cache and local text extraction
+
+Förderrichtlinien are mostly born-digital PDFs whose text layer can be read
+locally in milliseconds, instead of one paid remote Firecrawl call each.
+The pipeline:
+    1. streams every PDF into PDF_CACHE_DIR, named by the SHA-256 of its
+       content (the same PDF under several URLs is stored once; known URLs
+       are revalidated with If-None-Match / If-Modified-Since)
+    2. extracts the text layer with PyMuPDF in a process pool
+       (PDF_WORKERS) and converts it to markdown-ish text for the
+       extractor and RAG indexer (headings, bullets, no running headers)
+    3. falls back to Firecrawl only for scanned PDFs (less than
+       PDF_MIN_CHARS_PER_PAGE characters per page) or if PyMuPDF is missing
+Results are cached next to the PDF, so reruns cost neither download nor
+parsing.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from scraper_firecrawl import firecrawl_client
+from scraper_firecrawl.crawl_scheduler import DomainScheduler
+
+load_dotenv()
+
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', 'pdf_cache')
+
+# Bump when the markdown conversion changes (cached results are re-parsed)
+PARSER_VERSION = 2
+
+_BULLETS = ('•', '▪', '◦', '●', '·', '–', '\uf0b7', '-', '*')
+_DIGITS = re.compile(r'\d+')
+
+
+class PdfLine(NamedTuple):
+    """One text line of a page"""
+    text: str
+    size: float
+    block: int
+
+
+@dataclass
+class PdfResult:
+    """Extracted text of one PDF"""
+    url: str
+    sha256: str
+    markdown: str
+    pages: int
+    source: str  # 'local' or 'firecrawl'
+
+
+@dataclass
+class PdfStats:
+    """Counters of one pipeline run"""
+    downloaded: int = 0
+    not_modified: int = 0
+    bytes: int = 0
+    parsed: int = 0
+    cached: int = 0
+    fallbacks: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        return (
+            f'{self.downloaded} downloaded ({self.bytes / 1e6:.1f} MB), {self.not_modified} not modified, '
+            f'{self.parsed} parsed locally, {self.cached} cached, '
+            f'{self.fallbacks} via Firecrawl, {self.failed} failed'
+        )
+
+
+def _is_repeated(text: str, counts: Counter, page_count: int) -> bool:
+    """Running header/footer: same line (digits ignored) on most pages"""
+    return page_count >= 3 and counts[_DIGITS.sub('#', text)] >= max(3, page_count // 2 + 1)
+
+
+def lines_to_markdown(pages: List[List[PdfLine]]) -> str:
+    """
+    Convert extracted PDF lines to markdown-ish text
+
+    - lines clearly larger than the body font become headings
+    - bullet characters become '- ' list items
+    - words hyphenated across line breaks are joined
+    - lines of one text block are joined into a paragraph
+    - running headers/footers (e.g. 'Seite 3 von 12') are dropped
+
+    Args:
+        pages: Lines per page
+
+    Returns:
+        Markdown text
+    """
+    sizes = Counter()
+    repeated = Counter()
+    for lines in pages:
+        for line in lines:
+            sizes[round(line.size)] += len(line.text)
+        for text in {_DIGITS.sub('#', line.text) for line in lines}:
+            repeated[text] += 1
+    if not sizes:
+        return ''
+    body_size = sizes.most_common(1)[0][0]
+
+    blocks: List[str] = []
+    paragraph: List[str] = []
+
+    def flush() -> None:
+        if paragraph:
+            blocks.append(' '.join(paragraph))
+            paragraph.clear()
+
+    for lines in pages:
+        current_block = None
+        for line in lines:
+            text = line.text.strip()
+            if not text or _is_repeated(text, repeated, len(pages)):
+                continue
+
+            if line.size >= body_size * 1.15 and len(text) < 150:
+                flush()
+                level = '#' if line.size >= body_size * 1.5 else '##'
+                blocks.append(f'{level} {text}')
+                current_block = None
+                continue
+
+            bullet = next((b for b in _BULLETS if text.startswith(b + ' ') or text == b), None)
+            if bullet or line.block != current_block:
+                flush()
+            current_block = line.block
+            if bullet:
+                text = '- ' + text[len(bullet):].strip()
+
+            if paragraph and paragraph[-1].endswith('-') and text[:1].islower():
+                paragraph[-1] = paragraph[-1][:-1] + text
+            else:
+                paragraph.append(text)
+        flush()
+
+    return '\n\n'.join(block for block in blocks if block.strip('-# '))
+
+
+def parse_pdf(path: str) -> Dict:
+    """
+    Extract a PDF's text layer as markdown (runs in the process pool)
+
+    Raises:
+        ImportError: PyMuPDF not installed
+        RuntimeError: File is not a readable PDF
+
+    Returns:
+        {'markdown': str, 'pages': int, 'chars': int}
+    """
+    import fitz  # PyMuPDF
+
+    try:
+        document = fitz.open(path)
+    except Exception as e:
+        raise RuntimeError(f'Unreadable PDF: {e}') from e
+
+    pages: List[List[PdfLine]] = []
+    with document:
+        for page in document:
+            lines = []
+            for block_no, block in enumerate(page.get_text('dict')['blocks']):
+                if block.get('type') != 0:  # image block
+                    continue
+                for line in block['lines']:
+                    spans = [span for span in line['spans'] if span['text'].strip()]
+                    if spans:
+                        text = ''.join(span['text'] for span in line['spans'])
+                        lines.append(PdfLine(text, max(span['size'] for span in spans), block_no))
+            pages.append(lines)
+
+    markdown = lines_to_markdown(pages)
+    return {
+        'markdown': markdown,
+        'pages': len(pages),
+        'chars': sum(len(line.text) for lines in pages for line in lines)
+    }
+
+
+def _sha256_hex(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+class PdfPipeline:
+    """Downloads, caches and extracts PDFs; use as async context manager"""
+
+    def __init__(
+        self,
+        cache_dir: str = PDF_CACHE_DIR,
+        processes: int = 2,
+        max_bytes: int = 50 * 1024 * 1024,
+        min_chars_per_page: int = 100,
+        fallback: bool = True,
+        http: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Args:
+            cache_dir: Content-addressed PDF + result cache
+            processes: Parser processes (0 = parse in a thread, e.g. tests)
+            max_bytes: Larger PDFs are not downloaded
+            min_chars_per_page: Below this the PDF counts as scanned
+            fallback: Use Firecrawl for scanned / unparseable PDFs
+            http: HTTP client for downloads (default: own client)
+        """
+        self.cache_dir = cache_dir
+        self.processes = processes
+        self.max_bytes = max_bytes
+        self.min_chars_per_page = min_chars_per_page
+        self.fallback = fallback
+        self.stats = PdfStats()
+        self._http = http
+        self._own_http = http is None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._parser_missing = False
+        self._scheduler = DomainScheduler(
+            max_concurrency=int(os.getenv('SCRAPER_CONCURRENT_REQUESTS', 8)),
+            per_domain_concurrency=int(os.getenv('SCRAPER_DOMAIN_CONCURRENCY', 2)),
+            min_delay=0.0
+        )
+
+    @classmethod
+    def from_env(cls) -> 'PdfPipeline':
+        """Pipeline configured via PDF_* environment variables"""
+        return cls(
+            cache_dir=PDF_CACHE_DIR,
+            processes=int(os.getenv('PDF_WORKERS', min(4, os.cpu_count() or 1))),
+            max_bytes=int(float(os.getenv('PDF_MAX_MB', 50)) * 1024 * 1024),
+            min_chars_per_page=int(os.getenv('PDF_MIN_CHARS_PER_PAGE', 100))
+        )
+
+    async def __aenter__(self) -> 'PdfPipeline':
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=60, follow_redirects=True)
+        if self.processes > 0:
+            # spawn: the parent runs event-loop threads (shared Firecrawl client)
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._own_http and self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # --- cache layout: <sha[:2]>/<sha>.pdf, <sha>.json; urls/<sha(url)>.json ---
+
+    def _pdf_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, sha[:2], f'{sha}.pdf')
+
+    def _result_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, sha[:2], f'{sha}.json')
+
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, 'urls', f'{_sha256_hex(url)}.json')
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: str, data: Dict) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    async def download(self, url: str) -> Optional[str]:
+        """
+        Stream a PDF into the cache (conditional GET for known URLs)
+
+        Returns:
+            SHA-256 of the content or None (not a PDF, too large, error)
+        """
+        known = self._read_json(self._url_path(url))
+        headers = {}
+        if known and os.path.exists(self._pdf_path(known['sha256'])):
+            if known.get('etag'):
+                headers['If-None-Match'] = known['etag']
+            if known.get('last_modified'):
+                headers['If-Modified-Since'] = known['last_modified']
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        async with self._scheduler.slot(url):
+            try:
+                async with self._http.stream('GET', url, headers=headers) as response:
+                    if response.status_code == 304 and headers:
+                        self.stats.not_modified += 1
+                        return known['sha256']
+                    if response.status_code != 200:
+                        print(f'[WARN] PDF download {url} returned {response.status_code}')
+                        return None
+
+                    digest = hashlib.sha256()
+                    size = 0
+                    head = b''
+                    with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.part', delete=False) as tmp:
+                        try:
+                            async for chunk in response.aiter_bytes():
+                                if len(head) < 1024:
+                                    head += chunk[:1024]
+                                    if len(head) >= 1024 and b'%PDF-' not in head[:1024]:
+                                        raise ValueError('not a PDF')
+                                size += len(chunk)
+                                if size > self.max_bytes:
+                                    raise ValueError(f'larger than {self.max_bytes // (1024 * 1024)} MB')
+                                digest.update(chunk)
+                                tmp.write(chunk)
+                            if b'%PDF-' not in head[:1024]:
+                                raise ValueError('not a PDF')
+                        except Exception:
+                            tmp.close()
+                            os.unlink(tmp.name)
+                            raise
+            except (httpx.HTTPError, ValueError) as e:
+                print(f'[WARN] PDF download {url} skipped: {e}')
+                return None
+
+        sha = digest.hexdigest()
+        pdf_path = self._pdf_path(sha)
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        os.replace(tmp.name, pdf_path)  # same content under another URL: overwritten in place
+
+        self._write_json(self._url_path(url), {
+            'url': url,
+            'sha256': sha,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        })
+        self.stats.downloaded += 1
+        self.stats.bytes += size
+        return sha
+
+    async def _parse(self, path: str) -> Optional[Dict]:
+        if self._parser_missing:
+            return None
+        try:
+            if self._pool is not None:
+                return await asyncio.get_running_loop().run_in_executor(self._pool, parse_pdf, path)
+            return await asyncio.to_thread(parse_pdf, path)
+        except ImportError:
+            self._parser_missing = True
+            print('[WARN] PyMuPDF not installed - PDFs go through Firecrawl (pip install pymupdf)')
+        except RuntimeError as e:
+            print(f'[WARN] {path}: {e}')
+        return None
+
+    async def _firecrawl(self, url: str) -> Optional[str]:
+        """Remote fallback (Firecrawl converts PDFs, incl. OCR)"""
+        return await firecrawl_client.run_async(
+            firecrawl_client.get_client().scrape_markdown(url, timeout=90)
+        )
+
+    async def extract(self, url: str) -> Optional[PdfResult]:
+        """
+        Text of one PDF as markdown (cache -> local parser -> Firecrawl)
+
+        Returns:
+            PdfResult or None if nothing could be extracted
+        """
+        sha = await self.download(url)
+        if sha is None:
+            self.stats.failed += 1
+            return None
+
+        cached = self._read_json(self._result_path(sha))
+        if cached and cached.get('parser_version') == PARSER_VERSION:
+            self.stats.cached += 1
+            return PdfResult(url, sha, cached['markdown'], cached['pages'], cached['source'])
+
+        parsed = await self._parse(self._pdf_path(sha))
+        if parsed and parsed['chars'] >= self.min_chars_per_page * max(1, parsed['pages']):
+            self.stats.parsed += 1
+            result = PdfResult(url, sha, parsed['markdown'], parsed['pages'], 'local')
+        elif self.fallback:
+            # Scanned (no text layer) or parser unavailable
+            markdown = await self._firecrawl(url)
+            if not markdown:
+                self.stats.failed += 1
+                return None
+            self.stats.fallbacks += 1
+            result = PdfResult(url, sha, markdown, parsed['pages'] if parsed else 0, 'firecrawl')
+        else:
+            self.stats.failed += 1
+            return None
+
+        entry = asdict(result)
+        entry.pop('url')
+        self._write_json(self._result_path(sha), {**entry, 'parser_version': PARSER_VERSION})
+        return result
+
+    async def extract_many(self, urls: Iterable[str]) -> Dict[str, Optional[PdfResult]]:
+        """Extract several PDFs concurrently; {url: PdfResult or None}"""
+        urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.extract(url) for url in urls))
+        return dict(zip(urls, results))
+
+
+def extract_pdfs(urls: List[str]) -> Dict[str, Optional[PdfResult]]:
+    """
+    Blocking wrapper: extract PDFs with a pipeline configured from env
+
+    Returns:
+        {url: PdfResult or None}
+    """
+    async def run() -> Dict[str, Optional[PdfResult]]:
+        async with PdfPipeline.from_env() as pipeline:
+            results = await pipeline.extract_many(urls)
+        print(f'[STATS] PDFs: {pipeline.stats.summary()}')
+        return results
+
+    return asyncio.run(run())
@@ -10,15 +10,20 @@ Version: 1.0
 Date: 2025-10-29
 """
 
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
 import re
-import requests
 from urllib.parse import urljoin, urlparse
 from typing import List, Optional, Dict
 import logging
 
-logger = logging.getLogger(__name__)
+from scraper_firecrawl import firecrawl_client
+from scraper_firecrawl.pdf_pipeline import extract_pdfs
 
-FIRECRAWL_URL = "http://130.61.137.77:3002"
+logger = logging.getLogger(__name__)
 
 # PDF-Keywords (deutsch)
 PDF_KEYWORDS = [
@@ -111,72 +116,49 @@ def scrape_pdf_with_firecrawl(pdf_url: str) -> Optional[str]:
         Markdown text or None on error
     """
 
-    try:
-        logger.info(f"   📄 Scrape PDF: {pdf_url[:70]}...")
-
-        response = requests.post(
-            f"{FIRECRAWL_URL}/v1/scrape",
-            json={"url": pdf_url, "formats": ["markdown"]},
-            timeout=90  # PDFs können länger dauern
-        )
+    logger.info(f"   📄 Scrape PDF: {pdf_url[:70]}...")
 
-        if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'markdown' in data['data']:
-                markdown = data['data']['markdown']
-                logger.info(f"      ✅ PDF gescraped: {len(markdown)} chars")
-                return markdown
+    # PDFs können länger dauern
+    markdown = firecrawl_client.scrape_markdown(pdf_url, timeout=90)
 
-        logger.warning(f"      ❌ Firecrawl Error {response.status_code}")
-        return None
+    if markdown:
+        logger.info(f"      ✅ PDF gescraped: {len(markdown)} chars")
+        return markdown
 
-    except Exception as e:
-        logger.error(f"      ❌ Exception: {e}")
-        return None
+    logger.warning(f"      ❌ PDF scraping failed")
+    return None
 
 
-def scrape_with_pdf_fallback(base_url: str) -> Dict[str, any]:
+def scrape_with_pdf_fallback(base_url: str, max_pdfs: int = 5) -> Dict[str, any]:
     """
     Scraped URL mit PDF-Fallback
 
     1. Scrape Homepage
     2. Suche nach PDF-Links
-    3. Falls gefunden: Scrape PDF statt Homepage
+    3. Falls gefunden: Extrahiere die relevantesten PDFs lokal (parallel)
+       und nutze das beste statt der Homepage
 
     Args:
         base_url: URL der Webseite
+        max_pdfs: Max. Anzahl PDFs (nach Relevanz)
 
     Returns:
         Dict with:
             - text: Combined markdown text
             - source: 'homepage' or 'pdf'
             - pdf_url: URL des PDFs (falls verwendet)
+            - pdfs: Alle extrahierten PDFs (url, source, chars)
     """
 
     # 1. Scrape Homepage
-    try:
-        response = requests.post(
-            f"{FIRECRAWL_URL}/v1/scrape",
-            json={"url": base_url, "formats": ["markdown"]},
-            timeout=60
-        )
-
-        if response.status_code != 200:
-            logger.error(f"   ❌ Homepage scraping failed: {response.status_code}")
-            return {'text': '', 'source': 'error'}
+    homepage_text = firecrawl_client.scrape_markdown(base_url, timeout=60)
 
-        data = response.json()
-        homepage_text = data.get('data', {}).get('markdown', '')
-
-        if not homepage_text:
-            return {'text': '', 'source': 'error'}
-
-        logger.info(f"   ✅ Homepage gescraped: {len(homepage_text)} chars")
-
-    except Exception as e:
-        logger.error(f"   ❌ Exception: {e}")
+    if not homepage_text:
+        logger.error(f"   ❌ Homepage scraping failed")
         return {'text': '', 'source': 'error'}
 
+    logger.info(f"   ✅ Homepage gescraped: {len(homepage_text)} chars")
+
     # 2. Suche nach PDFs
     pdf_links = find_pdf_links(homepage_text, base_url)
 
@@ -185,29 +167,41 @@ def scrape_with_pdf_fallback(base_url: str) -> Dict[str, any]:
         return {
             'text': homepage_text,
             'source': 'homepage',
-            'pdf_url': None
+            'pdf_url': None,
+            'pdfs': []
         }
 
     logger.info(f"   🎯 {len(pdf_links)} PDFs gefunden!")
 
     # Log top PDFs
-    for i, pdf in enumerate(pdf_links[:3], 1):
+    candidates = pdf_links[:max_pdfs]
+    for i, pdf in enumerate(candidates, 1):
         logger.info(f"      {i}. [{pdf['score']}] {pdf['text'][:50]}...")
 
-    # 3. Scrape best PDF
-    best_pdf = pdf_links[0]
-    pdf_text = scrape_pdf_with_firecrawl(best_pdf['url'])
+    # 3. Extract PDFs (lokal, Firecrawl nur für gescannte PDFs)
+    results = extract_pdfs([pdf['url'] for pdf in candidates])
+    extracted = [results[pdf['url']] for pdf in candidates if results.get(pdf['url'])]
+    pdfs = [
+        {'url': result.url, 'source': result.source, 'chars': len(result.markdown)}
+        for result in extracted
+    ]
+
+    # Bestes PDF = relevantestes mit Text
+    best_pdf = next((result for result in extracted if result.markdown.strip()), None)
 
-    if not pdf_text:
+    if not best_pdf:
         logger.warning(f"   ⚠️ PDF scraping failed → Nutze Homepage")
         return {
             'text': homepage_text,
             'source': 'homepage',
-            'pdf_url': None
+            'pdf_url': None,
+            'pdfs': pdfs
         }
 
+    pdf_text = best_pdf.markdown
+
     # Success!
-    logger.info(f"   ✅ Nutze PDF statt Homepage!")
+    logger.info(f"   ✅ Nutze PDF statt Homepage! ({best_pdf.source})")
     logger.info(f"      PDF: {len(pdf_text)} chars")
     logger.info(f"      Homepage: {len(homepage_text)} chars")
     logger.info(f"      Faktor: {len(pdf_text) / len(homepage_text):.1f}x mehr Text")
@@ -215,7 +209,8 @@ def scrape_with_pdf_fallback(base_url: str) -> Dict[str, any]:
     return {
         'text': pdf_text,
         'source': 'pdf',
-        'pdf_url': best_pdf['url']
+        'pdf_url': best_pdf.url,
+        'pdfs': pdfs
     }
 
 
@@ -20,13 +20,13 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-import re
-import requests
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 from typing import List, Dict, Optional
 import logging
-import time
 
+from scraper_firecrawl import firecrawl_client
+from scraper_firecrawl.link_classifier import LinkClassifier
+from scraper_firecrawl.extraction_queue import ExtractionJob, checkpoint_path, extract_many
 from scraper_firecrawl.llm_extractor import (
     extract_with_deepseek,
     validate_extracted_data,
@@ -35,8 +35,6 @@ from scraper_firecrawl.llm_extractor import (
 
 logger = logging.getLogger(__name__)
 
-FIRECRAWL_URL = "http://130.61.137.77:3002"
-
 # Keywords für Förderprogramm-Links (priorisiert)
 PROGRAM_KEYWORDS = {
     'high_priority': [
@@ -76,7 +74,7 @@ BLACKLIST_KEYWORDS = [
 
 def scrape_page_firecrawl(url: str) -> Optional[str]:
     """
-    Scraped eine Seite mit Firecrawl
+    Scraped eine Seite mit Firecrawl (geteilter Client)
 
     Args:
         url: URL to scrape
@@ -84,25 +82,14 @@ def scrape_page_firecrawl(url: str) -> Optional[str]:
     Returns:
         Markdown text or None on error
     """
+    return firecrawl_client.scrape_markdown(url, timeout=60)
 
-    try:
-        response = requests.post(
-            f"{FIRECRAWL_URL}/v1/scrape",
-            json={"url": url, "formats": ["markdown"]},
-            timeout=60
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'markdown' in data['data']:
-                return data['data']['markdown']
 
-        logger.warning(f"      Firecrawl Error {response.status_code} for {url[:60]}...")
-        return None
-
-    except Exception as e:
-        logger.error(f"      Exception scraping {url[:60]}...: {e}")
-        return None
+# Prioritäten und Blacklist in einem kompilierten Muster
+LINK_CLASSIFIER = LinkClassifier(
+    {3: PROGRAM_KEYWORDS['high_priority'], 2: PROGRAM_KEYWORDS['medium_priority']},
+    blacklist=BLACKLIST_KEYWORDS
+)
 
 
 def extract_links_from_markdown(markdown_text: str, base_url: str) -> List[Dict[str, any]]:
@@ -114,79 +101,9 @@ def extract_links_from_markdown(markdown_text: str, base_url: str) -> List[Dict[
         base_url: Base URL für relative Links
 
     Returns:
-        List of dicts with 'url', 'text', 'priority'
+        List of dicts with 'url', 'text', 'priority' (dedupliziert, hohe Priorität zuerst)
     """
-
-    links = []
-
-    # Regex für Markdown-Links: [text](url)
-    pattern = r'\[([^\]]+)\]\(([^\)]+)\)'
-    matches = re.findall(pattern, markdown_text)
-
-    for text, url in matches:
-        # Skip anchors, mailto, tel
-        if url.startswith('#') or url.startswith('mailto:') or url.startswith('tel:'):
-            continue
-
-        # Convert to absolute URL
-        absolute_url = urljoin(base_url, url)
-
-        # Skip external domains
-        base_domain = urlparse(base_url).netloc
-        link_domain = urlparse(absolute_url).netloc
-        if base_domain not in link_domain:
-            continue
-
-        # Skip files
-        if absolute_url.lower().endswith(('.pdf', '.jpg', '.png', '.zip', '.doc', '.docx')):
-            continue
-
-        # Check if blacklisted
-        text_lower = text.lower()
-        url_lower = url.lower()
-        combined = text_lower + ' ' + url_lower
-
-        is_blacklisted = False
-        for keyword in BLACKLIST_KEYWORDS:
-            if keyword in combined:
-                is_blacklisted = True
-                break
-
-        if is_blacklisted:
-            continue
-
-        # Calculate priority
-        priority = 0
-        for keyword in PROGRAM_KEYWORDS['high_priority']:
-            if keyword in combined:
-                priority = 3
-                break
-
-        if priority == 0:
-            for keyword in PROGRAM_KEYWORDS['medium_priority']:
-                if keyword in combined:
-                    priority = 2
-                    break
-
-        if priority > 0:  # Only relevant links
-            links.append({
-                'url': absolute_url,
-                'text': text,
-                'priority': priority
-            })
-
-    # Sort by priority (high first)
-    links.sort(key=lambda x: x['priority'], reverse=True)
-
-    # Deduplicate by URL
-    seen = set()
-    unique_links = []
-    for link in links:
-        if link['url'] not in seen:
-            seen.add(link['url'])
-            unique_links.append(link)
-
-    return unique_links
+    return LINK_CLASSIFIER.extract_links(markdown_text, base_url)
 
 
 def test_page_quality(url: str, source_name: str) -> float:
@@ -239,7 +156,8 @@ def find_funding_programs(
         source_name: Name der Stiftung/Organisation
         max_pages: Maximale Anzahl zu testender Seiten
         min_quality: Minimaler Quality Score (default: 0.3)
-        delay: Delay zwischen Requests in Sekunden
+        delay: Mindestabstand zwischen Request-Starts auf derselben Domain
+            (Seiten werden parallel im Rate-Budget geladen)
 
     Returns:
         List of dicts with:
@@ -276,31 +194,37 @@ def find_funding_programs(
     for i, link in enumerate(links[:5], 1):
         logger.info(f"         {i}. [{link['priority']}] {link['text'][:40]}...")
 
-    # 3. Test each page
+    # 3. Scrape all candidate pages concurrently, then test each page
+    candidates = links[:max_pages]
+    logger.info(f"      Scrape {len(candidates)} Seiten parallel...")
+    pages = firecrawl_client.scrape_many([link['url'] for link in candidates], min_delay=delay, timeout=60)
+
+    # LLM extraction of all scraped pages concurrently (resumable)
+    logger.info(f"      🤖 LLM-Extraktion ({sum(1 for page in pages if page)} Seiten parallel)...")
+    extractions = extract_many(
+        [
+            ExtractionJob(link['url'], page_markdown, f"{source_name} - {link['text']}")
+            for link, page_markdown in zip(candidates, pages) if page_markdown
+        ],
+        checkpoint=checkpoint_path(f"program_finder_{urlparse(base_url).netloc}")
+    )
+
     found_programs = []
     pages_tested = 0
 
-    for link in links[:max_pages]:
-        if pages_tested >= max_pages:
-            break
-
-        time.sleep(delay)  # Rate limiting
+    for link, page_markdown in zip(candidates, pages):
         pages_tested += 1
 
-        logger.info(f"      [{pages_tested}/{min(len(links), max_pages)}] Teste: {link['text'][:40]}...")
+        logger.info(f"      [{pages_tested}/{len(candidates)}] Teste: {link['text'][:40]}...")
         logger.info(f"         URL: {link['url'][:70]}...")
 
-        # Scrape page
-        page_markdown = scrape_page_firecrawl(link['url'])
         if not page_markdown:
             logger.warning(f"         ❌ Scraping failed")
             continue
 
         logger.info(f"         ✅ Gescraped: {len(page_markdown)} chars")
 
-        # Extract structured data
-        logger.info(f"         🤖 LLM-Extraktion...")
-        extracted = extract_with_deepseek(page_markdown, f"{source_name} - {link['text']}")
+        extracted = extractions.get(link['url'])
 
         if not extracted:
             logger.warning(f"         ❌ Extraktion failed")
@@ -2,17 +2,22 @@
 """
 Scrape All Funding Sources
 Scrapes all configured funding sources and saves to database
+
+Results are saved per URL as soon as they are extracted; an aborted run
+is continued with --resume (job ledger, see utils.scrape_ledger).
 """
 
+import argparse
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
-from scraper_firecrawl.firecrawl_scraper import FirecrawlScraper
+from scraper_firecrawl.firecrawl_scraper import LEDGER_NAME, FirecrawlScraper
 from scraper_firecrawl.funding_sources import ALL_SOURCES
+from utils.scrape_ledger import ScrapeLedger
 
-def main():
+def main(resume: bool = False):
     """Scrape all funding sources"""
 
     print('\n' + '=' * 70)
@@ -21,6 +26,10 @@ def main():
 
     scraper = FirecrawlScraper()
 
+    ledger = ScrapeLedger.open(LEDGER_NAME, resume=resume)
+    for source in ALL_SOURCES:
+        ledger.register(source.name, source.urls)
+
     total_scraped = 0
     total_saved = 0
 
@@ -31,16 +40,13 @@ def main():
         print(f'  URLs: {len(source.urls)}')
 
         try:
-            opportunities = scraper.process_source(source)
+            scraped, saved_count = scraper.run_source(source, ledger)
 
-            if opportunities:
-                print(f'  ✅ Extracted: {len(opportunities)} opportunities')
-
-                # Save to database
-                saved_count = scraper.save_to_database(opportunities)
+            if scraped:
+                print(f'  ✅ Extracted: {scraped} opportunities')
                 print(f'  ✅ Saved: {saved_count} new opportunities')
 
-                total_scraped += len(opportunities)
+                total_scraped += scraped
                 total_saved += saved_count
             else:
                 print(f'  ⚠️  No opportunities extracted')
@@ -49,12 +55,19 @@ def main():
             print(f'  ❌ Error: {e}')
             continue
 
+    scraper.update_facets()
+
     print('\n' + '=' * 70)
     print('SCRAPING COMPLETE')
     print('=' * 70)
     print(f'✅ Total opportunities scraped: {total_scraped}')
     print(f'✅ Total new opportunities saved: {total_saved}')
+    print(f'📋 Jobs ({ledger.run_id}): {ledger.summary()}')
+    if not ledger.is_complete():
+        print('⚠️  Failed jobs left - continue with --resume')
     print('\n')
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Scrape all configured funding sources')
+    parser.add_argument('--resume', action='store_true', help='Continue the last unfinished run')
+    main(resume=parser.parse_args().resume)
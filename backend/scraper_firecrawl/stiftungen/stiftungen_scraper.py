@@ -15,11 +15,17 @@ import asyncio
 import json
 import logging
 import os
+import sys
 from datetime import datetime
 from typing import Dict, List, Optional
 import requests
 import cx_Oracle
 
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.fetch_state import FetchStateStore
+
 # Logging Setup
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +42,9 @@ class StiftungenScraper:
         self.firecrawl_url = "http://130.61.137.77:3002"
         self.db_connection = None
 
+        # Inhalts-Hash pro Seite: unveränderte Seiten nicht erneut extrahieren
+        self.fetch_state = FetchStateStore()
+
         # Stiftungsquellen-Konfiguration
         self.sources = {
             'deutsches_stiftungszentrum': {
@@ -256,10 +265,13 @@ class StiftungenScraper:
         Args:
             stiftung: Stiftungsdaten (Dict)
             quelle: Name der Quelle (z.B. 'DSZ')
+
+        Returns:
+            True, wenn gespeichert oder bereits vorhanden
         """
         if not self.db_connection:
             logger.error("Keine DB-Verbindung!")
-            return
+            return False
 
         try:
             cursor = self.db_connection.cursor()
@@ -278,7 +290,7 @@ class StiftungenScraper:
 
             if existing:
                 logger.info(f"  ⏭️ Stiftung existiert bereits: {stiftung.get('name')}")
-                return
+                return True
 
             # Inseriere neue Stiftung
             cursor.execute("""
@@ -316,10 +328,12 @@ class StiftungenScraper:
 
             self.db_connection.commit()
             logger.info(f"  ✅ Gespeichert: {stiftung.get('name')}")
+            return True
 
         except Exception as e:
             logger.error(f"  ❌ DB-Fehler beim Speichern: {e}")
             self.db_connection.rollback()
+            return False
 
     def scrape_source(self, source_key: str):
         """
@@ -344,18 +358,28 @@ class StiftungenScraper:
         # Extrahiere Stiftungen mit LLM
         stiftungen_found = 0
         for i, page in enumerate(pages, 1):
+            markdown = page.get('markdown', '')
+            page_url = page.get('url', '')
+
+            # Unveränderte Seite: keine LLM-Extraktion, kein DB-Write
+            if self.fetch_state.is_unchanged(page_url, markdown):
+                logger.info(f"⏭️ Seite {i}/{len(pages)} unverändert: {page_url}")
+                continue
+
             logger.info(f"🔍 Analysiere Seite {i}/{len(pages)}...")
 
-            stiftung_data = self.extract_stiftung_with_llm(
-                page.get('markdown', ''),
-                page.get('url', '')
-            )
+            stiftung_data = self.extract_stiftung_with_llm(markdown, page_url)
 
             if stiftung_data:
-                self.save_stiftung_to_db(stiftung_data, source_key.upper())
+                if not self.save_stiftung_to_db(stiftung_data, source_key.upper()):
+                    continue
                 stiftungen_found += 1
 
+            self.fetch_state.remember(page_url, markdown)
+
+        self.fetch_state.flush()
         logger.info(f"\n✅ {stiftungen_found} Stiftungen aus {source_config['name']} gespeichert\n")
+        logger.info(f"⏭️ Übersprungen: {self.fetch_state.stats()}")
 
     def scrape_all(self, priority_filter: Optional[str] = None):
         """
@@ -18,25 +18,23 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-import re
-import requests
-import xml.etree.ElementTree as ET
-from urllib.parse import urljoin, urlparse, urlunparse
+import asyncio
+from urllib.parse import urlparse
 from typing import List, Dict, Optional
 import logging
-import time
-import json
 
+from scraper_firecrawl import firecrawl_client
+from scraper_firecrawl.crawl_frontier import CrawlFrontier, PDF_SCORE, UrlScorer
+from scraper_firecrawl.crawl_scheduler import DomainScheduler
+from scraper_firecrawl.extraction_queue import ExtractionJob, checkpoint_path, extract_many
 from scraper_firecrawl.llm_extractor import (
-    extract_with_deepseek,
     validate_extracted_data,
     calculate_quality_score
 )
+from scraper_firecrawl.pdf_pipeline import PdfPipeline
 
 logger = logging.getLogger(__name__)
 
-FIRECRAWL_URL = "http://130.61.137.77:3002"
-
 # Keywords für Förderprogramm-URLs (erweitert!)
 PROGRAM_KEYWORDS = [
     'förder', 'foerder', 'programm', 'stipendium', 'ausschreibung',
@@ -51,115 +49,8 @@ BLACKLIST_KEYWORDS = [
     'team', 'karriere', 'jobs', 'cookie', 'agb', 'login', 'newsletter'
 ]
 
-
-def fetch_sitemap(base_url: str) -> List[str]:
-    """
-    Fetched sitemap.xml und extrahiert alle URLs
-
-    Args:
-        base_url: Base URL der Website
-
-    Returns:
-        List of all URLs from sitemap
-    """
-
-    sitemap_urls = [
-        urljoin(base_url, '/sitemap.xml'),
-        urljoin(base_url, '/sitemap_index.xml'),
-        urljoin(base_url, '/sitemap-index.xml'),
-        urljoin(base_url, '/robots.txt')  # robots.txt enthält oft sitemap location
-    ]
-
-    all_urls = []
-
-    for sitemap_url in sitemap_urls:
-        try:
-            logger.info(f"      Versuche: {sitemap_url}")
-            response = requests.get(sitemap_url, timeout=10)
-
-            if response.status_code != 200:
-                continue
-
-            # Check if robots.txt
-            if 'robots.txt' in sitemap_url:
-                # Parse robots.txt for Sitemap: directive
-                for line in response.text.split('\n'):
-                    if line.lower().startswith('sitemap:'):
-                        sitemap_loc = line.split(':', 1)[1].strip()
-                        logger.info(f"         Found sitemap in robots.txt: {sitemap_loc}")
-                        # Recursively fetch this sitemap
-                        sub_urls = fetch_sitemap_xml(sitemap_loc)
-                        all_urls.extend(sub_urls)
-                continue
-
-            # Parse XML sitemap
-            urls = fetch_sitemap_xml_content(response.content)
-            all_urls.extend(urls)
-            logger.info(f"      ✅ Found {len(urls)} URLs in {sitemap_url}")
-
-        except Exception as e:
-            logger.debug(f"      Failed to fetch {sitemap_url}: {e}")
-            continue
-
-    return list(set(all_urls))  # Deduplicate
-
-
-def fetch_sitemap_xml(sitemap_url: str) -> List[str]:
-    """
-    Fetched eine sitemap.xml URL
-
-    Args:
-        sitemap_url: URL of sitemap
-
-    Returns:
-        List of URLs
-    """
-
-    try:
-        response = requests.get(sitemap_url, timeout=10)
-        if response.status_code == 200:
-            return fetch_sitemap_xml_content(response.content)
-    except Exception as e:
-        logger.debug(f"Failed to fetch sitemap {sitemap_url}: {e}")
-
-    return []
-
-
-def fetch_sitemap_xml_content(xml_content: bytes) -> List[str]:
-    """
-    Parse sitemap XML content
-
-    Args:
-        xml_content: XML bytes
-
-    Returns:
-        List of URLs
-    """
-
-    urls = []
-
-    try:
-        root = ET.fromstring(xml_content)
-
-        # Handle namespace
-        ns = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-
-        # Check if this is a sitemap index
-        sitemaps = root.findall('.//ns:sitemap/ns:loc', ns)
-        if sitemaps:
-            logger.info(f"         Sitemap index found, fetching {len(sitemaps)} sub-sitemaps...")
-            for sitemap_loc in sitemaps:
-                sub_urls = fetch_sitemap_xml(sitemap_loc.text)
-                urls.extend(sub_urls)
-        else:
-            # Regular sitemap with URLs
-            url_elements = root.findall('.//ns:url/ns:loc', ns)
-            urls = [url.text for url in url_elements if url.text]
-
-    except ET.ParseError:
-        logger.debug("Failed to parse sitemap XML")
-
-    return urls
+# Both keyword lists compiled into one pattern (one pass per URL)
+URL_SCORER = UrlScorer(PROGRAM_KEYWORDS, BLACKLIST_KEYWORDS)
 
 
 def filter_program_urls(urls: List[str], base_url: str) -> List[Dict[str, any]]:
@@ -182,18 +73,10 @@ def filter_program_urls(urls: List[str], base_url: str) -> List[Dict[str, any]]:
         if urlparse(url).netloc != base_domain:
             continue
 
-        # Calculate relevance score
-        url_lower = url.lower()
-
-        # Check blacklist
-        is_blacklisted = any(keyword in url_lower for keyword in BLACKLIST_KEYWORDS)
-        if is_blacklisted:
-            continue
-
-        # Calculate score
-        score = sum(1 for keyword in PROGRAM_KEYWORDS if keyword in url_lower)
+        # Blacklisted -> None, irrelevant -> 0
+        score = URL_SCORER.score(url)
 
-        if score > 0:
+        if score:
             filtered.append({'url': url, 'score': score})
 
     # Sort by score
@@ -222,21 +105,6 @@ def search_pdfs_google(domain: str, query_terms: str) -> List[str]:
     return []
 
 
-def find_pdfs_in_sitemap(urls: List[str]) -> List[str]:
-    """
-    Filtert PDF URLs aus sitemap
-
-    Args:
-        urls: List of all URLs
-
-    Returns:
-        List of PDF URLs
-    """
-
-    pdfs = [url for url in urls if url.lower().endswith('.pdf')]
-    return pdfs
-
-
 def scrape_page_firecrawl(url: str) -> Optional[str]:
     """
     Scraped eine Seite mit Firecrawl
@@ -247,24 +115,7 @@ def scrape_page_firecrawl(url: str) -> Optional[str]:
     Returns:
         Markdown text or None on error
     """
-
-    try:
-        response = requests.post(
-            f"{FIRECRAWL_URL}/v1/scrape",
-            json={"url": url, "formats": ["markdown"]},
-            timeout=60
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'markdown' in data['data']:
-                return data['data']['markdown']
-
-        return None
-
-    except Exception as e:
-        logger.debug(f"Exception scraping {url}: {e}")
-        return None
+    return firecrawl_client.scrape_markdown(url, timeout=60)
 
 
 def super_scrape(
@@ -282,7 +133,8 @@ def super_scrape(
         source_name: Name der Organisation
         max_urls: Max URLs to test
         min_quality: Minimum quality score
-        delay: Delay between requests
+        delay: Min. seconds between request starts on one domain
+            (pages are fetched concurrently within the rate budget)
 
     Returns:
         List of found programs with extracted data
@@ -294,45 +146,43 @@ def super_scrape(
 
     found_programs = []
 
-    # STEP 1: Fetch sitemap.xml
+    # STEP 1: Stream sitemaps into the crawl frontier
     logger.info(f"   📋 STEP 1: Sitemap Crawling")
-    sitemap_urls = fetch_sitemap(base_url)
+    frontier = CrawlFrontier.from_env(base_url, URL_SCORER)
+    domain_concurrency = int(os.getenv('SCRAPER_DOMAIN_CONCURRENCY', 2))
+    asyncio.run(frontier.discover(concurrency=domain_concurrency))
+    stats = frontier.stats
 
-    if sitemap_urls:
-        logger.info(f"      ✅ Found {len(sitemap_urls)} URLs in sitemap")
+    if stats.sitemap_urls:
+        logger.info(f"      ✅ Found {stats.sitemap_urls} URLs in sitemap ({stats.duplicates} duplicates)")
     else:
         logger.warning(f"      ⚠️ No sitemap found, falling back to homepage crawl")
-        sitemap_urls = [base_url]
+        frontier.add(base_url)
 
-    # STEP 2: Filter for program URLs
+    # STEP 2: Program URLs (scored while streaming)
     logger.info(f"")
     logger.info(f"   🎯 STEP 2: Filter Program URLs")
-    program_urls = filter_program_urls(sitemap_urls, base_url)
 
-    if not program_urls:
+    if not len(frontier):
         logger.warning(f"      ⚠️ No relevant URLs found")
         return []
 
-    logger.info(f"      ✅ Found {len(program_urls)} relevant URLs")
+    logger.info(f"      ✅ Found {stats.candidates - stats.pdfs} relevant URLs")
 
     # Log top URLs
-    for i, url_data in enumerate(program_urls[:10], 1):
-        url_path = urlparse(url_data['url']).path
-        logger.info(f"         {i}. [{url_data['score']}] {url_path[:60]}...")
+    top_entries = frontier.peek(max(10, stats.pdfs))
+    for i, entry in enumerate([e for e in top_entries if e.score != PDF_SCORE][:10], 1):
+        url_path = urlparse(entry.url).path
+        logger.info(f"         {i}. [{entry.score}] {url_path[:60]}...")
 
-    # STEP 3: Find PDFs
+    # STEP 3: PDFs (queued with highest priority)
     logger.info(f"")
     logger.info(f"   📄 STEP 3: PDF Search")
-    pdf_urls = find_pdfs_in_sitemap(sitemap_urls)
-
-    if pdf_urls:
-        logger.info(f"      ✅ Found {len(pdf_urls)} PDFs")
-        for i, pdf_url in enumerate(pdf_urls[:5], 1):
-            pdf_path = urlparse(pdf_url).path
-            logger.info(f"         {i}. {pdf_path}")
-        # Add PDFs to program URLs (high priority)
-        for pdf_url in pdf_urls:
-            program_urls.insert(0, {'url': pdf_url, 'score': 999})  # Highest priority
+
+    if stats.pdfs:
+        logger.info(f"      ✅ Found {stats.pdfs} PDFs")
+        for i, entry in enumerate([e for e in top_entries if e.score == PDF_SCORE][:5], 1):
+            logger.info(f"         {i}. {urlparse(entry.url).path}")
     else:
         logger.info(f"      ℹ️ No PDFs found in sitemap")
 
@@ -340,31 +190,59 @@ def super_scrape(
     logger.info(f"")
     logger.info(f"   🧪 STEP 4: Test URLs (max {max_urls})")
 
-    tested = 0
-    for url_data in program_urls[:max_urls]:
-        if tested >= max_urls:
-            break
+    # Fetchers drain the frontier best-first, then pages are extracted concurrently
+    client = firecrawl_client.get_client()
+
+    async def fetch_candidates():
+        scheduler = DomainScheduler(
+            max_concurrency=domain_concurrency,
+            per_domain_concurrency=domain_concurrency,
+            min_delay=delay
+        )
 
+        async with PdfPipeline.from_env() as pdf_pipeline:
+
+            async def fetch(url: str) -> Optional[str]:
+                # PDFs are parsed locally (Firecrawl only for scanned ones)
+                if urlparse(url).path.lower().endswith('.pdf'):
+                    result = await pdf_pipeline.extract(url)
+                    return result.markdown if result else None
+                async with scheduler.slot(url):
+                    return await firecrawl_client.run_async(client.scrape_markdown(url, timeout=60))
+
+            fetched = await frontier.drain(fetch, limit=max_urls, workers=domain_concurrency)
+        logger.info(f"      PDFs: {pdf_pipeline.stats.summary()}")
+        return fetched
+
+    fetched = asyncio.run(fetch_candidates())
+    candidates = [{'url': entry.url, 'score': entry.score} for entry, _ in fetched]
+    pages = [markdown for _, markdown in fetched]
+
+    extractions = extract_many(
+        [
+            ExtractionJob(url_data['url'], markdown, f"{source_name} - {urlparse(url_data['url']).path[-50:]}")
+            for url_data, markdown in zip(candidates, pages) if markdown
+        ],
+        checkpoint=checkpoint_path(f"super_scraper_{urlparse(base_url).netloc}")
+    )
+    frontier.save()
+
+    tested = 0
+    for url_data, markdown in zip(candidates, pages):
         tested += 1
         url = url_data['url']
         url_short = urlparse(url).path[-50:] if len(urlparse(url).path) > 50 else urlparse(url).path
 
         logger.info(f"")
-        logger.info(f"      [{tested}/{min(len(program_urls), max_urls)}] Testing: {url_short}")
-
-        time.sleep(delay)
+        logger.info(f"      [{tested}/{len(candidates)}] Testing: {url_short}")
 
-        # Scrape
-        markdown = scrape_page_firecrawl(url)
         if not markdown:
             logger.warning(f"         ❌ Scraping failed")
             continue
 
         logger.info(f"         ✅ Scraped: {len(markdown)} chars")
 
-        # Extract
-        logger.info(f"         🤖 LLM Extraction...")
-        extracted = extract_with_deepseek(markdown, f"{source_name} - {url_short}")
+        extracted = extractions.get(url)
 
         if not extracted:
             logger.warning(f"         ❌ Extraction failed")
@@ -390,9 +268,10 @@ def super_scrape(
     # STEP 5: Summary
     logger.info(f"")
     logger.info(f"   📊 SUPER SCRAPER SUMMARY")
-    logger.info(f"      Sitemap URLs: {len(sitemap_urls)}")
-    logger.info(f"      Relevant URLs: {len(program_urls)}")
-    logger.info(f"      PDFs found: {len(pdf_urls)}")
+    logger.info(f"      Sitemap URLs: {stats.sitemap_urls}")
+    logger.info(f"      Relevant URLs: {stats.candidates}")
+    logger.info(f"      PDFs found: {stats.pdfs}")
+    logger.info(f"      Frontier: {stats.summary()}")
     logger.info(f"      URLs tested: {tested}")
     logger.info(f"      Programs found: {len(found_programs)}")
 
@@ -21,6 +21,8 @@ os.environ['CORS_ORIGINS'] = '["http://localhost:3000"]'
 os.environ['JWT_SECRET_KEY'] = 'test-secret-key-do-not-use-in-production'
 os.environ['JWT_ALGORITHM'] = 'HS256'
 os.environ['JWT_ACCESS_TOKEN_EXPIRE_MINUTES'] = '60'
+# Tests write funding rows directly: check the response cache version on every request
+os.environ['FUNDING_CACHE_CHECK_INTERVAL'] = '0'
 
 from api.main import app
 from utils.database_sqlite import get_db_manager, init_sqlite_schema
@@ -57,10 +59,15 @@ def test_db(test_db_path: str) -> Generator[str, None, None]:
 
     yield test_db_path
 
-    # Cleanup after all tests
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
-        print(f'\n[TEST DB] Cleaned up {test_db_path}')
+    # Cleanup after all tests (close persistent connections, WAL sidecar files)
+    from utils import database_sqlite
+    if database_sqlite._db_manager is not None:
+        database_sqlite._db_manager.close_all()
+
+    for path in (test_db_path, f'{test_db_path}-wal', f'{test_db_path}-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+    print(f'\n[TEST DB] Cleaned up {test_db_path}')
 
 
 @pytest.fixture(scope='function')
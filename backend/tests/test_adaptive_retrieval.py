@@ -0,0 +1,104 @@
+"""
+Test Suite: Adaptive Retrieval
+Tests the early-exit / widened paths of AdvancedRAGPipeline.retrieve
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('chromadb')
+pytest.importorskip('sentence_transformers')
+
+from rag_indexer.advanced_rag_pipeline import AdvancedRAGPipeline
+
+TOP_K = 3
+
+
+def ranked(ids):
+    return [{'id': doc_id, 'text': doc_id, 'score': 0.9 - 0.1 * rank} for rank, doc_id in enumerate(ids)]
+
+
+class FakeSearcher:
+    """Records candidate depth per query; sparse list depends on agree"""
+
+    def __init__(self, agree):
+        self.agree = agree
+        self.calls = []
+
+    def search_candidates(self, query, candidate_k=20, where_filter=None):
+        self.calls.append((query, candidate_k))
+        dense = ranked([f'd{i}' for i in range(candidate_k)])
+        sparse = dense if self.agree else ranked([f's{i}' for i in range(candidate_k)])
+        return dense, sparse
+
+
+class FakeExpander:
+    def __init__(self):
+        self.expanded = []
+
+    async def extract_metadata_filters(self, query):
+        return {'filters': {}, 'cleaned_query': query}
+
+    async def expand_query(self, query, num_variants=3):
+        self.expanded.append(query)
+        return [query, f'{query} Variante 1', f'{query} Variante 2']
+
+
+class FakeReranker:
+    available = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def rerank_with_metadata(self, query, results, text_key='text', top_k=5):
+        self.calls += 1
+        return results[:top_k]
+
+
+def make_pipeline(agree):
+    pipeline = AdvancedRAGPipeline.__new__(AdvancedRAGPipeline)
+    pipeline.verbose = False
+    pipeline.dense_weight, pipeline.sparse_weight = 0.6, 0.4
+    pipeline.adaptive = True
+    pipeline.early_exit_overlap = 0.6
+    pipeline.early_exit_margin = 0.15
+    pipeline.probe_depth_factor = 2
+    pipeline.wide_depth_factor = 6
+    pipeline.enable_query_expansion = True
+    pipeline.enable_reranking = True
+    pipeline.enable_crag = False
+    pipeline.searcher = FakeSearcher(agree)
+    pipeline.query_expander = FakeExpander()
+    pipeline.reranker = FakeReranker()
+    return pipeline
+
+
+@pytest.mark.unit
+class TestAdaptiveRetrieval:
+    """Test AdvancedRAGPipeline.retrieve paths"""
+
+    def test_early_exit_skips_expansion_and_reranking(self):
+        """Test that agreeing retrievers use only the shallow probe"""
+        pipeline = make_pipeline(agree=True)
+
+        results = asyncio.run(pipeline.retrieve('Tablets Grundschule', top_k=TOP_K))
+
+        assert len(results) == TOP_K
+        assert pipeline.searcher.calls == [('Tablets Grundschule', TOP_K * 2)]
+        assert pipeline.query_expander.expanded == []
+        assert pipeline.reranker.calls == 0
+
+    def test_widened_path_reuses_probe(self):
+        """Test that only the query variants are searched at the wide depth"""
+        pipeline = make_pipeline(agree=False)
+
+        results = asyncio.run(pipeline.retrieve('Tablets Grundschule', top_k=TOP_K))
+
+        assert len(results) == TOP_K
+        assert pipeline.searcher.calls == [
+            ('Tablets Grundschule', TOP_K * 2),
+            ('Tablets Grundschule Variante 1', TOP_K * 6),
+            ('Tablets Grundschule Variante 2', TOP_K * 6),
+        ]
+        assert pipeline.reranker.calls == 1
@@ -0,0 +1,99 @@
+"""
+Test Suite: Chunk Deduplication
+Tests for MinHash/LSH near-duplicate detection at index time
+"""
+
+import pytest
+
+from rag_indexer.deduplicator import ChunkDeduplicator, SHARED_FUNDING_ID
+
+
+COOKIE_NOTICE = (
+    'Diese Website verwendet Cookies, um Ihnen den bestmöglichen Service zu bieten. '
+    'Wenn Sie auf der Seite weitersurfen, stimmen Sie der Cookie-Nutzung zu. '
+    'Weitere Informationen finden Sie in unserer Datenschutzerklärung.'
+)
+
+PROGRAM_TEXTS = [
+    'Das Programm fördert die Anschaffung von Tablets und interaktiven Tafeln an Grundschulen in Bayern.',
+    'Gefördert werden Projekte zur Leseförderung in Schulbibliotheken mit bis zu 5.000 Euro pro Jahr.',
+    'Die Stiftung unterstützt Schulgärten, Umweltbildung und Klimaschutzprojekte von Schülerinnen und Schülern.',
+    'Antragsberechtigt sind Fördervereine von Ganztagsschulen für Musik- und Theaterprojekte im Nachmittag.'
+]
+
+
+def make_chunk(funding_id, index, text):
+    return {
+        'chunk_id': f'{funding_id}_chunk_{index}',
+        'funding_id': funding_id,
+        'title': f'Programm {funding_id}',
+        'chunk_text': text,
+        'chunk_index': index,
+        'provider': 'Test',
+        'region': '',
+        'funding_area': ''
+    }
+
+
+@pytest.mark.unit
+class TestChunkDeduplicator:
+    """Test near-duplicate detection and collapsing"""
+
+    def test_signature_is_deterministic(self):
+        """Test that identical texts get identical signatures"""
+        dedup = ChunkDeduplicator()
+        assert (dedup.signature(COOKIE_NOTICE) == dedup.signature(COOKIE_NOTICE)).all()
+
+    def test_near_duplicates_are_clustered(self):
+        """Test that small edits still count as duplicates, different texts do not"""
+        dedup = ChunkDeduplicator()
+        variant = COOKIE_NOTICE.replace('Datenschutzerklärung.', 'Datenschutzhinweisen.')
+
+        clusters = dedup.find_clusters([COOKIE_NOTICE, PROGRAM_TEXTS[0], variant, PROGRAM_TEXTS[1]])
+
+        assert [0, 2] in clusters
+        assert [1] in clusters
+        assert [3] in clusters
+
+    def test_boilerplate_collapsed_into_shared_chunk(self):
+        """Test that text repeated across many programs becomes one shared chunk"""
+        chunks = []
+        for i, text in enumerate(PROGRAM_TEXTS):
+            chunks.append(make_chunk(f'F{i}', 0, text))
+            chunks.append(make_chunk(f'F{i}', 1, COOKIE_NOTICE))
+
+        kept, stats = ChunkDeduplicator().deduplicate(chunks)
+
+        assert len(kept) == len(PROGRAM_TEXTS) + 1
+        shared = [c for c in kept if c['funding_id'] == SHARED_FUNDING_ID]
+        assert len(shared) == 1
+        assert shared[0]['duplicate_count'] == len(PROGRAM_TEXTS)
+        # No metadata of the first program on the shared chunk
+        assert shared[0]['title'] == '' and shared[0]['provider'] == ''
+        assert chunks[1]['title'] == 'Programm F0'
+        assert stats['boilerplate_clusters'] == 1
+        assert stats['removed_chunks'] == len(PROGRAM_TEXTS) - 1
+
+    def test_boilerplate_can_be_dropped(self):
+        """Test drop_boilerplate removes all copies"""
+        chunks = [make_chunk(f'F{i}', 0, COOKIE_NOTICE) for i in range(3)]
+        chunks.append(make_chunk('F9', 0, PROGRAM_TEXTS[0]))
+
+        kept, _ = ChunkDeduplicator(drop_boilerplate=True).deduplicate(chunks)
+
+        assert [c['chunk_id'] for c in kept] == ['F9_chunk_0']
+
+    def test_duplicates_within_program_keep_first(self):
+        """Test that a few programs sharing a chunk keep one copy each"""
+        chunks = [
+            make_chunk('A', 0, PROGRAM_TEXTS[0]),
+            make_chunk('A', 1, PROGRAM_TEXTS[0]),
+            make_chunk('B', 0, PROGRAM_TEXTS[0]),
+            make_chunk('B', 1, PROGRAM_TEXTS[2])
+        ]
+
+        kept, stats = ChunkDeduplicator().deduplicate(chunks)
+
+        assert [c['chunk_id'] for c in kept] == ['A_chunk_0', 'B_chunk_0', 'B_chunk_1']
+        assert kept[0]['duplicate_count'] == 2
+        assert stats['boilerplate_clusters'] == 0
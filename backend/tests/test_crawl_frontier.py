@@ -0,0 +1,160 @@
+"""
+Test Suite: Crawl Frontier
+Tests for streaming sitemap discovery, URL scoring and the priority queue
+"""
+
+import asyncio
+import gzip
+import time
+
+import httpx
+import pytest
+
+from scraper_firecrawl.crawl_frontier import CrawlFrontier, UrlScorer
+from scraper_firecrawl.super_scraper import BLACKLIST_KEYWORDS, PROGRAM_KEYWORDS, URL_SCORER
+
+BASE = 'https://www.ministerium.example'
+
+
+def urlset(paths):
+    entries = ''.join(
+        f'<url><loc>{BASE}{path}</loc><image:image><image:loc>{BASE}/bild.jpg</image:loc></image:image></url>'
+        for path in paths
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+        'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">'
+        f'{entries}</urlset>'
+    ).encode()
+
+
+def site(files):
+    """Mock site serving the given {path: bytes}"""
+    def handler(request):
+        if request.url.path in files:
+            return httpx.Response(200, content=files[request.url.path])
+        return httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def discover(frontier, http):
+    async def scenario():
+        async with http:
+            await frontier.discover(http)
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+class TestCrawlFrontier:
+    """Test UrlScorer and CrawlFrontier"""
+
+    def test_scorer_matches_keyword_loops(self):
+        """Test single-pass scoring against the nested keyword loops"""
+        urls = [
+            f'{BASE}/foerderprogramm/antrag-und-bewerbung',
+            f'{BASE}/projekt-foerderung/richtlinie',
+            f'{BASE}/presse/foerderprogramm',
+            f'{BASE}/ueber-uns',
+            f'{BASE}/Grant-Application-Call',
+        ]
+
+        for url in urls:
+            lower = url.lower()
+            if any(keyword in lower for keyword in BLACKLIST_KEYWORDS):
+                expected = None
+            else:
+                expected = sum(1 for keyword in PROGRAM_KEYWORDS if keyword in lower)
+            assert URL_SCORER.score(url) == expected
+
+    def test_scorer_counts_overlapping_prefix_keywords(self):
+        """Test keywords that are prefixes of each other at the same position"""
+        keywords = ['foerder', 'foerderprogramm', 'programm', 'antrag', 'antragsfrist']
+        blacklist = ['news', 'newsletter']
+        scorer = UrlScorer(keywords, blacklist)
+        urls = [
+            f'{BASE}/foerderprogramm/antragsfrist',
+            f'{BASE}/foerderung/antrag',
+            f'{BASE}/newsletter/foerderprogramm',
+            f'{BASE}/programme',
+        ]
+
+        for url in urls:
+            lower = url.lower()
+            if any(keyword in lower for keyword in blacklist):
+                expected = None
+            else:
+                expected = sum(1 for keyword in keywords if keyword in lower)
+            assert scorer.score(url) == expected
+        assert scorer.score(f'{BASE}/foerderprogramm/antragsfrist') == 5
+
+    def test_streams_index_and_gzip_sitemaps(self):
+        """Test robots.txt, sitemap index, .gz sub-sitemaps, dedupe, PDFs first"""
+        http = site({
+            '/robots.txt': f'User-agent: *\nSitemap: {BASE}/sitemaps/index.xml\n'.encode(),
+            '/sitemaps/index.xml': (
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'<sitemap><loc>{BASE}/sitemaps/a.xml</loc></sitemap>'
+                f'<sitemap><loc>{BASE}/sitemaps/b.xml.gz</loc></sitemap>'
+                '</sitemapindex>'
+            ).encode(),
+            '/sitemaps/a.xml': urlset(['/foerderprogramm/antrag', '/impressum', '/aktuelles']),
+            '/sitemaps/b.xml.gz': gzip.compress(urlset([
+                '/foerderprogramm/antrag#bewerbung', '/projekt', '/downloads/richtlinie.pdf'
+            ])),
+            '/sitemap.xml': b'<html>Kein Sitemap</html>',
+        })
+        frontier = CrawlFrontier(BASE, URL_SCORER)
+        discover(frontier, http)
+
+        order = [frontier.pop().url for _ in range(len(frontier))]
+        assert order == [
+            f'{BASE}/downloads/richtlinie.pdf',
+            f'{BASE}/foerderprogramm/antrag',
+            f'{BASE}/projekt',
+        ]
+        assert frontier.stats.sitemaps == 3  # index + 2 sub-sitemaps
+        assert frontier.stats.duplicates == 1
+        assert frontier.stats.pdfs == 1
+
+    def test_seen_set_demotes_fetched_pages(self, tmp_path):
+        """Test that pages fetched in an earlier run queue behind new ones"""
+        seen_path = str(tmp_path / 'ministerium.seen')
+        scorer = UrlScorer(['foerder'])
+
+        first = CrawlFrontier(BASE, scorer, seen_path=seen_path)
+        first.add(f'{BASE}/foerderung-a')
+        first.add(f'{BASE}/foerderung-b')
+
+        async def fetch(url):
+            return None if url.endswith('-b') else f'# {url}'
+
+        results = asyncio.run(first.drain(fetch, limit=5))
+        assert [entry.url for entry, _ in results] == [f'{BASE}/foerderung-a', f'{BASE}/foerderung-b']
+        assert first.save() == 1
+
+        second = CrawlFrontier(BASE, scorer, seen_path=seen_path)
+        second.add(f'{BASE}/foerderung-a')
+        second.add(f'{BASE}/foerderung-b')
+        second.add(f'{BASE}/foerderung-c')
+
+        # Only successful fetches count as seen
+        assert [entry.url for entry in second.peek(3)] == [
+            f'{BASE}/foerderung-b', f'{BASE}/foerderung-c', f'{BASE}/foerderung-a'
+        ]
+
+    def test_large_sitemap_bounded(self):
+        """Test 50k URL sitemap: seconds, capacity-bounded queue"""
+        paths = [f'/seite-{i}' if i % 10 else f'/foerderprogramm-{i}' for i in range(50_000)]
+        http = site({'/sitemap.xml': urlset(paths)})
+        frontier = CrawlFrontier(BASE, URL_SCORER, capacity=1000)
+
+        start = time.monotonic()
+        discover(frontier, http)
+        elapsed = time.monotonic() - start
+
+        assert frontier.stats.sitemap_urls == 50_000
+        assert frontier.stats.candidates == 5_000
+        assert len(frontier) <= 2 * frontier.capacity
+        assert elapsed < 10
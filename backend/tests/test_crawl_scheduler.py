@@ -0,0 +1,105 @@
+"""
+Test Suite: Crawl Scheduler
+Tests for global / per-domain concurrency limits and politeness delay
+"""
+
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+from scraper_firecrawl.crawl_scheduler import DomainScheduler
+
+
+async def fetch_all(scheduler, urls, duration=0.05):
+    """Simulated fetches; records start times and peak concurrency"""
+    loop = asyncio.get_running_loop()
+    starts = defaultdict(list)
+    active = {'total': 0, 'peak': 0}
+    active_per_domain = defaultdict(int)
+    peak_per_domain = defaultdict(int)
+
+    async def fetch(url):
+        domain = scheduler.domain_of(url)
+        async with scheduler.slot(url):
+            starts[domain].append(loop.time())
+            active['total'] += 1
+            active_per_domain[domain] += 1
+            active['peak'] = max(active['peak'], active['total'])
+            peak_per_domain[domain] = max(peak_per_domain[domain], active_per_domain[domain])
+            await asyncio.sleep(duration)
+            active['total'] -= 1
+            active_per_domain[domain] -= 1
+
+    start = loop.time()
+    async with asyncio.TaskGroup() as group:
+        for url in urls:
+            group.create_task(fetch(url))
+    return loop.time() - start, starts, active['peak'], peak_per_domain
+
+
+@pytest.mark.unit
+class TestDomainScheduler:
+    """Test DomainScheduler limits"""
+
+    def test_limits_are_respected(self):
+        """Test global and per-domain concurrency caps"""
+        scheduler = DomainScheduler(max_concurrency=3, per_domain_concurrency=2, min_delay=0)
+        urls = [f'https://site{i % 4}.example/page{i}' for i in range(20)]
+
+        _, starts, peak, peak_per_domain = asyncio.run(fetch_all(scheduler, urls))
+
+        assert peak <= 3
+        assert max(peak_per_domain.values()) <= 2
+        assert sum(len(times) for times in starts.values()) == 20
+
+    def test_min_delay_per_domain(self):
+        """Test spacing of request starts on one domain"""
+        scheduler = DomainScheduler(max_concurrency=10, per_domain_concurrency=10, min_delay=0.05)
+        urls = ['https://ministerium.example/a', 'https://ministerium.example/b', 'https://ministerium.example/c']
+
+        _, starts, _, _ = asyncio.run(fetch_all(scheduler, urls, duration=0))
+        times = sorted(starts['ministerium.example'])
+
+        assert all(later - earlier >= 0.045 for earlier, later in zip(times, times[1:]))
+
+    def test_domains_run_in_parallel(self):
+        """Test that wall time follows the slowest domain, not the sum"""
+        scheduler = DomainScheduler(max_concurrency=10, per_domain_concurrency=1, min_delay=0)
+        urls = [f'https://site{i}.example/' for i in range(5)] * 2
+
+        elapsed, _, _, _ = asyncio.run(fetch_all(scheduler, urls, duration=0.05))
+
+        # 2 sequential fetches per domain (0.1s) instead of 10 (0.5s)
+        assert elapsed < 0.3
+        assert scheduler.stats() == {f'site{i}.example': 2 for i in range(5)}
+
+    def test_task_timeout_excludes_queue_time(self):
+        """Test that waiting for a slot does not count against SCRAPER_TASK_TIMEOUT"""
+        from types import SimpleNamespace
+
+        crawl4ai_scraper = pytest.importorskip('scraper_firecrawl.crawl4ai_scraper')
+
+        class NeverModified:
+            def probe(self, url):
+                return False
+
+        async def scrape_url(url, extract_schema=None):
+            await asyncio.sleep(0.1)
+            return {'success': True, 'url': url}
+
+        scraper = crawl4ai_scraper.Crawl4AIScraper.__new__(crawl4ai_scraper.Crawl4AIScraper)
+        scraper.task_timeout = 0.25
+        scraper.fetch_state = NeverModified()
+        scraper.scrape_url = scrape_url
+        scraper._parse_page_data = lambda page_data, source: {'title': page_data['url']}
+
+        # One slot: the last URL queues 0.2s, its own fetch takes 0.1s
+        scheduler = DomainScheduler(max_concurrency=1, per_domain_concurrency=1, min_delay=0)
+        source = SimpleNamespace(name='Ministerium', schema=None)
+        urls = [f'https://ministerium.example/{i}' for i in range(3)]
+
+        async def run():
+            return await asyncio.gather(*(scraper.process_url(url, source, scheduler) for url in urls))
+
+        assert asyncio.run(run()) == [{'title': url} for url in urls]
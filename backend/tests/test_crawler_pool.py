@@ -0,0 +1,106 @@
+"""
+Test Suite: Crawler Pool
+Tests for browser reuse, recycling after max pages and restart on failure
+"""
+
+import asyncio
+
+import pytest
+
+from scraper_firecrawl.crawler_pool import CrawlerPool, is_browser_failure
+
+
+class FakeCrawler:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+
+def make_pool(size=1, max_pages=50):
+    """Pool with fake crawlers; returns (pool, started crawlers)"""
+    crawlers = []
+
+    async def start():
+        crawler = FakeCrawler(len(crawlers))
+        crawlers.append(crawler)
+        return crawler
+
+    async def stop(crawler):
+        crawler.closed = True
+
+    return CrawlerPool(start, stop, size=size, max_pages=max_pages), crawlers
+
+
+async def use(pool, times=1):
+    used = []
+    for _ in range(times):
+        async with pool.crawler() as crawler:
+            used.append(crawler)
+    return used
+
+
+@pytest.mark.unit
+class TestCrawlerPool:
+    """Test CrawlerPool lifecycle"""
+
+    def test_reuses_crawler(self):
+        """Test that one browser serves many pages"""
+        pool, crawlers = make_pool()
+
+        used = asyncio.run(use(pool, times=10))
+
+        assert len(crawlers) == 1
+        assert all(crawler is crawlers[0] for crawler in used)
+        assert not crawlers[0].closed
+
+    def test_recycles_after_max_pages(self):
+        """Test page cap per browser"""
+        pool, crawlers = make_pool(max_pages=3)
+
+        used = asyncio.run(use(pool, times=7))
+
+        assert [crawler.number for crawler in used] == [0, 0, 0, 1, 1, 1, 2]
+        assert crawlers[0].closed and crawlers[1].closed
+        assert not crawlers[2].closed
+
+    def test_restarts_after_exception(self):
+        """Test that a crashed browser is closed and replaced"""
+        pool, crawlers = make_pool()
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                async with pool.crawler():
+                    raise RuntimeError('Target closed')
+            return await use(pool)
+
+        used = asyncio.run(scenario())
+
+        assert crawlers[0].closed
+        assert used == [crawlers[1]]
+        assert pool.restarted == 1
+
+    def test_concurrent_pages_share_pool(self):
+        """Test pool size bound under concurrency"""
+        pool, crawlers = make_pool(size=2)
+
+        async def page():
+            async with pool.crawler():
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            async with asyncio.TaskGroup() as group:
+                for _ in range(10):
+                    group.create_task(page())
+            await pool.close()
+
+        asyncio.run(scenario())
+
+        assert len(crawlers) == 2
+        assert all(crawler.closed for crawler in crawlers)
+
+    def test_is_browser_failure(self):
+        """Test detection of crash messages"""
+        assert is_browser_failure('Page.goto: Target closed')
+        assert is_browser_failure('Browser has been closed')
+        assert not is_browser_failure('net::ERR_NAME_NOT_RESOLVED')
+        assert not is_browser_failure(None)
@@ -5,12 +5,15 @@ Tests for database connection, queries, and data integrity
 
 import pytest
 import sqlite3
+import threading
 from utils.database_sqlite import (
+    SQLiteDatabaseManager,
     get_db_manager,
     get_db_connection,
     get_db_cursor,
     execute_query,
-    init_sqlite_schema
+    init_sqlite_schema,
+    create_indexes
 )
 
 
@@ -201,6 +204,309 @@ class TestDatabaseTransactions:
             # Should be None if rollback worked (or might exist if insert completed before error)
 
 
+@pytest.mark.unit
+class TestPersistentConnections:
+    """Test per-thread WAL connections"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = SQLiteDatabaseManager(str(tmp_path / 'wal_test.db'))
+        with manager.get_cursor() as cursor:
+            cursor.execute('CREATE TABLE ITEMS (item_id INTEGER PRIMARY KEY, name TEXT)')
+        yield manager
+        manager.close_all()
+
+    def test_wal_mode_enabled(self, manager):
+        """Test that connections use WAL and synchronous=NORMAL"""
+        with manager.get_cursor() as cursor:
+            assert cursor.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert cursor.execute('PRAGMA synchronous').fetchone()[0] == 1
+
+    def test_connection_reused_per_thread(self, manager):
+        """Test one persistent connection per thread"""
+        with manager.get_cursor() as cursor:
+            first = cursor.connection
+        with manager.get_cursor() as cursor:
+            assert cursor.connection is first
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(manager._thread_connection()))
+        thread.start()
+        thread.join()
+
+        assert other[0] is not first
+
+    def test_nested_cursor_rolls_back_to_savepoint(self, manager):
+        """Test that a failing nested block only undoes its own writes"""
+        with manager.get_cursor() as outer:
+            outer.execute("INSERT INTO ITEMS (name) VALUES ('outer')")
+            with pytest.raises(sqlite3.OperationalError):
+                with manager.get_cursor() as inner:
+                    inner.execute("INSERT INTO ITEMS (name) VALUES ('inner')")
+                    inner.execute('INVALID SQL QUERY')
+
+        with manager.get_cursor() as cursor:
+            names = [row['name'] for row in cursor.execute('SELECT name FROM ITEMS')]
+        assert names == ['outer']
+
+    def test_reader_not_blocked_by_writer(self, manager):
+        """Test that reads succeed while another connection holds a write transaction"""
+        writer = manager.get_connection()
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute("INSERT INTO ITEMS (name) VALUES ('pending')")
+
+        result = []
+
+        def read():
+            with manager.get_cursor() as cursor:
+                result.append(cursor.execute('SELECT COUNT(*) FROM ITEMS').fetchone()[0])
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join(timeout=2)
+
+        writer.rollback()
+        writer.close()
+
+        assert result == [0]
+
+
+@pytest.mark.unit
+class TestAsyncDatabaseHelpers:
+    """Test async DB helpers (db_adapter thread pool)"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        from utils import database_sqlite
+        manager = SQLiteDatabaseManager(str(tmp_path / 'async_test.db'))
+        with manager.get_cursor() as cursor:
+            cursor.execute('CREATE TABLE ITEMS (item_id INTEGER PRIMARY KEY, name TEXT)')
+        monkeypatch.setattr(database_sqlite, '_db_manager', manager)
+        yield manager
+        manager.close_all()
+
+    def test_execute_and_fetch(self, manager):
+        """Test db_execute rowcount and db_fetch_all / db_fetch_one results"""
+        import asyncio
+        from utils.db_adapter import db_execute, db_fetch_all, db_fetch_one
+
+        async def run():
+            inserted = await db_execute("INSERT INTO ITEMS (name) VALUES ('a'), ('b')")
+            rows = await db_fetch_all('SELECT item_id, name FROM ITEMS ORDER BY item_id', as_dicts=True)
+            row = await db_fetch_one('SELECT name FROM ITEMS WHERE name = ?', ('b',), as_dict=True)
+            missing = await db_fetch_one('SELECT name FROM ITEMS WHERE name = ?', ('x',))
+            return inserted, rows, row, missing
+
+        inserted, rows, row, missing = asyncio.run(run())
+
+        assert inserted == 2
+        assert [r['name'] for r in rows] == ['a', 'b']
+        assert row == {'name': 'b'}
+        assert missing is None
+
+    def test_calls_run_off_event_loop_thread(self, manager):
+        """Test that run_db executes in the DB thread pool"""
+        import asyncio
+        from utils.db_adapter import run_db
+
+        async def run():
+            return await run_db(lambda: threading.current_thread().name)
+
+        assert asyncio.run(run()).startswith('db')
+
+
+@pytest.mark.unit
+class TestQueryPlans:
+    """Test that the hot queries use the schema indexes"""
+
+    @pytest.fixture
+    def cursor(self, tmp_path, monkeypatch):
+        from utils import database_sqlite
+        manager = SQLiteDatabaseManager(str(tmp_path / 'plan_test.db'))
+        monkeypatch.setattr(database_sqlite, '_db_manager', manager)
+        init_sqlite_schema()
+        with manager.get_cursor() as cursor:
+            yield cursor
+        manager.close_all()
+
+    def query_plan(self, cursor, query, params=()):
+        rows = cursor.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()
+        return ' | '.join(row['detail'] for row in rows)
+
+    @pytest.mark.parametrize('query,params,index', [
+        (
+            "SELECT * FROM FUNDING_OPPORTUNITIES WHERE (application_deadline IS NULL OR application_deadline > date('now')) "
+            'ORDER BY application_deadline ASC, funding_id ASC LIMIT ? OFFSET ?',
+            (50, 0),
+            'idx_funding_deadline_keyset'
+        ),
+        (
+            "SELECT * FROM FUNDING_OPPORTUNITIES WHERE (application_deadline IS NULL OR application_deadline > date('now')) "
+            'AND (application_deadline, funding_id) > (?, ?) '
+            'ORDER BY application_deadline ASC, funding_id ASC LIMIT ? OFFSET ?',
+            ('2030-01-01', 'F1', 50, 0),
+            'idx_funding_deadline_keyset ((application_deadline,funding_id)>(?,?))'
+        ),
+        (
+            "SELECT * FROM FUNDING_OPPORTUNITIES WHERE provider = ? AND (application_deadline IS NULL OR application_deadline > date('now')) "
+            'ORDER BY application_deadline ASC, funding_id ASC LIMIT ? OFFSET ?',
+            ('BMBF', 50, 0),
+            'idx_funding_provider_keyset'
+        ),
+        (
+            'SELECT funding_id FROM FUNDING_OPPORTUNITIES WHERE source_url = ?',
+            ('https://example.org',),
+            'idx_funding_source_url_unique'
+        ),
+        (
+            'SELECT * FROM APPLICATIONS WHERE school_id = ? ORDER BY created_at DESC, application_id DESC',
+            ('school-1',),
+            'idx_applications_school_keyset'
+        ),
+        (
+            'SELECT * FROM APPLICATIONS WHERE school_id = ? AND (created_at, application_id) < (?, ?) '
+            'ORDER BY created_at DESC, application_id DESC LIMIT ?',
+            ('school-1', '2030-01-01', 'A1', 20),
+            'idx_applications_school_keyset (school_id=? AND (created_at,application_id)<(?,?))'
+        ),
+        (
+            'SELECT * FROM APPLICATION_DRAFTS WHERE application_id = ? ORDER BY created_at DESC',
+            ('app-1',),
+            'idx_drafts_application_created'
+        ),
+    ])
+    def test_hot_query_uses_index(self, cursor, query, params, index):
+        """Test index usage without a full scan or extra sort step"""
+        plan = self.query_plan(cursor, query, params)
+
+        assert index in plan
+        assert 'USE TEMP B-TREE' not in plan
+
+    def test_create_indexes_is_idempotent(self, cursor):
+        """Test that the migration can run on an existing database"""
+        create_indexes(cursor)
+        create_indexes(cursor)
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'")
+        names = {row['name'] for row in cursor.fetchall()}
+        assert 'idx_funding_source_url_unique' in names
+        assert 'idx_funding_source_url' not in names
+        assert 'idx_applications_school_keyset' in names
+        assert 'idx_applications_school_created' not in names
+
+
+@pytest.mark.unit
+class TestFundingUpsert:
+    """Test the scraper bulk upsert keyed by source_url"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        from utils import database_sqlite
+        manager = SQLiteDatabaseManager(str(tmp_path / 'upsert_test.db'))
+        monkeypatch.setattr(database_sqlite, '_db_manager', manager)
+        init_sqlite_schema()
+        yield manager
+        manager.close_all()
+
+    @staticmethod
+    def funding(url, title='Programm', text='Förderung für Schulen.'):
+        return {
+            'source_url': url, 'title': title, 'cleaned_text': text,
+            'provider': 'Stiftung', 'region': 'Bayern', 'funding_area': 'MINT'
+        }
+
+    def test_insert_then_update(self, manager):
+        """Test that a second run updates by source_url instead of duplicating"""
+        from utils.funding_upsert import upsert_funding_opportunities
+
+        first = upsert_funding_opportunities([self.funding('https://a.example'), self.funding('https://b.example')])
+        second = upsert_funding_opportunities([
+            self.funding('https://a.example', title='Neuer Titel'),
+            self.funding('https://c.example')
+        ])
+
+        assert (first.inserted, first.updated) == (2, 0)
+        assert (second.inserted, second.updated) == (1, 1)
+
+        with manager.get_cursor() as cursor:
+            cursor.execute('SELECT source_url, title, summary FROM FUNDING_OPPORTUNITIES ORDER BY source_url')
+            rows = [tuple(row) for row in cursor.fetchall()]
+        assert rows == [
+            ('https://a.example', 'Neuer Titel', 'Förderung für Schulen.'),
+            ('https://b.example', 'Programm', 'Förderung für Schulen.'),
+            ('https://c.example', 'Programm', 'Förderung für Schulen.'),
+        ]
+
+    def test_row_errors_do_not_abort_the_batch(self, manager):
+        """Test that invalid rows are reported by index and the rest is saved"""
+        from utils.funding_upsert import upsert_funding_opportunities
+
+        result = upsert_funding_opportunities([
+            self.funding('https://a.example'),
+            {'source_url': 'https://broken.example'},
+            self.funding('https://b.example', title=None),
+            self.funding('https://c.example'),
+        ])
+
+        assert result.inserted == 2
+        assert [index for index, _ in result.errors] == [1, 2]
+        assert 'NOT NULL' in result.errors[1][1]
+
+    @staticmethod
+    def insert_duplicates(cursor):
+        cursor.execute('DROP INDEX idx_funding_source_url_unique')
+        cursor.executemany(
+            """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, source_url, updated_at)
+            VALUES (?, 'Programm', 'https://dup.example', ?)""",
+            [('OLD', '2020-01-01'), ('NEW', '2025-01-01')]
+        )
+        cursor.execute(
+            """INSERT INTO APPLICATIONS (application_id, school_id, user_id, funding_id, title)
+            VALUES ('A1', 'S1', 'U1', 'OLD', 'Antrag')"""
+        )
+
+    def test_startup_keeps_duplicates_with_fallback_index(self, manager):
+        """Test that create_indexes never deletes rows, it falls back to a plain index"""
+        with manager.get_cursor() as cursor:
+            self.insert_duplicates(cursor)
+
+        init_sqlite_schema()
+        init_sqlite_schema()
+
+        with manager.get_cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES WHERE source_url = 'https://dup.example'")
+            assert cursor.fetchone()[0] == 2
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_funding_source_url%'")
+            assert [row[0] for row in cursor.fetchall()] == ['idx_funding_source_url']
+
+    def test_merge_migration_backs_up_and_records(self, manager, tmp_path, monkeypatch):
+        """Test run_index_migration --merge-duplicates: backup, record, unique index"""
+        import json
+        import run_index_migration
+
+        with manager.get_cursor() as cursor:
+            self.insert_duplicates(cursor)
+        monkeypatch.setattr(run_index_migration, 'USE_SQLITE', True)
+
+        run_index_migration.run_migration(merge=True)
+
+        with manager.get_cursor() as cursor:
+            cursor.execute("SELECT funding_id FROM FUNDING_OPPORTUNITIES WHERE source_url = 'https://dup.example'")
+            assert [row[0] for row in cursor.fetchall()] == ['NEW']
+            cursor.execute("SELECT funding_id FROM APPLICATIONS WHERE application_id = 'A1'")
+            assert cursor.fetchone()[0] == 'NEW'
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_funding_source_url%'")
+            assert [row[0] for row in cursor.fetchall()] == ['idx_funding_source_url_unique']
+
+        backup, = [path for path in tmp_path.iterdir() if path.name.endswith('.bak')]
+        with sqlite3.connect(backup) as connection:
+            assert connection.execute('SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES').fetchone()[0] == 2
+        record = json.loads((tmp_path / f'{backup.name}.merged.json').read_text(encoding='utf-8'))
+        assert record == [{
+            'source_url': 'https://dup.example', 'kept_funding_id': 'NEW', 'removed_funding_id': 'OLD'
+        }]
+
+
 @pytest.mark.unit
 class TestDatabaseConstraints:
     """Test database constraints and foreign keys"""
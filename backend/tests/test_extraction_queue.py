@@ -0,0 +1,142 @@
+"""
+Test Suite: LLM Extraction Queue
+Tests for concurrent extraction, retries, checkpoint resume and stats
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from scraper_firecrawl import llm_extractor
+from scraper_firecrawl.extraction_queue import ExtractionJob, ExtractionQueue
+from utils.llm_cache import LLMCache
+
+
+def make_queue(handler, **kwargs):
+    # LLM cache off: every test sends its requests
+    return ExtractionQueue(cache=LLMCache(enabled=False), transport=httpx.MockTransport(handler), **kwargs)
+
+
+def completion(title, prompt_tokens=100, completion_tokens=20):
+    return httpx.Response(200, json={
+        'choices': [{'message': {'content': json.dumps({'title': title})}}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens}
+    })
+
+
+def title_of(request):
+    """Echo the page text (last prompt line before the instructions) as title"""
+    prompt = json.loads(request.read())['messages'][1]['content']
+    return prompt.split('TEXT ZUR ANALYSE:')[1].strip().splitlines()[0]
+
+
+def jobs(count):
+    return [ExtractionJob(f'https://stiftung.example/{i}', f'Programm {i}', f'Seite {i}') for i in range(count)]
+
+
+@pytest.mark.unit
+class TestExtractionQueue:
+    """Test ExtractionQueue"""
+
+    @pytest.fixture(autouse=True)
+    def api_key(self, monkeypatch):
+        monkeypatch.setattr(llm_extractor, 'DEEPSEEK_API_KEY', 'test-key')
+
+    @staticmethod
+    def run(queue, items):
+        return asyncio.run(queue.run(items))
+
+    def test_concurrency_scales_wall_time(self):
+        """Test bounded concurrency and throughput stats"""
+        active = {'now': 0, 'peak': 0}
+
+        async def handler(request):
+            active['now'] += 1
+            active['peak'] = max(active['peak'], active['now'])
+            await asyncio.sleep(0.05)
+            active['now'] -= 1
+            return completion(title_of(request))
+
+        queue = make_queue(handler, concurrency=4)
+        start = time.monotonic()
+        results = self.run(queue, jobs(8))
+        elapsed = time.monotonic() - start
+
+        assert results['https://stiftung.example/3'] == {'title': 'Programm 3'}
+        assert active['peak'] == 4
+        # 2 rounds of 4 instead of 8 sequential requests
+        assert elapsed < 0.3
+        assert queue.stats.completed == 8
+        assert queue.stats.prompt_tokens == 800
+        assert queue.stats.tokens_per_minute > 0 and queue.stats.items_per_minute > 0
+
+    def test_retries_transient_failures(self):
+        """Test retry on 503 / timeouts, no retry on 400"""
+        calls = {}
+
+        def handler(request):
+            title = title_of(request)
+            calls[title] = calls.get(title, 0) + 1
+            if title == 'Programm 0' and calls[title] == 1:
+                return httpx.Response(503)
+            if title == 'Programm 1' and calls[title] == 1:
+                raise httpx.ReadTimeout('timeout', request=request)
+            if title == 'Programm 2':
+                return httpx.Response(400, text='bad request')
+            return completion(title)
+
+        queue = make_queue(handler, concurrency=2, backoff=0.01)
+        results = self.run(queue, jobs(3))
+
+        assert results['https://stiftung.example/0'] == {'title': 'Programm 0'}
+        assert results['https://stiftung.example/1'] == {'title': 'Programm 1'}
+        assert results['https://stiftung.example/2'] is None
+        assert calls == {'Programm 0': 2, 'Programm 1': 2, 'Programm 2': 1}
+        assert (queue.stats.retries, queue.stats.failed) == (2, 1)
+
+    def test_non_json_body_fails_only_that_item(self):
+        """Test that a 200 with a non-JSON body marks the item failed, the run continues"""
+        def handler(request):
+            title = title_of(request)
+            if title == 'Programm 1':
+                return httpx.Response(200, text='<html>Bad Gateway</html>')
+            return completion(title)
+
+        queue = make_queue(handler, concurrency=2)
+        results = self.run(queue, jobs(3))
+
+        assert results['https://stiftung.example/1'] is None
+        assert results['https://stiftung.example/0'] == {'title': 'Programm 0'}
+        assert results['https://stiftung.example/2'] == {'title': 'Programm 2'}
+        assert (queue.stats.completed, queue.stats.failed) == (2, 1)
+
+    def test_resume_skips_finished_items(self, tmp_path):
+        """Test checkpoint: finished items are not extracted again"""
+        checkpoint = str(tmp_path / 'run.jsonl')
+        calls = []
+        fail = {'Programm 2'}
+
+        def handler(request):
+            title = title_of(request)
+            calls.append(title)
+            if title in fail:
+                return httpx.Response(400)
+            return completion(title)
+
+        first = make_queue(handler, concurrency=2, checkpoint=checkpoint)
+        self.run(first, jobs(3))
+        assert first.stats.failed == 1
+
+        fail.clear()
+        calls.clear()
+        second = make_queue(handler, concurrency=2, checkpoint=checkpoint)
+        results = self.run(second, jobs(3))
+
+        assert calls == ['Programm 2']
+        assert second.stats.resumed == 2
+        assert results['https://stiftung.example/0'] == {'title': 'Programm 0'}
+        # Clean finish removes the checkpoint
+        assert not (tmp_path / 'run.jsonl').exists()
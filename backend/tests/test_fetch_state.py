@@ -0,0 +1,179 @@
+"""
+Test Suite: Fetch State
+Tests for conditional fetch / content-hash skipping of unchanged pages
+"""
+
+import pytest
+
+from utils.database_sqlite import SQLiteDatabaseManager, init_sqlite_schema
+from utils.fetch_state import FetchStateStore, content_hash
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+@pytest.mark.unit
+class TestFetchState:
+    """Test FetchStateStore"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        from utils import database_sqlite
+        manager = SQLiteDatabaseManager(str(tmp_path / 'fetch_state_test.db'))
+        monkeypatch.setattr(database_sqlite, '_db_manager', manager)
+        init_sqlite_schema()
+        yield manager
+        manager.close_all()
+
+    @pytest.fixture
+    def responses(self, monkeypatch):
+        """Queued origin responses; records the request headers"""
+        queue, sent = [], []
+
+        def fake_get(url, headers=None, **kwargs):
+            sent.append(headers)
+            return queue.pop(0)
+
+        monkeypatch.setattr('utils.fetch_state.requests.get', fake_get)
+        return queue, sent
+
+    def test_content_hash_ignores_volatile_parts(self):
+        """Test normalization of whitespace and link query strings"""
+        first = 'Förderung  für\nSchulen [Antrag](/antrag.pdf?v=1)'
+        second = 'Förderung für Schulen [Antrag](/antrag.pdf?v=2)\n'
+
+        assert content_hash(first) == content_hash(second)
+        assert content_hash(first) != content_hash('Förderung für Kitas')
+
+    def test_unchanged_only_after_flush(self, manager):
+        """Test that a page counts as processed only once flushed"""
+        url = 'https://stiftung.example/programm'
+
+        store = FetchStateStore(force_refresh=False)
+        store.remember(url, 'Inhalt')
+        assert FetchStateStore(force_refresh=False).is_unchanged(url, 'Inhalt') is False
+
+        assert store.flush() == 1
+        next_run = FetchStateStore(force_refresh=False)
+        assert next_run.is_unchanged(url, 'Inhalt') is True
+        assert next_run.is_unchanged(url, 'Neuer Inhalt') is False
+        assert FetchStateStore(force_refresh=True).is_unchanged(url, 'Inhalt') is False
+
+    def test_forget_drops_pending_state(self, manager):
+        """Test that failed DB writes are retried next run"""
+        url = 'https://stiftung.example/programm'
+        store = FetchStateStore(force_refresh=False)
+        store.remember(url, 'Inhalt')
+        store.forget(url)
+
+        assert store.flush() == 0
+
+    def test_probe_sends_conditional_request(self, manager, responses):
+        """Test ETag learning, If-None-Match and 304 skipping"""
+        queue, sent = responses
+        url = 'https://ministerium.example/foerderung'
+
+        first_run = FetchStateStore(force_refresh=False)
+        queue.append(FakeResponse(200, {'ETag': '"v1"', 'Last-Modified': 'Mon, 19 Oct 2026 08:00:00 GMT'}))
+        assert first_run.probe(url) is False
+        first_run.remember(url, 'Inhalt')
+        first_run.flush()
+
+        next_run = FetchStateStore(force_refresh=False)
+        queue.append(FakeResponse(304))
+        assert next_run.probe(url) is True
+        assert sent[-1] == {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Mon, 19 Oct 2026 08:00:00 GMT'
+        }
+        assert next_run.not_modified == 1
+
+    def test_failed_fetch_keeps_old_validators(self, manager, responses):
+        """Test that a changed page whose fetch fails is fetched again next run"""
+        queue, sent = responses
+        url = 'https://ministerium.example/foerderung'
+        other = 'https://ministerium.example/andere-seite'
+
+        first_run = FetchStateStore(force_refresh=False)
+        queue.append(FakeResponse(200, {'ETag': '"v1"'}))
+        first_run.probe(url)
+        first_run.remember(url, 'Inhalt v1')
+        first_run.flush()
+
+        # Page changed (v2), its fetch fails; the next URL flushes everything
+        second_run = FetchStateStore(force_refresh=False)
+        queue.append(FakeResponse(200, {'ETag': '"v2"'}))
+        assert second_run.probe(url) is False
+        second_run.remember(other, 'Andere Seite')
+        assert second_run.flush() == 1
+
+        third_run = FetchStateStore(force_refresh=False)
+        assert third_run.get(url).etag == '"v1"'
+        queue.append(FakeResponse(200, {'ETag': '"v2"'}))
+        assert third_run.probe(url) is False
+        assert sent[-1] == {'If-None-Match': '"v1"'}
+
+        # Extracted this time: v2 is stored with the new hash
+        third_run.remember(url, 'Inhalt v2')
+        third_run.flush()
+        assert FetchStateStore(force_refresh=False).get(url).etag == '"v2"'
+
+    def test_probe_skipped_without_validators(self, manager, responses):
+        """Test that origins without ETag/Last-Modified fall back to hashing"""
+        queue, sent = responses
+        url = 'https://ministerium.example/ohne-etag'
+
+        store = FetchStateStore(force_refresh=False)
+        queue.append(FakeResponse(200))
+        store.probe(url)
+        store.remember(url, 'Inhalt')
+        store.flush()
+
+        assert FetchStateStore(force_refresh=False).probe(url) is False
+        assert len(sent) == 1
+
+    def test_failed_extraction_is_not_remembered(self, manager, monkeypatch):
+        """Test that a page whose LLM extraction fails is processed again next run"""
+        from scraper_firecrawl import firecrawl_scraper
+        from scraper_firecrawl.funding_sources import FundingSource
+
+        url = 'https://stiftung.example/programm'
+        page = {'success': True, 'data': {'markdown': 'Förderprogramm für Schulen. ' * 5, 'metadata': {'sourceURL': url}}}
+        source = FundingSource('Stiftung', 'Stiftung', 'Bundesweit', 'Bildung', [url], {})
+
+        def timeout(*args):
+            raise TimeoutError('DeepSeek timeout')
+
+        scraper = firecrawl_scraper.FirecrawlScraper()
+        monkeypatch.setattr(firecrawl_scraper, 'extract_with_deepseek', timeout)
+        with pytest.raises(TimeoutError):
+            scraper._parse_page_data(page, source)
+        assert scraper.fetch_state.flush() == 0
+
+        monkeypatch.setattr(firecrawl_scraper, 'extract_with_deepseek', lambda *args: {'title': 'Programm'})
+        assert scraper._parse_page_data(page, source)['title'] == 'Programm'
+        assert scraper.fetch_state.flush() == 1
+
+    def test_flush_selected_urls(self, manager):
+        """Test that a per-URL flush leaves pages still in extraction pending"""
+        saved, in_flight = 'https://stiftung.example/a', 'https://stiftung.example/b'
+        store = FetchStateStore(force_refresh=False)
+        store.remember(saved, 'Programm A')
+        store.remember(in_flight, 'Programm B')
+
+        assert store.flush(urls=[saved]) == 1
+        next_run = FetchStateStore(force_refresh=False)
+        assert next_run.is_unchanged(saved, 'Programm A')
+        assert not next_run.is_unchanged(in_flight, 'Programm B')
+
+        store.forget(in_flight)
+        assert store.flush() == 0
@@ -0,0 +1,104 @@
+"""
+Test Suite: Firecrawl Client
+Tests for token-bucket rate limiting, 429 backoff and concurrent scraping
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from scraper_firecrawl.firecrawl_client import FirecrawlClient, FirecrawlError, TokenBucket
+
+
+def make_client(handler, **kwargs):
+    kwargs.setdefault('requests_per_minute', 6000)
+    kwargs.setdefault('backoff', 0.01)
+    return FirecrawlClient('http://firecrawl.test', transport=httpx.MockTransport(handler), **kwargs)
+
+
+def markdown_response(request):
+    url = request.read().decode()
+    return httpx.Response(200, json={'success': True, 'data': {'markdown': f'# {url}'}})
+
+
+@pytest.mark.unit
+class TestFirecrawlClient:
+    """Test FirecrawlClient"""
+
+    def test_token_bucket_limits_rate(self):
+        """Test that requests beyond the burst are spaced by the rate"""
+        async def scenario():
+            bucket = TokenBucket(rate=50, capacity=2)
+            start = time.monotonic()
+            for _ in range(6):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        # 2 immediately, 4 more at 50/s
+        assert asyncio.run(scenario()) >= 0.07
+
+    def test_retries_after_429(self):
+        """Test Retry-After handling on rate limit responses"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={'Retry-After': '0.05'})
+            return markdown_response(request)
+
+        async def scenario():
+            async with make_client(handler) as client:
+                start = time.monotonic()
+                markdown = await client.scrape_markdown('https://stiftung.example')
+                return markdown, time.monotonic() - start, client.retries
+
+        markdown, elapsed, retries = asyncio.run(scenario())
+
+        assert markdown.startswith('# ')
+        assert len(calls) == 2 and retries == 1
+        assert elapsed >= 0.05
+
+    def test_gives_up_on_client_errors(self):
+        """Test that 4xx (other than 429) is not retried"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, json={'error': 'bad url'})
+
+        async def scenario():
+            async with make_client(handler) as client:
+                with pytest.raises(FirecrawlError) as error:
+                    await client.post('/v1/scrape', {'url': 'nope'})
+                return error.value.status_code, await client.scrape_markdown('nope')
+
+        status_code, markdown = asyncio.run(scenario())
+
+        assert status_code == 400
+        assert markdown is None
+        assert len(calls) == 2
+
+    def test_scrape_many_runs_concurrently(self):
+        """Test concurrent subpage fetches, results in input order"""
+        active = {'now': 0, 'peak': 0}
+
+        async def handler(request):
+            active['now'] += 1
+            active['peak'] = max(active['peak'], active['now'])
+            await asyncio.sleep(0.02)
+            active['now'] -= 1
+            return markdown_response(request)
+
+        urls = [f'https://site{i}.example/foerderung' for i in range(6)]
+
+        async def scenario():
+            async with make_client(handler, max_connections=4) as client:
+                return await client.scrape_many(urls)
+
+        pages = asyncio.run(scenario())
+
+        assert [url in page for url, page in zip(urls, pages)] == [True] * 6
+        assert 1 < active['peak'] <= 4
@@ -3,6 +3,8 @@ Test Suite: Funding Opportunities
 Tests for funding list, detail, search, and filters
 """
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -167,6 +169,422 @@ class TestFundingSearch:
         assert isinstance(response.json(), list)
 
 
+@pytest.fixture
+def fts_programs(client: TestClient):
+    """Inserts two searchable programs into the test database"""
+    from utils.database_sqlite import get_db_cursor
+
+    programs = [
+        ('fts-test-tablets', 'Tablets für Grundschulen', 'Digitalstiftung',
+         'Die Stiftung fördert die Anschaffung von Tablets und Lernsoftware für den Unterricht.'),
+        ('fts-test-garten', 'Schulgarten-Programm', 'Umweltstiftung',
+         'Gefördert werden Schulgärten und Umweltbildung. Tablets sind nicht förderfähig.'),
+    ]
+    with get_db_cursor() as cursor:
+        cursor.executemany(
+            """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider, cleaned_text, application_deadline)
+            VALUES (?, ?, ?, ?, date('now', '+90 days'))""",
+            programs
+        )
+
+    yield [program[0] for program in programs]
+
+    with get_db_cursor() as cursor:
+        cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id LIKE 'fts-test-%'")
+
+
+@pytest.mark.unit
+class TestFundingFullTextSearch:
+    """Test q= full-text search (FTS5, BM25, snippets)"""
+
+    def test_search_ranks_by_relevance(self, client: TestClient, fts_programs):
+        """Test that the title match ranks first and results carry score + snippet"""
+        response = client.get('/api/v1/funding/?q=Tablets')
+
+        assert response.status_code == 200
+        ids = [item['funding_id'] for item in response.json()]
+        assert ids[:2] == ['fts-test-tablets', 'fts-test-garten']
+
+        first = response.json()[0]
+        assert first['score'] > response.json()[1]['score']
+        assert '<mark>' in first['snippet']
+
+    def test_search_prefix_and_umlauts(self, client: TestClient, fts_programs):
+        """Test prefix matching and diacritic folding"""
+        response = client.get('/api/v1/funding/?q=schulgarten')
+
+        assert response.status_code == 200
+        assert [item['funding_id'] for item in response.json()] == ['fts-test-garten']
+
+    def test_search_all_terms_required(self, client: TestClient, fts_programs):
+        """Test that all search terms must match"""
+        response = client.get('/api/v1/funding/?q=Tablets Lernsoftware')
+
+        assert [item['funding_id'] for item in response.json()] == ['fts-test-tablets']
+
+    def test_search_ignores_query_syntax(self, client: TestClient, fts_programs):
+        """Test that FTS operators in user input do not cause errors"""
+        response = client.get('/api/v1/funding/?q="Tablets" OR -(NEAR*')
+
+        assert response.status_code == 200
+
+    def test_index_follows_updates_and_deletes(self, client: TestClient, fts_programs):
+        """Test that triggers keep the index in sync"""
+        from utils.database_sqlite import get_db_cursor
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE FUNDING_OPPORTUNITIES SET title = 'Robotik AG' WHERE funding_id = 'fts-test-garten'"
+            )
+        response = client.get('/api/v1/funding/?q=Robotik')
+        assert [item['funding_id'] for item in response.json()] == ['fts-test-garten']
+
+        with get_db_cursor() as cursor:
+            cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id = 'fts-test-garten'")
+        response = client.get('/api/v1/funding/?q=Robotik')
+        assert response.json() == []
+
+    def test_index_survives_rowid_changes(self, client: TestClient, fts_programs):
+        """Test that search joins on funding_id, not the implicit rowid (e.g. after VACUUM)"""
+        from utils.database_sqlite import get_db_cursor
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE FUNDING_OPPORTUNITIES SET rowid = rowid + 100000 WHERE funding_id LIKE 'fts-test-%'"
+            )
+        response = client.get('/api/v1/funding/?q=Lernsoftware')
+        assert [item['funding_id'] for item in response.json()] == ['fts-test-tablets']
+
+        with get_db_cursor() as cursor:
+            cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id = 'fts-test-tablets'")
+        response = client.get('/api/v1/funding/?q=Lernsoftware')
+        assert response.json() == []
+
+    def test_search_covers_region_and_funding_area(self, client: TestClient, fts_programs):
+        """Test that q= matches region and funding_area like the Oracle multi-column index"""
+        from utils.database_sqlite import get_db_cursor
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE FUNDING_OPPORTUNITIES SET region = 'Brandenburg', funding_area = 'Umweltbildung' "
+                "WHERE funding_id = 'fts-test-tablets'"
+            )
+        for q in ('Brandenburg', 'Umweltbildung'):
+            response = client.get(f'/api/v1/funding/?q={q}')
+            assert 'fts-test-tablets' in [item['funding_id'] for item in response.json()]
+
+    def test_match_query_building(self):
+        """Test conversion of user input to safe MATCH / CONTAINS expressions"""
+        from utils.fulltext import fts5_match_query, oracle_contains_query
+
+        assert fts5_match_query('Digitalisierung  "Schule" -x') == '"digitalisierung"* "schule"* "x"*'
+        assert fts5_match_query('!!!') == ''
+        assert oracle_contains_query('Tablets Schule') == '{tablets} AND {schule}'
+
+
+@pytest.mark.unit
+class TestFundingListProjection:
+    """Test that list responses carry a short summary instead of the full text"""
+
+    def test_list_has_summary_not_cleaned_text(self, client: TestClient):
+        """Test the lean list projection and the full text on the detail endpoint"""
+        from utils.database_sqlite import get_db_cursor
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider, cleaned_text)
+                VALUES ('summary-test-2', 'Programm', 'Summary-Stiftung', '## Ziel\nDie Stiftung fördert Lesepaten.')"""
+            )
+        try:
+            item = client.get('/api/v1/funding/?provider=Summary-Stiftung').json()[0]
+
+            assert 'cleaned_text' not in item
+            # No precomputed summary: falls back to the start of the text
+            assert 'Die Stiftung fördert' in item['summary']
+
+            detail = client.get('/api/v1/funding/summary-test-2').json()
+            assert detail['cleaned_text'].endswith('Die Stiftung fördert Lesepaten.')
+        finally:
+            with get_db_cursor() as cursor:
+                cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id = 'summary-test-2'")
+
+    def test_summary_is_bounded(self, client: TestClient):
+        """Test that long markdown is reduced to a short preview"""
+        from utils.database_sqlite import get_db_cursor
+        from utils.summary import make_summary, SUMMARY_MAX_CHARS
+
+        cleaned_text = '# Programm\n\n' + 'Förderung für **Schulen** [mehr](https://example.org). ' * 2000
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider, cleaned_text, summary)
+                VALUES ('summary-test-1', 'Programm', 'Summary-Stiftung', ?, ?)""",
+                (cleaned_text, make_summary(cleaned_text))
+            )
+        try:
+            response = client.get('/api/v1/funding/?provider=Summary-Stiftung')
+            summary = response.json()[0]['summary']
+
+            assert len(summary) <= SUMMARY_MAX_CHARS
+            assert summary.startswith('Förderung für Schulen mehr.')
+            assert len(response.content) < len(cleaned_text) / 50
+        finally:
+            with get_db_cursor() as cursor:
+                cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id = 'summary-test-1'")
+
+    def test_make_summary(self):
+        """Test markdown stripping and word-boundary truncation"""
+        from utils.summary import make_summary
+
+        assert make_summary(None) is None
+        assert make_summary('## Nur Überschrift') is None
+        assert make_summary('- Punkt *eins*\n- ![Bild](x.png) Punkt zwei') == 'Punkt eins Punkt zwei'
+        assert make_summary('Alpha Beta Gamma Delta', max_chars=12) == 'Alpha Beta…'
+
+
+@pytest.fixture
+def paging_programs(client: TestClient):
+    """Inserts programs of one provider, including equal and missing deadlines"""
+    from utils.database_sqlite import get_db_cursor
+
+    deadlines = [None, None, '+30 days', '+30 days', '+30 days', '+60 days', '+90 days']
+    with get_db_cursor() as cursor:
+        for i, deadline in enumerate(deadlines):
+            cursor.execute(
+                """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider, application_deadline)
+                VALUES (?, ?, 'Paging-Stiftung', CASE WHEN ? IS NULL THEN NULL ELSE date('now', ?) END)""",
+                (f'page-test-{i}', f'Programm {i}', deadline, deadline)
+            )
+
+    yield len(deadlines)
+
+    with get_db_cursor() as cursor:
+        cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id LIKE 'page-test-%'")
+
+
+@pytest.mark.unit
+class TestFundingKeysetPagination:
+    """Test cursor pagination and total counts"""
+
+    def test_cursor_pages_cover_all_rows_once(self, client: TestClient, paging_programs):
+        """Test that following X-Next-Cursor returns every row exactly once, in order"""
+        seen = []
+        url = '/api/v1/funding/?provider=Paging-Stiftung&limit=3'
+        cursor = None
+
+        for _ in range(10):
+            response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+            assert response.status_code == 200
+            seen.extend(item['funding_id'] for item in response.json())
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        full = client.get('/api/v1/funding/?provider=Paging-Stiftung&limit=50').json()
+        assert seen == [item['funding_id'] for item in full]
+        assert len(seen) == paging_programs
+
+    def test_last_page_has_no_cursor(self, client: TestClient, paging_programs):
+        """Test that a short page ends the pagination"""
+        response = client.get('/api/v1/funding/?provider=Paging-Stiftung&limit=50')
+
+        assert 'X-Next-Cursor' not in response.headers
+
+    def test_total_count(self, client: TestClient, paging_programs):
+        """Test X-Total-Count only when requested"""
+        response = client.get('/api/v1/funding/?provider=Paging-Stiftung&limit=2&include_total=true')
+        assert response.headers['X-Total-Count'] == str(paging_programs)
+
+        response = client.get('/api/v1/funding/?provider=Paging-Stiftung&limit=2')
+        assert 'X-Total-Count' not in response.headers
+
+    def test_invalid_cursor(self, client: TestClient):
+        """Test that a tampered cursor is rejected"""
+        response = client.get('/api/v1/funding/?cursor=not-a-cursor')
+
+        assert response.status_code == 400
+
+    def test_cursor_scope_is_checked(self):
+        """Test that a cursor of another endpoint is rejected"""
+        from fastapi import HTTPException
+        from api.pagination import encode_cursor, decode_cursor
+
+        token = encode_cursor('applications', {'created_at': '2026-01-01', 'id': 'A'})
+
+        assert decode_cursor('applications', token)['id'] == 'A'
+        with pytest.raises(HTTPException):
+            decode_cursor('funding', token)
+
+
+@pytest.mark.unit
+class TestFundingResponseCache:
+    """Test the funding response cache (ETag, Last-Modified, 304)"""
+
+    def test_etag_and_not_modified(self, client: TestClient, paging_programs):
+        """Test validators on list responses and 304 on a matching If-None-Match"""
+        url = '/api/v1/funding/?provider=Paging-Stiftung&limit=3'
+        response = client.get(url)
+
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert etag.startswith('"') and 'Last-Modified' in response.headers
+        assert 'X-Next-Cursor' in response.headers
+
+        cached = client.get(url, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.content == b''
+        assert cached.headers['ETag'] == etag
+
+    def test_saves_change_the_response(self, client: TestClient, paging_programs):
+        """Test that written rows are visible despite the cache"""
+        from utils.database_sqlite import get_db_cursor
+
+        url = '/api/v1/funding/?provider=Paging-Stiftung&limit=50'
+        before = client.get(url)
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE FUNDING_OPPORTUNITIES SET title = 'Umbenannt' WHERE funding_id = 'page-test-6'"
+            )
+
+        after = client.get(url, headers={'If-None-Match': before.headers['ETag']})
+        assert after.status_code == 200
+        assert after.headers['ETag'] != before.headers['ETag']
+        assert 'Umbenannt' in [item['title'] for item in after.json()]
+
+    def test_detail_is_cached_and_404_is_not(self, client: TestClient, paging_programs):
+        """Test detail responses carry an ETag and missing programs stay 404"""
+        response = client.get('/api/v1/funding/page-test-0')
+
+        assert response.status_code == 200
+        assert client.get(
+            '/api/v1/funding/page-test-0', headers={'If-None-Match': response.headers['ETag']}
+        ).status_code == 304
+        assert client.get('/api/v1/funding/page-test-missing').status_code == 404
+
+    def test_update_trigger_sets_updated_at(self, client: TestClient, paging_programs):
+        """Test that updates bump updated_at like the Oracle triggers"""
+        from utils.database_sqlite import get_db_cursor
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE FUNDING_OPPORTUNITIES SET updated_at = '2000-01-01 00:00:00' WHERE funding_id = 'page-test-1'"
+            )
+            cursor.execute("UPDATE FUNDING_OPPORTUNITIES SET title = 'Neu' WHERE funding_id = 'page-test-1'")
+            cursor.execute("SELECT updated_at FROM FUNDING_OPPORTUNITIES WHERE funding_id = 'page-test-1'")
+            updated_at = cursor.fetchone()[0]
+
+        assert updated_at > '2000-01-01 00:00:00'
+
+    def test_delete_and_insert_change_data_version(self, client: TestClient, paging_programs):
+        """Test that replacing a row within the same second yields a new data version"""
+        from api.funding_cache import _read_version
+        from utils.database_sqlite import get_db_cursor
+
+        # Existing rows as stamped by CURRENT_TIMESTAMP: start of the current second
+        with get_db_cursor() as cursor:
+            cursor.execute("UPDATE FUNDING_OPPORTUNITIES SET updated_at = strftime('%Y-%m-%d %H:%M:%S', 'now')")
+        before = _read_version()
+        time.sleep(0.002)
+        with get_db_cursor() as cursor:
+            cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id = 'page-test-2'")
+            cursor.execute(
+                "INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider) "
+                "VALUES ('page-test-2', 'Ersetzt', 'Paging-Stiftung')"
+            )
+        after = _read_version()
+
+        assert after[0] == before[0]
+        assert after[1] > before[1]
+
+
+@pytest.fixture
+def facet_programs(client: TestClient):
+    """Inserts programs of one provider with overlapping categories"""
+    from utils.database_sqlite import get_db_cursor
+    from utils.facets import invalidate_facets_cache
+
+    with get_db_cursor() as cursor:
+        cursor.executemany(
+            """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider, region, categories)
+            VALUES (?, ?, 'Facetten-Stiftung', 'Facettenland', ?)""",
+            [
+                ('facet-test-1', 'Programm 1', 'Facette-MINT, Facette-Digital'),
+                ('facet-test-2', 'Programm 2', 'Facette-MINT'),
+            ]
+        )
+
+    yield
+
+    with get_db_cursor() as cursor:
+        cursor.execute("DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id LIKE 'facet-test-%'")
+    invalidate_facets_cache()
+
+
+@pytest.mark.unit
+class TestFundingFacets:
+    """Test precomputed filter facets and their ETag"""
+
+    def test_counts_per_value(self, facet_programs):
+        """Test value counts, with comma-separated categories split"""
+        from utils.facets import refresh_facets, get_facets, facet_options
+
+        refresh_facets()
+        _, facets = get_facets()
+        counts = {facet: {item['value']: item['count'] for item in items} for facet, items in facets.items()}
+
+        assert counts['providers']['Facetten-Stiftung'] == 2
+        assert counts['regions']['Facettenland'] == 2
+        assert counts['categories']['Facette-MINT'] == 2
+        assert counts['categories']['Facette-Digital'] == 1
+        assert 'Facetten-Stiftung' in facet_options(facets)['providers']
+
+    def test_refresh_changes_etag_only_on_change(self, facet_programs):
+        """Test that the ETag is stable and changes after new data is saved"""
+        from utils.database_sqlite import get_db_cursor
+        from utils.facets import refresh_facets, get_facets
+
+        etag = refresh_facets()
+        assert refresh_facets() == etag
+        assert get_facets()[0] == etag
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """INSERT INTO FUNDING_OPPORTUNITIES (funding_id, title, provider)
+                VALUES ('facet-test-3', 'Programm 3', 'Facetten-Stiftung')"""
+            )
+
+        assert refresh_facets() != etag
+
+    def test_snapshot_written_by_other_process(self, facet_programs):
+        """Test that get_facets picks up a snapshot written elsewhere after invalidation"""
+        from utils.database_sqlite import get_db_cursor
+        from utils.facets import refresh_facets, get_facets, invalidate_facets_cache
+
+        refresh_facets()
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE FUNDING_FACETS SET payload = :payload, etag = 'other' WHERE name = 'filters'",
+                {'payload': '{"providers": []}'}
+            )
+
+        invalidate_facets_cache()
+        assert get_facets() == ('other', {'providers': []})
+
+    def test_if_none_match(self):
+        """Test strong ETag comparison for 304 responses"""
+        from starlette.requests import Request
+        from api.http_cache import cached_json_response
+
+        def request(header=None):
+            headers = [(b'if-none-match', header.encode())] if header else []
+            return Request({'type': 'http', 'method': 'GET', 'headers': headers})
+
+        assert cached_json_response(request(), {'a': 1}, 'abc').status_code == 200
+        assert cached_json_response(request('"abc"'), {'a': 1}, 'abc').status_code == 304
+        assert cached_json_response(request('"x", W/"abc"'), {'a': 1}, 'abc').status_code == 304
+        assert cached_json_response(request('"x"'), {'a': 1}, 'abc').headers['ETag'] == '"abc"'
+
+
 @pytest.mark.unit
 class TestFundingDataQuality:
     """Test data quality and structure of funding responses"""
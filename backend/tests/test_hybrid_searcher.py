@@ -0,0 +1,87 @@
+"""
+Test Suite: Hybrid Searcher
+Tests that shared boilerplate chunks do not take retrieval slots
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('chromadb')
+pytest.importorskip('rank_bm25')
+pytest.importorskip('sentence_transformers')
+
+from rag_indexer.deduplicator import SHARED_FUNDING_ID
+from rag_indexer.hybrid_searcher import HybridSearcher
+
+COOKIE = 'Cookies Datenschutz Förderung Kontakt Impressum'
+
+# Shared boilerplate first: it is the closest match for the query
+CHUNKS = [
+    (f'{SHARED_FUNDING_ID}_cookie', SHARED_FUNDING_ID, COOKIE),
+    (f'{SHARED_FUNDING_ID}_footer', SHARED_FUNDING_ID, 'Förderung Newsletter Kontakt Impressum'),
+] + [
+    (f'F{i}_chunk_0', f'F{i}', f'Förderung Programm {i} für Schulen und Kitas')
+    for i in range(6)
+]
+
+
+def matches(metadata, where):
+    if not where:
+        return True
+    if '$and' in where:
+        return all(matches(metadata, condition) for condition in where['$and'])
+    return all(
+        metadata.get(key) != value['$ne'] if isinstance(value, dict) else metadata.get(key) == value
+        for key, value in where.items()
+    )
+
+
+class FakeCollection:
+    """ChromaDB collection stub; distance = position in CHUNKS"""
+
+    def query(self, query_embeddings, n_results, where=None):
+        hits = [
+            (chunk_id, text, {'funding_id': funding_id}, rank / 10)
+            for rank, (chunk_id, funding_id, text) in enumerate(CHUNKS)
+            if matches({'funding_id': funding_id}, where)
+        ][:n_results]
+        return {
+            'ids': [[hit[0] for hit in hits]],
+            'documents': [[hit[1] for hit in hits]],
+            'metadatas': [[hit[2] for hit in hits]],
+            'distances': [[hit[3] for hit in hits]],
+        }
+
+
+class FakeEmbedder:
+    def embed_query(self, query):
+        return np.zeros(4)
+
+
+@pytest.mark.unit
+class TestHybridSearcher:
+    """Test HybridSearcher without shared boilerplate"""
+
+    @pytest.fixture
+    def searcher(self, tmp_path):
+        searcher = HybridSearcher.__new__(HybridSearcher)
+        searcher.collection = FakeCollection()
+        searcher.embedder = FakeEmbedder()
+        searcher.bm25_index_path = str(tmp_path / 'bm25_index.pkl')
+        searcher.build_bm25_index([{'id': chunk_id, 'text': text} for chunk_id, _, text in CHUNKS])
+        return searcher
+
+    def test_shared_chunks_do_not_take_top_k_slots(self, searcher):
+        """Test that a query still gets top_k program chunks"""
+        results = searcher.hybrid_search('Förderung Kontakt Impressum', top_k=5)
+
+        assert len(results) == 5
+        assert not any(result['id'].startswith(f'{SHARED_FUNDING_ID}_') for result in results)
+
+    def test_region_filter_keeps_shared_exclusion(self):
+        """Test where filter composition"""
+        assert HybridSearcher._exclude_shared({'region': 'Berlin'}) == {'$and': [
+            {'region': 'Berlin'},
+            {'funding_id': {'$ne': SHARED_FUNDING_ID}}
+        ]}
+        assert HybridSearcher._exclude_shared({'funding_id': 'F1'}) == {'funding_id': 'F1'}
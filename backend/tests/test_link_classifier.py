@@ -0,0 +1,104 @@
+"""
+Test Suite: Link Classifier
+Tests for single-pass keyword classification of markdown links
+"""
+
+from urllib.parse import urljoin, urlparse
+
+import pytest
+
+from scraper_firecrawl import multi_page_scraper, program_finder
+from scraper_firecrawl.link_classifier import KeywordMatcher, LinkClassifier
+
+BASE = 'https://www.ministerium.example/foerderung/'
+
+
+def legacy_priority(text, url, priorities, blacklist=()):
+    """Keyword loops of the former extract_links_from_markdown"""
+    combined = text.lower() + ' ' + url.lower()
+    if any(keyword in combined for keyword in blacklist):
+        return 0
+    for priority in sorted(priorities, reverse=True):
+        if any(keyword in combined for keyword in priorities[priority]):
+            return priority
+    return 0
+
+
+@pytest.mark.unit
+class TestLinkClassifier:
+    """Test KeywordMatcher, LinkClassifier and the scraper wrappers"""
+
+    def test_matcher_finds_overlapping_keywords(self):
+        """Test that prefixes and overlaps are all found"""
+        matcher = KeywordMatcher(['förder', 'förderprogramm', 'programm', 'gramm'])
+
+        assert matcher.find('Unsere FÖRDERPROGRAMME') == {'förder', 'förderprogramm', 'programm', 'gramm'}
+        assert KeywordMatcher([]).find('förder') == set()
+
+    def test_priorities_match_keyword_loops(self):
+        """Test both scrapers' classifiers against the former nested loops"""
+        samples = [
+            ('Förderprogramm Digitalisierung', '/foerderung/digital'),
+            ('Ausschreibung 2025', '/calls/2025'),
+            ('Presse: neues Förderprogramm', '/presse/foerderprogramm'),
+            ('Karriere', '/stellenangebote/foerder-referent'),
+            ('Richtlinien', '/service/richtlinie'),
+            ('Impressum', '/impressum'),
+            ('Über uns', '/ueber-uns'),
+        ]
+        finder = {3: program_finder.PROGRAM_KEYWORDS['high_priority'], 2: program_finder.PROGRAM_KEYWORDS['medium_priority']}
+        multi = {
+            3: multi_page_scraper.LINK_KEYWORDS['high_priority'],
+            2: multi_page_scraper.LINK_KEYWORDS['medium_priority'],
+            1: multi_page_scraper.LINK_KEYWORDS['low_priority'],
+        }
+
+        for text, url in samples:
+            assert program_finder.LINK_CLASSIFIER.priority(text, url) == legacy_priority(
+                text, url, finder, program_finder.BLACKLIST_KEYWORDS
+            )
+            assert multi_page_scraper.LINK_CLASSIFIER.priority(text, url) == legacy_priority(text, url, multi)
+
+    def test_extract_links_resolves_filters_and_dedupes(self):
+        """Test relative links, external/file/anchor skips and fragment dedupe"""
+        classifier = LinkClassifier({3: ['programm'], 1: ['info']}, blacklist=['presse'])
+        markdown = '\n'.join([
+            '[Info Programm](/info)',
+            '[Programm A](programm-a)',
+            '[Programm A Details](programm-a#details "Titel")',
+            '[Programm B](https://WWW.Ministerium.example/programm-b)',
+            '[Extern Programm](https://andere.example/programm)',
+            '[Programm PDF](/programm.pdf)',
+            '[Programm](#programm)',
+            '[Programm Mail](mailto:programm@ministerium.example)',
+            '[Pressemitteilung Programm](/presse/programm)',
+            '[Weitere Infos](/info)',
+            '[Kontakt](/kontakt)',
+        ])
+
+        links = classifier.extract_links(markdown, BASE)
+
+        assert [(link['url'], link['priority']) for link in links] == [
+            ('https://www.ministerium.example/info', 3),
+            ('https://www.ministerium.example/foerderung/programm-a', 3),
+            ('https://www.ministerium.example/programm-b', 3),
+        ]
+        assert links[0]['text'] == 'Info Programm'
+
+    def test_wrappers_keep_output_format(self):
+        """Test that extract_links_from_markdown still returns url/text/priority dicts"""
+        markdown = (
+            '[Förderprogramme](/foerderprogramme) [Stellenangebote Förderung](/karriere) '
+            '[Projekte](/projekte) [Kontakt](/kontakt)'
+        )
+
+        found = program_finder.extract_links_from_markdown(markdown, BASE)
+        multi = multi_page_scraper.extract_links_from_markdown(markdown, BASE)
+
+        assert found == [
+            {'url': 'https://www.ministerium.example/foerderprogramme', 'text': 'Förderprogramme', 'priority': 3},
+            {'url': 'https://www.ministerium.example/projekte', 'text': 'Projekte', 'priority': 2},
+        ]
+        assert {link['url'] for link in multi} >= {link['url'] for link in found}
+        for link in multi:
+            assert urlparse(link['url']).netloc == urlparse(urljoin(BASE, '/')).netloc
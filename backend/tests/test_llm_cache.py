@@ -0,0 +1,113 @@
+"""
+Test Suite: LLM Cache
+Tests for content-addressed caching of LLM extraction results
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from scraper_firecrawl import llm_extractor
+from scraper_firecrawl.extraction_queue import ExtractionJob, ExtractionQueue
+from utils.database_sqlite import SQLiteDatabaseManager, init_sqlite_schema
+from utils.llm_cache import LLMCache, cache_key, prompt_version
+
+
+@pytest.mark.unit
+class TestLLMCache:
+    """Test LLMCache and its use by the extractors"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        from utils import database_sqlite
+        manager = SQLiteDatabaseManager(str(tmp_path / 'llm_cache_test.db'))
+        monkeypatch.setattr(database_sqlite, '_db_manager', manager)
+        init_sqlite_schema()
+        yield manager
+        manager.close_all()
+
+    @pytest.fixture
+    def cache(self, manager, monkeypatch):
+        """Fresh process-wide cache on the test database"""
+        cache = LLMCache(enabled=True)
+        monkeypatch.setattr(llm_extractor, 'get_llm_cache', lambda: cache)
+        monkeypatch.setattr(llm_extractor, 'DEEPSEEK_API_KEY', 'test-key')
+        return cache
+
+    def test_key_depends_on_prompt_model_temperature_text(self):
+        """Test that any input of the request changes the key"""
+        version = prompt_version('System', 'Analysiere: {text}')
+        key = cache_key(version, 'deepseek-chat', 0.1, 'Förderprogramm')
+
+        assert key == cache_key(version, 'deepseek-chat', 0.1, 'Förderprogramm')
+        assert key != cache_key(prompt_version('System', 'Extrahiere: {text}'), 'deepseek-chat', 0.1, 'Förderprogramm')
+        assert key != cache_key(version, 'deepseek-reasoner', 0.1, 'Förderprogramm')
+        assert key != cache_key(version, 'deepseek-chat', 0.2, 'Förderprogramm')
+        assert key != cache_key(version, 'deepseek-chat', 0.1, 'Anderes Programm')
+
+    def test_persists_across_instances(self, manager):
+        """Test that results survive the process (stored in LLM_CACHE)"""
+        LLMCache(enabled=True).put('k1', {'title': 'MINT-Förderung'}, 'v1', 'deepseek-chat')
+
+        next_run = LLMCache(enabled=True)
+        result = next_run.get('k1')
+        result['title'] = 'geändert'
+
+        assert next_run.get('k1') == {'title': 'MINT-Förderung'}
+        assert next_run.get('k2') is None
+        assert (next_run.hits, next_run.misses) == (2, 1)
+        assert LLMCache(enabled=False).get('k1') is None
+
+    def test_extract_with_deepseek_hits_cache(self, cache, monkeypatch):
+        """Test that a repeated page costs no API call"""
+        calls = []
+
+        class FakeResponse:
+            status_code = 200
+
+            def json(self):
+                return {'choices': [{'message': {'content': '{"title": "Leseförderung"}'}}]}
+
+        def fake_post(*args, **kwargs):
+            calls.append(kwargs['json'])
+            return FakeResponse()
+
+        monkeypatch.setattr(llm_extractor.requests, 'post', fake_post)
+
+        first = llm_extractor.extract_with_deepseek('Leseförderung für Grundschulen', 'Stiftung Lesen')
+        second = llm_extractor.extract_with_deepseek('Leseförderung für Grundschulen', 'Stiftung Lesen')
+        llm_extractor.extract_with_deepseek('Leseförderung für Grundschulen', 'Stiftung Lesen', temperature=0.5)
+
+        assert first == second == {'title': 'Leseförderung'}
+        assert len(calls) == 2
+
+        # New prompt template -> old entries are not used
+        monkeypatch.setattr(llm_extractor, 'EXTRACTION_PROMPT_VERSION', 'changed')
+        llm_extractor.extract_with_deepseek('Leseförderung für Grundschulen', 'Stiftung Lesen')
+        assert len(calls) == 3
+
+    def test_queue_skips_cached_and_duplicate_texts(self, cache):
+        """Test that the queue only sends texts it has never seen"""
+        sent = []
+
+        def handler(request):
+            prompt = json.loads(request.read())['messages'][1]['content']
+            sent.append(prompt)
+            return httpx.Response(200, json={'choices': [{'message': {'content': '{"title": "Programm"}'}}]})
+
+        known = llm_extractor.extraction_cache_key(llm_extractor.build_extraction_request('Bekannter Text'))
+        cache.put(known, {'title': 'Programm'}, llm_extractor.EXTRACTION_PROMPT_VERSION, 'deepseek-chat')
+
+        jobs = [
+            ExtractionJob('https://stiftung.example/a', 'Bekannter Text', 'A'),
+            ExtractionJob('https://stiftung.example/b', 'Neuer Text', 'B'),
+            ExtractionJob('https://stiftung.example/b?ref=nav', 'Neuer Text', 'B (Navigation)'),
+        ]
+        queue = ExtractionQueue(cache=cache, transport=httpx.MockTransport(handler))
+        results = asyncio.run(queue.run(jobs))
+
+        assert len(sent) == 1 and 'Neuer Text' in sent[0]
+        assert all(data == {'title': 'Programm'} for data in results.values())
+        assert (queue.stats.cached, queue.stats.completed) == (1, 2)
@@ -0,0 +1,156 @@
+"""
+Test Suite: PDF Pipeline
+Tests for streamed PDF download, content-addressed cache, local extraction
+and the Firecrawl fallback for scanned PDFs
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from scraper_firecrawl import pdf_pipeline
+from scraper_firecrawl.pdf_pipeline import PdfLine, PdfPipeline, lines_to_markdown
+
+BASE = 'https://ministerium.example'
+
+
+@pytest.fixture
+def fixture_pdfs():
+    """Born-digital Förderrichtlinie and a scanned (image-only) PDF"""
+    fitz = pytest.importorskip('fitz')
+
+    text = fitz.open()
+    for number in range(1, 4):
+        page = text.new_page()
+        page.insert_text((72, 40), f'Seite {number} von 3', fontsize=8)
+        if number == 1:
+            page.insert_text((72, 90), 'Förderrichtlinie MINT', fontsize=20)
+        y = 130
+        for sentence in range(8):
+            page.insert_text((72, y), f'Gefördert werden Projekte an Grundschulen, Absatz {sentence}.', fontsize=11)
+            y += 16
+    scanned = fitz.open()
+    for _ in range(2):
+        scanned.new_page()
+
+    pdfs = {'/richtlinie.pdf': text.tobytes(), '/scan.pdf': scanned.tobytes()}
+    text.close()
+    scanned.close()
+    return pdfs
+
+
+def make_pipeline(tmp_path, files, etag=None, **kwargs):
+    """Pipeline against a mock site serving {path: bytes}; records requests"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if etag and request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304)
+        if request.url.path not in files:
+            return httpx.Response(404)
+        headers = {'ETag': etag} if etag else {}
+        return httpx.Response(200, content=files[request.url.path], headers=headers)
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    kwargs.setdefault('processes', 0)
+    return PdfPipeline(cache_dir=str(tmp_path / 'pdf_cache'), http=http, **kwargs), requests
+
+
+def run(pipeline, urls):
+    async def scenario():
+        async with pipeline:
+            return await pipeline.extract_many(urls)
+    return asyncio.run(scenario())
+
+
+@pytest.mark.unit
+class TestPdfPipeline:
+    """Test PdfPipeline and the markdown conversion"""
+
+    def test_lines_to_markdown(self):
+        """Test headings, bullets, dehyphenation and running headers"""
+        pages = [
+            [
+                PdfLine('Förderrichtlinie Digitale Bildung', 18, 0),
+                PdfLine('Gefördert werden Vorhaben zur Digi-', 10, 1),
+                PdfLine('talisierung an Grundschulen.', 10, 1),
+                PdfLine('• Endgeräte', 10, 2),
+                PdfLine('• Fortbildungen', 10, 3),
+                PdfLine('\uf0b7 Lernsoftware', 10, 4),
+                PdfLine('Seite 1 von 3', 8, 5),
+            ],
+            [PdfLine('1. Zuwendungszweck', 12, 0), PdfLine('Text', 10, 1), PdfLine('Seite 2 von 3', 8, 2)],
+            [PdfLine('Anlagen', 10, 0), PdfLine('Seite 3 von 3', 8, 1)],
+        ]
+
+        assert lines_to_markdown(pages).split('\n\n') == [
+            '# Förderrichtlinie Digitale Bildung',
+            'Gefördert werden Vorhaben zur Digitalisierung an Grundschulen.',
+            '- Endgeräte',
+            '- Fortbildungen',
+            '- Lernsoftware',
+            '## 1. Zuwendungszweck',
+            'Text',
+            'Anlagen',
+        ]
+
+    def test_parses_fixture_pdf_locally(self, tmp_path, fixture_pdfs):
+        """Test local extraction in the process pool, no Firecrawl call"""
+        pipeline, _ = make_pipeline(tmp_path, fixture_pdfs, processes=1)
+        result = run(pipeline, [f'{BASE}/richtlinie.pdf'])[f'{BASE}/richtlinie.pdf']
+
+        assert result.source == 'local'
+        assert result.pages == 3
+        assert result.markdown.startswith('# Förderrichtlinie MINT')
+        assert 'Seite 1 von 3' not in result.markdown
+        assert pipeline.stats.fallbacks == 0
+
+    def test_scanned_pdf_falls_back_to_firecrawl(self, tmp_path, fixture_pdfs, monkeypatch):
+        """Test Firecrawl only for PDFs without text layer"""
+        remote = []
+
+        async def fake_firecrawl(self, url):
+            remote.append(url)
+            return '# OCR Text'
+
+        monkeypatch.setattr(PdfPipeline, '_firecrawl', fake_firecrawl)
+        pipeline, _ = make_pipeline(tmp_path, fixture_pdfs)
+        results = run(pipeline, [f'{BASE}/richtlinie.pdf', f'{BASE}/scan.pdf'])
+
+        assert remote == [f'{BASE}/scan.pdf']
+        assert results[f'{BASE}/scan.pdf'].source == 'firecrawl'
+        assert results[f'{BASE}/richtlinie.pdf'].source == 'local'
+
+    def test_content_addressed_cache(self, tmp_path, monkeypatch):
+        """Test dedupe by content, conditional re-download, cached results"""
+        parsed = []
+
+        def fake_parse(path):
+            parsed.append(path)
+            return {'markdown': 'Richtlinie ' * 50, 'pages': 1, 'chars': 550}
+
+        monkeypatch.setattr(pdf_pipeline, 'parse_pdf', fake_parse)
+        content = b'%PDF-1.4\n' + b'0' * 4096
+        files = {'/a.pdf': content, '/kopie/a.pdf': content, '/seite.pdf': b'<html>Kein PDF</html>'}
+        urls = [f'{BASE}/a.pdf', f'{BASE}/kopie/a.pdf', f'{BASE}/seite.pdf']
+
+        pipeline, _ = make_pipeline(tmp_path, files, etag='"v1"')
+        first = run(pipeline, urls)
+        pdf_files = [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith('.pdf')]
+
+        assert first[f'{BASE}/seite.pdf'] is None
+        assert first[f'{BASE}/a.pdf'].sha256 == first[f'{BASE}/kopie/a.pdf'].sha256
+        assert len(pdf_files) == 1
+        assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith('.part')]
+
+        parsed_first_run = len(parsed)
+        rerun, requests = make_pipeline(tmp_path, files, etag='"v1"')
+        second = run(rerun, urls[:2])
+
+        assert second[f'{BASE}/a.pdf'].markdown == first[f'{BASE}/a.pdf'].markdown
+        assert all(request.headers.get('If-None-Match') == '"v1"' for request in requests)
+        assert (rerun.stats.not_modified, rerun.stats.cached, rerun.stats.parsed) == (2, 2, 0)
+        assert len(parsed) == parsed_first_run
@@ -0,0 +1,89 @@
+"""
+Test Suite: Prompt Builder
+Tests for token counting and priority-based budget allocation
+"""
+
+import pytest
+
+from api.prompt_builder import (
+    PromptBuilder,
+    PRIORITY_REQUIRED,
+    PRIORITY_CONTEXT,
+    PRIORITY_SCHOOL_PROFILE,
+    PRIORITY_FEW_SHOT
+)
+from utils.token_counter import count_tokens, truncate_to_tokens
+
+TEMPLATE = 'KONTEXT:\n{context}\nSCHULE:\n{school}\nBEISPIEL:\n{example}\nANFRAGE:\n{query}'
+
+
+@pytest.mark.unit
+class TestTokenCounter:
+    """Test token counting helpers"""
+
+    def test_empty_text(self):
+        """Test that empty text has zero tokens"""
+        assert count_tokens('') == 0
+        assert truncate_to_tokens('', 10) == ''
+
+    def test_truncate_respects_budget(self):
+        """Test that truncated text fits the budget and keeps whole words"""
+        text = 'Förderung digitaler Bildung an Grundschulen ' * 50
+        truncated = truncate_to_tokens(text, 40)
+
+        assert count_tokens(truncated) <= 40
+        assert truncated.endswith(' …')
+        assert text.startswith(truncated[:-2])
+
+    def test_short_text_unchanged(self):
+        """Test that text within budget is not modified"""
+        assert truncate_to_tokens('Kurzer Text', 100) == 'Kurzer Text'
+
+
+@pytest.mark.unit
+class TestPromptBuilder:
+    """Test priority-based prompt assembly"""
+
+    def _builder(self, max_tokens):
+        return (
+            PromptBuilder(TEMPLATE, max_tokens=max_tokens)
+            .add_section('query', 'Tablets für Klasse 3', PRIORITY_REQUIRED)
+            .add_section('context', 'Richtlinie ' * 400, PRIORITY_CONTEXT, min_tokens=50)
+            .add_section('school', 'Grundschule Musterberg, Berlin ' * 20, PRIORITY_SCHOOL_PROFILE, min_tokens=20)
+            .add_section('example', 'Beispielantrag ' * 200, PRIORITY_FEW_SHOT, fallback='(entfällt)')
+        )
+
+    def test_everything_fits(self):
+        """Test that nothing is truncated with a generous budget"""
+        result = self._builder(100000).build()
+
+        assert not any(section['truncated'] for section in result['sections'].values())
+        assert result['prompt_tokens'] == count_tokens(result['prompt'])
+
+    def test_prompt_stays_within_budget(self):
+        """Test that the assembled prompt respects the token budget"""
+        result = self._builder(600).build()
+
+        assert result['prompt_tokens'] <= 600
+        assert 'Tablets für Klasse 3' in result['prompt']
+
+    def test_low_priority_dropped_first(self):
+        """Test that the few-shot example is dropped before context is cut"""
+        full = self._builder(100000).build()['sections']
+        budget = (
+            count_tokens(TEMPLATE.format(context='', school='', example='', query=''))
+            + full['query']['tokens'] + full['context']['tokens'] + full['school']['tokens']
+        )
+        result = self._builder(budget).build()
+        sections = result['sections']
+
+        assert sections['example']['tokens'] == 0
+        assert '(entfällt)' in result['prompt']
+        assert not sections['context']['truncated']
+
+    def test_min_tokens_reserved_for_lower_priorities(self):
+        """Test that min_tokens keeps a share for the school profile"""
+        result = self._builder(600).build()
+
+        assert result['sections']['school']['tokens'] >= 15
+        assert result['sections']['context']['truncated']
@@ -0,0 +1,89 @@
+"""
+Test Suite: RAG Context Compression
+Tests for sentence splitting and extractive compression
+"""
+
+import numpy as np
+import pytest
+
+from rag_indexer.context_compressor import ContextCompressor, split_sentences
+
+
+class KeywordEmbedder:
+    """Deterministic stand-in for AdvancedEmbedder (no model download)"""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def embed_documents(self, texts, batch_size=32, show_progress=False):
+        self.encoded += len(texts)
+        return np.array([[1.0 if 'Tablet' in t else 0.0, 1.0] for t in texts])
+
+    def embed_query(self, query):
+        return np.array([1.0, 0.0])
+
+
+@pytest.mark.unit
+class TestSentenceSplitting:
+    """Test German-aware sentence splitting"""
+
+    def test_abbreviations_do_not_split(self):
+        """Test that z.B. / vgl. / max. do not end a sentence"""
+        text = 'Gefördert werden z.B. Tablets für Schulen. Anträge bis max. 50.000 EUR (vgl. Nr. 3).'
+        sentences = split_sentences(text)
+
+        assert len(sentences) == 2
+        assert sentences[0].startswith('Gefördert werden z.B. Tablets')
+
+    def test_short_fragments_are_merged(self):
+        """Test that headings are merged into the following sentence"""
+        sentences = split_sentences('## Ziele\nDas Programm fördert digitale Bildung an Grundschulen.')
+
+        assert sentences == ['## Ziele Das Programm fördert digitale Bildung an Grundschulen.']
+
+
+@pytest.mark.unit
+class TestContextCompressor:
+    """Test extractive context compression"""
+
+    chunks = [
+        'Cookie-Hinweis: Diese Seite verwendet Cookies. Weitere Informationen finden Sie im Impressum.',
+        'Gefördert werden Tablets für den Unterricht. Der Eigenanteil beträgt zehn Prozent der Kosten.'
+    ]
+
+    def test_keeps_relevant_sentences_within_budget(self):
+        """Test that the most relevant sentence survives a tight budget"""
+        compressor = ContextCompressor(KeywordEmbedder())
+        result = compressor.compress('Tablets', self.chunks, max_tokens=15)
+
+        assert 'Tablets für den Unterricht' in result['text']
+        assert 'Cookie' not in result['text']
+        assert result['compressed_tokens'] <= 15
+        assert result['sentences_kept'] < result['sentences_total']
+
+    def test_original_order_is_preserved(self):
+        """Test that selected sentences keep their original order"""
+        compressor = ContextCompressor(KeywordEmbedder())
+        result = compressor.compress('Tablets', self.chunks, max_tokens=1000)
+
+        assert result['text'].index('Cookie') < result['text'].index('Tablets')
+
+    def test_sentence_embeddings_are_cached(self):
+        """Test that repeated chunks are not encoded again"""
+        embedder = KeywordEmbedder()
+        compressor = ContextCompressor(embedder)
+
+        compressor.compress('Tablets', self.chunks, max_tokens=50)
+        encoded_first = embedder.encoded
+        compressor.compress('Tablets', self.chunks, max_tokens=50)
+
+        assert embedder.encoded == encoded_first
+        assert compressor.get_stats()['cache_hits'] == encoded_first
+
+    def test_empty_chunks(self):
+        """Test compression of empty input"""
+        compressor = ContextCompressor(KeywordEmbedder())
+        result = compressor.compress('Tablets', [], max_tokens=100)
+
+        assert result['text'] == ''
+        assert result['sentences_kept'] == 0
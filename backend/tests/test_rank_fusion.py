@@ -0,0 +1,115 @@
+"""
+Test Suite: Rank Fusion
+Tests for vectorized Reciprocal Rank Fusion
+"""
+
+import random
+from collections import defaultdict
+
+import pytest
+
+from rag_indexer.rank_fusion import rrf_fuse, fuse_results, ranking_agreement
+
+
+def reference_rrf(ranked_ids, weights, k=60):
+    """Straightforward dict-based RRF (previous implementation)"""
+    scores = defaultdict(float)
+    for weight, ids in zip(weights, ranked_ids):
+        for rank, doc_id in enumerate(ids):
+            scores[doc_id] += weight / (k + rank)
+    return scores
+
+
+@pytest.mark.unit
+class TestRankFusion:
+    """Test RRF over N ranked lists"""
+
+    def test_matches_reference_scores(self):
+        """Test that vectorized scores equal the dict-based formula"""
+        rng = random.Random(7)
+        pool = [f'doc_{i}' for i in range(200)]
+        ranked_ids = [rng.sample(pool, 80) for _ in range(8)]
+        weights = [0.6, 0.4] * 4
+
+        ids, scores = rrf_fuse(ranked_ids, weights=weights)
+        expected = reference_rrf(ranked_ids, weights)
+
+        assert set(ids) == set(expected)
+        for doc_id, score in zip(ids, scores):
+            assert score == pytest.approx(expected[doc_id])
+        assert list(scores) == sorted(scores, reverse=True)
+
+    def test_top_k_selection(self):
+        """Test that top_k returns the k best in order"""
+        rng = random.Random(3)
+        pool = [f'doc_{i}' for i in range(500)]
+        ranked_ids = [rng.sample(pool, 100) for _ in range(6)]
+
+        all_ids, _ = rrf_fuse(ranked_ids)
+        top_ids, top_scores = rrf_fuse(ranked_ids, top_k=10)
+
+        assert top_ids == all_ids[:10]
+        assert len(top_scores) == 10
+
+    def test_agreement_across_lists_wins(self):
+        """Test that an id ranked by several lists beats a single top hit"""
+        ids, _ = rrf_fuse([['a', 'b'], ['c', 'b'], ['d', 'b']])
+        assert ids[0] == 'b'
+
+    def test_empty_lists(self):
+        """Test fusion of empty input"""
+        ids, scores = rrf_fuse([[], []])
+        assert ids == []
+        assert len(scores) == 0
+
+    def test_fuse_results_prefers_metadata(self):
+        """Test that result data with metadata is kept"""
+        sparse = [{'id': 'x', 'text': 'Text', 'score': 3.2}]
+        dense = [{'id': 'x', 'text': 'Text', 'metadata': {'funding_id': 'F1'}}]
+
+        fused = fuse_results([sparse, dense], weights=[0.4, 0.6])
+
+        assert fused[0]['metadata'] == {'funding_id': 'F1'}
+        assert fused[0]['rrf_score'] == pytest.approx(1.0 / 60)
+
+
+@pytest.mark.unit
+class TestRankingAgreement:
+    """Test dense/sparse agreement used for early exit"""
+
+    def test_full_overlap(self):
+        """Test identical top-k lists"""
+        dense = [{'id': i, 'score': 0.9 - 0.01 * n} for n, i in enumerate('abcde')]
+        sparse = [{'id': i, 'score': 5.0} for i in 'edcba']
+
+        agreement = ranking_agreement(dense, sparse, top_k=5)
+
+        assert agreement['overlap'] == 1.0
+        assert agreement['top1_shared'] is True
+        assert agreement['margin'] == pytest.approx(0.01)
+
+    def test_disjoint_lists(self):
+        """Test no agreement"""
+        dense = [{'id': 'a', 'score': 0.8}, {'id': 'b', 'score': 0.5}]
+        sparse = [{'id': 'x', 'score': 3.0}, {'id': 'y', 'score': 2.0}]
+
+        agreement = ranking_agreement(dense, sparse, top_k=5)
+
+        assert agreement['overlap'] == 0.0
+        assert agreement['top1_shared'] is False
+        assert agreement['margin'] == pytest.approx(0.3)
+
+    def test_empty_sparse(self):
+        """Test missing BM25 index gives no overlap"""
+        agreement = ranking_agreement([{'id': 'a', 'score': 0.8}], [], top_k=5)
+        assert agreement['overlap'] == 0.0
+
+    def test_short_lists_do_not_count_as_agreement(self):
+        """Test that one shared hit among few results is not full overlap"""
+        dense = [{'id': 'a', 'score': 0.8}, {'id': 'b', 'score': 0.4}]
+        sparse = [{'id': 'a', 'score': 3.0}]
+
+        agreement = ranking_agreement(dense, sparse, top_k=5)
+
+        assert agreement['overlap'] == pytest.approx(0.2)
+        assert agreement['top1_shared'] is True
@@ -0,0 +1,139 @@
+"""
+Test Suite: Scrape Ledger
+Tests for the persistent job ledger, per-URL saves and resumed scrape runs
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from scraper_firecrawl import firecrawl_scraper
+from scraper_firecrawl.firecrawl_scraper import FirecrawlScraper
+from scraper_firecrawl.funding_sources import FundingSource
+from utils.database_sqlite import SQLiteDatabaseManager, init_sqlite_schema
+from utils.db_adapter import get_db_cursor
+from utils.scrape_ledger import ScrapeLedger, latest_unfinished_run
+
+BASE = 'https://stiftung.example'
+
+
+def opportunity(url, title):
+    return {
+        'title': title,
+        'source_url': url,
+        'cleaned_text': f'# {title}',
+        'provider': 'Stiftung Beispiel',
+        'region': 'Bundesweit',
+        'funding_area': 'Bildung',
+        'tags': [],
+        'metadata_json': {'requested_url': url},
+    }
+
+
+@pytest.mark.unit
+class TestScrapeLedger:
+    """Test ScrapeLedger and resumable Firecrawl runs"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        from utils import database_sqlite
+        manager = SQLiteDatabaseManager(str(tmp_path / 'scrape_ledger_test.db'))
+        monkeypatch.setattr(database_sqlite, '_db_manager', manager)
+        init_sqlite_schema()
+        yield manager
+        manager.close_all()
+
+    def test_job_states_persist_and_resume(self, manager):
+        """Test that a resumed run continues the open jobs of the same run id"""
+        urls = [f'{BASE}/a', f'{BASE}/b', f'{BASE}/c']
+        first = ScrapeLedger('test', max_attempts=2)
+        first.register('Stiftung', urls + [f'{BASE}/a'])
+        first.start_job('Stiftung', f'{BASE}/a')
+        first.finish_job('Stiftung', f'{BASE}/a', 2)
+        first.start_job('Stiftung', f'{BASE}/b')
+        first.fail_job('Stiftung', f'{BASE}/b', 'DeepSeek 503')
+
+        assert first.summary() == {'pending': 1, 'running': 0, 'done': 1, 'failed': 1}
+        assert latest_unfinished_run('test', max_attempts=2) == first.run_id
+
+        resumed = ScrapeLedger('test', latest_unfinished_run('test'), max_attempts=2)
+        assert resumed.open_urls('Stiftung', urls) == [f'{BASE}/b', f'{BASE}/c']
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "SELECT state, attempts, results, error FROM SCRAPE_JOBS WHERE run_id = :run_id AND url = :url",
+                {'run_id': first.run_id, 'url': f'{BASE}/b'}
+            )
+            assert tuple(cursor.fetchone()) == ('failed', 1, 0, 'DeepSeek 503')
+
+        # Second failure uses up the attempts, the rest finishes: run complete
+        resumed.start_job('Stiftung', f'{BASE}/b')
+        resumed.fail_job('Stiftung', f'{BASE}/b', 'DeepSeek 503')
+        resumed.start_job('Stiftung', f'{BASE}/c')
+        resumed.finish_job('Stiftung', f'{BASE}/c')
+
+        assert resumed.is_complete()
+        assert latest_unfinished_run('test', max_attempts=2) is None
+
+    def test_crashed_run_resumes_without_repeating_work(self, manager, monkeypatch):
+        """Test per-URL saves and that --resume only processes the open URLs"""
+        sources = [
+            FundingSource('Stiftung A', 'Stiftung A', 'Bundesweit', 'Bildung', [f'{BASE}/a1', f'{BASE}/a2'], {}),
+            FundingSource('Stiftung B', 'Stiftung B', 'Bayern', 'Bildung', [f'{BASE}/b1'], {}),
+        ]
+        processed = []
+        outage = {f'{BASE}/a2'}
+
+        def fake_process_url(self, url, source):
+            processed.append(url)
+            if url in outage:
+                raise RuntimeError('DeepSeek outage')
+            return [opportunity(url, f'Programm {url[-2:]}')]
+
+        monkeypatch.setattr(firecrawl_scraper, 'ALL_SOURCES', sources)
+        monkeypatch.setattr(FirecrawlScraper, 'process_url', fake_process_url)
+        discovered = REGISTRY.get_sample_value('scraper_programs_discovered_total', {'source': 'Stiftung A'}) or 0
+
+        scraper = FirecrawlScraper()
+        scraper.run_all()
+
+        with get_db_cursor() as cursor:
+            cursor.execute('SELECT source_url FROM FUNDING_OPPORTUNITIES ORDER BY source_url')
+            assert [row[0] for row in cursor.fetchall()] == [f'{BASE}/a1', f'{BASE}/b1']
+        assert REGISTRY.get_sample_value('scraper_programs_discovered_total', {'source': 'Stiftung A'}) == discovered + 1
+        assert REGISTRY.get_sample_value('scraper_jobs', {'scraper': 'firecrawl', 'state': 'failed'}) == 1
+
+        processed.clear()
+        outage.clear()
+        FirecrawlScraper().run_all(resume=True)
+
+        assert processed == [f'{BASE}/a2']
+        with get_db_cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES')
+            assert cursor.fetchone()[0] == 3
+        assert latest_unfinished_run('firecrawl') is None
+
+    def test_progress_is_exported(self, manager, monkeypatch):
+        """Test opt-in metrics port and Pushgateway pushes of a batch run"""
+        from utils import prometheus_metrics
+
+        servers, pushes = [], []
+        monkeypatch.setenv('SCRAPER_METRICS_PORT', '9101')
+        monkeypatch.setenv('PROMETHEUS_PUSHGATEWAY', 'http://pushgateway.example:9091')
+        monkeypatch.setattr(prometheus_metrics, '_metrics_server_started', False)
+        monkeypatch.setattr(prometheus_metrics, '_last_push', 0.0)
+        monkeypatch.setattr(prometheus_metrics, 'start_http_server', lambda port: servers.append(port))
+        monkeypatch.setattr(
+            prometheus_metrics, 'push_to_gateway',
+            lambda gateway, job, registry: pushes.append((gateway, job))
+        )
+
+        ledger = ScrapeLedger.open('export-test')
+        ScrapeLedger.open('export-test')
+        ledger.register('Stiftung', [f'{BASE}/a'])
+        ledger.start_job('Stiftung', f'{BASE}/a')
+        ledger.finish_job('Stiftung', f'{BASE}/a', 1)
+        ledger.source_finished('Stiftung', 1.0)
+
+        assert servers == [9101]
+        # First update pushes, later ones are throttled; source end always pushes
+        assert pushes == [('http://pushgateway.example:9091', 'scraper_export-test')] * 2
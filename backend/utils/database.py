@@ -1,6 +1,9 @@
 """
 Oracle Database Connection Manager
 Verwaltet Verbindungen zur Oracle Autonomous Database
+
+Verbindungen kommen aus einem cx_Oracle SessionPool (mTLS-Handshake nur
+beim Öffnen neuer Sessions, Statement-Cache pro Session).
 """
 
 import os
@@ -10,9 +13,26 @@ from typing import Generator, Optional
 import cx_Oracle
 from dotenv import load_dotenv
 
+from utils.prometheus_metrics import db_connection_pool_size
+
 load_dotenv()
 
 
+def _lobs_as_strings(cursor, name, default_type, size, precision, scale):
+    """
+    Output Type Handler: CLOB/BLOB direkt als str/bytes holen
+
+    LOB-Locators sind nur gültig, solange die Verbindung gehalten wird.
+    db_adapter gibt Zeilen aber erst nach der Rückgabe an den Pool zurück
+    (json.loads auf metadata_json, cleaned_text in Responses).
+    """
+    if default_type in (cx_Oracle.DB_TYPE_CLOB, cx_Oracle.DB_TYPE_NCLOB):
+        return cursor.var(cx_Oracle.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if default_type == cx_Oracle.DB_TYPE_BLOB:
+        return cursor.var(cx_Oracle.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+    return None
+
+
 class DatabaseManager:
     """Manager für Oracle DB Verbindungen"""
 
@@ -23,6 +43,13 @@ class DatabaseManager:
         self.dsn = os.getenv('ORACLE_DSN')
         self.wallet_path = os.getenv('ORACLE_WALLET_PATH')
 
+        # Session Pool Konfiguration
+        self.pool_min = int(os.getenv('ORACLE_POOL_MIN', 2))
+        self.pool_max = int(os.getenv('ORACLE_POOL_MAX', 10))
+        self.pool_increment = int(os.getenv('ORACLE_POOL_INCREMENT', 1))
+        self.stmt_cache_size = int(os.getenv('ORACLE_STMT_CACHE_SIZE', 50))
+        self.pool: Optional[cx_Oracle.SessionPool] = None
+
         if not all([self.user, self.password, self.dsn]):
             raise ValueError('Oracle DB Credentials nicht vollständig in .env')
 
@@ -39,27 +66,105 @@ class DatabaseManager:
         """
         return f'{self.user}/{self.password}@{self.dsn}'
 
-    def get_connection(self) -> cx_Oracle.Connection:
+    def create_pool(self) -> cx_Oracle.SessionPool:
         """
-        Erstellt eine neue DB-Verbindung
+        Erstellt den Session Pool (idempotent)
 
         Returns:
-            Oracle Connection Objekt
+            cx_Oracle SessionPool
 
         Raises:
-            cx_Oracle.Error: Bei Verbindungsfehlern
+            Exception: Bei Verbindungsfehlern
         """
+        if self.pool is not None:
+            return self.pool
+
         try:
-            connection = cx_Oracle.connect(
+            self.pool = cx_Oracle.SessionPool(
                 user=self.user,
                 password=self.password,
                 dsn=self.dsn,
+                min=self.pool_min,
+                max=self.pool_max,
+                increment=self.pool_increment,
+                threaded=True,
+                getmode=cx_Oracle.SPOOL_ATTRVAL_WAIT,
                 encoding='UTF-8'
             )
-            return connection
+            self.pool.stmtcachesize = self.stmt_cache_size
+        except cx_Oracle.Error as e:
+            raise Exception(f'Fehler beim Erstellen des Oracle Session Pools: {str(e)}')
+
+        print(
+            f'[DB] Oracle Session Pool erstellt '
+            f'(min={self.pool_min}, max={self.pool_max}, increment={self.pool_increment}, '
+            f'stmtcachesize={self.stmt_cache_size})'
+        )
+        self._update_pool_metrics()
+        return self.pool
+
+    def close_pool(self) -> None:
+        """Schließt den Session Pool (wartet nicht auf hängende Sessions)"""
+        if self.pool is None:
+            return
+
+        try:
+            self.pool.close()
+        except cx_Oracle.Error:
+            # Sessions still busy - force close on shutdown
+            self.pool.close(force=True)
+
+        self.pool = None
+        db_connection_pool_size.labels(state='active').set(0)
+        db_connection_pool_size.labels(state='idle').set(0)
+        print('[DB] Oracle Session Pool geschlossen')
+
+    def _update_pool_metrics(self) -> None:
+        """Exportiert den Pool-Zustand an Prometheus"""
+        if self.pool is None:
+            return
+        busy = self.pool.busy
+        db_connection_pool_size.labels(state='active').set(busy)
+        db_connection_pool_size.labels(state='idle').set(self.pool.opened - busy)
+
+    def get_connection(self) -> cx_Oracle.Connection:
+        """
+        Holt eine Verbindung aus dem Session Pool
+
+        Der Pool wird beim ersten Zugriff erstellt, falls er nicht schon im
+        FastAPI-Lifespan angelegt wurde (Skripte, Scraper). connection.close()
+        gibt die Verbindung an den Pool zurück. LOB-Spalten kommen als
+        str/bytes zurück (siehe _lobs_as_strings).
+
+        Returns:
+            Oracle Connection Objekt
+
+        Raises:
+            cx_Oracle.Error: Bei Verbindungsfehlern
+        """
+        pool = self.create_pool()
+        try:
+            connection = pool.acquire()
         except cx_Oracle.Error as e:
             raise Exception(f'Fehler beim Verbinden mit Oracle DB: {str(e)}')
 
+        connection.outputtypehandler = _lobs_as_strings
+        self._update_pool_metrics()
+        return connection
+
+    def release_connection(self, connection: cx_Oracle.Connection) -> None:
+        """
+        Gibt eine Verbindung an den Session Pool zurück
+
+        Args:
+            connection: Aus dem Pool geholte Verbindung
+        """
+        if self.pool is not None:
+            self.pool.release(connection)
+            self._update_pool_metrics()
+        else:
+            connection.close()
+
     @contextmanager
     def get_cursor(self) -> Generator[cx_Oracle.Cursor, None, None]:
         """
@@ -83,7 +188,7 @@ class DatabaseManager:
             raise e
         finally:
             cursor.close()
-            connection.close()
+            self.release_connection(connection)
 
     @contextmanager
     def get_connection_context(self) -> Generator[cx_Oracle.Connection, None, None]:
@@ -103,7 +208,7 @@ class DatabaseManager:
         try:
             yield connection
         finally:
-            connection.close()
+            self.release_connection(connection)
 
 
 # Singleton-Instanz
@@ -123,9 +228,20 @@ def get_db_manager() -> DatabaseManager:
     return _db_manager
 
 
+def init_db_pool() -> None:
+    """Erstellt den Session Pool (FastAPI Lifespan Startup)"""
+    get_db_manager().create_pool()
+
+
+def close_db_pool() -> None:
+    """Schließt den Session Pool (FastAPI Lifespan Shutdown)"""
+    if _db_manager is not None:
+        _db_manager.close_pool()
+
+
 # Convenience-Funktionen
 def get_db_connection() -> cx_Oracle.Connection:
-    """Erstellt eine neue DB-Verbindung"""
+    """Holt eine DB-Verbindung aus dem Session Pool (close() gibt sie zurück)"""
     return get_db_manager().get_connection()
 
 
@@ -178,3 +294,188 @@ def execute_update(query: str, params: dict) -> int:
     with get_db_cursor() as cursor:
         cursor.execute(query, params)
         return cursor.rowcount
+
+
+# Indizes für die häufigsten Queries. Die Router filtern mit
+# RAWTOHEX(<id>) = :id, daher funktionsbasierte Indizes auf RAWTOHEX(...).
+ORACLE_INDEXES = [
+    ('idx_funding_active_keyset', 'FUNDING_OPPORTUNITIES(is_active, deadline, funding_id)'),
+    ('idx_funding_provider_keyset', 'FUNDING_OPPORTUNITIES(provider, deadline, funding_id)'),
+    ('idx_funding_app_deadline', 'FUNDING_OPPORTUNITIES(application_deadline)'),
+    ('idx_funding_updated_at', 'FUNDING_OPPORTUNITIES(updated_at)'),
+    (
+        'idx_applications_school_keyset',
+        'APPLICATIONS(RAWTOHEX(school_id), created_at, RAWTOHEX(application_id))'
+    ),
+    ('idx_drafts_application_created', 'APPLICATION_DRAFTS(RAWTOHEX(application_id), created_at)'),
+]
+
+# Volltextsuche (list_funding?q=), benötigt CTXAPP-Rolle. Der Index hängt an
+# cleaned_text, ein MULTI_COLUMN_DATASTORE indiziert aber dieselben Felder
+# wie FUNDING_FTS unter SQLite (Titel, Anbieter, Region, Förderbereich, Text).
+# SYNC (ON COMMIT) greift nur bei Änderungen an cleaned_text; der Scraper
+# schreibt die Zeile immer komplett.
+ORACLE_FULLTEXT_INDEX = 'idx_funding_fulltext'
+ORACLE_FULLTEXT_DATASTORE = 'funding_fulltext_ds'
+ORACLE_FULLTEXT_COLUMNS = ['title', 'provider', 'region', 'funding_area', 'cleaned_text']
+
+# ORA-00955: Name existiert, ORA-01408: Spaltenliste bereits indiziert,
+# ORA-00904: Spalte fehlt in älteren Schemas,
+# ORA-29879: Spalte hat bereits einen CONTEXT-Index
+_IGNORED_INDEX_ERRORS = (955, 1408, 904, 29879)
+
+
+# Eindeutige Indizes: Scraper-Upsert per MERGE ON source_url
+ORACLE_UNIQUE_INDEXES = [
+    ('idx_funding_source_url_unique', 'FUNDING_OPPORTUNITIES(source_url)'),
+]
+
+# Fallback, solange doppelte source_url-Werte den Unique-Index verhindern;
+# wird erst entfernt, wenn source_url eindeutig indiziert ist
+ORACLE_SOURCE_URL_FALLBACK = ('idx_funding_source_url', 'FUNDING_OPPORTUNITIES(source_url)')
+
+# Durch die Keyset- bzw. Unique-Indizes ersetzt (Präfix derselben Spalten)
+ORACLE_OBSOLETE_INDEXES = [
+    'idx_funding_active_deadline',
+    'idx_funding_provider_deadline',
+    'idx_applications_school_created',
+]
+
+
+def _drop_index(cursor, name: str) -> bool:
+    """DROP INDEX; False, wenn der Index nicht existiert"""
+    try:
+        cursor.execute(f'DROP INDEX {name}')
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code != 1418:  # ORA-01418: Index existiert nicht
+            raise
+        return False
+    print(f'[DB] Index entfernt: {name}')
+    return True
+
+
+def _source_url_is_unique(cursor) -> bool:
+    """True, wenn ein eindeutiger Index (z.B. UNIQUE aus schema.sql) source_url abdeckt"""
+    cursor.execute('''
+        SELECT COUNT(*) FROM (
+            SELECT i.index_name FROM user_indexes i
+            JOIN user_ind_columns c ON c.index_name = i.index_name
+            WHERE i.table_name = 'FUNDING_OPPORTUNITIES' AND i.uniqueness = 'UNIQUE'
+            GROUP BY i.index_name
+            HAVING COUNT(*) = 1 AND MAX(c.column_name) = 'SOURCE_URL'
+        )
+    ''')
+    return cursor.fetchone()[0] > 0
+
+
+def _has_duplicate_source_urls(cursor) -> bool:
+    cursor.execute('''
+        SELECT COUNT(*) FROM (
+            SELECT source_url FROM FUNDING_OPPORTUNITIES
+            WHERE source_url IS NOT NULL
+            GROUP BY source_url HAVING COUNT(*) > 1
+        )
+    ''')
+    return cursor.fetchone()[0] > 0
+
+
+def _create_fulltext_datastore(cursor) -> None:
+    """Legt die MULTI_COLUMN_DATASTORE-Präferenz (neu) an"""
+    cursor.execute("""
+        BEGIN
+            BEGIN
+                CTX_DDL.DROP_PREFERENCE(:name);
+            EXCEPTION
+                WHEN OTHERS THEN NULL;  -- Präferenz existiert noch nicht
+            END;
+            CTX_DDL.CREATE_PREFERENCE(:name, 'MULTI_COLUMN_DATASTORE');
+            CTX_DDL.SET_ATTRIBUTE(:name, 'COLUMNS', :columns);
+            -- Spalten nur durch Zeilenumbruch trennen: keine <title>-Tags in CTX_DOC.SNIPPET
+            CTX_DDL.SET_ATTRIBUTE(:name, 'DELIMITER', 'NEWLINE');
+        END;
+    """, {'name': ORACLE_FULLTEXT_DATASTORE, 'columns': ', '.join(ORACLE_FULLTEXT_COLUMNS)})
+
+
+def _fulltext_datastore(cursor) -> Optional[str]:
+    """Datastore-Typ des Volltextindex (None, wenn der Index fehlt)"""
+    cursor.execute("""
+        SELECT ixo_object FROM ctx_user_index_objects
+        WHERE ixo_index_name = :name AND ixo_class = 'DATASTORE'
+    """, {'name': ORACLE_FULLTEXT_INDEX.upper()})
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def create_fulltext_index(cursor) -> None:
+    """
+    Legt den CONTEXT-Index über ORACLE_FULLTEXT_COLUMNS an
+
+    Ein älterer Index nur über cleaned_text (DIRECT_DATASTORE) wird
+    entfernt und mit dem MULTI_COLUMN_DATASTORE neu aufgebaut.
+    """
+    datastore = _fulltext_datastore(cursor)
+    if datastore == 'MULTI_COLUMN_DATASTORE':
+        print(f'[DB] Index übersprungen: {ORACLE_FULLTEXT_INDEX} (bereits mehrspaltig)')
+        return
+    if datastore is not None:
+        _drop_index(cursor, ORACLE_FULLTEXT_INDEX)
+
+    _create_fulltext_datastore(cursor)
+    try:
+        cursor.execute(f"""
+            CREATE INDEX {ORACLE_FULLTEXT_INDEX} ON FUNDING_OPPORTUNITIES(cleaned_text)
+            INDEXTYPE IS CTXSYS.CONTEXT
+            PARAMETERS ('DATASTORE {ORACLE_FULLTEXT_DATASTORE} SYNC (ON COMMIT)')
+        """)
+        print(f'[DB] Index erstellt: {ORACLE_FULLTEXT_INDEX}')
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code not in _IGNORED_INDEX_ERRORS:
+            raise
+        print(f'[DB] Index übersprungen: {ORACLE_FULLTEXT_INDEX} ({error.message.strip()})')
+
+
+def create_indexes() -> None:
+    """Migration: legt fehlende Indizes an (bereits vorhandene werden übersprungen)"""
+    with get_db_cursor() as cursor:
+        for name in ORACLE_OBSOLETE_INDEXES:
+            _drop_index(cursor, name)
+
+        for name, target in ORACLE_INDEXES:
+            try:
+                cursor.execute(f'CREATE INDEX {name} ON {target}')
+                print(f'[DB] Index erstellt: {name}')
+            except cx_Oracle.DatabaseError as e:
+                error, = e.args
+                if error.code not in _IGNORED_INDEX_ERRORS:
+                    raise
+                print(f'[DB] Index übersprungen: {name} ({error.message.strip()})')
+
+        create_fulltext_index(cursor)
+
+        # schema.sql legt source_url bereits UNIQUE an: dann nichts zu tun.
+        # Bei Duplikaten bleibt der nicht-eindeutige Fallback stehen (kein
+        # Drop/Create bei jedem Lauf), bis die Duplikate bereinigt sind.
+        fallback_name, fallback_target = ORACLE_SOURCE_URL_FALLBACK
+        for name, target in ORACLE_UNIQUE_INDEXES:
+            if _source_url_is_unique(cursor):
+                print(f'[DB] Index übersprungen: {name} (source_url bereits eindeutig indiziert)')
+                _drop_index(cursor, fallback_name)
+                continue
+
+            if _has_duplicate_source_urls(cursor):
+                print(f'[WARN] {name}: doppelte source_url-Werte, nutze nicht-eindeutigen Index {fallback_name}')
+                try:
+                    cursor.execute(f'CREATE INDEX {fallback_name} ON {fallback_target}')
+                    print(f'[DB] Index erstellt: {fallback_name}')
+                except cx_Oracle.DatabaseError as e:
+                    error, = e.args
+                    if error.code not in _IGNORED_INDEX_ERRORS:
+                        raise
+                continue
+
+            # Fallback zuerst entfernen, sonst ORA-01408 (Spalte bereits indiziert)
+            _drop_index(cursor, fallback_name)
+            cursor.execute(f'CREATE UNIQUE INDEX {name} ON {target}')
+            print(f'[DB] Index erstellt: {name}')
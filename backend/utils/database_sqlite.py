@@ -1,16 +1,28 @@
 """
 SQLite Database Manager (Dev Only)
 Development fallback when Oracle DB is not available
+
+Eine persistente Verbindung pro Thread im WAL-Modus: Leser blockieren nicht
+hinter Schreibern (Draft-Inserts, Scraper), Statements werden pro
+Verbindung gecacht.
 """
 
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Generator, Optional
+from datetime import datetime
+from typing import Generator, Optional, List, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Connection Tuning
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))
+SQLITE_CACHED_STATEMENTS = int(os.getenv('SQLITE_CACHED_STATEMENTS', 256))
+
 
 class SQLiteDatabaseManager:
     """Manager für SQLite DB Verbindungen (Development)"""
@@ -18,51 +30,134 @@ class SQLiteDatabaseManager:
     def __init__(self, db_path: str = 'dev_database.db'):
         """Initialisiert den Database Manager"""
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
 
-    def get_connection(self) -> sqlite3.Connection:
+    def get_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
         """
-        Erstellt eine neue DB-Verbindung
+        Erstellt eine neue, konfigurierte DB-Verbindung
+
+        Der Aufrufer ist für close() verantwortlich. get_cursor() und
+        get_connection_context() nutzen stattdessen die Thread-Verbindung.
+
+        Args:
+            check_same_thread: sqlite3 Thread-Prüfung (aus für Thread-Verbindungen,
+                damit close_all() sie beim Shutdown schließen kann)
 
         Returns:
             SQLite Connection Objekt
         """
-        connection = sqlite3.connect(self.db_path)
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+            check_same_thread=check_same_thread
+        )
         connection.row_factory = sqlite3.Row  # Ermöglicht dict-like access
+
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+        connection.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+        connection.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+        connection.execute('PRAGMA temp_store=MEMORY')
         return connection
 
+    def _thread_connection(self) -> sqlite3.Connection:
+        """
+        Persistente Verbindung des aktuellen Threads
+
+        Wird neu geöffnet, wenn sich db_path geändert hat (Tests).
+
+        Returns:
+            SQLite Connection Objekt
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.db_path == self.db_path:
+            return connection
+
+        if connection is not None:
+            self._discard(connection)
+
+        connection = self.get_connection(check_same_thread=False)
+        self._local.connection = connection
+        self._local.db_path = self.db_path
+        self._local.depth = 0
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _discard(self, connection: sqlite3.Connection) -> None:
+        """Schließt eine Thread-Verbindung und vergisst sie"""
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        connection.close()
+
+    def close_all(self) -> None:
+        """Schließt alle Thread-Verbindungen (Shutdown)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+
+        for connection in connections:
+            connection.close()
+
+        self._local = threading.local()
+
     @contextmanager
     def get_cursor(self) -> Generator[sqlite3.Cursor, None, None]:
         """
         Context Manager für DB-Cursor (auto-commit bei Erfolg)
 
+        Verschachtelte Aufrufe im selben Thread laufen in einem SAVEPOINT,
+        committed wird nur auf der äußersten Ebene.
+
         Yields:
             SQLite Cursor Objekt
         """
-        connection = self.get_connection()
+        connection = self._thread_connection()
+        depth = self._local.depth
+        savepoint = f'sp_{depth}' if depth else None
+
+        if savepoint:
+            connection.execute(f'SAVEPOINT {savepoint}')
+
+        self._local.depth = depth + 1
         cursor = connection.cursor()
         try:
             yield cursor
-            connection.commit()
+            if savepoint:
+                connection.execute(f'RELEASE {savepoint}')
+            else:
+                connection.commit()
         except Exception as e:
-            connection.rollback()
+            if savepoint:
+                connection.execute(f'ROLLBACK TO {savepoint}')
+                connection.execute(f'RELEASE {savepoint}')
+            else:
+                connection.rollback()
             raise e
         finally:
             cursor.close()
-            connection.close()
+            self._local.depth = depth
 
     @contextmanager
     def get_connection_context(self) -> Generator[sqlite3.Connection, None, None]:
         """
         Context Manager für DB-Connection (manuelles Commit)
 
+        Nicht committete Änderungen werden am Ende zurückgerollt.
+
         Yields:
             SQLite Connection Objekt
         """
-        connection = self.get_connection()
+        connection = self._thread_connection()
         try:
             yield connection
         finally:
-            connection.close()
+            if connection.in_transaction and self._local.depth == 0:
+                connection.rollback()
 
 
 # Singleton-Instanz
@@ -82,9 +177,20 @@ def get_db_manager() -> SQLiteDatabaseManager:
     return _db_manager
 
 
+def init_db_pool() -> None:
+    """Öffnet die Verbindung des Startup-Threads (aktiviert WAL)"""
+    get_db_manager()._thread_connection()
+
+
+def close_db_pool() -> None:
+    """Schließt alle persistenten Verbindungen (FastAPI Lifespan Shutdown)"""
+    if _db_manager is not None:
+        _db_manager.close_all()
+
+
 # Convenience-Funktionen
 def get_db_connection() -> sqlite3.Connection:
-    """Erstellt eine neue DB-Verbindung"""
+    """Erstellt eine neue DB-Verbindung (Aufrufer schließt sie)"""
     return get_db_manager().get_connection()
 
 
@@ -201,6 +307,7 @@ def init_sqlite_schema():
                 url TEXT,
                 source_url TEXT,
                 cleaned_text TEXT,
+                summary TEXT,
                 metadata_json TEXT,
                 last_scraped TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -242,9 +349,195 @@ def init_sqlite_schema():
             )
         ''')
 
+        # updated_at bei jeder Änderung setzen (wie die Oracle-Trigger);
+        # Grundlage für Last-Modified / Datenversion des Response-Caches.
+        # Millisekunden (auch beim INSERT), damit Änderungen in derselben
+        # Sekunde sichtbar sind und neue Zeilen immer das Maximum bilden.
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS funding_set_updated_at
+            AFTER UPDATE ON FUNDING_OPPORTUNITIES
+            WHEN new.updated_at IS old.updated_at
+            BEGIN
+                UPDATE FUNDING_OPPORTUNITIES
+                SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                WHERE rowid = new.rowid;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS funding_insert_updated_at
+            AFTER INSERT ON FUNDING_OPPORTUNITIES
+            BEGIN
+                UPDATE FUNDING_OPPORTUNITIES
+                SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                WHERE rowid = new.rowid;
+            END
+        ''')
+
+        add_missing_columns(cursor)
+        create_indexes(cursor)
+        create_fulltext_index(cursor)
+
+        # Listen-Vorschau für Programme aus älteren Importen
+        from utils.summary import backfill_summaries
+        backfill_summaries(cursor)
+
     print("✅ SQLite Schema initialized")
 
 
+# Nachträglich ergänzte Spalten: (Tabelle, Spalte, Typ)
+SQLITE_ADDED_COLUMNS = [
+    ('FUNDING_OPPORTUNITIES', 'summary', 'TEXT'),
+]
+
+
+def add_missing_columns(cursor: sqlite3.Cursor) -> None:
+    """
+    Migration: ergänzt neue Spalten in bestehenden Datenbanken
+
+    CREATE TABLE IF NOT EXISTS ändert vorhandene Tabellen nicht.
+    """
+    for table, column, column_type in SQLITE_ADDED_COLUMNS:
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+            print(f'[DB] Added column {table}.{column}')
+
+
+# Indizes für die häufigsten Queries (list_funding inkl. Keyset-Pagination
+# auf (application_deadline, funding_id), Datenversion des Response-Caches
+# (MAX(updated_at)), list_applications auf (created_at, application_id),
+# Entwürfe pro Antrag)
+SQLITE_INDEXES = [
+    ('idx_funding_deadline_keyset', 'FUNDING_OPPORTUNITIES(application_deadline, funding_id)'),
+    ('idx_funding_provider_keyset', 'FUNDING_OPPORTUNITIES(provider, application_deadline, funding_id)'),
+    ('idx_funding_updated_at', 'FUNDING_OPPORTUNITIES(updated_at)'),
+    ('idx_applications_school_keyset', 'APPLICATIONS(school_id, created_at, application_id)'),
+    ('idx_drafts_application_created', 'APPLICATION_DRAFTS(application_id, created_at)'),
+]
+
+# Eindeutige Indizes: Scraper-Upsert ON CONFLICT(source_url)
+SQLITE_UNIQUE_INDEXES = [
+    ('idx_funding_source_url_unique', 'FUNDING_OPPORTUNITIES(source_url)'),
+]
+
+# Fallback, solange doppelte source_url-Werte den Unique-Index verhindern
+SQLITE_SOURCE_URL_FALLBACK = ('idx_funding_source_url', 'FUNDING_OPPORTUNITIES(source_url)')
+
+# Durch die Keyset- bzw. Unique-Indizes ersetzt (Präfix derselben Spalten)
+SQLITE_OBSOLETE_INDEXES = [
+    'idx_funding_deadline',
+    'idx_funding_provider_deadline',
+    'idx_applications_school_created',
+    'idx_funding_source_url',
+]
+
+
+def duplicate_source_urls(cursor: sqlite3.Cursor) -> List[str]:
+    """source_url-Werte, die mehreren Programmen gehören"""
+    cursor.execute('''
+        SELECT source_url FROM FUNDING_OPPORTUNITIES
+        WHERE source_url IS NOT NULL
+        GROUP BY source_url HAVING COUNT(*) > 1
+    ''')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def merge_duplicate_source_urls(cursor: sqlite3.Cursor) -> List[Tuple[str, str, str]]:
+    """
+    Führt Programme mit gleicher source_url zusammen (Voraussetzung für den
+    Unique-Index, nur über run_index_migration.py --merge-duplicates)
+
+    Behalten wird jeweils die zuletzt aktualisierte Zeile; Anträge der
+    übrigen Zeilen werden auf sie umgehängt.
+
+    Returns:
+        (source_url, behaltene funding_id, entfernte funding_id) je entfernter Zeile
+    """
+    merged = []
+    for url in duplicate_source_urls(cursor):
+        cursor.execute(
+            '''SELECT funding_id FROM FUNDING_OPPORTUNITIES WHERE source_url = ?
+            ORDER BY updated_at DESC, rowid DESC''',
+            (url,)
+        )
+        keep, *duplicates = [row[0] for row in cursor.fetchall()]
+        for funding_id in duplicates:
+            cursor.execute('UPDATE APPLICATIONS SET funding_id = ? WHERE funding_id = ?', (keep, funding_id))
+            cursor.execute('DELETE FROM FUNDING_OPPORTUNITIES WHERE funding_id = ?', (funding_id,))
+            merged.append((url, keep, funding_id))
+
+    if merged:
+        print(f'[DB] Merged {len(merged)} duplicate funding rows by source_url')
+    return merged
+
+
+def backup_database(target: Optional[str] = None) -> str:
+    """
+    Online-Backup der SQLite-DB (sqlite3 Backup-API, z.B. vor Migrationen)
+
+    Args:
+        target: Zieldatei (default: <db_path>.<Zeitstempel>.bak)
+
+    Returns:
+        Pfad des Backups
+    """
+    manager = get_db_manager()
+    target = target or f'{manager.db_path}.{datetime.now():%Y%m%d-%H%M%S}.bak'
+    source = manager.get_connection()
+    destination = sqlite3.connect(target)
+    try:
+        source.backup(destination)
+    finally:
+        destination.close()
+        source.close()
+    return target
+
+
+def create_indexes(cursor: Optional[sqlite3.Cursor] = None) -> None:
+    """
+    Migration: legt fehlende Indizes an (idempotent, auch für bestehende DBs)
+
+    Läuft bei jedem Start (init_sqlite_schema) und ändert keine Daten: bei
+    doppelten source_url-Werten bleibt es beim nicht-eindeutigen Index, bis
+    run_index_migration.py --merge-duplicates die Duplikate zusammenführt.
+
+    Args:
+        cursor: Offener Cursor (default: eigener Cursor)
+    """
+    if cursor is None:
+        with get_db_cursor() as cursor:
+            create_indexes(cursor)
+        return
+
+    for name, target in SQLITE_INDEXES:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    existing = {row[0] for row in cursor.fetchall()}
+    needed_fallbacks = set()
+    for name, target in SQLITE_UNIQUE_INDEXES:
+        if name in existing:
+            continue
+        duplicates = duplicate_source_urls(cursor)
+        if duplicates:
+            fallback_name, fallback_target = SQLITE_SOURCE_URL_FALLBACK
+            print(
+                f'[WARN] {name}: {len(duplicates)} doppelte source_url-Werte, nutze '
+                f'{fallback_name} (zusammenführen: python run_index_migration.py --merge-duplicates)'
+            )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {fallback_name} ON {fallback_target}')
+            needed_fallbacks.add(fallback_name)
+        else:
+            cursor.execute(f'CREATE UNIQUE INDEX {name} ON {target}')
+
+    for name in SQLITE_OBSOLETE_INDEXES:
+        if name not in needed_fallbacks:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+    # Statistiken für den Query Planner (nur wenn nötig)
+    cursor.execute('PRAGMA optimize')
+
+
 def seed_demo_data():
     """
     Fügt Demo-Daten für Entwicklung ein
@@ -322,3 +615,103 @@ def seed_demo_data():
     print(f"   School ID: {school_id}")
     print(f"   User ID: {user_id}")
     print(f"   Login: admin@gs-musterberg.de / test1234")
+
+
+# FTS5-Volltextindex über die Fördertexte. Eigenständige Tabelle, per Trigger
+# synchron gehalten und über funding_id verknüpft (nicht über die rowid:
+# FUNDING_OPPORTUNITIES hat einen TEXT-Primärschlüssel, VACUUM darf die
+# implizite rowid neu vergeben). Titel, Anbieter, Region, Förderbereich und
+# Text deckt unter Oracle auch der MULTI_COLUMN_DATASTORE von idx_funding_fulltext ab.
+FUNDING_FTS_COLUMNS = [
+    'title', 'provider', 'region', 'funding_area', 'description', 'categories', 'cleaned_text'
+]
+
+
+def create_fulltext_index(cursor: Optional[sqlite3.Cursor] = None) -> None:
+    """
+    Migration: legt FUNDING_FTS (FTS5) samt Sync-Triggern an (idempotent)
+
+    Ist der Index leer oder nicht vollständig (z.B. bestehende DB, Importe
+    ohne Trigger), wird er aus FUNDING_OPPORTUNITIES neu aufgebaut.
+
+    Args:
+        cursor: Offener Cursor (default: eigener Cursor)
+    """
+    if cursor is None:
+        with get_db_cursor() as cursor:
+            create_fulltext_index(cursor)
+        return
+
+    columns = ', '.join(FUNDING_FTS_COLUMNS)
+    new_values = ', '.join(f'new.{col}' for col in FUNDING_FTS_COLUMNS)
+
+    # Ältere DBs: FUNDING_FTS mit anderen Spalten neu anlegen (wird unten neu befüllt)
+    existing = [row[1] for row in cursor.execute('PRAGMA table_info(FUNDING_FTS)').fetchall()]
+    if existing and existing != ['funding_id'] + FUNDING_FTS_COLUMNS:
+        cursor.execute('DROP TABLE FUNDING_FTS')
+
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS FUNDING_FTS USING fts5(
+            funding_id UNINDEXED,
+            {columns},
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''')
+
+    # Neu anlegen: ältere DBs haben Trigger, die über die rowid synchronisieren
+    for trigger in ('funding_fts_insert', 'funding_fts_delete', 'funding_fts_update'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+    cursor.execute(f'''
+        CREATE TRIGGER funding_fts_insert AFTER INSERT ON FUNDING_OPPORTUNITIES
+        BEGIN
+            INSERT INTO FUNDING_FTS (funding_id, {columns})
+            VALUES (new.funding_id, {new_values});
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER funding_fts_delete AFTER DELETE ON FUNDING_OPPORTUNITIES
+        BEGIN
+            DELETE FROM FUNDING_FTS WHERE funding_id = old.funding_id;
+        END
+    ''')
+
+    # Nur bei Änderungen an indizierten Spalten (nicht bei last_scraped etc.)
+    cursor.execute(f'''
+        CREATE TRIGGER funding_fts_update
+        AFTER UPDATE OF funding_id, {columns} ON FUNDING_OPPORTUNITIES
+        BEGIN
+            DELETE FROM FUNDING_FTS WHERE funding_id = old.funding_id;
+            INSERT INTO FUNDING_FTS (funding_id, {columns})
+            VALUES (new.funding_id, {new_values});
+        END
+    ''')
+
+    indexed = cursor.execute('SELECT COUNT(*) FROM FUNDING_FTS').fetchone()[0]
+    total = cursor.execute('SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES').fetchone()[0]
+    if indexed != total:
+        rebuild_fulltext_index(cursor)
+
+
+def rebuild_fulltext_index(cursor: Optional[sqlite3.Cursor] = None) -> None:
+    """
+    Baut FUNDING_FTS komplett neu auf (nach Bulk-Imports ohne Trigger)
+
+    Args:
+        cursor: Offener Cursor (default: eigener Cursor)
+    """
+    if cursor is None:
+        with get_db_cursor() as cursor:
+            rebuild_fulltext_index(cursor)
+        return
+
+    columns = ', '.join(FUNDING_FTS_COLUMNS)
+    cursor.execute('DELETE FROM FUNDING_FTS')
+    cursor.execute(f'''
+        INSERT INTO FUNDING_FTS (funding_id, {columns})
+        SELECT funding_id, {columns} FROM FUNDING_OPPORTUNITIES
+    ''')
+    indexed = cursor.rowcount
+    cursor.execute("INSERT INTO FUNDING_FTS (FUNDING_FTS) VALUES ('optimize')")
+    print(f'[DB] FTS5-Index neu aufgebaut ({indexed} Programme)')
@@ -1,8 +1,17 @@
 """
 Database Adapter - Auto-detects Oracle or SQLite
+
+Async-API (db_fetch_all, db_fetch_one, db_execute, run_db) führt die
+blockierenden DB-Aufrufe in einem begrenzten Thread-Pool aus, damit async
+FastAPI-Handler den Event Loop nicht blockieren.
 """
 
 import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,7 +26,10 @@ if USE_SQLITE:
         get_db_connection,
         get_db_manager,
         init_sqlite_schema,
-        seed_demo_data
+        seed_demo_data,
+        init_db_pool,
+        close_db_pool,
+        create_indexes
     )
 else:
     print("[DB] Using Oracle Database (Production Mode)")
@@ -25,7 +37,10 @@ else:
         from utils.database import (
             get_db_cursor,
             get_db_connection,
-            get_db_manager
+            get_db_manager,
+            init_db_pool,
+            close_db_pool,
+            create_indexes
         )
         # Oracle doesn't need init functions
         init_sqlite_schema = None
@@ -39,8 +54,133 @@ else:
             get_db_connection,
             get_db_manager,
             init_sqlite_schema,
-            seed_demo_data
+            seed_demo_data,
+            init_db_pool,
+            close_db_pool,
+            create_indexes
+        )
+
+
+# Bounded executor for blocking DB calls (should not exceed the Oracle pool size)
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', os.getenv('ORACLE_POOL_MAX', 10)))
+
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=DB_EXECUTOR_WORKERS,
+            thread_name_prefix='db'
         )
+    return _db_executor
+
+
+def shutdown_db_executor() -> None:
+    """Wartet auf laufende DB-Aufrufe und beendet den Thread-Pool (Shutdown)"""
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """
+    Führt eine blockierende DB-Funktion im DB-Thread-Pool aus
+
+    Für mehrere Statements in einer Transaktion: eine Funktion mit einem
+    get_db_cursor()-Block übergeben.
+
+    Args:
+        func: Synchrone Funktion
+        *args, **kwargs: Argumente für func
+
+    Returns:
+        Rückgabewert von func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def _execute_on(cursor, query: str, params) -> None:
+    if params is None:
+        cursor.execute(query)
+    else:
+        cursor.execute(query, params)
+
+
+def _rows_as_dicts(cursor, rows) -> List[Dict[str, Any]]:
+    columns = [col[0].lower() for col in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _fetch_all(query: str, params=None, as_dicts: bool = False) -> list:
+    # Rows outlive the pooled connection; Oracle LOBs therefore arrive as
+    # str/bytes (outputtypehandler in utils.database), not as locators
+    with get_db_cursor() as cursor:
+        _execute_on(cursor, query, params)
+        rows = cursor.fetchall()
+        return _rows_as_dicts(cursor, rows) if as_dicts else rows
+
+
+def _fetch_one(query: str, params=None, as_dict: bool = False):
+    with get_db_cursor() as cursor:
+        _execute_on(cursor, query, params)
+        row = cursor.fetchone()
+        if row is None or not as_dict:
+            return row
+        return _rows_as_dicts(cursor, [row])[0]
+
+
+def _execute(query: str, params=None) -> int:
+    with get_db_cursor() as cursor:
+        _execute_on(cursor, query, params)
+        return cursor.rowcount
+
+
+async def db_fetch_all(query: str, params=None, as_dicts: bool = False) -> list:
+    """
+    SELECT ausführen und alle Zeilen zurückgeben (async)
+
+    Args:
+        query: SQL Query
+        params: Query-Parameter (tuple für SQLite, dict für Oracle)
+        as_dicts: Zeilen als dicts mit kleingeschriebenen Spaltennamen
+
+    Returns:
+        Liste von Zeilen
+    """
+    return await run_db(_fetch_all, query, params, as_dicts)
+
+
+async def db_fetch_one(query: str, params=None, as_dict: bool = False):
+    """
+    SELECT ausführen und die erste Zeile zurückgeben (async)
+
+    Args:
+        query: SQL Query
+        params: Query-Parameter
+        as_dict: Zeile als dict mit kleingeschriebenen Spaltennamen
+
+    Returns:
+        Zeile oder None
+    """
+    return await run_db(_fetch_one, query, params, as_dict)
+
+
+async def db_execute(query: str, params=None) -> int:
+    """
+    INSERT/UPDATE/DELETE ausführen und committen (async)
+
+    Args:
+        query: SQL Query
+        params: Query-Parameter
+
+    Returns:
+        Anzahl betroffener Zeilen
+    """
+    return await run_db(_execute, query, params)
 
 
 __all__ = [
@@ -49,5 +189,13 @@ __all__ = [
     'get_db_manager',
     'init_sqlite_schema',
     'seed_demo_data',
+    'init_db_pool',
+    'close_db_pool',
+    'create_indexes',
+    'run_db',
+    'db_fetch_all',
+    'db_fetch_one',
+    'db_execute',
+    'shutdown_db_executor',
     'USE_SQLITE'
 ]
@@ -0,0 +1,245 @@
+"""
+Funding Facets
+Vorberechnete Filter-Facetten (Wert + Anzahl) für /funding/filters/options
+
+Die Facetten werden einmal nach jedem Scrape/Index-Lauf berechnet
+(refresh_facets) und als Snapshot in FUNDING_FACETS gespeichert. Die API
+liest sie aus einem In-Process-Cache (get_facets); spätestens nach
+FACETS_CACHE_TTL Sekunden wird per ETag-Vergleich (ein PK-Lookup) geprüft,
+ob ein anderer Prozess (Scraper) einen neueren Snapshot geschrieben hat.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from utils.db_adapter import get_db_cursor, USE_SQLITE
+
+load_dotenv()
+
+# Sekunden bis zur ETag-Prüfung gegen FUNDING_FACETS (Scraper-Updates)
+FACETS_CACHE_TTL = float(os.getenv('FACETS_CACHE_TTL', 30))
+
+FACETS_SNAPSHOT_NAME = 'filters'
+
+# Facette -> Spalte (categories: kommagetrennte Liste)
+FACET_COLUMNS = {
+    'providers': 'provider',
+    'regions': 'region',
+    'funding_areas': 'funding_area',
+    'categories': 'categories',
+}
+
+_SPLIT_FACETS = {'categories'}
+
+# Nur aktive Programme (Oracle hat is_active, SQLite nicht)
+_ACTIVE_FILTER = '' if USE_SQLITE else ' AND is_active = 1'
+
+
+# Oracle: CREATE TABLE nur einmal pro Prozess versuchen
+_table_ready = False
+
+
+def _ensure_table(cursor) -> None:
+    global _table_ready
+
+    if USE_SQLITE:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS FUNDING_FACETS (
+                name TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        return
+
+    if _table_ready:
+        return
+
+    import cx_Oracle
+    try:
+        cursor.execute('''
+            CREATE TABLE FUNDING_FACETS (
+                name VARCHAR2(50) PRIMARY KEY,
+                payload CLOB NOT NULL,
+                etag VARCHAR2(64) NOT NULL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code != 955:  # ORA-00955: Tabelle existiert bereits
+            raise
+    _table_ready = True
+
+
+def compute_facets(cursor) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Berechnet alle Facetten mit Anzahl pro Wert
+
+    Args:
+        cursor: Offener DB-Cursor
+
+    Returns:
+        {facette: [{'value': ..., 'count': ...}, ...]} nach Wert sortiert
+    """
+    facets = {}
+    for facet, column in FACET_COLUMNS.items():
+        cursor.execute(f'''
+            SELECT {column}, COUNT(*)
+            FROM FUNDING_OPPORTUNITIES
+            WHERE {column} IS NOT NULL{_ACTIVE_FILTER}
+            GROUP BY {column}
+        ''')
+
+        counts = Counter()
+        for value, count in cursor.fetchall():
+            if facet in _SPLIT_FACETS:
+                for part in {item.strip() for item in str(value).split(',')}:
+                    if part:
+                        counts[part] += count
+            elif str(value).strip():
+                counts[value] += count
+
+        facets[facet] = [
+            {'value': value, 'count': count}
+            for value, count in sorted(counts.items(), key=lambda item: str(item[0]).lower())
+        ]
+
+    return facets
+
+
+def _etag_for(payload: str) -> str:
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def refresh_facets() -> str:
+    """
+    Berechnet die Facetten neu und speichert den Snapshot
+
+    Aufruf nach jedem Scrape-/Index-Lauf. Die API übernimmt den neuen Stand
+    spätestens nach FACETS_CACHE_TTL Sekunden (im selben Prozess sofort).
+
+    Returns:
+        ETag des neuen Snapshots
+    """
+    with get_db_cursor() as cursor:
+        _ensure_table(cursor)
+        payload = json.dumps(compute_facets(cursor), ensure_ascii=False, sort_keys=True)
+        etag = _etag_for(payload)
+
+        cursor.execute(
+            'DELETE FROM FUNDING_FACETS WHERE name = :name',
+            {'name': FACETS_SNAPSHOT_NAME}
+        )
+        cursor.execute(
+            'INSERT INTO FUNDING_FACETS (name, payload, etag) VALUES (:name, :payload, :etag)',
+            {'name': FACETS_SNAPSHOT_NAME, 'payload': payload, 'etag': etag}
+        )
+
+    _cache.store(etag, json.loads(payload))
+    print(f'[FACETS] Snapshot aktualisiert (etag={etag[:12]})')
+    return etag
+
+
+def _read_etag() -> Optional[str]:
+    with get_db_cursor() as cursor:
+        _ensure_table(cursor)
+        cursor.execute(
+            'SELECT etag FROM FUNDING_FACETS WHERE name = :name',
+            {'name': FACETS_SNAPSHOT_NAME}
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _read_snapshot() -> Optional[Tuple[str, Dict[str, Any]]]:
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            'SELECT etag, payload FROM FUNDING_FACETS WHERE name = :name',
+            {'name': FACETS_SNAPSHOT_NAME}
+        )
+        row = cursor.fetchone()
+    if not row:
+        return None
+    payload = row[1].read() if hasattr(row[1], 'read') else row[1]
+    return row[0], json.loads(payload)
+
+
+class _FacetsCache:
+    """Letzter Snapshot im Speicher + Zeitpunkt der letzten ETag-Prüfung"""
+
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.facets: Optional[Dict[str, Any]] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def store(self, etag: str, facets: Dict[str, Any]) -> None:
+        with self.lock:
+            self.etag = etag
+            self.facets = facets
+            self.checked_at = time.monotonic()
+
+    def fresh(self) -> bool:
+        return self.facets is not None and time.monotonic() - self.checked_at < FACETS_CACHE_TTL
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.checked_at = 0.0
+
+
+_cache = _FacetsCache()
+
+
+def get_facets() -> Tuple[str, Dict[str, Any]]:
+    """
+    Liefert (etag, facetten) - innerhalb der TTL ohne DB-Zugriff
+
+    Blockierend (DB-Zugriff nach Ablauf der TTL); aus async Handlern über
+    run_db aufrufen.
+
+    Returns:
+        (ETag, {facette: [{'value', 'count'}]})
+    """
+    if _cache.fresh():
+        return _cache.etag, _cache.facets
+
+    etag = _read_etag()
+    if etag is None:
+        # Noch kein Snapshot (frische DB): einmalig berechnen
+        refresh_facets()
+    elif etag != _cache.etag:
+        snapshot = _read_snapshot()
+        if snapshot is None:
+            refresh_facets()
+        else:
+            _cache.store(*snapshot)
+    else:
+        _cache.store(etag, _cache.facets)
+
+    return _cache.etag, _cache.facets
+
+
+def invalidate_facets_cache() -> None:
+    """Erzwingt die ETag-Prüfung beim nächsten get_facets() (gleicher Prozess)"""
+    _cache.invalidate()
+
+
+def facet_options(facets: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Response-Format für /filters/options
+
+    Werte-Listen pro Facette (kompatibel mit dem bisherigen Format) plus
+    'facets' mit Anzahl pro Wert.
+    """
+    options = {facet: [item['value'] for item in items] for facet, items in facets.items()}
+    options['facets'] = facets
+    return options
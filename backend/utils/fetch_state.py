@@ -0,0 +1,295 @@
+"""
+Fetch State
+Abrufstatus pro URL (ETag, Last-Modified, Inhalts-Hash) für Scraper
+
+Nächtliche Läufe holen fast nur unveränderte Seiten. FETCH_STATE merkt
+sich pro URL die Validatoren des Servers und einen Hash des normalisierten
+Inhalts:
+    probe()        bedingter GET (If-None-Match / If-Modified-Since) direkt
+                   beim Server; 304 -> kein Firecrawl/Browser-Abruf nötig
+    is_unchanged() Hash-Vergleich, falls der Server keine Validatoren kennt;
+                   gleicher Inhalt -> keine LLM-Extraktion, kein DB-Write
+Neue Stände werden erst mit flush() gespeichert (nach dem DB-Write), damit
+ein abgebrochener Lauf Seiten nicht fälschlich als verarbeitet markiert.
+Validatoren aus probe() werden erst mit remember() vorgemerkt: ein neuer
+ETag neben einem alten Hash würde die Seite sonst dauerhaft per 304
+überspringen.
+SCRAPER_FORCE_REFRESH=true verarbeitet alle Seiten neu (z.B. nach Änderung
+des Extraktions-Prompts).
+"""
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+from utils.db_adapter import get_db_cursor, USE_SQLITE
+
+load_dotenv()
+
+# Timeout des bedingten GET (Sekunden)
+FETCH_PROBE_TIMEOUT = float(os.getenv('FETCH_PROBE_TIMEOUT', 10))
+
+SQLITE_UPSERT = """
+    INSERT INTO FETCH_STATE (url, etag, last_modified, content_hash, checked_at)
+    VALUES (:url, :etag, :last_modified, :content_hash, CURRENT_TIMESTAMP)
+    ON CONFLICT(url) DO UPDATE SET
+        etag = excluded.etag,
+        last_modified = excluded.last_modified,
+        content_hash = excluded.content_hash,
+        checked_at = CURRENT_TIMESTAMP
+"""
+
+ORACLE_MERGE = """
+    MERGE INTO FETCH_STATE f
+    USING (SELECT :url AS url FROM dual) s
+    ON (f.url = s.url)
+    WHEN MATCHED THEN UPDATE SET
+        f.etag = :etag,
+        f.last_modified = :last_modified,
+        f.content_hash = :content_hash,
+        f.checked_at = CURRENT_TIMESTAMP
+    WHEN NOT MATCHED THEN INSERT (url, etag, last_modified, content_hash, checked_at)
+    VALUES (:url, :etag, :last_modified, :content_hash, CURRENT_TIMESTAMP)
+"""
+
+# Volatile Teile, die keinen inhaltlichen Unterschied bedeuten
+_NORMALIZE_PATTERNS = [
+    (re.compile(r'\]\(([^)?#\s]*)[?#][^)\s]*\)'), r'](\1)'),  # Query/Fragment in Links
+    (re.compile('[\u200b\u200c\u200d\ufeff\u00ad]'), ''),    # unsichtbare Zeichen
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_content(text: str) -> str:
+    """Normalisiert Markdown für den Vergleich (Whitespace, Cache-Buster)"""
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 des normalisierten Inhalts"""
+    return hashlib.sha256(normalize_content(text).encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class FetchState:
+    """Gespeicherter Stand einer URL"""
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+# Oracle: CREATE TABLE nur einmal pro Prozess versuchen
+_table_ready = False
+
+
+def _ensure_table(cursor) -> None:
+    global _table_ready
+
+    if USE_SQLITE:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS FETCH_STATE (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        return
+
+    if _table_ready:
+        return
+
+    import cx_Oracle
+    try:
+        cursor.execute('''
+            CREATE TABLE FETCH_STATE (
+                url VARCHAR2(2048) PRIMARY KEY,
+                etag VARCHAR2(512),
+                last_modified VARCHAR2(64),
+                content_hash VARCHAR2(64),
+                checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code != 955:  # ORA-00955: Tabelle existiert bereits
+            raise
+    _table_ready = True
+
+
+class FetchStateStore:
+    """Abrufstatus aller URLs eines Scraper-Laufs (einmal geladen)"""
+
+    def __init__(self, force_refresh: Optional[bool] = None):
+        """
+        Args:
+            force_refresh: Nie überspringen (default: SCRAPER_FORCE_REFRESH)
+        """
+        if force_refresh is None:
+            force_refresh = os.getenv('SCRAPER_FORCE_REFRESH', 'false').lower() == 'true'
+        self.force_refresh = force_refresh
+        self._states: Optional[Dict[str, FetchState]] = None
+        self._pending: Dict[str, FetchState] = {}
+        # Validatoren aus probe() bis zur erfolgreichen Verarbeitung
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.unchanged = 0
+
+    def _load(self) -> Dict[str, FetchState]:
+        if self._states is None:
+            with get_db_cursor() as cursor:
+                _ensure_table(cursor)
+                cursor.execute('SELECT url, etag, last_modified, content_hash FROM FETCH_STATE')
+                self._states = {row[0]: FetchState(*row) for row in cursor.fetchall()}
+        return self._states
+
+    def get(self, url: str) -> Optional[FetchState]:
+        """Aktueller Stand einer URL (inkl. noch nicht gespeicherter Änderungen)"""
+        with self._lock:
+            return self._pending.get(url) or self._load().get(url)
+
+    def _stage(self, url: str, **changes) -> None:
+        with self._lock:
+            current = self._pending.get(url) or self._load().get(url) or FetchState(url)
+            self._pending[url] = replace(current, **changes)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since aus dem gespeicherten Stand"""
+        state = self.get(url)
+        headers = {}
+        if state and state.etag:
+            headers['If-None-Match'] = state.etag
+        if state and state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+        return headers
+
+    def probe(self, url: str, timeout: float = FETCH_PROBE_TIMEOUT) -> bool:
+        """
+        Bedingter GET direkt beim Server (nur Header, Body wird nicht gelesen)
+
+        Lernt bei 200 ETag/Last-Modified; gespeichert werden sie erst mit
+        dem Inhalt (remember() bzw. is_unchanged()). Server ohne Validatoren
+        werden danach nicht mehr geprüft (dann nur Hash-Vergleich).
+
+        Returns:
+            True, wenn der Server 304 meldet und die Seite bereits
+            verarbeitet wurde (Abruf und Extraktion überspringen)
+        """
+        state = self.get(url)
+        if state and not (state.etag or state.last_modified):
+            return False
+
+        try:
+            with requests.get(
+                url,
+                headers=self.conditional_headers(url),
+                timeout=timeout,
+                stream=True,
+                allow_redirects=True
+            ) as response:
+                status = response.status_code
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except requests.exceptions.RequestException:
+            return False
+
+        if status == 304:
+            if state and state.content_hash and not self.force_refresh:
+                with self._lock:
+                    self.not_modified += 1
+                return True
+            return False
+
+        if status == 200:
+            with self._lock:
+                self._validators[url] = (etag, last_modified)
+        return False
+
+    def _stage_processed(self, url: str, **changes) -> None:
+        """Merkt Inhalt plus die Validatoren des zugehörigen Abrufs vor"""
+        with self._lock:
+            validators = self._validators.pop(url, None)
+        if validators is not None:
+            changes.update(etag=validators[0], last_modified=validators[1])
+        if changes:
+            self._stage(url, **changes)
+
+    def is_unchanged(self, url: str, text: str) -> bool:
+        """True, wenn der normalisierte Inhalt dem zuletzt verarbeiteten gleicht"""
+        state = self.get(url)
+        if self.force_refresh or not state or not state.content_hash:
+            return False
+        if state.content_hash != content_hash(text):
+            return False
+        # Gleicher Inhalt wie der gespeicherte Hash: neue Validatoren passen
+        self._stage_processed(url)
+        with self._lock:
+            self.unchanged += 1
+        return True
+
+    def remember(self, url: str, text: str) -> None:
+        """Merkt den verarbeiteten Inhalt vor (gespeichert mit flush())"""
+        if url:
+            self._stage_processed(url, content_hash=content_hash(text))
+
+    def forget(self, url: str) -> None:
+        """Verwirft vorgemerkte Änderungen (z.B. DB-Write fehlgeschlagen)"""
+        with self._lock:
+            self._pending.pop(url, None)
+            self._validators.pop(url, None)
+
+    def flush(self, urls: Optional[Iterable[str]] = None) -> int:
+        """
+        Speichert vorgemerkte Stände (ein executemany)
+
+        Args:
+            urls: Nur diese URLs speichern (default: alle). Bei parallelen
+                Abrufen nur die URL, deren Zeilen gerade geschrieben wurden.
+
+        Returns:
+            Anzahl gespeicherter URLs
+        """
+        with self._lock:
+            if urls is None:
+                pending, self._pending = self._pending, {}
+            else:
+                pending = {url: self._pending.pop(url) for url in set(urls) if url in self._pending}
+        if not pending:
+            return 0
+
+        rows = [
+            {
+                'url': state.url,
+                'etag': state.etag,
+                'last_modified': state.last_modified,
+                'content_hash': state.content_hash
+            }
+            for state in pending.values()
+        ]
+        try:
+            with get_db_cursor() as cursor:
+                _ensure_table(cursor)
+                cursor.executemany(SQLITE_UPSERT if USE_SQLITE else ORACLE_MERGE, rows)
+        except Exception:
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+            raise
+
+        with self._lock:
+            self._load().update(pending)
+        return len(rows)
+
+    def stats(self) -> str:
+        """Kurzfassung für die Lauf-Statistik"""
+        return f'{self.not_modified} not modified (304), {self.unchanged} unchanged content'
@@ -0,0 +1,66 @@
+"""
+Full-Text Search Helpers
+Wandelt Nutzereingaben (q=) in sichere FTS5- bzw. Oracle-Text-Queries um
+
+Nutzereingaben werden nie direkt als MATCH/CONTAINS-Syntax verwendet:
+Operatoren, Anführungszeichen und Sonderzeichen würden sonst Syntaxfehler
+auslösen. Stattdessen werden Wort-Tokens extrahiert und mit UND verknüpft.
+"""
+
+import re
+from typing import List
+
+# Markierung der Treffer in Snippets
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Snippet-Länge (FTS5: Tokens)
+SNIPPET_TOKENS = 16
+
+# Maximale Anzahl Suchbegriffe pro Query
+MAX_QUERY_TERMS = 8
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize_query(q: str) -> List[str]:
+    """
+    Extrahiert Suchbegriffe aus der Nutzereingabe
+
+    Args:
+        q: Freitext, z.B. 'Digitalisierung "Grundschule" -Tablets'
+
+    Returns:
+        Kleingeschriebene Wort-Tokens (dedupliziert, max. MAX_QUERY_TERMS)
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall((q or '').lower()):
+        if token not in terms:
+            terms.append(token)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def fts5_match_query(q: str) -> str:
+    """
+    SQLite FTS5 MATCH-Ausdruck: alle Begriffe (Präfix-Suche), UND-verknüpft
+
+    Args:
+        q: Freitext
+
+    Returns:
+        MATCH-Ausdruck, '' wenn keine Suchbegriffe
+    """
+    return ' '.join(f'"{term}"*' for term in tokenize_query(q))
+
+
+def oracle_contains_query(q: str) -> str:
+    """
+    Oracle Text CONTAINS-Ausdruck: alle Begriffe (escaped), UND-verknüpft
+
+    Args:
+        q: Freitext
+
+    Returns:
+        CONTAINS-Ausdruck, '' wenn keine Suchbegriffe
+    """
+    return ' AND '.join(f'{{{term}}}' for term in tokenize_query(q))
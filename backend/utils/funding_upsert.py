@@ -0,0 +1,168 @@
+"""
+Funding Upsert
+Bulk-Speichern gescrapter Förderprogramme (Schlüssel: source_url)
+
+Statt SELECT + UPDATE/INSERT pro Programm (zwei Round-Trips je Zeile)
+schreibt ein einziges executemany alle Programme:
+    Oracle: MERGE mit Array-Binding, Fehler pro Zeile über batcherrors
+    SQLite: INSERT ... ON CONFLICT(source_url) DO UPDATE
+Eine zweite Query zählt, welche der neu vergebenen IDs angelegt wurden.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from utils.db_adapter import get_db_cursor, USE_SQLITE
+from utils.summary import make_summary
+
+# Spalten, die bei erneutem Scrape überschrieben werden
+_UPDATE_COLUMNS = [
+    ('title', 'title'),
+    ('cleaned_text', 'cleaned_text'),
+    ('summary', 'summary'),
+    ('provider', 'provider'),
+    ('region', 'region'),
+    ('funding_area', 'funding_area'),
+    ('deadline', 'deadline'),
+    ('min_funding_amount', 'min_amount'),
+    ('max_funding_amount', 'max_amount'),
+    ('metadata_json', 'metadata'),
+]
+
+_INSERT_COLUMNS = ['funding_id', 'source_url'] + [column for column, _ in _UPDATE_COLUMNS]
+_INSERT_BINDS = [':funding_id', ':url'] + [f':{bind}' for _, bind in _UPDATE_COLUMNS]
+
+SQLITE_UPSERT = f"""
+    INSERT INTO FUNDING_OPPORTUNITIES ({', '.join(_INSERT_COLUMNS)}, last_scraped)
+    VALUES ({', '.join(_INSERT_BINDS)}, CURRENT_TIMESTAMP)
+    ON CONFLICT(source_url) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column, _ in _UPDATE_COLUMNS)},
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+ORACLE_MERGE = f"""
+    MERGE INTO FUNDING_OPPORTUNITIES f
+    USING (SELECT :url AS source_url FROM dual) s
+    ON (f.source_url = s.source_url)
+    WHEN MATCHED THEN UPDATE SET
+        {', '.join(f'f.{column} = :{bind}' for column, bind in _UPDATE_COLUMNS)},
+        f.updated_at = CURRENT_TIMESTAMP
+    WHEN NOT MATCHED THEN INSERT ({', '.join(_INSERT_COLUMNS)}, last_scraped)
+    VALUES ({', '.join(_INSERT_BINDS)}, CURRENT_TIMESTAMP)
+"""
+
+# Max. Bind-Variablen pro IN-Liste (Oracle: 1000 Ausdrücke)
+_ID_CHUNK = 500
+
+
+@dataclass
+class UpsertResult:
+    """Ergebnis eines Bulk-Upserts"""
+    inserted: int = 0
+    updated: int = 0
+    # (Index in der Eingabeliste, Fehlermeldung)
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def _bind_row(funding: Dict[str, Any]) -> Dict[str, Any]:
+    """Bind-Parameter für ein Programm (neue ID wird nur beim INSERT genutzt)"""
+    return {
+        'funding_id': str(uuid.uuid4()).replace('-', '').upper(),
+        'url': funding['source_url'],
+        'title': funding['title'],
+        'cleaned_text': funding['cleaned_text'],
+        'summary': make_summary(funding['cleaned_text']),
+        'provider': funding['provider'],
+        'region': funding['region'],
+        'funding_area': funding['funding_area'],
+        'deadline': funding.get('deadline'),
+        'min_amount': funding.get('min_funding_amount'),
+        'max_amount': funding.get('max_funding_amount'),
+        'metadata': str(funding.get('metadata_json', {}))
+    }
+
+
+def _count_inserted(cursor, funding_ids: List[str]) -> int:
+    """Zählt, wie viele der neu vergebenen IDs tatsächlich angelegt wurden"""
+    inserted = 0
+    id_expr = ':id{}' if USE_SQLITE else 'HEXTORAW(:id{})'
+    for start in range(0, len(funding_ids), _ID_CHUNK):
+        chunk = funding_ids[start:start + _ID_CHUNK]
+        placeholders = ', '.join(id_expr.format(i) for i in range(len(chunk)))
+        cursor.execute(
+            f'SELECT COUNT(*) FROM FUNDING_OPPORTUNITIES WHERE funding_id IN ({placeholders})',
+            {f'id{i}': funding_id for i, funding_id in enumerate(chunk)}
+        )
+        inserted += cursor.fetchone()[0]
+    return inserted
+
+
+def _upsert_sqlite(cursor, rows: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    """executemany; bei Fehlern Zeile für Zeile, um sie einzeln zu melden"""
+    import sqlite3
+
+    cursor.execute('SAVEPOINT funding_upsert')
+    try:
+        cursor.executemany(SQLITE_UPSERT, rows)
+        cursor.execute('RELEASE funding_upsert')
+        return []
+    except sqlite3.Error:
+        cursor.execute('ROLLBACK TO funding_upsert')
+        cursor.execute('RELEASE funding_upsert')
+
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            cursor.execute(SQLITE_UPSERT, row)
+        except sqlite3.Error as e:
+            errors.append((index, str(e)))
+    return errors
+
+
+def _upsert_oracle(cursor, rows: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    """Ein MERGE mit Array-Binding; fehlerhafte Zeilen über batcherrors"""
+    import cx_Oracle
+
+    cursor.setinputsizes(cleaned_text=cx_Oracle.DB_TYPE_CLOB, metadata=cx_Oracle.DB_TYPE_CLOB)
+    cursor.executemany(ORACLE_MERGE, rows, batcherrors=True)
+    return [(error.offset, error.message.strip()) for error in cursor.getbatcherrors()]
+
+
+def upsert_funding_opportunities(funding_opportunities: List[Dict[str, Any]]) -> UpsertResult:
+    """
+    Speichert Programme per Bulk-Upsert auf source_url
+
+    Args:
+        funding_opportunities: Programme im Scraper-Format (source_url,
+            title, cleaned_text, provider, region, funding_area, ...)
+
+    Returns:
+        UpsertResult mit Anzahl neuer/aktualisierter Programme und Fehlern
+            pro Zeile
+    """
+    result = UpsertResult()
+    if not funding_opportunities:
+        return result
+
+    # offsets[i]: Index von rows[i] in der Eingabeliste (für Fehlermeldungen)
+    rows, offsets = [], []
+    for index, funding in enumerate(funding_opportunities):
+        try:
+            rows.append(_bind_row(funding))
+            offsets.append(index)
+        except KeyError as e:
+            result.errors.append((index, f'missing field {e}'))
+
+    with get_db_cursor() as cursor:
+        if USE_SQLITE:
+            row_errors = _upsert_sqlite(cursor, rows)
+        else:
+            row_errors = _upsert_oracle(cursor, rows)
+
+        result.errors.extend((offsets[offset], message) for offset, message in row_errors)
+        result.inserted = _count_inserted(cursor, [row['funding_id'] for row in rows])
+
+    result.updated = len(rows) - len(row_errors) - result.inserted
+    result.errors.sort()
+    return result
@@ -0,0 +1,184 @@
+"""
+LLM Cache
+Inhaltsadressierter Cache für LLM-Extraktionsergebnisse
+
+Derselbe Seitentext geht oft mehrfach an DeepSeek: bei erneuten Läufen,
+aus mehreren Scrapern oder doppelt verlinkten Seiten. LLM_CACHE speichert
+das geparste JSON unter einem Hash aus
+    (Prompt-Version, Modell, Temperatur, gekürzter Eingabetext)
+Die Prompt-Version ist ein Hash der Prompt-Vorlage selbst - jede Änderung
+am Prompt ergibt neue Schlüssel, alte Einträge werden nicht mehr getroffen.
+Gespeichert werden nur erfolgreiche Extraktionen; Fehler werden beim
+nächsten Aufruf erneut versucht. LLM_CACHE_ENABLED=false schaltet ab.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.db_adapter import get_db_cursor, USE_SQLITE
+
+load_dotenv()
+
+SQLITE_UPSERT = """
+    INSERT INTO LLM_CACHE (cache_key, prompt_version, model, result_json, created_at)
+    VALUES (:cache_key, :prompt_version, :model, :result_json, CURRENT_TIMESTAMP)
+    ON CONFLICT(cache_key) DO UPDATE SET
+        result_json = excluded.result_json,
+        created_at = CURRENT_TIMESTAMP
+"""
+
+ORACLE_MERGE = """
+    MERGE INTO LLM_CACHE c
+    USING (SELECT :cache_key AS cache_key FROM dual) s
+    ON (c.cache_key = s.cache_key)
+    WHEN MATCHED THEN UPDATE SET
+        c.result_json = :result_json,
+        c.created_at = CURRENT_TIMESTAMP
+    WHEN NOT MATCHED THEN INSERT (cache_key, prompt_version, model, result_json, created_at)
+    VALUES (:cache_key, :prompt_version, :model, :result_json, CURRENT_TIMESTAMP)
+"""
+
+
+def prompt_version(*templates: str) -> str:
+    """Version einer Prompt-Vorlage (Hash über System- und User-Prompt)"""
+    digest = hashlib.sha256('\x00'.join(templates).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def cache_key(version: str, model: str, temperature: float, text: str) -> str:
+    """SHA-256 über Prompt-Version, Modell, Temperatur und Eingabetext"""
+    material = json.dumps([version, model, float(temperature), text], ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+# Oracle: CREATE TABLE nur einmal pro Prozess versuchen
+_table_ready = False
+
+
+def _ensure_table(cursor) -> None:
+    global _table_ready
+
+    if USE_SQLITE:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS LLM_CACHE (
+                cache_key TEXT PRIMARY KEY,
+                prompt_version TEXT,
+                model TEXT,
+                result_json TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        return
+
+    if _table_ready:
+        return
+
+    import cx_Oracle
+    try:
+        cursor.execute('''
+            CREATE TABLE LLM_CACHE (
+                cache_key VARCHAR2(64) PRIMARY KEY,
+                prompt_version VARCHAR2(16),
+                model VARCHAR2(100),
+                result_json CLOB,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code != 955:  # ORA-00955: Tabelle existiert bereits
+            raise
+    _table_ready = True
+
+
+class LLMCache:
+    """Persistenter LLM-Ergebnis-Cache mit In-Memory-Schicht"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Args:
+            enabled: Cache nutzen (default: LLM_CACHE_ENABLED)
+        """
+        if enabled is None:
+            enabled = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+        # JSON-Strings, damit jeder Treffer ein eigenes (veränderbares) dict liefert
+        self._memory: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Gespeichertes Ergebnis zu einem Schlüssel
+
+        Returns:
+            Geparstes JSON oder None (nicht im Cache / Cache aus)
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            raw = self._memory.get(key)
+        if raw is None:
+            try:
+                with get_db_cursor() as cursor:
+                    _ensure_table(cursor)
+                    cursor.execute('SELECT result_json FROM LLM_CACHE WHERE cache_key = :cache_key', {'cache_key': key})
+                    row = cursor.fetchone()
+            except Exception as e:
+                print(f'[WARN] LLM cache lookup failed: {e}')
+                row = None
+            if row and row[0] is not None:
+                raw = row[0].read() if hasattr(row[0], 'read') else row[0]
+                with self._lock:
+                    self._memory[key] = raw
+
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    def put(self, key: str, data: Dict, version: str, model: str) -> None:
+        """Speichert ein erfolgreiches Ergebnis (Fehler beim Schreiben nur geloggt)"""
+        if not self.enabled:
+            return
+
+        raw = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._memory[key] = raw
+        try:
+            with get_db_cursor() as cursor:
+                _ensure_table(cursor)
+                cursor.execute(SQLITE_UPSERT if USE_SQLITE else ORACLE_MERGE, {
+                    'cache_key': key,
+                    'prompt_version': version,
+                    'model': model,
+                    'result_json': raw
+                })
+        except Exception as e:
+            print(f'[WARN] LLM cache write failed: {e}')
+
+    def stats(self) -> str:
+        """Kurzfassung für die Lauf-Statistik"""
+        return f'{self.hits} cache hits, {self.misses} misses'
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Prozessweiter Cache (beim ersten Aufruf angelegt)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+    return _cache
@@ -3,7 +3,8 @@ Prometheus Metrics for EduFunds Backend
 Defines custom business and application metrics
 """
 
-from prometheus_client import Counter, Histogram, Gauge, Info
+from prometheus_client import Counter, Histogram, Gauge, Info, REGISTRY, push_to_gateway, start_http_server
+import os
 import time
 from functools import wraps
 from typing import Callable, Any
@@ -60,6 +61,12 @@ rag_search_results = Histogram(
     buckets=[0, 1, 3, 5, 10, 20, 50]
 )
 
+rag_retrieval_path_total = Counter(
+    'rag_retrieval_path_total',
+    'Adaptive retrieval decisions',
+    ['path']  # early_exit, widened or fixed
+)
+
 # Database Metrics
 db_query_duration = Histogram(
     'db_query_duration_seconds',
@@ -131,6 +138,69 @@ scraper_duration = Histogram(
     buckets=[60, 300, 600, 1800, 3600, 7200]
 )
 
+scraper_jobs = Gauge(
+    'scraper_jobs',
+    'Scrape ledger jobs of the current run',
+    ['scraper', 'state']  # pending/running/done/failed
+)
+
+
+# =============================================================================
+# Batch Processes (Scraper)
+# =============================================================================
+# Scrapers run outside the API process; their metrics are only visible when
+# exported explicitly (both opt-in):
+# - SCRAPER_METRICS_PORT: /metrics endpoint while the run is active
+# - PROMETHEUS_PUSHGATEWAY: push to a Pushgateway (throttled, forced per source)
+
+SCRAPER_METRICS_PUSH_INTERVAL = float(os.getenv('SCRAPER_METRICS_PUSH_INTERVAL', 15))
+
+_metrics_server_started = False
+_last_push = 0.0
+
+
+def start_batch_metrics_server() -> None:
+    """Expose this process' metrics on SCRAPER_METRICS_PORT (once per process)"""
+    global _metrics_server_started
+
+    port = os.getenv('SCRAPER_METRICS_PORT')
+    if _metrics_server_started or not port:
+        return
+
+    try:
+        start_http_server(int(port))
+    except OSError as e:
+        print(f'[WARN] Scraper metrics port {port} not available: {e}')
+        return
+    _metrics_server_started = True
+    print(f'[INFO] Scraper metrics on :{port}/metrics')
+
+
+def push_batch_metrics(job: str, force: bool = False) -> None:
+    """
+    Push all metrics to PROMETHEUS_PUSHGATEWAY (no-op if unset)
+
+    Args:
+        job: Pushgateway job name (e.g. 'scraper_firecrawl')
+        force: Push even within SCRAPER_METRICS_PUSH_INTERVAL of the last push
+    """
+    global _last_push
+
+    gateway = os.getenv('PROMETHEUS_PUSHGATEWAY')
+    if not gateway:
+        return
+
+    now = time.monotonic()
+    if not force and now - _last_push < SCRAPER_METRICS_PUSH_INTERVAL:
+        return
+    _last_push = now
+
+    try:
+        push_to_gateway(gateway, job=job, registry=REGISTRY)
+    except Exception as e:
+        # Metrics must never fail a scrape run
+        print(f'[WARN] Pushgateway {gateway} not reachable: {e}')
+
 
 # =============================================================================
 # Business Metrics
@@ -0,0 +1,287 @@
+"""
+Scrape Ledger
+Persistentes Job-Protokoll für fortsetzbare Scraper-Läufe
+
+Jeder Lauf bekommt eine run_id; alle URLs aller Quellen werden zu Beginn
+als Jobs in SCRAPE_JOBS eingetragen (pending) und beim Abarbeiten
+fortgeschrieben:
+    pending -> running -> done / failed
+mit Versuchszähler und Zeitstempeln. Die Ergebnisse einer URL werden
+sofort gespeichert, bevor der Job als done gilt - bricht der Lauf ab
+(Browser-Crash, DeepSeek-Ausfall), sind alle fertigen Seiten bereits in
+der DB. Mit --resume setzt der nächste Lauf die letzte unvollständige
+run_id fort und verarbeitet nur Jobs, die nicht done sind und weniger als
+SCRAPER_LEDGER_MAX_ATTEMPTS Versuche haben.
+
+Fortschritt geht zusätzlich in die Scraper-Metriken (scraper_jobs,
+scraper_programs_discovered, scraper_runs_total, scraper_duration); sichtbar
+über SCRAPER_METRICS_PORT (/metrics während des Laufs) und/oder
+PROMETHEUS_PUSHGATEWAY (siehe utils.prometheus_metrics).
+"""
+
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from utils.db_adapter import get_db_cursor, USE_SQLITE
+from utils.prometheus_metrics import (
+    push_batch_metrics,
+    scraper_duration,
+    scraper_jobs,
+    scraper_programs_discovered,
+    scraper_runs_total,
+    start_batch_metrics_server
+)
+
+load_dotenv()
+
+# Versuche pro Job, danach wird er beim Fortsetzen übersprungen
+SCRAPER_LEDGER_MAX_ATTEMPTS = int(os.getenv('SCRAPER_LEDGER_MAX_ATTEMPTS', 3))
+
+JOB_STATES = ('pending', 'running', 'done', 'failed')
+
+# Fehlermeldungen werden gekürzt gespeichert
+_MAX_ERROR_LENGTH = 1000
+
+# Oracle: CREATE TABLE nur einmal pro Prozess versuchen
+_table_ready = False
+
+
+def _ensure_table(cursor) -> None:
+    global _table_ready
+
+    if USE_SQLITE:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS SCRAPE_JOBS (
+                run_id TEXT NOT NULL,
+                scraper TEXT NOT NULL,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                results INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_id, source, url)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scrape_jobs_scraper ON SCRAPE_JOBS(scraper, updated_at)')
+        return
+
+    if _table_ready:
+        return
+
+    import cx_Oracle
+    try:
+        cursor.execute('''
+            CREATE TABLE SCRAPE_JOBS (
+                run_id VARCHAR2(64) NOT NULL,
+                scraper VARCHAR2(64) NOT NULL,
+                source VARCHAR2(255) NOT NULL,
+                url VARCHAR2(2048) NOT NULL,
+                state VARCHAR2(16) DEFAULT 'pending' NOT NULL,
+                attempts NUMBER DEFAULT 0 NOT NULL,
+                results NUMBER DEFAULT 0 NOT NULL,
+                error VARCHAR2(1000),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT pk_scrape_jobs PRIMARY KEY (run_id, source, url)
+            )
+        ''')
+        cursor.execute('CREATE INDEX idx_scrape_jobs_scraper ON SCRAPE_JOBS(scraper, updated_at)')
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        if error.code != 955:  # ORA-00955: Tabelle existiert bereits
+            raise
+    _table_ready = True
+
+
+def new_run_id() -> str:
+    """Sortierbare Lauf-ID, z.B. 20251104-031500-3f9a1c"""
+    return f'{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}'
+
+
+def latest_unfinished_run(scraper: str, max_attempts: int = SCRAPER_LEDGER_MAX_ATTEMPTS) -> Optional[str]:
+    """
+    Letzter Lauf eines Scrapers mit offenen Jobs
+
+    Returns:
+        run_id oder None, wenn alle Läufe abgeschlossen sind
+    """
+    with get_db_cursor() as cursor:
+        _ensure_table(cursor)
+        cursor.execute('''
+            SELECT run_id FROM SCRAPE_JOBS
+            WHERE scraper = :scraper AND state <> 'done' AND attempts < :max_attempts
+            GROUP BY run_id
+            ORDER BY MAX(updated_at) DESC, run_id DESC
+        ''', {'scraper': scraper, 'max_attempts': max_attempts})
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class ScrapeLedger:
+    """Jobs eines Scraper-Laufs (einmal geladen, jede Änderung sofort gespeichert)"""
+
+    def __init__(
+        self,
+        scraper: str,
+        run_id: Optional[str] = None,
+        max_attempts: int = SCRAPER_LEDGER_MAX_ATTEMPTS
+    ):
+        """
+        Args:
+            scraper: Name des Scrapers (z.B. 'firecrawl', 'crawl4ai')
+            run_id: Bestehender Lauf zum Fortsetzen (default: neuer Lauf)
+            max_attempts: Versuche pro Job
+        """
+        self.scraper = scraper
+        self.run_id = run_id or new_run_id()
+        self.max_attempts = max_attempts
+        self.resumed = run_id is not None
+        self._lock = threading.Lock()
+        # (source, url) -> [state, attempts]
+        self._jobs: Dict[Tuple[str, str], List] = {}
+
+        with get_db_cursor() as cursor:
+            _ensure_table(cursor)
+            cursor.execute(
+                'SELECT source, url, state, attempts FROM SCRAPE_JOBS WHERE run_id = :run_id',
+                {'run_id': self.run_id}
+            )
+            for source, url, state, attempts in cursor.fetchall():
+                self._jobs[(source, url)] = [state, attempts]
+        self._report()
+
+    @classmethod
+    def open(cls, scraper: str, resume: bool = False) -> 'ScrapeLedger':
+        """
+        Neuer Lauf oder (resume=True) Fortsetzung des letzten unvollständigen
+
+        Args:
+            scraper: Name des Scrapers
+            resume: Letzten unvollständigen Lauf fortsetzen
+
+        Returns:
+            ScrapeLedger des Laufs
+        """
+        start_batch_metrics_server()
+        run_id = latest_unfinished_run(scraper) if resume else None
+        if resume and run_id is None:
+            print(f'[INFO] No unfinished {scraper} run to resume - starting a new run')
+        ledger = cls(scraper, run_id)
+        if ledger.resumed:
+            print(f'[INFO] Resuming run {ledger.run_id}: {ledger.summary()}')
+        else:
+            print(f'[INFO] Run id: {ledger.run_id}')
+        return ledger
+
+    def register(self, source: str, urls: Iterable[str]) -> None:
+        """Trägt neue Jobs einer Quelle als pending ein (bekannte bleiben unverändert)"""
+        with self._lock:
+            new_urls = [url for url in dict.fromkeys(urls) if (source, url) not in self._jobs]
+            for url in new_urls:
+                self._jobs[(source, url)] = ['pending', 0]
+        if not new_urls:
+            return
+
+        rows = [
+            {'run_id': self.run_id, 'scraper': self.scraper, 'source': source, 'url': url}
+            for url in new_urls
+        ]
+        with get_db_cursor() as cursor:
+            _ensure_table(cursor)
+            cursor.executemany('''
+                INSERT INTO SCRAPE_JOBS (run_id, scraper, source, url, state, attempts)
+                VALUES (:run_id, :scraper, :source, :url, 'pending', 0)
+            ''', rows)
+        self._report()
+
+    def should_process(self, source: str, url: str) -> bool:
+        """False für erledigte Jobs und Jobs ohne verbleibende Versuche"""
+        with self._lock:
+            state, attempts = self._jobs.get((source, url), ('pending', 0))
+        return state != 'done' and attempts < self.max_attempts
+
+    def open_urls(self, source: str, urls: Iterable[str]) -> List[str]:
+        """URLs einer Quelle, die in diesem Lauf noch zu verarbeiten sind"""
+        return [url for url in urls if self.should_process(source, url)]
+
+    def _update(self, source: str, url: str, state: str, sql_set: str, params: Dict) -> None:
+        with self._lock:
+            job = self._jobs.setdefault((source, url), ['pending', 0])
+            job[0] = state
+            if state == 'running':
+                job[1] += 1
+        with get_db_cursor() as cursor:
+            _ensure_table(cursor)
+            cursor.execute(
+                f'''
+                UPDATE SCRAPE_JOBS SET state = :state, {sql_set}, updated_at = CURRENT_TIMESTAMP
+                WHERE run_id = :run_id AND source = :source AND url = :url
+                ''',
+                {'state': state, 'run_id': self.run_id, 'source': source, 'url': url, **params}
+            )
+        self._report()
+
+    def start_job(self, source: str, url: str) -> None:
+        """Job beginnt (zählt einen Versuch)"""
+        self._update(
+            source, url, 'running',
+            'attempts = attempts + 1, started_at = CURRENT_TIMESTAMP, error = NULL', {}
+        )
+
+    def finish_job(self, source: str, url: str, results: int = 0) -> None:
+        """Job erledigt - erst aufrufen, nachdem seine Ergebnisse gespeichert sind"""
+        self._update(source, url, 'done', 'results = :results, finished_at = CURRENT_TIMESTAMP', {'results': results})
+        if results:
+            scraper_programs_discovered.labels(source=source).inc(results)
+
+    def fail_job(self, source: str, url: str, error: str) -> None:
+        """Job fehlgeschlagen (wird mit --resume erneut versucht)"""
+        self._update(
+            source, url, 'failed', 'error = :error, finished_at = CURRENT_TIMESTAMP',
+            {'error': str(error)[:_MAX_ERROR_LENGTH]}
+        )
+
+    def source_finished(self, source: str, duration: float) -> None:
+        """Meldet eine abgeschlossene Quelle an die Scraper-Metriken"""
+        with self._lock:
+            failed = any(job[0] == 'failed' for (name, _), job in self._jobs.items() if name == source)
+        scraper_runs_total.labels(status='error' if failed else 'success', source=source).inc()
+        scraper_duration.labels(source=source).observe(duration)
+        push_batch_metrics(self.metrics_job, force=True)
+
+    def summary(self) -> Dict[str, int]:
+        """Anzahl Jobs pro Zustand"""
+        with self._lock:
+            counts = dict.fromkeys(JOB_STATES, 0)
+            for state, _ in self._jobs.values():
+                counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def is_complete(self) -> bool:
+        """True, wenn kein Job mehr offen ist (erledigt oder Versuche aufgebraucht)"""
+        with self._lock:
+            return not any(
+                state != 'done' and attempts < self.max_attempts for state, attempts in self._jobs.values()
+            )
+
+    @property
+    def metrics_job(self) -> str:
+        """Pushgateway job name"""
+        return f'scraper_{self.scraper}'
+
+    def _report(self) -> None:
+        for state, count in self.summary().items():
+            scraper_jobs.labels(scraper=self.scraper, state=state).set(count)
+        push_batch_metrics(self.metrics_job)
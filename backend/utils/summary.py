@@ -0,0 +1,101 @@
+"""
+Funding Summary
+Kurze Klartext-Vorschau (summary) aus dem Markdown-Volltext
+
+Die Listenansicht zeigt nur eine Vorschau; statt cleaned_text (oft
+zehntausende Zeichen Markdown pro Programm) liefert GET /funding/ die
+vorberechnete Spalte summary. Scraper setzen sie beim Speichern,
+backfill_summaries() ergänzt fehlende Werte.
+"""
+
+import re
+from typing import Optional
+
+from utils.db_adapter import get_db_cursor
+
+# Maximale Länge der Vorschau (Zeichen, inkl. '…')
+SUMMARY_MAX_CHARS = 300
+
+_MARKDOWN_PATTERNS = [
+    (re.compile(r'!\[[^\]]*\]\([^)]*\)'), ' '),          # Bilder
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),       # Links -> Linktext
+    (re.compile(r'^\s{0,3}#{1,6}\s.*$', re.MULTILINE), ' '),  # Überschriften
+    (re.compile(r'^\s*(?:[-*+]|\d+\.)\s+', re.MULTILINE), ''),  # Listenpunkte
+    (re.compile(r'^\s*>\s?', re.MULTILINE), ''),         # Zitate
+    (re.compile(r'[|*_`~]+'), ' '),                      # Tabellen, Hervorhebungen
+    (re.compile(r'<[^>]+>'), ' '),                       # HTML-Tags
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def make_summary(text: Optional[str], max_chars: int = SUMMARY_MAX_CHARS) -> Optional[str]:
+    """
+    Erzeugt eine Klartext-Vorschau
+
+    Entfernt Markdown (Überschriften, Links, Bilder, Tabellen) und kürzt
+    an einer Wortgrenze.
+
+    Args:
+        text: Markdown-Volltext (cleaned_text)
+        max_chars: Maximale Länge
+
+    Returns:
+        Vorschau oder None bei leerem Text
+    """
+    if not text:
+        return None
+
+    summary = text
+    for pattern, replacement in _MARKDOWN_PATTERNS:
+        summary = pattern.sub(replacement, summary)
+    summary = summary.strip()
+
+    if not summary:
+        return None
+    if len(summary) <= max_chars:
+        return summary
+
+    cut = summary[:max_chars - 1]
+    if ' ' in cut:
+        cut = cut[:cut.rindex(' ')]
+    return cut.rstrip(' ,;:.-') + '…'
+
+
+def backfill_summaries(cursor=None, batch_size: int = 500) -> int:
+    """
+    Setzt summary für alle Programme ohne Vorschau (idempotent)
+
+    Args:
+        cursor: Offener Cursor (default: eigener Cursor)
+        batch_size: Zeilen pro executemany
+
+    Returns:
+        Anzahl aktualisierter Programme
+    """
+    if cursor is None:
+        with get_db_cursor() as cursor:
+            return backfill_summaries(cursor, batch_size)
+
+    cursor.execute("""
+        SELECT funding_id, cleaned_text
+        FROM FUNDING_OPPORTUNITIES
+        WHERE summary IS NULL AND cleaned_text IS NOT NULL
+    """)
+    updates = []
+    for funding_id, cleaned_text in cursor.fetchall():
+        # Oracle: CLOB
+        if hasattr(cleaned_text, 'read'):
+            cleaned_text = cleaned_text.read()
+        summary = make_summary(cleaned_text)
+        if summary:
+            updates.append({'summary': summary, 'funding_id': funding_id})
+
+    for start in range(0, len(updates), batch_size):
+        cursor.executemany(
+            'UPDATE FUNDING_OPPORTUNITIES SET summary = :summary WHERE funding_id = :funding_id',
+            updates[start:start + batch_size]
+        )
+
+    if updates:
+        print(f'[INFO] Backfilled {len(updates)} funding summaries')
+    return len(updates)
@@ -0,0 +1,131 @@
+"""
+Token Counter
+Schnelles Token-Zählen für DeepSeek-Prompts (Fast Tokenizer mit Fallback)
+"""
+
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local tokenizer path or HuggingFace name ('' = estimate). A hub name is
+# downloaded on first load - load_tokenizer() at startup, not per request
+DEEPSEEK_TOKENIZER = os.getenv('DEEPSEEK_TOKENIZER', '')
+
+# Fallback: average characters per token for German text
+CHARS_PER_TOKEN = 3.5
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """
+    Lädt den Fast Tokenizer einmalig (lazy, besser vorab: load_tokenizer)
+
+    Returns:
+        PreTrainedTokenizerFast oder None (dann wird geschätzt)
+    """
+    if not DEEPSEEK_TOKENIZER:
+        return None
+
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(DEEPSEEK_TOKENIZER, use_fast=True)
+        print(f'[INFO] Token counter using tokenizer: {DEEPSEEK_TOKENIZER}')
+        return tokenizer
+    except Exception as e:
+        print(f'[WARNING] Tokenizer {DEEPSEEK_TOKENIZER} not available ({e}), using estimate')
+        return None
+
+
+def load_tokenizer() -> None:
+    """Lädt den Tokenizer beim Start (blockierend, außerhalb von Requests)"""
+    if DEEPSEEK_TOKENIZER:
+        print(f'[STARTUP] Loading tokenizer {DEEPSEEK_TOKENIZER}...')
+    get_tokenizer()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Schätzt die Token-Anzahl ohne Tokenizer
+
+    Args:
+        text: Text
+
+    Returns:
+        Geschätzte Anzahl Tokens
+    """
+    if not text:
+        return 0
+    return max(1, int(len(text) / CHARS_PER_TOKEN + 0.5))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Zählt die Tokens eines Texts
+
+    Args:
+        text: Text
+
+    Returns:
+        Anzahl Tokens
+    """
+    if not text:
+        return 0
+
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = ' …') -> str:
+    """
+    Kürzt einen Text auf maximal max_tokens Tokens
+
+    Es wird an einer Wortgrenze geschnitten, damit keine halben Wörter
+    im Prompt landen.
+
+    Args:
+        text: Text
+        max_tokens: Token-Budget (inkl. Suffix)
+        suffix: Markierung für gekürzten Text
+
+    Returns:
+        Gekürzter Text (unverändert, wenn er ins Budget passt)
+    """
+    if not text or max_tokens <= 0:
+        return ''
+
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(1, max_tokens - count_tokens(suffix))
+    cut = _char_offset_for_tokens(text, budget)
+
+    # Back off to the last whitespace so no word is split
+    space = text.rfind(' ', 0, cut)
+    if space > cut * 0.8:
+        cut = space
+
+    return text[:cut].rstrip() + suffix
+
+
+def _char_offset_for_tokens(text: str, max_tokens: int) -> int:
+    """Zeichen-Offset, an dem max_tokens Tokens enden"""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return int(max_tokens * CHARS_PER_TOKEN)
+
+    encoding = tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True
+    )
+    offsets = encoding['offset_mapping']
+    if len(offsets) <= max_tokens:
+        return len(text)
+    return offsets[max_tokens - 1][1]
@@ -0,0 +1,77 @@
+"""
+TTL Cache
+Kleiner thread-sicherer In-Process-Cache mit Ablaufzeit
+
+Für teure, aber kurzlebig gültige API-Ergebnisse (z.B. Gesamtanzahl pro
+Filterkombination). Pro API-Prozess; Schreibpfade rufen invalidate() auf.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """LRU-begrenzter Cache, Einträge verfallen nach ttl Sekunden"""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024):
+        """
+        Args:
+            ttl: Lebensdauer eines Eintrags in Sekunden (0 = Cache aus)
+            max_entries: Maximale Anzahl Einträge (älteste fliegen raus)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Gibt den Wert zurück, None wenn nicht vorhanden oder abgelaufen"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Speichert einen Wert"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Gibt den gecachten Wert zurück oder berechnet und speichert ihn"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> None:
+        """
+        Entfernt Einträge
+
+        Args:
+            predicate: Nur Keys entfernen, für die predicate(key) True ist
+                (default: alle)
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
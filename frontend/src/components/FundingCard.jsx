@@ -42,9 +42,10 @@ export function FundingCard({ funding }) {
       } €`
     : null
 
-  // Extract description from cleaned_text (first 150 chars)
-  const description = funding.cleaned_text
-    ? funding.cleaned_text
+  // Short plain-text preview (list responses carry summary, not cleaned_text)
+  const previewText = funding.summary || funding.cleaned_text
+  const description = previewText
+    ? previewText
         .replace(/^#.*$/gm, '') // Remove markdown headers
         .replace(/\n+/g, ' ') // Replace newlines with spaces
         .trim()
@@ -440,8 +440,8 @@ function FundingCard({ funding }) {
           <h3 className="text-base font-semibold text-brand-navy group-hover:text-primary-600 line-clamp-2">{funding.title}</h3>
           <p className="mt-1 text-xs text-slate-500">{funding.provider || 'Unbekannter Fördergeber'}</p>
         </div>
-        {funding.cleaned_text && (
-          <p className="text-sm text-slate-600 line-clamp-3">{funding.cleaned_text}</p>
+        {(funding.summary || funding.cleaned_text) && (
+          <p className="text-sm text-slate-600 line-clamp-3">{funding.summary || funding.cleaned_text}</p>
         )}
         <div className="flex flex-wrap items-center gap-2 text-xs text-slate-500">
           {deadline && (
@@ -6,6 +6,7 @@ export interface FundingOpportunity {
   id: string;
   title: string;
   description?: string;
+  summary?: string;
   provider: string;
   category?: string;
   amount_min?: number;